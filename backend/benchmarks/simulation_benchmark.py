@@ -0,0 +1,396 @@
+"""Scaling benchmarks of the simulation core.
+
+Usage (from the backend directory):
+    python -m benchmarks.simulation_benchmark run --scales tiny small --output benchmark_results.json
+    python -m benchmarks.simulation_benchmark compare benchmarks/baseline.json benchmark_results.json
+
+Each scale builds a synthetic network (a square grid of base stations with the default cells, UEs
+spread over the coverage area) in a fresh process, then times:
+    step                     SimulationEngine.step
+    to_json                  SimulationEngine.to_json
+    move_ues                 the mobility stage moving every UE (see network_layer/mobility.py)
+    allocate_prb             Cell.allocate_prb of every cell
+    monitor_signal_strength  UE.monitor_signal_strength of every UE, recomputing all its measurements
+    query_knowledge          KnowledgeRouter.query_knowledge of BENCHMARK_KNOWLEDGE_QUERIES, without response cache
+and records the peak memory (tracemalloc) of building the network and of one step.
+
+compare exits with status 1 if a median time or a peak memory grew by more than the threshold,
+so it can gate a deployment.
+
+benchmarks/baseline.json holds the tiny and small results of the commit in its metadata, produced with
+    python -m benchmarks.simulation_benchmark run --scales tiny small --output benchmarks/baseline.json
+Timings depend on the machine (recorded in the metadata): a gate compares against a baseline
+produced the same way on its own machine, and the baseline is refreshed with changes that are
+expected to move the numbers.
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import math
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from tabulate import tabulate
+
+import settings
+from network_layer.what_if import init_headless_process
+
+logger = logging.getLogger(__name__)
+
+# scale name -> (base stations, UEs)
+BENCHMARK_SCALES = {
+    "tiny": (4, 50),
+    "small": (25, 1000),
+    "medium": (100, 10000),
+    "large": (1000, 100000),
+}
+BENCHMARK_DEFAULT_SCALES = ["tiny", "small"]
+BENCHMARK_BS_SPACING_M = 1000
+BENCHMARK_KNOWLEDGE_QUERIES = [
+    "/sim_engine",
+    "/base_stations",
+    "/cells",
+    "/user_equipments",
+    "/base_stations/{bs_id}",
+    "/cells/{cell_id}",
+    "/user_equipments/{ue_imsi}",
+]
+BENCHMARK_RESULTS_VERSION = 1
+
+
+def build_network(bs_count, ue_count, seed=0):
+    """
+    Build a synthetic network (a square grid of base stations) in this (benchmark) process.
+
+    Returns:
+        SimulationEngine: The engine, with every UE powered up and registered.
+    """
+    from network_layer.simulation_engine import SimulationEngine
+    from network_layer.ue import UE
+    from utils import get_random_ue_operational_region
+
+    columns = math.ceil(math.sqrt(bs_count))
+    rows = math.ceil(bs_count / columns)
+    # no UEs are spawned while the benchmark steps the network
+    settings.UE_DEFAULT_MAX_COUNT = ue_count
+    # the benchmark times the simulation core, the KPI history of the live UI is not recorded
+    settings.SIM_KPI_RECORDER_ENABLED = False
+    bs_list = []
+    for i in range(bs_count):
+        bs_id = f"bs_{i}"
+        bs_list.append(
+            {
+                "bs_id": bs_id,
+                "position_x": BENCHMARK_BS_SPACING_M // 2
+                + (i % columns) * BENCHMARK_BS_SPACING_M,
+                "position_y": BENCHMARK_BS_SPACING_M // 2
+                + (i // columns) * BENCHMARK_BS_SPACING_M,
+                "cell_list": settings.RAN_BS_DEFAULT_CELLS(bs_id),
+                "rrc_measurement_events": settings.RAN_BS_DEFAULT_RRC_MEASUREMENT_EVENTS(),
+                "edge_server": settings.RAN_BS_EDGE_DEFAULT_SERVER(),
+            }
+        )
+
+    simulation_engine = SimulationEngine(seed=seed)
+    simulation_engine.reset_network()
+    simulation_engine.network_setup(
+        topology={
+            "coverage_width": columns * BENCHMARK_BS_SPACING_M,
+            "coverage_height": rows * BENCHMARK_BS_SPACING_M,
+            "bs_list": bs_list,
+        }
+    )
+    rng = simulation_engine.rng
+    for i in range(ue_count):
+        ue_imsi = f"IMSI_{i}"
+        if ue_imsi not in simulation_engine.core_network.ue_subscription_data:
+            simulation_engine.core_network.ue_subscription_data[ue_imsi] = [
+                settings.NETWORK_SLICE_EMBB_NAME
+            ]
+        region = get_random_ue_operational_region(
+            rng, simulation_engine.coverage_width, simulation_engine.coverage_height
+        )
+        ue = UE(
+            ue_imsi=ue_imsi,
+            operation_region=region,
+            position_x=rng.randint("spawning", region["min_x"], region["max_x"]),
+            position_y=rng.randint("spawning", region["min_y"], region["max_y"]),
+            target_x=rng.randint("mobility", region["min_x"], region["max_x"]),
+            target_y=rng.randint("mobility", region["min_y"], region["max_y"]),
+            speed_mps=rng.randint(
+                "spawning", settings.UE_speed_mps_MIN, settings.UE_speed_mps_MAX
+            ),
+            simulation_engine=simulation_engine,
+        )
+        if ue.power_up():
+            simulation_engine.add_ue(ue)
+    return simulation_engine
+
+
+def _time(function, repeats):
+    seconds = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - started_at)
+    return {
+        "repeats": repeats,
+        "min_seconds": min(seconds),
+        "median_seconds": statistics.median(seconds),
+        "mean_seconds": statistics.mean(seconds),
+    }
+
+
+def run_scale(bs_count, ue_count, repeats, seed=0):
+    """Benchmark one scale in this (fresh) process, see the module docstring."""
+    from knowledge_layer import KnowledgeRouter
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        tracemalloc.start()
+        started_at = time.perf_counter()
+        simulation_engine = build_network(bs_count, ue_count, seed=seed)
+        build_seconds = time.perf_counter() - started_at
+        network_memory, build_peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        knowledge_router = KnowledgeRouter()
+        knowledge_router.import_routes(simulation_engine)
+        cells = list(simulation_engine.cell_list.values())
+        ues = list(simulation_engine.ue_list.values())
+        queries = [
+            query.format(
+                bs_id=next(iter(simulation_engine.base_station_list)),
+                cell_id=cells[0].cell_id,
+                ue_imsi=ues[0].ue_imsi if ues else "IMSI_0",
+            )
+            for query in BENCHMARK_KNOWLEDGE_QUERIES
+        ]
+
+        def step():
+            simulation_engine.sim_step += 1
+            simulation_engine.step(settings.SIM_STEP_TIME_DEFAULT)
+
+        def move_ues():
+            simulation_engine.mobility.step(
+                simulation_engine.ue_list,
+                settings.SIM_STEP_TIME_DEFAULT,
+                simulation_engine.rng,
+            )
+
+        def allocate_prb():
+            for cell in cells:
+                cell.allocate_prb()
+
+        def monitor_signal_strength():
+            for ue in ues:
+                # the full recomputation, the measurements of unchanged UEs are skipped otherwise
+                ue.measured_position = None
+                ue.invalidate_measurements()
+                ue.monitor_signal_strength()
+
+        def query_knowledge():
+            for query in queries:
+                knowledge_router.clear_response_cache()
+                knowledge_router.query_knowledge(query)
+
+        timings = {
+            "step": _time(step, repeats),
+            "to_json": _time(simulation_engine.to_json, repeats),
+            "move_ues": _time(move_ues, repeats),
+            "allocate_prb": _time(allocate_prb, repeats),
+            "monitor_signal_strength": _time(monitor_signal_strength, repeats),
+            "query_knowledge": _time(query_knowledge, repeats),
+        }
+        timings["move_ues"]["calls"] = len(ues)
+        timings["allocate_prb"]["calls"] = len(cells)
+        timings["monitor_signal_strength"]["calls"] = len(ues)
+        timings["query_knowledge"]["calls"] = len(queries)
+
+        tracemalloc.start()
+        step()
+        simulation_engine.to_json()
+        _, step_peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "base_stations": bs_count,
+        "cells": len(cells),
+        "ues": len(simulation_engine.ue_list),
+        "build_seconds": build_seconds,
+        "memory": {
+            "network_mb": network_memory / 2**20,
+            "build_peak_mb": build_peak_memory / 2**20,
+            "step_peak_mb": step_peak_memory / 2**20,
+        },
+        "timings": timings,
+    }
+
+
+def _get_git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(scales, repeats=5, seed=0, output_path=None):
+    """
+    Run the benchmark of every scale, each in a fresh process.
+
+    Args:
+        scales (list[str]): Names of BENCHMARK_SCALES, or "<base stations>x<UEs>", e.g. "9x200".
+        repeats (int): Timed repetitions of each operation.
+        seed (int): Seed of the synthetic networks.
+        output_path (str, optional): JSON file the results are written to.
+
+    Returns:
+        dict: {"metadata": {...}, "results": {scale: {...}}}
+    """
+    results = {}
+    for scale in scales:
+        if scale in BENCHMARK_SCALES:
+            bs_count, ue_count = BENCHMARK_SCALES[scale]
+        else:
+            try:
+                bs_count, ue_count = (int(n) for n in scale.split("x"))
+            except ValueError:
+                raise ValueError(
+                    f"Unknown scale '{scale}', expected one of {', '.join(BENCHMARK_SCALES)} or <base stations>x<UEs>."
+                )
+        logger.info(f"Benchmarking {scale}: {bs_count} base stations, {ue_count} UEs")
+        with ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_headless_process,
+        ) as executor:
+            results[scale] = executor.submit(
+                run_scale, bs_count, ue_count, repeats, seed
+            ).result()
+        logger.info(
+            f"{scale}: "
+            + ", ".join(
+                f"{name} {timing['median_seconds'] * 1000:.2f} ms"
+                for name, timing in results[scale]["timings"].items()
+            )
+        )
+
+    benchmark = {
+        "version": BENCHMARK_RESULTS_VERSION,
+        "metadata": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_commit": _get_git_commit(),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+            "repeats": repeats,
+            "seed": seed,
+        },
+        "results": results,
+    }
+    if output_path:
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(output_path, "w") as file:
+            json.dump(benchmark, file, indent=2)
+    return benchmark
+
+
+def compare_benchmarks(baseline, current, threshold=0.2):
+    """
+    Compare benchmark results against a baseline.
+
+    Returns:
+        tuple: (rows of [scale, metric, baseline, current, change], regressions as "<scale> <metric>")
+    """
+    rows = []
+    regressions = []
+    for scale, current_result in current["results"].items():
+        baseline_result = baseline["results"].get(scale, None)
+        if baseline_result is None:
+            continue
+        metrics = [
+            (
+                f"{name} median (s)",
+                timing["median_seconds"],
+                baseline_result["timings"].get(name, {}).get("median_seconds", None),
+            )
+            for name, timing in current_result["timings"].items()
+        ] + [
+            (f"{name} (MB)", value, baseline_result["memory"].get(name, None))
+            for name, value in current_result["memory"].items()
+        ]
+        for metric, current_value, baseline_value in metrics:
+            if baseline_value is None:
+                continue
+            change = (
+                (current_value - baseline_value) / baseline_value
+                if baseline_value > 0
+                else 0.0
+            )
+            regressed = change > threshold
+            if regressed:
+                regressions.append(f"{scale} {metric}")
+            rows.append(
+                [
+                    scale,
+                    metric,
+                    f"{baseline_value:.6g}",
+                    f"{current_value:.6g}",
+                    f"{change:+.1%}" + (" REGRESSION" if regressed else ""),
+                ]
+            )
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling benchmarks of the simulation core")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks")
+    run_parser.add_argument("--scales", nargs="+", default=BENCHMARK_DEFAULT_SCALES, help=f"Scales: {', '.join(BENCHMARK_SCALES)} or <base stations>x<UEs>")
+    run_parser.add_argument("--repeats", type=int, default=5, help="Timed repetitions of each operation")
+    run_parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic networks")
+    run_parser.add_argument("--output", default="benchmark_results.json", help="JSON file for the results")
+    compare_parser = subparsers.add_parser("compare", help="Compare results against a baseline")
+    compare_parser.add_argument("baseline", help="JSON file of the baseline results")
+    compare_parser.add_argument("current", help="JSON file of the results to check")
+    compare_parser.add_argument("--threshold", type=float, default=0.2, help="Relative growth counted as a regression, e.g. 0.2 for +20%%")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logger.setLevel(logging.INFO)
+    if args.command == "run":
+        run_benchmarks(args.scales, repeats=args.repeats, seed=args.seed, output_path=args.output)
+        print(f"Benchmark results written to {args.output}")
+        return
+
+    with open(args.baseline, "r") as file:
+        baseline = json.load(file)
+    with open(args.current, "r") as file:
+        current = json.load(file)
+    rows, regressions = compare_benchmarks(baseline, current, threshold=args.threshold)
+    print(tabulate(rows, headers=["Scale", "Metric", "Baseline", "Current", "Change"]))
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
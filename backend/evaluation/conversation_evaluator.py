@@ -54,10 +54,16 @@ from intelligence_layer.network_knowledge_agent import (
     non_reasoning_network_knowledge_agent,
     reasoning_network_knowledge_agent
 )
-from knowledge_layer import KnowledgeRouter
-from network_layer.simulation_engine import SimulationEngine
-from settings import OPENAI_NON_REASONING_MODEL_NAME, SIM_STEP_TIME_DEFAULT
-from utils import WebSocketSingleton, setup_logging
+from network_layer.simulation_registry import (
+    get_simulation_registry,
+    set_current_session,
+)
+from settings import (
+    OPENAI_NON_REASONING_MODEL_NAME,
+    SIM_STEP_TIME_DEFAULT,
+    SIM_WARM_START_CHECKPOINT,
+)
+from utils import setup_logging
 
 logger = logging.getLogger(__name__)
 
@@ -84,8 +90,10 @@ class DynamicConversationEvaluator:
     Evaluates the Network Engineer Chat Agent using dynamic conversations
     """
     
-    def __init__(self, conversation_data_file: str = "conversation_data.json", debug_log_dir: Optional[str] = None):
+    def __init__(self, conversation_data_file: str = "conversation_data.json", debug_log_dir: Optional[str] = None, checkpoint_file: Optional[str] = None):
         self.conversation_data_file = conversation_data_file
+        # warmed-up network state every run starts from, instead of a fresh network setup
+        self.checkpoint_file = checkpoint_file or SIM_WARM_START_CHECKPOINT
         self.simulation_engine = None
         self.knowledge_router = None
         self.conversation_ai = self._create_conversation_ai()
@@ -163,14 +171,22 @@ IMPORTANT:
         # Setup logging
         setup_logging()
         
-        # Initialize simulation engine
-        self.simulation_engine = SimulationEngine()
+        # Initialize simulation engine and knowledge router of a session without frontend,
+        # bound to the evaluation task so the agent tools resolve them
+        session = get_simulation_registry().create_session(session_id="evaluation")
+        set_current_session(session)
+        self.simulation_engine = session.simulation_engine
+        self.knowledge_router = session.knowledge_router
         self.simulation_engine.reset_network()
-        self.simulation_engine.network_setup()
+        if self.checkpoint_file:
+            # identical warm state for every run, no warm-up steps needed
+            self.simulation_engine.load_checkpoint(self.checkpoint_file)
+        else:
+            self.simulation_engine.network_setup()
         
-        # Initialize knowledge router
-        self.knowledge_router = KnowledgeRouter()
-        self.knowledge_router.import_routes(self.simulation_engine)
+        if self.checkpoint_file:
+            logger.info(f"Simulation restored from checkpoint {self.checkpoint_file}")
+            return
         
         # Start simulation in background (non-blocking)
         logger.info("Starting simulation in background...")
@@ -824,6 +840,7 @@ async def main():
     parser.add_argument("--output-dir", default=None, help="Output directory for results")
     parser.add_argument("--conversation-data", default="conversation_data.json", help="Conversation data file")
     parser.add_argument("--test-single", default=None, help="Test a single question by ID (e.g., q_001)")
+    parser.add_argument("--checkpoint", default=None, help="Start from a saved simulation checkpoint instead of a fresh network")
     
     args = parser.parse_args()
     
@@ -834,7 +851,7 @@ async def main():
     else:
         output_dir = str(args.output_dir)
     
-    evaluator = DynamicConversationEvaluator(args.conversation_data, output_dir)
+    evaluator = DynamicConversationEvaluator(args.conversation_data, output_dir, checkpoint_file=args.checkpoint)
     
     if args.test_single:
         # Test single question
@@ -1,9 +1,8 @@
 import asyncio
-from utils import WebSocketSingleton, WebSocketResponse
+from utils import WebSocketResponse
 
 from agents import Agent, function_tool
-from network_layer.simulation_engine import SimulationEngine
-from knowledge_layer import KnowledgeRouter
+from network_layer.simulation_registry import get_current_session
 
 
 @function_tool
@@ -14,9 +13,10 @@ def deploy_ai_service(ai_service_name: str, ue_ids: list[str]) -> str:
         ai_service_name (str): The name of the AI service to deploy.
         ue_ids (list[str]): A list of User Equipment IDs in the format `IMSI_<digits>`.
     """
-    websocket = WebSocketSingleton().get_websocket()
-    simulation_engine = SimulationEngine()
-    knowledge_router = KnowledgeRouter()
+    session = get_current_session()
+    websocket = session.websocket
+    simulation_engine = session.simulation_engine
+    knowledge_router = session.knowledge_router
 
     ai_service_data = knowledge_router.query_knowledge(
         f"/ai_services/{ai_service_name}/raw",
@@ -1,10 +1,10 @@
 import asyncio
-from utils import WebSocketSingleton, WebSocketResponse
+from utils import WebSocketResponse
 
 from agents import Agent, function_tool
 from ..knowledge_tools import get_knowledge, get_knowledge_bulk
 from settings import OPENAI_NON_REASONING_MODEL_NAME
-from knowledge_layer import KnowledgeRouter
+from network_layer.simulation_registry import get_current_session
 
 
 @function_tool
@@ -15,8 +15,9 @@ def recommend_ai_services(ai_service_names: list[str]) -> str:
         ai_service_names (list[str]): A list of AI service names to recommend.
     """
 
-    knowledge_router = KnowledgeRouter()
-    websocket = WebSocketSingleton().get_websocket()
+    session = get_current_session()
+    knowledge_router = session.knowledge_router
+    websocket = session.websocket
 
     if websocket is None:
         print("WebSocket is not available.")
@@ -1,9 +1,8 @@
+from typing import Optional
 from agents import function_tool
 
 
-from knowledge_layer import KnowledgeRouter
-
-knowledge_router = KnowledgeRouter()  # get the singleton instance of KnowledgeRouter
+from network_layer.simulation_registry import get_current_knowledge_router
 
 
 @function_tool
@@ -13,21 +12,22 @@ async def get_knowledge(knowledge_query_key: str) -> str:
     Args:
         knowledge_query_key (str): The key to query in the knowledge layer.
     """
-    return knowledge_router.query_knowledge(knowledge_query_key)
+    return get_current_knowledge_router().query_knowledge(knowledge_query_key)
 
 
 @function_tool
-async def get_knowledge_bulk(knowledge_query_key_list: list[str]) -> str:
+async def get_knowledge_bulk(
+    knowledge_query_key_list: list[str], max_chars_per_query: Optional[int] = None
+) -> str:
     """Get the knowledge of a list of keys in the knowledge database.
+    All keys are answered from the same simulation step and repeated keys are only answered once.
 
     Args:
         knowledge_query_key_list (list[str]): The list of keys to query in the knowledge layer.
+        max_chars_per_query (int, optional): Truncate each answer to this many characters.
     """
-
-    response_text = ""
-
-    for knowledge_query_key in knowledge_query_key_list:
-        if knowledge_query_key.strip():
-            response_text += f"Query {knowledge_query_key}: \n{knowledge_router.query_knowledge(knowledge_query_key)}\n\n-----------------------------\n\n"
-
-    return response_text
+    knowledge_router = get_current_knowledge_router()
+    bulk_response = knowledge_router.query_knowledge_bulk(
+        knowledge_query_key_list, max_chars_per_query=max_chars_per_query
+    )
+    return knowledge_router.render_bulk_knowledge(bulk_response)
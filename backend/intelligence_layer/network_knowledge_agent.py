@@ -1,5 +1,6 @@
 from agents import Agent
 from .knowledge_tools import get_knowledge, get_knowledge_bulk
+from .what_if_tools import run_what_if
 from agents.extensions.handoff_prompt import RECOMMENDED_PROMPT_PREFIX
 from settings import OPENAI_NON_REASONING_MODEL_NAME, OPENAI_REASONING_MODEL_NAME
 
@@ -14,6 +15,7 @@ non_reasoning_network_knowledge_agent = Agent(
     tools=[
         get_knowledge,
         get_knowledge_bulk,
+        run_what_if,
     ],
     instructions=f"""{RECOMMENDED_PROMPT_PREFIX}
 Use the tools to query the knowledge database of the simulated telecom network. 
@@ -28,6 +30,11 @@ You should always start with
 
 The knowledge tools often returns a list of related knowledge keys.
 You should explore these related knowledge keys as well to gather more information to answer the user query wherever possible.
+To find or count UEs, cells or base stations matching a condition, query the list keys with a query string
+(e.g. "/user_equipments?where=downlink_cqi<5&fields=ue_imsi,current_cell&agg=count", see "/docs/knowledge_queries")
+instead of fetching every element one by one.
+For questions about the past (e.g. "what was the load on bs_11 over the last 5 minutes"), use the KPI history keys described in "/docs/kpi_history".
+For "what if" questions about a change (e.g. a cell's cell_individual_offset_dBm or enabling/disabling an xApp), use the run_what_if tool to preview its impact on a fork of the simulation.
 Note that most elements in the query keys are plural (user_equipments, base_stations, cells, ai_services, attributes, methods),
 except for the RIC and simulation engine, which are singular (ric, sim_engine).
 """,
@@ -41,6 +48,7 @@ reasoning_network_knowledge_agent = Agent(
     tools=[
         get_knowledge,
         get_knowledge_bulk,
+        run_what_if,
     ],
     instructions=f"""{RECOMMENDED_PROMPT_PREFIX}
 Use the tools to query the knowledge database of the simulated telecom network. 
@@ -54,6 +62,11 @@ You should always start with
 
 The knowledge tools often returns a list of related knowledge keys.
 You should explore these related knowledge keys as well to gather more information to answer the user query wherever possible.
+To find or count UEs, cells or base stations matching a condition, query the list keys with a query string
+(e.g. "/user_equipments?where=downlink_cqi<5&fields=ue_imsi,current_cell&agg=count", see "/docs/knowledge_queries")
+instead of fetching every element one by one.
+For questions about the past (e.g. "what was the load on bs_11 over the last 5 minutes"), use the KPI history keys described in "/docs/kpi_history".
+For "what if" questions about a change (e.g. a cell's cell_individual_offset_dBm or enabling/disabling an xApp), use the run_what_if tool to preview its impact on a fork of the simulation.
 Note that most elements in the URL patterns are plural (user_equipments, base_stations, cells, attributes, methods),
 except for the RIC and simulation engine, which are singular (ric, sim_engine).
 """,
@@ -0,0 +1,52 @@
+from typing import Optional
+from agents import function_tool
+from pydantic import BaseModel
+
+from network_layer.simulation_registry import get_current_simulation_engine
+from network_layer.what_if import (
+    WhatIfScenario,
+    get_what_if_runner,
+    render_what_if_result,
+)
+
+
+class CellChange(BaseModel):
+    cell_id: str
+    attribute: str
+    value: float
+
+
+@function_tool
+async def run_what_if(
+    steps: int,
+    cell_changes: Optional[list[CellChange]] = None,
+    disable_xapps: Optional[list[str]] = None,
+    enable_xapps: Optional[list[str]] = None,
+) -> str:
+    """Preview the impact of a change on a fork of the live simulation before applying it.
+    The fork runs in the background with and without the change, from the current step,
+    and the KPIs of both runs are compared. The live simulation is not modified.
+
+    Args:
+        steps (int): How many simulation steps to run ahead, e.g. 60.
+        cell_changes (list[CellChange], optional): Cell parameters to change,
+            e.g. [{"cell_id": "bs_11_cell_mid_freq", "attribute": "cell_individual_offset_dBm", "value": 3}].
+        disable_xapps (list[str], optional): IDs of running xApps to stop, e.g. ["xAppA3HandoverBlind"].
+        enable_xapps (list[str], optional): IDs of available xApps to start.
+    """
+    cell_overrides = {}
+    for change in cell_changes or []:
+        value = int(change.value) if change.value.is_integer() else change.value
+        cell_overrides.setdefault(change.cell_id, {})[change.attribute] = value
+    scenario = WhatIfScenario(
+        steps=steps,
+        cell_overrides=cell_overrides,
+        disable_xapps=disable_xapps,
+        enable_xapps=enable_xapps,
+    )
+    error, result = await get_what_if_runner().run(
+        get_current_simulation_engine(), scenario
+    )
+    if error:
+        return error
+    return render_what_if_result(result)
@@ -3,7 +3,7 @@ import re
 from typing import List
 
 from agents import Agent, function_tool
-from network_layer.simulation_engine import SimulationEngine
+from network_layer.simulation_registry import get_current_simulation_engine
 
 
 def _to_snake_case(name: str) -> str:
@@ -28,7 +28,7 @@ def _xapps_dir() -> str:
 @function_tool
 def list_xapps() -> str:
     """Lists currently loaded xApps on the RIC and available xApp modules on disk."""
-    sim = SimulationEngine()
+    sim = get_current_simulation_engine().get_snapshot()
     ric = sim.ric
     loaded = (
         list(ric.xapp_list.keys()) if ric and getattr(ric, "xapp_list", None) else []
@@ -57,7 +57,7 @@ def list_xapps() -> str:
 @function_tool
 def view_xapp_source(xapp_id: str) -> str:
     """Shows the source code of a loaded xApp by its ID (class name)."""
-    sim = SimulationEngine()
+    sim = get_current_simulation_engine().get_snapshot()
     ric = sim.ric
     if not ric or xapp_id not in ric.xapp_list:
         return f"xApp '{xapp_id}' is not loaded. Use reload_xapps after creating, or check the name."
@@ -71,7 +71,7 @@ def view_xapp_source(xapp_id: str) -> str:
 @function_tool
 def reload_xapps() -> str:
     """Reloads xApps from disk and starts them on the RIC."""
-    sim = SimulationEngine()
+    sim = get_current_simulation_engine()
     if not sim.ric:
         return "RIC not initialized in simulation engine."
     sim.ric.load_xApps()
@@ -127,7 +127,7 @@ class {class_name}(xAppBase):
         f.write(skeleton)
 
     # Reload xApps to register the new one
-    sim = SimulationEngine()
+    sim = get_current_simulation_engine()
     if sim.ric:
         sim.ric.load_xApps()
 
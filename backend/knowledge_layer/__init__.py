@@ -1,8 +1,7 @@
 from .knowledge_router import KnowledgeRouter
 
 
-
 def initialize_knowledge_router(sim):
     knowledge_router = KnowledgeRouter()
-
+    knowledge_router.import_routes(sim)
     return knowledge_router
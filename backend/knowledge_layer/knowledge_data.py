@@ -0,0 +1,35 @@
+import numpy as np
+
+
+def to_knowledge_data(value):
+    """Convert a value read from the simulation into JSON serializable knowledge data.
+
+    Network objects are referenced by their IDs instead of being expanded, so that
+    UEs, cells and base stations pointing at each other do not blow up the response.
+    """
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    for id_attribute in ("ue_imsi", "cell_id", "bs_id", "xapp_id", "subscription_id"):
+        if hasattr(value, id_attribute) and not isinstance(value, dict):
+            return getattr(value, id_attribute)
+    if isinstance(value, dict):
+        return {str(k): to_knowledge_data(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [to_knowledge_data(v) for v in value]
+    if hasattr(value, "value") and hasattr(value, "name"):
+        # enums
+        return to_knowledge_data(value.value)
+    if callable(value):
+        owner = getattr(value, "__self__", None)
+        if owner is not None:
+            return f"{type(owner).__name__}.{value.__name__}"
+        return getattr(value, "__name__", repr(value))
+    return repr(value)
+
+
+def get_attributes_data(obj, attributes):
+    return {attr: to_knowledge_data(getattr(obj, attr, None)) for attr in attributes}
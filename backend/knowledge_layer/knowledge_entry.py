@@ -1,6 +1,7 @@
 from typing import Optional, List, Tuple, Callable
 from .relationships import KnowledgeRelationship
 from .tags import KnowledgeTag
+from .knowledge_query import KnowledgeCollection
 
 knowledge_entry_registry = {}
 
@@ -9,12 +10,36 @@ def knowledge_entry(
     key: str,
     tags: Optional[List[KnowledgeTag]] = None,
     related: Optional[List[Tuple[KnowledgeRelationship, str]]] = None,
+    cacheable: bool = True,
+    data_func: Optional[Callable] = None,
+    collection: Optional[KnowledgeCollection] = None,
+    paginated: bool = False,
+    query_params: Optional[List[str]] = None,
 ):
+    """Register a knowledge handler under the given key.
+
+    data_func, if given, has the same signature as the handler and returns the JSON serializable
+    data behind the rendered text, used by KnowledgeRouter.query_knowledge_bulk.
+
+    collection, if given, makes the route accept query strings (`?where=...&agg=...`)
+    evaluated over the collection, see KnowledgeQuery.
+
+    paginated routes receive the `cursor` and `page_size` query string params in their params,
+    see KnowledgePage.
+
+    query_params lists further query string params the handler receives in its params, e.g. ["from", "to"].
+    """
+
     def decorator(func: Callable):
         knowledge_entry_registry[key] = {
             "func": func,
             "tags": tags or [],
             "related": related or [],
+            "cacheable": cacheable,
+            "data_func": data_func,
+            "collection": collection,
+            "paginated": paginated,
+            "query_params": query_params or [],
         }
         return func
 
@@ -0,0 +1,179 @@
+import re
+from collections import Counter
+
+import settings
+
+PAGINATION_PARAMS = ["cursor", "page_size"]
+PAGE_SIZE_ALL = "all"
+
+_DIGITS_REGEX = re.compile(r"(\d+)")
+
+
+class KnowledgePaginationError(ValueError):
+    pass
+
+
+def natural_sort_key(item_id):
+    """Sort key ordering IDs like IMSI_2 before IMSI_10."""
+    return tuple(
+        (0, int(part), "") if part.isdigit() else (1, 0, part)
+        for part in _DIGITS_REGEX.split(str(item_id))
+        if part
+    )
+
+
+def _id_pattern(item_id):
+    """The shape of an ID without its numbers, e.g. IMSI_# for IMSI_12."""
+    return _DIGITS_REGEX.sub("#", str(item_id))
+
+
+def get_cursor(params):
+    """
+    Returns:
+        str | None: The cursor requested in the params, None for the first page.
+    """
+    cursor = params.get("cursor", None)
+    if cursor is not None and not cursor.strip():
+        raise KnowledgePaginationError(
+            "Invalid empty cursor, omit the cursor for the first page."
+        )
+    return cursor
+
+
+def get_page_size(params):
+    """
+    Returns:
+        int | None: The page size requested in the params (None for `page_size=all`),
+                    settings.KNOWLEDGE_LIST_PAGE_SIZE by default.
+    """
+    page_size = params.get("page_size", None)
+    if page_size is None or page_size == "":
+        return settings.KNOWLEDGE_LIST_PAGE_SIZE
+    if page_size == PAGE_SIZE_ALL:
+        return None
+    try:
+        page_size = int(page_size)
+    except ValueError:
+        raise KnowledgePaginationError(
+            f"Invalid page_size '{page_size}', expected a positive integer or '{PAGE_SIZE_ALL}'."
+        )
+    if page_size <= 0:
+        raise KnowledgePaginationError(
+            f"Invalid page_size '{page_size}', expected a positive integer or '{PAGE_SIZE_ALL}'."
+        )
+    return page_size
+
+
+class KnowledgePage:
+    """A page of a knowledge listing.
+
+    Items are ordered by their ID (natural order) and the cursor is the ID of the last item of the
+    previous page, so pages stay consistent while UEs join and leave the network between queries.
+    A cursor that cannot come from the listing raises a KnowledgePaginationError rather than
+    restarting from the first page, which would repeat rows to a client paging through it.
+    """
+
+    def __init__(self, items, total, cursor, next_cursor, page_size):
+        self.items = items
+        self.total = total
+        self.cursor = cursor
+        self.next_cursor = next_cursor
+        self.page_size = page_size
+
+    @classmethod
+    def from_dict(cls, items_by_id, params):
+        """
+        Args:
+            items_by_id (dict): item ID -> item, e.g., sim.ue_list.
+            params (dict): The route params, optionally holding "cursor" and "page_size".
+        """
+        page_size = get_page_size(params)
+        cursor = get_cursor(params)
+        item_ids = sorted(items_by_id.keys(), key=natural_sort_key)
+        if cursor is not None:
+            # the item of the cursor may have left since, but the IDs of a listing share one shape
+            cursor_pattern = _id_pattern(cursor)
+            if item_ids and all(_id_pattern(i) != cursor_pattern for i in item_ids):
+                raise KnowledgePaginationError(
+                    f"Invalid cursor '{cursor}', expected the ID of an item of this list, e.g. '{item_ids[0]}'."
+                )
+            cursor_key = natural_sort_key(cursor)
+            item_ids = [i for i in item_ids if natural_sort_key(i) > cursor_key]
+        next_cursor = None
+        if page_size is not None and len(item_ids) > page_size:
+            item_ids = item_ids[:page_size]
+            next_cursor = item_ids[-1]
+        return cls(
+            items=[items_by_id[i] for i in item_ids],
+            total=len(items_by_id),
+            cursor=cursor,
+            next_cursor=next_cursor,
+            page_size=page_size,
+        )
+
+    @classmethod
+    def from_list(cls, items, params):
+        """Pages of a list in its own order, the cursor is the index of the last item of the previous page."""
+        page_size = get_page_size(params)
+        cursor = get_cursor(params)
+        start = 0
+        if cursor is not None:
+            try:
+                start = int(cursor) + 1
+            except ValueError:
+                raise KnowledgePaginationError(
+                    f"Invalid cursor '{cursor}', expected an item index."
+                )
+            if not 0 < start <= len(items):
+                raise KnowledgePaginationError(
+                    f"Invalid cursor '{cursor}', expected an item index from 0 to {len(items) - 1}."
+                )
+        end = len(items) if page_size is None else start + page_size
+        return cls(
+            items=items[start:end],
+            total=len(items),
+            cursor=cursor,
+            next_cursor=str(end - 1) if end < len(items) else None,
+            page_size=page_size,
+        )
+
+    def render_header(self, name):
+        if not self.items:
+            return f"Showing 0 of {self.total} {name}.\n"
+        if self.page_size is None and self.cursor is None:
+            return f"Showing all {self.total} {name}.\n"
+        return f"Showing {len(self.items)} of {self.total} {name}" + (
+            f" after cursor {self.cursor}.\n" if self.cursor is not None else ".\n"
+        )
+
+    def render_footer(self, path):
+        if self.next_cursor is None:
+            return ""
+        page_size = "" if self.page_size is None else f"&page_size={self.page_size}"
+        return (
+            f"More results: `{path}?cursor={self.next_cursor}{page_size}` "
+            f"(or `{path}?page_size={PAGE_SIZE_ALL}` for the full list).\n"
+        )
+
+    def to_json(self):
+        return {
+            "total": self.total,
+            "cursor": self.cursor,
+            "next_cursor": self.next_cursor,
+            "page_size": self.page_size,
+        }
+
+
+def render_counts(title, values):
+    """Render a one line summary counting the occurrences of each value, e.g. UEs per slice."""
+    counts = Counter("None" if v is None else str(v) for v in values)
+    if not counts:
+        return f"{title}: none\n"
+    return (
+        f"{title}: "
+        + ", ".join(
+            f"{value}={count}"
+            for value, count in sorted(counts.items(), key=lambda c: natural_sort_key(c[0]))
+        )
+        + "\n"
+    )
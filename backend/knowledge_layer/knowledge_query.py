@@ -0,0 +1,327 @@
+import re
+from typing import List, Optional
+from urllib.parse import parse_qsl
+
+import numpy as np
+
+from .knowledge_data import to_knowledge_data
+
+CONDITION_REGEX = re.compile(r"^\s*(\w+)\s*(<=|>=|!=|==|=|<|>)\s*(.*?)\s*$")
+AGGREGATION_REGEX = re.compile(r"^\s*(count|avg|mean|min|max|sum)\s*(?:\(\s*(\w*)\s*\))?\s*$")
+SUPPORTED_QUERY_PARAMS = ["where", "fields", "sort", "limit", "agg", "group_by"]
+
+
+class KnowledgeQueryError(ValueError):
+    pass
+
+
+class KnowledgeCollection:
+    """A population of network elements that list routes can filter and aggregate.
+
+    Args:
+        name (str): The element name used in responses, e.g., "UEs".
+        source_attribute (str): The simulation engine attribute holding the elements, e.g., "ue_list".
+        id_attribute (str): The attribute identifying an element, e.g., "ue_imsi".
+        attributes (list[str]): The attributes that can be used in where/fields/sort/agg/group_by.
+    """
+
+    def __init__(self, name, source_attribute, id_attribute, attributes):
+        self.name = name
+        self.source_attribute = source_attribute
+        self.id_attribute = id_attribute
+        self.attributes = list(attributes)
+
+    def get_elements(self, sim):
+        return list(getattr(sim, self.source_attribute).values())
+
+
+class CollectionColumns:
+    """Lazily built numpy columns of the attributes of a collection's elements."""
+
+    def __init__(self, collection, elements):
+        self.collection = collection
+        self.elements = elements
+        self.columns = {}
+        # attribute -> knowledge data of each element, as returned in projected rows
+        self.values = {}
+
+    def __len__(self):
+        return len(self.elements)
+
+    def get(self, attribute):
+        if attribute not in self.collection.attributes:
+            raise KnowledgeQueryError(
+                f"Attribute '{attribute}' is not supported. Supported attributes: {', '.join(self.collection.attributes)}"
+            )
+        if attribute not in self.columns:
+            values = [
+                to_knowledge_data(getattr(element, attribute, None))
+                for element in self.elements
+            ]
+            self.values[attribute] = values
+            if all(
+                value is None
+                or (isinstance(value, (int, float)) and not isinstance(value, bool))
+                for value in values
+            ) and any(value is not None for value in values):
+                column = np.array(
+                    [np.nan if value is None else value for value in values],
+                    dtype=float,
+                )
+            else:
+                column = np.empty(len(values), dtype=object)
+                column[:] = [
+                    value if value is None or isinstance(value, str) else str(value)
+                    for value in values
+                ]
+            self.columns[attribute] = column
+        return self.columns[attribute]
+
+
+def _is_numeric(column):
+    return column.dtype.kind == "f"
+
+
+def _parse_number(value, attribute):
+    try:
+        return float(value)
+    except ValueError:
+        raise KnowledgeQueryError(
+            f"'{value}' is not a number, but '{attribute}' is a numeric attribute."
+        )
+
+
+class KnowledgeQuery:
+    """Filters, projections, sorting and aggregations over a knowledge collection.
+
+    Query string syntax (all parts optional):
+        where=downlink_cqi<5,current_bs=bs_12   conditions joined by AND; operators: = == != < <= > >=;
+                                                 "|" separates alternatives for = and !=, e.g. slice_type=eMBB|URLLC
+        fields=ue_imsi,current_cell              attributes to return for each element
+        sort=-downlink_cqi                       sort by an attribute, "-" for descending
+        limit=10                                 return at most this many elements
+        agg=count,avg(downlink_cqi)              aggregations: count, avg/mean, min, max, sum
+        group_by=current_cell                    compute the aggregations per value of an attribute
+    """
+
+    def __init__(
+        self,
+        where: Optional[List[tuple]] = None,
+        fields: Optional[List[str]] = None,
+        sort: Optional[str] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+        aggregations: Optional[List[tuple]] = None,
+        group_by: Optional[str] = None,
+    ):
+        self.where = where or []
+        self.fields = fields or []
+        self.sort = sort
+        self.descending = descending
+        self.limit = limit
+        self.aggregations = aggregations or []
+        self.group_by = group_by
+
+    @classmethod
+    def parse(cls, query_string: str):
+        query = cls()
+        for name, value in parse_qsl(query_string, keep_blank_values=True):
+            if name == "where":
+                for condition in filter(None, (c.strip() for c in value.split(","))):
+                    match = CONDITION_REGEX.match(condition)
+                    if match is None:
+                        raise KnowledgeQueryError(f"Invalid condition '{condition}'.")
+                    attribute, operator, operand = match.groups()
+                    query.where.append(
+                        (attribute, "==" if operator == "=" else operator, operand)
+                    )
+            elif name == "fields":
+                query.fields += [f.strip() for f in value.split(",") if f.strip()]
+            elif name == "sort":
+                value = value.strip()
+                query.descending = value.startswith("-")
+                query.sort = value.lstrip("-+") or None
+            elif name == "limit":
+                try:
+                    query.limit = int(value)
+                except ValueError:
+                    raise KnowledgeQueryError(f"Invalid limit '{value}'.")
+                if query.limit < 0:
+                    raise KnowledgeQueryError(f"Invalid limit '{value}'.")
+            elif name == "agg":
+                for aggregation in filter(None, (a.strip() for a in value.split(","))):
+                    match = AGGREGATION_REGEX.match(aggregation)
+                    if match is None:
+                        raise KnowledgeQueryError(
+                            f"Invalid aggregation '{aggregation}'."
+                        )
+                    function, attribute = match.groups()
+                    function = "avg" if function == "mean" else function
+                    if function != "count" and not attribute:
+                        raise KnowledgeQueryError(
+                            f"Aggregation '{function}' needs an attribute, e.g. {function}(downlink_cqi)."
+                        )
+                    query.aggregations.append((function, attribute or None))
+            elif name == "group_by":
+                query.group_by = value.strip() or None
+            else:
+                raise KnowledgeQueryError(
+                    f"Unknown query parameter '{name}'. Supported parameters: {', '.join(SUPPORTED_QUERY_PARAMS)}"
+                )
+        if query.group_by and not query.aggregations:
+            query.aggregations.append(("count", None))
+        return query
+
+    def _condition_mask(self, columns, attribute, operator, operand):
+        column = columns.get(attribute)
+        if _is_numeric(column):
+            if operator in ("==", "!=") and "|" in operand:
+                mask = np.isin(
+                    column,
+                    [_parse_number(o, attribute) for o in operand.split("|")],
+                )
+                return mask if operator == "==" else ~mask
+            number = _parse_number(operand, attribute)
+            with np.errstate(invalid="ignore"):
+                if operator == "==":
+                    return column == number
+                if operator == "!=":
+                    return column != number
+                if operator == "<":
+                    return column < number
+                if operator == "<=":
+                    return column <= number
+                if operator == ">":
+                    return column > number
+                return column >= number
+
+        if operator not in ("==", "!="):
+            raise KnowledgeQueryError(
+                f"Operator '{operator}' is only supported for numeric attributes, '{attribute}' is not numeric."
+            )
+        options = [None if o == "None" else o for o in operand.split("|")]
+        mask = np.isin(column, np.array(options, dtype=object))
+        return mask if operator == "==" else ~mask
+
+    def _aggregate(self, columns, indices):
+        result = {}
+        for function, attribute in self.aggregations:
+            if function == "count":
+                result["count"] = int(len(indices))
+                continue
+            column = columns.get(attribute)
+            if not _is_numeric(column):
+                raise KnowledgeQueryError(
+                    f"Aggregation '{function}' needs a numeric attribute, '{attribute}' is not numeric."
+                )
+            values = column[indices]
+            values = values[~np.isnan(values)]
+            key = f"{function}({attribute})"
+            if len(values) == 0:
+                result[key] = None
+            elif function == "avg":
+                result[key] = float(values.mean())
+            elif function == "min":
+                result[key] = float(values.min())
+            elif function == "max":
+                result[key] = float(values.max())
+            else:
+                result[key] = float(values.sum())
+        return result
+
+    def evaluate(self, columns: CollectionColumns, max_rows: Optional[int] = None):
+        """
+        Args:
+            columns (CollectionColumns): The columns of the collection to query.
+            max_rows (int, optional): Bound on the returned rows when the query has no limit,
+                the number of rows left out is reported as "more_rows".
+
+        Returns:
+            dict: {"matched": int, "rows": [...]} for plain queries,
+                  {"matched": int, "aggregations": {...}} for aggregations (plus "rows" if fields are given),
+                  {"matched": int, "groups": [{group_by_attribute: value, **aggregations}]} for grouped aggregations.
+        """
+        mask = np.ones(len(columns), dtype=bool)
+        for attribute, operator, operand in self.where:
+            mask &= self._condition_mask(columns, attribute, operator, operand)
+        indices = np.flatnonzero(mask)
+
+        if self.sort:
+            sort_column = columns.get(self.sort)[indices]
+            if _is_numeric(sort_column):
+                # missing values always last
+                keys = -sort_column if self.descending else sort_column
+                order = np.argsort(np.where(np.isnan(keys), np.inf, keys), kind="stable")
+            else:
+                order = np.argsort(
+                    np.array(
+                        ["" if v is None else v for v in sort_column], dtype=str
+                    ),
+                    kind="stable",
+                )
+                if self.descending:
+                    order = order[::-1]
+            indices = indices[order]
+
+        result = {"matched": int(len(indices))}
+
+        if self.group_by:
+            group_column = columns.get(self.group_by)[indices]
+            groups = []
+            group_keys = list(
+                dict.fromkeys(
+                    None if v is None or (isinstance(v, float) and np.isnan(v)) else v
+                    for v in group_column.tolist()
+                )
+            )
+            for group_key in group_keys:
+                if group_key is None:
+                    if _is_numeric(group_column):
+                        group_mask = np.isnan(group_column)
+                    else:
+                        group_mask = np.array(
+                            [v is None for v in group_column], dtype=bool
+                        )
+                else:
+                    group_mask = group_column == group_key
+                group = {self.group_by: group_key}
+                group.update(self._aggregate(columns, indices[group_mask]))
+                groups.append(group)
+            if self.limit is not None:
+                groups = groups[: self.limit]
+            result["groups"] = groups
+            return result
+
+        if self.aggregations:
+            result["aggregations"] = self._aggregate(columns, indices)
+            if not self.fields:
+                return result
+
+        if self.limit is not None:
+            indices = indices[: self.limit]
+        elif max_rows is not None and len(indices) > max_rows:
+            result["more_rows"] = int(len(indices) - max_rows)
+            indices = indices[:max_rows]
+        fields = self.fields or [columns.collection.id_attribute]
+        for field in fields:
+            columns.get(field)
+        result["rows"] = [
+            {field: columns.values[field][i] for field in fields} for i in indices
+        ]
+        return result
+
+
+def render_query_result(collection, query_key, result):
+    response = f"Query {query_key} matched {result['matched']} {collection.name}.\n"
+    if "aggregations" in result:
+        for key, value in result["aggregations"].items():
+            response += f"- {key}: {value}\n"
+    if "groups" in result:
+        for group in result["groups"]:
+            response += "- " + ", ".join(f"{k}={v}" for k, v in group.items()) + "\n"
+        return response
+    for row in result.get("rows", []):
+        response += "- " + ", ".join(f"{k}={v}" for k, v in row.items()) + "\n"
+    if result.get("more_rows"):
+        response += f"... {result['more_rows']} more, narrow the query or use limit=<n> / page_size=all.\n"
+    return response
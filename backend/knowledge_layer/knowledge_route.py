@@ -2,6 +2,7 @@ import re
 from typing import Callable, List, Tuple, Optional
 from .tags import KnowledgeTag
 from .relationships import KnowledgeRelationship
+from .knowledge_query import KnowledgeCollection
 
 class KnowledgeRoute:
     def __init__(
@@ -10,12 +11,24 @@ class KnowledgeRoute:
         handler: Callable,
         tags: Optional[List[KnowledgeTag]] = None,
         related: Optional[List[Tuple[KnowledgeRelationship, str]]] = None,
+        cacheable: bool = True,
+        data_handler: Optional[Callable] = None,
+        collection: Optional[KnowledgeCollection] = None,
+        paginated: bool = False,
+        query_params: Optional[List[str]] = None,
     ):
         self.pattern = pattern
         self.regex, self.param_names = self._compile_pattern(pattern)
         self.handler = handler
         self.tags = tags or []
         self.related = related or []
+        self.cacheable = cacheable
+        self.data_handler = data_handler
+        self.collection = collection
+        self.paginated = paginated
+        self.query_params = query_params or []
+        # "/docs/..." explainers do not depend on the simulation state
+        self.is_static = pattern == "/docs" or pattern.startswith("/docs/")
 
     def _compile_pattern(self, pattern: str):
         param_names = []
@@ -0,0 +1,92 @@
+import re
+from typing import Dict, List, Optional, Tuple
+from .knowledge_route import KnowledgeRoute
+
+PARAM_SEGMENT_REGEX = re.compile(r"^\{(\w+)\}$")
+
+
+class _TrieNode:
+    __slots__ = ("static_children", "param_child", "route_indices")
+
+    def __init__(self):
+        self.static_children: Dict[str, "_TrieNode"] = {}
+        self.param_child: Optional["_TrieNode"] = None
+        # registration indices of the routes ending at this node, in registration order
+        self.route_indices: List[int] = []
+
+
+class KnowledgeRouteTrie:
+    """Segment based trie of knowledge routes.
+
+    Static segments are resolved by dict lookup and `{param}` segments match any non-empty segment.
+    When several routes match a key, the one registered first wins, same as scanning the
+    routes in order. Routes with segments mixing static text and params are not inserted
+    into the trie; they are matched with their regex and compete on registration order.
+    """
+
+    def __init__(self):
+        self.root = _TrieNode()
+        self.routes: List[KnowledgeRoute] = []
+        self.irregular_route_indices: List[int] = []
+
+    def insert(self, route: KnowledgeRoute):
+        route_index = len(self.routes)
+        self.routes.append(route)
+
+        segments = route.pattern.split("/")
+        param_segment_count = 0
+        node = self.root
+        for segment in segments:
+            if PARAM_SEGMENT_REGEX.match(segment):
+                param_segment_count += 1
+                if node.param_child is None:
+                    node.param_child = _TrieNode()
+                node = node.param_child
+            elif "{" in segment:
+                self.irregular_route_indices.append(route_index)
+                return
+            else:
+                node = node.static_children.setdefault(segment, _TrieNode())
+        if param_segment_count != len(route.param_names):
+            # e.g. the same param appearing in a non-segment position
+            self.irregular_route_indices.append(route_index)
+            return
+        node.route_indices.append(route_index)
+
+    def match(self, key: str) -> Optional[Tuple[KnowledgeRoute, Dict[str, str]]]:
+        best = self._match_node(self.root, key.split("/"), 0, [])
+        best_index = best[0] if best else None
+
+        for route_index in self.irregular_route_indices:
+            if best_index is not None and route_index > best_index:
+                break
+            params = self.routes[route_index].match(key)
+            if params is not None:
+                return self.routes[route_index], params
+
+        if best is None:
+            return None
+        route = self.routes[best_index]
+        return route, dict(zip(route.param_names, best[1]))
+
+    def _match_node(self, node, segments, position, param_values):
+        """depth first search returning (route_index, param_values) of the earliest registered match"""
+        if position == len(segments):
+            if node.route_indices:
+                return node.route_indices[0], list(param_values)
+            return None
+
+        segment = segments[position]
+        best = None
+        static_child = node.static_children.get(segment, None)
+        if static_child is not None:
+            best = self._match_node(static_child, segments, position + 1, param_values)
+        if node.param_child is not None and segment:
+            param_values.append(segment)
+            candidate = self._match_node(
+                node.param_child, segments, position + 1, param_values
+            )
+            param_values.pop()
+            if candidate is not None and (best is None or candidate[0] < best[0]):
+                best = candidate
+        return best
@@ -1,15 +1,51 @@
+import contextvars
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode
 from typing import Callable, Dict, List, Tuple, Optional
 from .relationships import KnowledgeRelationship
 from .tags import KnowledgeTag
 from .knowledge_route import KnowledgeRoute
-import utils
+from .knowledge_route_trie import KnowledgeRouteTrie
+from .knowledge_query import (
+    CollectionColumns,
+    KnowledgeQuery,
+    KnowledgeQueryError,
+    render_query_result,
+)
+from .knowledge_pagination import PAGINATION_PARAMS, get_page_size
 from .knowledge_entry import knowledge_entry_registry
 from .knowledge_sources import *  # Import all modules to load entries
 
+# snapshot every handler of a bulk query reads, so that all answers describe the same step
+_pinned_snapshot = contextvars.ContextVar("pinned_snapshot", default=None)
+
+
+class KnowledgeRouter:
+    MATCH_CACHE_SIZE = 4096
 
-class KnowledgeRouter(metaclass=utils.SingletonMeta):
     def __init__(self):
         self.routes: List[KnowledgeRoute] = []
+        self.route_trie = KnowledgeRouteTrie()
+        # query key -> (route, params) or None, least recently used keys are evicted first
+        self.match_cache = OrderedDict()
+
+        self.sim = None
+        # query key -> response of "/docs/..." routes, kept until routes are re-imported
+        self.static_response_cache = {}
+        # query key -> response of live routes, valid for a single simulation state version
+        self.live_response_cache = {}
+        self.live_response_cache_version = None
+        self.response_cache_metrics = {
+            "static_hits": 0,
+            "static_misses": 0,
+            "live_hits": 0,
+            "live_misses": 0,
+            "chars_served_from_cache": 0,
+            "seconds_saved": 0.0,
+        }
+        # query key -> seconds it took to build the cached response
+        self.response_build_seconds = {}
 
     def register_route(
         self,
@@ -17,48 +53,289 @@ class KnowledgeRouter(metaclass=utils.SingletonMeta):
         handler: Callable,
         tags: Optional[List[KnowledgeTag]] = None,
         related: Optional[List[Tuple[KnowledgeRelationship, str]]] = None,
+        cacheable: bool = True,
+        data_handler: Optional[Callable] = None,
+        collection=None,
+        paginated: bool = False,
+        query_params: Optional[List[str]] = None,
     ):
-        route = KnowledgeRoute(pattern, handler, tags, related)
+        route = KnowledgeRoute(
+            pattern,
+            handler,
+            tags,
+            related,
+            cacheable,
+            data_handler,
+            collection,
+            paginated,
+            query_params,
+        )
         self.routes.append(route)
+        self.route_trie.insert(route)
+        self.match_cache.clear()
+        self.clear_response_cache()
 
     def import_routes(self, sim=None):
+        if self.sim is None:
+            # the handlers of the first import win the route matching, so do their simulation engine
+            self.sim = sim
         for reg_key, entry in knowledge_entry_registry.items():
             handler_func = entry["func"]
             tags = entry["tags"] if "tags" in entry else []
             related = entry["related"] if "related" in entry else []
+            cacheable = entry.get("cacheable", True)
+            data_func = entry.get("data_func", None)
+            collection = entry.get("collection", None)
+            paginated = entry.get("paginated", False)
+            query_params = entry.get("query_params", [])
 
             def wrapped_handler(query_key, params, f=handler_func):
-                return f(sim, self, query_key, params)
+                return f(self._get_query_snapshot(sim), self, query_key, params)
+
+            def wrapped_data_handler(query_key, params, f=data_func):
+                return f(self._get_query_snapshot(sim), self, query_key, params)
 
             self.register_route(
                 pattern=reg_key,
                 handler=wrapped_handler,
                 tags=tags,
                 related=related,
+                cacheable=cacheable,
+                data_handler=wrapped_data_handler if data_func else None,
+                collection=collection,
+                paginated=paginated,
+                query_params=query_params,
             )
 
+    def _get_query_snapshot(self, sim=None):
+        # handlers read the snapshot published at the last step boundary, never the live state
+        pinned_snapshot = _pinned_snapshot.get()
+        if pinned_snapshot is not None:
+            return pinned_snapshot
+        sim = sim if sim is not None else self.sim
+        return sim.get_snapshot() if sim is not None else None
+
     def _find_route(self, key: str) -> Tuple[KnowledgeRoute, Dict[str, str]]:
-        for route in self.routes:
-            params = route.match(key)
-            if params is not None:
-                return route, params
-        raise KeyError(f"Query key '{key}' not recognized.")
+        if key in self.match_cache:
+            self.match_cache.move_to_end(key)
+            match = self.match_cache[key]
+        else:
+            match = self._match_route(key)
+            self.match_cache[key] = match
+            if len(self.match_cache) > self.MATCH_CACHE_SIZE:
+                self.match_cache.popitem(last=False)
+        if match is None:
+            raise KeyError(f"Query key '{key}' not recognized.")
+        route, params = match
+        return route, dict(params)
+
+    def _match_route(self, key: str):
+        if key.endswith("\n"):
+            # the route regexes also accept a trailing newline ("$"), which has no segment equivalent
+            for route in self.routes:
+                params = route.match(key)
+                if params is not None:
+                    return route, params
+            return None
+        return self.route_trie.match(key)
+
+    def clear_response_cache(self):
+        self.static_response_cache.clear()
+        self.live_response_cache.clear()
+        self.response_build_seconds.clear()
+
+    def _get_response_cache(self, route: KnowledgeRoute):
+        if not route.cacheable:
+            return None
+        if route.is_static:
+            return self.static_response_cache
+        snapshot = self._get_query_snapshot()
+        if snapshot is None:
+            return None
+        state_version = snapshot.state_version
+        if state_version != self.live_response_cache_version:
+            for query_key in self.live_response_cache:
+                self.response_build_seconds.pop(query_key, None)
+            self.live_response_cache.clear()
+            self.live_response_cache_version = state_version
+        return self.live_response_cache
 
     def query_knowledge(self, query_key: str):
         try:
-            route, params = self._find_route(query_key)
-            print(f"Querying knowledge for key: {query_key}")
-            print(f"Route found: {route.pattern}")
-            print(f"Parameters extracted: {params}")
-            knowledge = route.handler(query_key, params)
-            if route.related:
-                knowledge += "\n\nRelated knowledge:\n"
-                for rel, pat in route.related:
-                    knowledge += f"- {rel.value}: {pat}\n"
-            return knowledge
+            return self._query_knowledge(query_key)
         except Exception as e:
             return f"Error recognising the knowledge key {query_key}: {str(e)}"
 
+    def _find_query_route(self, query_key: str):
+        """Returns (route, params, query_string).
+
+        Query string params declared by the route (pagination and route specific params) are added
+        to the route params, the rest of the query string is a collection query (None if there is none).
+        """
+        path, separator, query_string = query_key.partition("?")
+        route, params = self._find_route(path)
+        if not separator:
+            return route, params, None
+
+        query_params = parse_qsl(query_string, keep_blank_values=True)
+        route_param_names = set(route.query_params)
+        if route.paginated or route.collection is not None:
+            route_param_names.update(PAGINATION_PARAMS)
+        route_params = {k: v for k, v in query_params if k in route_param_names}
+        collection_params = [(k, v) for k, v in query_params if k not in route_param_names]
+        if collection_params and route.collection is None:
+            unsupported = ", ".join(dict.fromkeys(k for k, _ in collection_params))
+            raise KnowledgeQueryError(
+                f"Route {route.pattern} does not support the query params: {unsupported}."
+            )
+        if collection_params and "cursor" in route_params:
+            raise KnowledgeQueryError(
+                "cursor is not supported in filter/aggregate queries, use sort and limit instead."
+            )
+        params.update(route_params)
+        return route, params, urlencode(collection_params) if collection_params else None
+
+    def _evaluate_collection_query(
+        self, route: KnowledgeRoute, query_string: str, params: dict
+    ):
+        query = KnowledgeQuery.parse(query_string)
+        snapshot = self._get_query_snapshot()
+        columns = CollectionColumns(
+            route.collection, route.collection.get_elements(snapshot)
+        )
+        return query.evaluate(columns, max_rows=get_page_size(params))
+
+    def _query_knowledge(self, query_key: str):
+        return self._query_knowledge_with_result(query_key)[0]
+
+    def _query_knowledge_with_result(self, query_key: str):
+        """Returns (knowledge, collection query result), the result is None unless a collection query was evaluated."""
+        route, params, query_string = self._find_query_route(query_key)
+        response_cache = self._get_response_cache(route)
+        metric_prefix = "static" if route.is_static else "live"
+        if response_cache is not None and query_key in response_cache:
+            knowledge = response_cache[query_key]
+            self.response_cache_metrics[f"{metric_prefix}_hits"] += 1
+            self.response_cache_metrics["chars_served_from_cache"] += len(knowledge)
+            self.response_cache_metrics[
+                "seconds_saved"
+            ] += self.response_build_seconds.get(query_key, 0.0)
+            return knowledge, None
+
+        print(f"Querying knowledge for key: {query_key}")
+        print(f"Route found: {route.pattern}")
+        print(f"Parameters extracted: {params}")
+        build_start_time = time.perf_counter()
+        query_result = None
+        if query_string is not None:
+            query_result = self._evaluate_collection_query(route, query_string, params)
+            knowledge = render_query_result(route.collection, query_key, query_result)
+        else:
+            knowledge = route.handler(query_key, params)
+        if route.related and query_string is None:
+            knowledge += "\n\nRelated knowledge:\n"
+            for rel, pat in route.related:
+                knowledge += f"- {rel.value}: {pat}\n"
+
+        if response_cache is not None and isinstance(knowledge, str):
+            self.response_cache_metrics[f"{metric_prefix}_misses"] += 1
+            response_cache[query_key] = knowledge
+            self.response_build_seconds[query_key] = (
+                time.perf_counter() - build_start_time
+            )
+        return knowledge, query_result
+
+    def query_knowledge_bulk(
+        self, query_keys: List[str], max_chars_per_query: Optional[int] = None
+    ):
+        """Resolve many knowledge keys in one call.
+
+        All keys are answered from the same simulation snapshot and repeated keys are resolved once.
+        Each result carries the rendered text and, for routes that provide it, the structured data.
+
+        Args:
+            query_keys (list[str]): The knowledge keys to query, blank keys are ignored.
+            max_chars_per_query (int, optional): Truncate each rendered text to this many characters.
+
+        Returns:
+            dict: {"sim_step", "state_version", "results": [{"query_key", "text", "data", "error", "truncated"}]}
+        """
+        unique_query_keys = list(
+            dict.fromkeys(key.strip() for key in query_keys if key and key.strip())
+        )
+        snapshot = self._get_query_snapshot()
+        token = _pinned_snapshot.set(snapshot)
+        try:
+            results = [
+                self._query_knowledge_result(query_key, max_chars_per_query)
+                for query_key in unique_query_keys
+            ]
+        finally:
+            _pinned_snapshot.reset(token)
+        return {
+            "sim_step": snapshot.sim_step if snapshot is not None else None,
+            "state_version": snapshot.state_version if snapshot is not None else None,
+            "results": results,
+        }
+
+    def _query_knowledge_result(self, query_key, max_chars_per_query=None):
+        result = {
+            "query_key": query_key,
+            "text": None,
+            "data": None,
+            "error": None,
+            "truncated": False,
+        }
+        try:
+            text, query_result = self._query_knowledge_with_result(query_key)
+            route, params, query_string = self._find_query_route(query_key)
+            if query_string is not None:
+                # the text was rendered from this result, or cached for the same snapshot
+                result["data"] = (
+                    query_result
+                    if query_result is not None
+                    else self._evaluate_collection_query(route, query_string, params)
+                )
+            elif route.data_handler is not None:
+                result["data"] = route.data_handler(query_key, params)
+        except Exception as e:
+            result["error"] = str(e)
+            text = f"Error recognising the knowledge key {query_key}: {str(e)}"
+
+        if (
+            max_chars_per_query is not None
+            and text is not None
+            and len(text) > max_chars_per_query
+        ):
+            text = (
+                text[:max_chars_per_query]
+                + f"\n... [truncated {len(text) - max_chars_per_query} characters]"
+            )
+            result["truncated"] = True
+        result["text"] = text
+        return result
+
+    @staticmethod
+    def render_bulk_knowledge(bulk_response):
+        return "".join(
+            f"Query {result['query_key']}: \n{result['text']}\n\n-----------------------------\n\n"
+            for result in bulk_response["results"]
+        )
+
+    def get_response_cache_metrics(self):
+        metrics = dict(self.response_cache_metrics)
+        lookups = sum(
+            metrics[f"{kind}_{result}"]
+            for kind in ("static", "live")
+            for result in ("hits", "misses")
+        )
+        metrics["hit_rate"] = (
+            (metrics["static_hits"] + metrics["live_hits"]) / lookups if lookups else 0.0
+        )
+        metrics["cached_static_responses"] = len(self.static_response_cache)
+        metrics["cached_live_responses"] = len(self.live_response_cache)
+        return metrics
+
     def get_routes(self):
         return [
             {
@@ -3,4 +3,6 @@ from . import sim_knowledge
 from . import cell_knowledge
 from . import ric_knowledge
 from . import base_station_knowledge
-from . import ai_service_knowledge
\ No newline at end of file
+from . import ai_service_knowledge
+from . import query_knowledge
+from . import kpi_history_knowledge
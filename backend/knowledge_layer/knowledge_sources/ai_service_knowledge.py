@@ -1,6 +1,7 @@
 import json
 from ..knowledge_entry import knowledge_entry
 from ..tags import KnowledgeTag
+from ..knowledge_pagination import KnowledgePage, render_counts
 import os
 from utils import bytes_pretty_printer
 
@@ -48,7 +49,7 @@ def ai_services_help(sim, knowledge_router, query_key, params):
         "📘 **Welcome to the AI Service Knowledge Base**\n\n"
         "You can query all the AI serivces ready-for-deployment across the network here.\n\n"
         "### Available Endpoints:\n"
-        "- **Overview available AI tasks and services**: `/ai_services`\n"
+        "- **Overview available AI tasks and services (paginated)**: `/ai_services`, next pages with `/ai_services?cursor={next_cursor}`, `/ai_services?page_size=all` for the full list\n"
         # "- **Get overview of AI services for a specific task**: `/ai_services?task={task_name}`\n"
         "- **Get details of a specific AI service**: `/ai_services/{ai_service_name}`\n\n"
         # "### Supported AI Tasks:\n"
@@ -62,18 +63,32 @@ def ai_services_help(sim, knowledge_router, query_key, params):
     key="/ai_services",
     tags=[KnowledgeTag.AI_SERVICE, KnowledgeTag.KNOWLEDGE_GUIDE],
     related=[],
+    paginated=True,
 )
 def ai_services_overview(sim, knowledge_router, query_key, params):
-    response = f"There are in total {len(cranfield_ai_services_data)} AI services covering {len(AI_SERVICE_TASK_MAP)} different tasks:"
+    response = f"There are in total {len(cranfield_ai_services_data)} AI services covering {len(AI_SERVICE_TASK_MAP)} different tasks.\n"
+    response += render_counts(
+        "AI services per task",
+        [ai_service["task"] for ai_service in cranfield_ai_services_data],
+    )
+    page = KnowledgePage.from_list(
+        [
+            ai_service
+            for ai_services in AI_SERVICE_TASK_MAP.values()
+            for ai_service in ai_services
+        ],
+        params,
+    )
+    response += page.render_header("AI services")
 
-    for task, ai_services in AI_SERVICE_TASK_MAP.items():
-        response += f"""\n### AI services for task "{task}":\n"""
-        for ai_service in ai_services:
-            response += (
-                f"- {ai_service_name_mapper(ai_service['image_repository_url'])}\n"
-            )
+    task = None
+    for ai_service in page.items:
+        if ai_service["task"] != task:
+            task = ai_service["task"]
+            response += f"""\n### AI services for task "{task}":\n"""
+        response += f"- {ai_service_name_mapper(ai_service['image_repository_url'])}\n"
 
-    return response
+    return response + page.render_footer("/ai_services")
 
 
 @knowledge_entry(
@@ -1,5 +1,8 @@
 import inspect
 from ..knowledge_entry import knowledge_entry
+from ..knowledge_data import get_attributes_data
+from ..knowledge_query import KnowledgeCollection
+from ..knowledge_pagination import KnowledgePage
 from ..tags import KnowledgeTag
 from ..relationships import KnowledgeRelationship
 from network_layer.base_station import BaseStation
@@ -27,6 +30,13 @@ SUPPORTED_BS_METHODS = [
     "step",
 ]
 
+BS_COLLECTION = KnowledgeCollection(
+    name="BSs",
+    source_attribute="base_station_list",
+    id_attribute="bs_id",
+    attributes=SUPPORTED_BS_ATTRIBUTES,
+)
+
 
 @knowledge_entry(
     key="/docs/base_stations",
@@ -38,11 +48,13 @@ def bs_knowledge_help(sim, knowledge_router, query_key, params):
         "📘 **Welcome to the Base Station (BS) Knowledge Base**\n\n"
         "You can query live data and explanations for Base Station (BSs) in the simulation.\n\n"
         "### Available Endpoints:\n"
-        "- **List all BSs (identifiers only)**: `/base_stations`\n"
+        "- **List all BSs (identifiers only, paginated)**: `/base_stations`, next pages with `/base_stations?cursor={next_cursor}`, page size with `page_size={n}` (`page_size=all` for the full list)\n"
         "- **Get all attributes values for a specific BS**: `/base_stations/{bs_id}`\n"
         "- **Get a specific attribute value of a specific BS**: `/base_stations/{bs_id}/attributes/{attribute_name}`\n"
+        "- **Get the recorded history of an attribute of a specific BS**: `/base_stations/{bs_id}/history/{attribute_name}?from=-300` (see `/docs/kpi_history`)\n"
         "- **Explain what an attribute of BS means**: `/docs/base_stations/attributes/{attribute_name}`\n"
         "- **Explain what a method in BS class does**: `/docs/base_stations/methods/{method_name}`\n"
+        "- **Filter, sort and aggregate BSs**: `/base_stations?where=...&fields=...&sort=...&limit=...&agg=...&group_by=...`, e.g. `/base_stations?fields=bs_id,position_x,position_y&sort=bs_id` (see `/docs/knowledge_queries`)\n"
         "### Supported BS Attributes:\n"
         f"{', '.join(SUPPORTED_BS_ATTRIBUTES)}\n\n"
         "### Supported BS Methods:\n"
@@ -50,6 +62,26 @@ def bs_knowledge_help(sim, knowledge_router, query_key, params):
     )
 
 
+def get_bs_list_data(sim, knowledge_router, query_key, params):
+    page = KnowledgePage.from_dict(sim.base_station_list, params)
+    data = page.to_json()
+    data["items"] = [
+        get_attributes_data(bs, SUPPORTED_BS_ATTRIBUTES) for bs in page.items
+    ]
+    return data
+
+
+def get_bs_data(sim, knowledge_router, query_key, params):
+    bs = sim.base_station_list.get(params["bs_id"], None)
+    if bs is None:
+        return None
+    if "attribute_name" in params:
+        if params["attribute_name"] not in SUPPORTED_BS_ATTRIBUTES:
+            return None
+        return get_attributes_data(bs, [params["attribute_name"]])
+    return get_attributes_data(bs, SUPPORTED_BS_ATTRIBUTES)
+
+
 # ------------------------------------------
 #     GET /base_stations
 #       → List all BSs (representations) in the simulation
@@ -58,12 +90,18 @@ def bs_knowledge_help(sim, knowledge_router, query_key, params):
     key="/base_stations",
     tags=[KnowledgeTag.BS],
     related=[],
+    data_func=get_bs_list_data,
+    collection=BS_COLLECTION,
+    paginated=True,
 )
 def get_bs_repr_list(sim, knowledge_router, query_key, params):
-    list_of_bs_repr = [repr(bs) for bs in sim.base_station_list.values()]
+    page = KnowledgePage.from_dict(sim.base_station_list, params)
+    list_of_bs_repr = [repr(bs) for bs in page.items]
     return (
-        f"Currently there are {len(list_of_bs_repr)} BSs in the simulation:\n"
-        f"{"\n".join(list_of_bs_repr)}\n"
+        f"Currently there are {len(sim.base_station_list)} BSs in the simulation.\n"
+        f"{page.render_header("BSs")}"
+        f"{"".join(f"{bs_repr}\n" for bs_repr in list_of_bs_repr)}"
+        f"{page.render_footer("/base_stations")}"
     )
 
 
@@ -75,6 +113,7 @@ def get_bs_repr_list(sim, knowledge_router, query_key, params):
     key="/base_stations/{bs_id}",
     tags=[KnowledgeTag.BS],
     related=[],
+    data_func=get_bs_data,
 )
 def get_bs_attributes(sim, knowledge_router, query_key, params):
     bs_id = params["bs_id"]
@@ -147,6 +186,7 @@ def get_bs_attributes(sim, knowledge_router, query_key, params):
     key="/base_stations/{bs_id}/attributes/{attribute_name}",
     tags=[KnowledgeTag.BS],
     related=[],
+    data_func=get_bs_data,
 )
 def get_bs_attribute_value(sim, knowledge_router, query_key, params):
     bs_id = params["bs_id"]
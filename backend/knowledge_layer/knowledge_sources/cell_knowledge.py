@@ -3,6 +3,9 @@ from ..tags import KnowledgeTag
 from ..relationships import KnowledgeRelationship
 from network_layer.base_station import Cell
 from ..knowledge_entry import knowledge_entry
+from ..knowledge_data import get_attributes_data
+from ..knowledge_query import KnowledgeCollection
+from ..knowledge_pagination import KnowledgePage, render_counts
 
 SUPPORTED_CELL_ATTRIBUTES = [
     "cell_id",
@@ -39,6 +42,13 @@ SUPPORTED_CELL_METHODS = [
     # "to_json",
 ]
 
+CELL_COLLECTION = KnowledgeCollection(
+    name="Cells",
+    source_attribute="cell_list",
+    id_attribute="cell_id",
+    attributes=SUPPORTED_CELL_ATTRIBUTES + ["base_station"],
+)
+
 
 @knowledge_entry(
     key="/docs/cells",
@@ -50,11 +60,13 @@ def cell_knowledge_help(sim, knowledge_router, query_key, params):
         "Welcome to the Cell knowledge base!\n\n"
         "You can query live data and explanations for Cells in the simulation.\n\n"
         "### Available Endpoints:\n"
-        "- **List all Cells (identifiers only)**: `/cells`\n"
+        "- **List all Cells (identifiers only, paginated)**: `/cells`, next pages with `/cells?cursor={next_cursor}`, page size with `page_size={n}` (`page_size=all` for the full list)\n"
         "- **Get all attributes values for a specific Cell**: `/cells/{cell_id}`\n"
         "- **Get a specific attribute value of a specific Cell**: `/cells/{cell_id}/attributes/{attribute_name}`\n"
+        "- **Get the recorded history of an attribute of a specific Cell**: `/cells/{cell_id}/history/{attribute_name}?from=-300` (see `/docs/kpi_history`)\n"
         "- **Explain what an attribute of Cell means**: `/docs/cells/attributes/{attribute_name}`\n"
         "- **Explain what a method in Cell class does**: `/docs/cells/methods/{method_name}`\n"
+        "- **Filter, sort and aggregate Cells**: `/cells?where=...&fields=...&sort=...&limit=...&agg=...&group_by=...`, e.g. `/cells?where=current_load>0.8&fields=cell_id,current_load&sort=-current_load` (see `/docs/knowledge_queries`)\n"
         "### Supported Cell Attributes:\n"
         f"{', '.join(SUPPORTED_CELL_ATTRIBUTES)}\n\n"
         "### Supported Cell Methods:\n"
@@ -62,6 +74,35 @@ def cell_knowledge_help(sim, knowledge_router, query_key, params):
     )
 
 
+def render_cell_summary(cell_list):
+    return render_counts(
+        "Cells per base station",
+        [cell.base_station.bs_id for cell in cell_list.values()],
+    ) + render_counts(
+        "Cells per frequency band", [cell.frequency_band for cell in cell_list.values()]
+    )
+
+
+def get_cell_list_data(sim, knowledge_router, query_key, params):
+    page = KnowledgePage.from_dict(sim.cell_list, params)
+    data = page.to_json()
+    data["items"] = [
+        get_attributes_data(cell, SUPPORTED_CELL_ATTRIBUTES) for cell in page.items
+    ]
+    return data
+
+
+def get_cell_data(sim, knowledge_router, query_key, params):
+    cell = sim.cell_list.get(params["cell_id"])
+    if cell is None:
+        return None
+    if "attribute_name" in params:
+        if params["attribute_name"] not in SUPPORTED_CELL_ATTRIBUTES:
+            return None
+        return get_attributes_data(cell, [params["attribute_name"]])
+    return get_attributes_data(cell, SUPPORTED_CELL_ATTRIBUTES)
+
+
 # ------------------------------------------
 #     GET /cells
 #       → List all Cells (representations) in the simulation
@@ -70,12 +111,19 @@ def cell_knowledge_help(sim, knowledge_router, query_key, params):
     key="/cells",
     tags=[KnowledgeTag.CELL],
     related=[],
+    data_func=get_cell_list_data,
+    collection=CELL_COLLECTION,
+    paginated=True,
 )
 def get_ue_repr_list(sim, knowledge_router, query_key, params):
-    list_of_cell_repr = [repr(cell) for cell in sim.cell_list.values()]
+    page = KnowledgePage.from_dict(sim.cell_list, params)
+    list_of_cell_repr = [repr(cell) for cell in page.items]
     return (
-        f"Currently there are {len(list_of_cell_repr)} Cells in the simulation:\n"
-        f"{"\n".join(list_of_cell_repr)}\n"
+        f"Currently there are {len(sim.cell_list)} Cells in the simulation.\n"
+        f"{render_cell_summary(sim.cell_list)}"
+        f"{page.render_header("Cells")}"
+        f"{"".join(f"{cell_repr}\n" for cell_repr in list_of_cell_repr)}"
+        f"{page.render_footer("/cells")}"
     )
 
 
@@ -87,6 +135,7 @@ def get_ue_repr_list(sim, knowledge_router, query_key, params):
     key="/cells/{cell_id}",
     tags=[KnowledgeTag.CELL],
     related=[],
+    data_func=get_cell_data,
 )
 def get_cell_attributes(sim, knowledge_router, query_key, params):
     cell_id = params["cell_id"]
@@ -117,6 +166,7 @@ def get_cell_attributes(sim, knowledge_router, query_key, params):
     key="/cells/{cell_id}/attributes/{attribute_name}",
     tags=[KnowledgeTag.CELL],
     related=[],
+    data_func=get_cell_data,
 )
 def get_cell_attribute_value(sim, knowledge_router, query_key, params):
     cell_id = params["cell_id"]
@@ -530,6 +580,8 @@ def cell_monitor_ue_signal_strength_explainer(sim, knowledge_router, query_key,
         "4. The method applies a path loss model (as configured in the simulation settings, e.g., Urban Macro NLOS) to estimate the signal attenuation over the distance and frequency.\n"
         "5. The received uplink power at the cell is computed as the UE's transmit power minus the path loss.\n"
         "6. The result is stored in `ue_uplink_signal_strength_dict` under the UE's IMSI.\n\n"
+        "The path loss and antenna gain of a UE are cached (`uplink_path_loss_cache`) and only recomputed when "
+        "the UE moved further than `UE_MEASUREMENT_POSITION_TOLERANCE_M` or the cell's radio configuration changed.\n\n"
     )
     return f"```python\n{code}\n```\n\n{explanation}"
 
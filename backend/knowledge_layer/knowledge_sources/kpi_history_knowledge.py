@@ -0,0 +1,158 @@
+import numpy as np
+
+import settings
+from ..knowledge_entry import knowledge_entry
+from ..tags import KnowledgeTag
+from ..relationships import KnowledgeRelationship
+from network_layer.kpi_recorder import (
+    UE_KPI_ATTRIBUTES,
+    CELL_KPI_ATTRIBUTES,
+    BS_KPI_ATTRIBUTES,
+)
+
+HISTORY_QUERY_PARAMS = ["from", "to"]
+
+
+@knowledge_entry(
+    key="/docs/kpi_history",
+    tags=[KnowledgeTag.KNOWLEDGE_GUIDE, KnowledgeTag.SIMULATION],
+    related=[
+        (KnowledgeRelationship.ASSOCIATED_WITH, "/docs/user_equipments"),
+        (KnowledgeRelationship.ASSOCIATED_WITH, "/docs/cells"),
+        (KnowledgeRelationship.ASSOCIATED_WITH, "/docs/base_stations"),
+    ],
+)
+def kpi_history_docs(sim, knowledge_router, query_key, params):
+    return (
+        "📘 **KPI History**\n\n"
+        "The simulation records the KPIs of every UE, cell and base station at each step. "
+        "Recent steps are kept one by one, older ones as averages over "
+        f"{' and '.join(str(f) for f in settings.SIM_KPI_RECORDER_DOWNSAMPLING_FACTORS)} steps.\n\n"
+        "### Available Endpoints:\n"
+        "- **History of a UE attribute**: `/user_equipments/{ue_imsi}/history/{attribute_name}`\n"
+        "- **History of a cell attribute**: `/cells/{cell_id}/history/{attribute_name}`\n"
+        "- **History of a base station attribute**: `/base_stations/{bs_id}/history/{attribute_name}`\n\n"
+        "### Time Window:\n"
+        "Times are simulated seconds since the network setup. Add `?from=<t>&to=<t>` to select a window, "
+        "negative values are relative to the latest step, e.g. `/base_stations/bs_11/history/current_load?from=-300` "
+        "for the last 5 minutes. By default the whole recorded history is returned.\n\n"
+        "### Recorded UE Attributes:\n"
+        f"{', '.join(UE_KPI_ATTRIBUTES)}\n\n"
+        "### Recorded Cell Attributes:\n"
+        f"{', '.join(CELL_KPI_ATTRIBUTES)}\n\n"
+        "### Recorded Base Station Attributes:\n"
+        f"{', '.join(BS_KPI_ATTRIBUTES)}\n\n"
+    )
+
+
+def _parse_time(params, name):
+    value = params.get(name, None)
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"Invalid '{name}' time '{value}', expected simulated seconds.")
+
+
+def _get_history(sim, table_name, element_id, params):
+    return sim.kpi_recorder.get_history(
+        table_name,
+        element_id,
+        params["attribute_name"],
+        from_time=_parse_time(params, "from"),
+        to_time=_parse_time(params, "to"),
+        latest_time=sim.sim_time,
+    )
+
+
+def _render_history(element_name, history):
+    sim_times = np.array(history["sim_times"])
+    values = np.array(history["values"])
+    window_start = (
+        "the start"
+        if history["from_time"] is None
+        else f"t={history['from_time']:g}s"
+    )
+    response = (
+        f"History of '{history['attribute']}' of {element_name} "
+        f"from {window_start} to t={history['to_time']:g}s"
+    )
+    if len(values) == 0:
+        return response + ": no samples in this window.\n"
+    response += f" ({len(values)} samples"
+    if history["resolution_steps"] > 1:
+        response += f", each averaging {history['resolution_steps']} steps"
+    response += "):\n"
+    response += (
+        f"- min: {values.min():.4g}, mean: {values.mean():.4g}, max: {values.max():.4g}\n"
+        f"- first (t={sim_times[0]:g}s): {values[0]:.4g}, last (t={sim_times[-1]:g}s): {values[-1]:.4g}\n"
+    )
+
+    max_points = settings.KNOWLEDGE_HISTORY_MAX_POINTS
+    if len(values) > max_points:
+        response += f"Values averaged into {max_points} points (t = end of each interval):\n"
+        buckets = np.array_split(np.arange(len(values)), max_points)
+        points = [(sim_times[b[-1]], values[b].mean()) for b in buckets]
+    else:
+        response += "Values:\n"
+        points = zip(sim_times, values)
+    response += "".join(f"  t={t:g}s: {v:.4g}\n" for t, v in points)
+    return response
+
+
+def get_ue_history_data(sim, knowledge_router, query_key, params):
+    error, history = _get_history(sim, "user_equipments", params["ue_imsi"], params)
+    return history
+
+
+def get_cell_history_data(sim, knowledge_router, query_key, params):
+    error, history = _get_history(sim, "cells", params["cell_id"], params)
+    return history
+
+
+def get_bs_history_data(sim, knowledge_router, query_key, params):
+    error, history = _get_history(sim, "base_stations", params["bs_id"], params)
+    return history
+
+
+@knowledge_entry(
+    key="/user_equipments/{ue_imsi}/history/{attribute_name}",
+    tags=[KnowledgeTag.UE],
+    related=[(KnowledgeRelationship.ASSOCIATED_WITH, "/docs/kpi_history")],
+    data_func=get_ue_history_data,
+    query_params=HISTORY_QUERY_PARAMS,
+)
+def get_ue_history(sim, knowledge_router, query_key, params):
+    error, history = _get_history(sim, "user_equipments", params["ue_imsi"], params)
+    if error:
+        return error
+    return _render_history(f"UE {params['ue_imsi']}", history)
+
+
+@knowledge_entry(
+    key="/cells/{cell_id}/history/{attribute_name}",
+    tags=[KnowledgeTag.CELL],
+    related=[(KnowledgeRelationship.ASSOCIATED_WITH, "/docs/kpi_history")],
+    data_func=get_cell_history_data,
+    query_params=HISTORY_QUERY_PARAMS,
+)
+def get_cell_history(sim, knowledge_router, query_key, params):
+    error, history = _get_history(sim, "cells", params["cell_id"], params)
+    if error:
+        return error
+    return _render_history(f"cell {params['cell_id']}", history)
+
+
+@knowledge_entry(
+    key="/base_stations/{bs_id}/history/{attribute_name}",
+    tags=[KnowledgeTag.BS],
+    related=[(KnowledgeRelationship.ASSOCIATED_WITH, "/docs/kpi_history")],
+    data_func=get_bs_history_data,
+    query_params=HISTORY_QUERY_PARAMS,
+)
+def get_bs_history(sim, knowledge_router, query_key, params):
+    error, history = _get_history(sim, "base_stations", params["bs_id"], params)
+    if error:
+        return error
+    return _render_history(f"base station {params['bs_id']}", history)
@@ -0,0 +1,34 @@
+from ..knowledge_entry import knowledge_entry
+from ..tags import KnowledgeTag
+from ..relationships import KnowledgeRelationship
+
+
+@knowledge_entry(
+    key="/docs/knowledge_queries",
+    tags=[KnowledgeTag.KNOWLEDGE_GUIDE],
+    related=[
+        (KnowledgeRelationship.ASSOCIATED_WITH, "/docs/user_equipments"),
+        (KnowledgeRelationship.ASSOCIATED_WITH, "/docs/cells"),
+        (KnowledgeRelationship.ASSOCIATED_WITH, "/docs/base_stations"),
+    ],
+)
+def knowledge_queries_docs(sim, knowledge_router, query_key, params):
+    return (
+        "📘 **Knowledge Queries**\n\n"
+        "The list endpoints `/user_equipments`, `/cells` and `/base_stations` accept a query string to filter, "
+        "project, sort and aggregate the whole population in a single call, instead of fetching every element one by one.\n\n"
+        "### Query Parameters (all optional, combined with `&`):\n"
+        "- `where=<conditions>`: comma separated conditions, all of which must hold. "
+        "Operators: `=`, `!=`, `<`, `<=`, `>`, `>=`. Use `|` to match any of several values, e.g. `slice_type=eMBB|URLLC`. "
+        "References to other elements (e.g. `current_cell`, `current_bs`) compare by ID.\n"
+        "- `fields=<attributes>`: comma separated attributes to return for each matching element (default: the ID).\n"
+        "- `sort=<attribute>`: sort the matching elements, prefix with `-` for descending order.\n"
+        "- `limit=<n>`: return at most n elements (or groups). Without a limit, at most one page of elements is returned, "
+        "`page_size=<n>` changes the page size and `page_size=all` returns all matching elements.\n"
+        "- `agg=<aggregations>`: comma separated `count`, `avg(attr)`, `min(attr)`, `max(attr)`, `sum(attr)`.\n"
+        "- `group_by=<attribute>`: compute the aggregations (default `count`) per value of the attribute.\n\n"
+        "### Examples:\n"
+        "- UEs with CQI below 5 served by bs_12: `/user_equipments?where=downlink_cqi<5,current_bs=bs_12&fields=ue_imsi,current_cell&agg=count`\n"
+        "- Average bitrate per slice: `/user_equipments?agg=count,avg(downlink_bitrate)&group_by=slice_type`\n"
+        "- The 3 most loaded cells: `/cells?fields=cell_id,current_load&sort=-current_load&limit=3`\n"
+    )
@@ -1,6 +1,10 @@
 import json
 import inspect
 from ..knowledge_entry import knowledge_entry
+from ..knowledge_data import get_attributes_data
+from ..knowledge_pagination import KnowledgePage
+from .ue_knowledge import render_ue_summary
+from .cell_knowledge import render_cell_summary
 from ..tags import KnowledgeTag
 from ..relationships import KnowledgeRelationship
 from network_layer.simulation_engine import SimulationEngine
@@ -15,6 +19,9 @@ SUPPORTED_SIM_ATTRIBUTES = [
     "logs",
 ]
 
+# attributes that grow with the network size or the simulation time and are listed page by page
+SIM_LIST_ATTRIBUTES = ["base_station_list", "cell_list", "ue_list", "logs"]
+
 SUPPORTED_SIM_METHODS = [
     "network_setup",
     "spawn_random_ue",
@@ -43,7 +50,8 @@ def sim_engine_docs(sim, knowledge_router, query_key, params):
         "You can query live data and explanations for the simulation engine.\n\n"
         "### Available Endpoints:\n"
         "- **List all attributes of the simulation engine**: `/sim_engine`\n"
-        "- **Get a specific attribute value of the simulation engine**: `/sim_engine/attributes/{attribute_name}`\n"
+        "- **Get a specific attribute value of the simulation engine**: `/sim_engine/attributes/{attribute_name}` "
+        f"(paginated for {', '.join(SIM_LIST_ATTRIBUTES)}: next pages with `?cursor={{next_cursor}}`, `?page_size=all` for the full list)\n"
         "- **Explain what an attribute of simulation engine means**: `/docs/sim_engine/attributess/{attribute_name}`\n"
         "- **Explain what a method in simulation engine class does**: `/docs/sim_engine/methods/{method_name}`\n"
         "### Supported SimulationEngine Attributes:\n"
@@ -53,10 +61,22 @@ def sim_engine_docs(sim, knowledge_router, query_key, params):
     )
 
 
+def get_sim_engine_data(sim, knowledge_router, query_key, params):
+    data = get_attributes_data(sim, SUPPORTED_SIM_ATTRIBUTES)
+    if "attribute_name" in params:
+        if params["attribute_name"] not in SUPPORTED_SIM_ATTRIBUTES:
+            return None
+        return {params["attribute_name"]: data[params["attribute_name"]]}
+    data["knowledge_response_cache"] = knowledge_router.get_response_cache_metrics()
+    return data
+
+
 @knowledge_entry(
     key="/sim_engine",
     tags=[KnowledgeTag.SIMULATION],
     related=[],
+    cacheable=False,  # shows the live knowledge response cache metrics
+    data_func=get_sim_engine_data,
 )
 def get_sim_engine_attributes(sim, knowledge_router, query_key, params):
     response = "Attributes value of the simulation engine:\n"
@@ -65,13 +85,17 @@ def get_sim_engine_attributes(sim, knowledge_router, query_key, params):
         if value is None:
             response += f"- {attr}: None\n"
             continue
-        if attr == "ue_list" or attr == "base_station_list" or attr == "cell_list":
-            response += f"{attr}:\n"
-            for val in value.values():
-                response += f"  - {repr(val)}\n"
+        if attr in SIM_LIST_ATTRIBUTES:
+            response += f"- {attr}: {len(value)} items, list them with `/sim_engine/attributes/{attr}`\n"
         else:
             response += f"- {attr}: {repr(value)}\n"
 
+    response += "Knowledge response cache:\n"
+    for metric, value in knowledge_router.get_response_cache_metrics().items():
+        if isinstance(value, float):
+            value = round(value, 4)
+        response += f"  - {metric}: {value}\n"
+
     return response
 
 
@@ -83,6 +107,8 @@ def get_sim_engine_attributes(sim, knowledge_router, query_key, params):
     key="/sim_engine/attributes/{attribute_name}",
     tags=[KnowledgeTag.SIMULATION],
     related=[],
+    data_func=get_sim_engine_data,
+    paginated=True,
 )
 def get_sim_engine_attribute_value(sim, knowledge_router, query_key, params):
     attribute_name = params["attribute_name"]
@@ -92,14 +118,20 @@ def get_sim_engine_attribute_value(sim, knowledge_router, query_key, params):
     response = f"Value of attribute '{attribute_name}':"
     if value is None:
         response += " None"
-    elif (
-        attribute_name == "ue_list"
-        or attribute_name == "base_station_list"
-        or attribute_name == "cell_list"
-    ):
-        response += "\n"
-        for val in value.values():
-            response += f"  - {repr(val)}\n"
+    elif attribute_name in SIM_LIST_ATTRIBUTES:
+        if isinstance(value, dict):
+            page = KnowledgePage.from_dict(value, params)
+        else:
+            page = KnowledgePage.from_list(value, params)
+        response += f" {len(value)} items\n"
+        if attribute_name == "ue_list":
+            response += render_ue_summary(value)
+        elif attribute_name == "cell_list":
+            response += render_cell_summary(value)
+        response += page.render_header("items")
+        for val in page.items:
+            response += f"  - {val if isinstance(val, str) else repr(val)}\n"
+        response += page.render_footer(f"/sim_engine/attributes/{attribute_name}")
     else:
         response += f" {repr(value)}"
     return response
@@ -283,7 +315,8 @@ def sim_spawn_UEs_explainer(sim, knowledge_router, query_key, params):
     "/docs/sim_engine/methods/step_UEs",
     tags=[KnowledgeTag.SIMULATION, KnowledgeTag.UE, KnowledgeTag.CODE],
     related=[
-        (KnowledgeRelationship.CALLED_BY_METHOD, "/docs/user_equipments/methods/step"),
+        (KnowledgeRelationship.CALL_METHOD, "/docs/user_equipments/mobility"),
+        (KnowledgeRelationship.CALL_METHOD, "/docs/user_equipments/methods/step"),
         (KnowledgeRelationship.USES_ATTRIBUTE, "/docs/sim_engine/attributes/ue_list"),
         (KnowledgeRelationship.CALL_METHOD, "/docs/sim_engine/methods/remove_UE"),
     ],
@@ -292,7 +325,8 @@ def sim_step_UEs_explainer(sim, knowledge_router, query_key, params):
     code = inspect.getsource(getattr(SimulationEngine, "step_UEs"))
     explanation = (
         "The `step_UEs` method advances the state of all UEs in the simulation by one time step. "
-        "It calls each UE's `step` method to update its position, connectivity, and state, and removes UEs that are no longer connected. "
+        "It moves all UEs at once with the mobility model (see `/docs/user_equipments/mobility`), then calls each UE's `step` method "
+        "to update its connectivity and state, and removes UEs that are no longer connected. "
     )
     return f"```python\n{code}\n```\n\n{explanation}"
 
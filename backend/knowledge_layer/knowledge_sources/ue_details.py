@@ -3,7 +3,7 @@ from agents import function_tool
 from pydantic import BaseModel
 from pydantic import Field
 from settings.slice_config import NETWORK_SLICE_EMBB_NAME, NETWORK_SLICE_MTC_NAME, NETWORK_SLICE_URLLC_NAME
-from network_layer.simulation_engine import SimulationEngine
+from network_layer.simulation_registry import get_current_simulation_engine
 
 class UEDetails:
     def __init__(self, imsi: str, network_slices: list[str]):
@@ -30,7 +30,7 @@ def add_ue(imsi: str, network_slices: list[str]):
     Returns:
         str: Status message.
     """
-    sim_engine = SimulationEngine()
+    sim_engine = get_current_simulation_engine()
     success = sim_engine.register_ue(imsi, network_slices)
     if success:
         return f"UE {imsi} was successfully registered."
@@ -47,7 +47,7 @@ def remove_ue(imsi: str):
     Returns:
         str: Status message.
     """
-    sim_engine = SimulationEngine()
+    sim_engine = get_current_simulation_engine()
     success = sim_engine.deregister_ue(imsi)
     if success:
         return f"UE {imsi} was successfully deregistered and removed."
@@ -61,7 +61,7 @@ def get_available_ue_description() -> str:
     Returns:
         str: A summary of registered UEs (first and last IMSI), or absence message.
     """
-    sim_engine = SimulationEngine()
+    sim_engine = get_current_simulation_engine().get_snapshot()
     core_network = sim_engine.core_network
     imsies = list(core_network.active_ues.keys())
     if not imsies:
@@ -103,7 +103,7 @@ def get_ues(slices: list[str] = [NETWORK_SLICE_EMBB_NAME, NETWORK_SLICE_URLLC_NA
         - The slices parameter allows selective retrieval for scenarios where only UEs with access to certain slices are needed.
     """
     print(f"LOG: slices: {slices}")
-    sim_engine = SimulationEngine()
+    sim_engine = get_current_simulation_engine().get_snapshot()
     core_network = sim_engine.core_network
     result: list[GetUE] = []
     for ue_imsi, reg_info in core_network.active_ues.items():
@@ -124,7 +124,7 @@ def update_ue_subscription(imsi: str, new_slices: list[str]):
     Returns:
         str: Status message.
     """
-    sim_engine = SimulationEngine()
+    sim_engine = get_current_simulation_engine()
     core_network = sim_engine.core_network
 
     if not isinstance(new_slices, list) or not new_slices:
@@ -1,5 +1,8 @@
 import json
 from ..knowledge_entry import knowledge_entry
+from ..knowledge_data import get_attributes_data
+from ..knowledge_query import KnowledgeCollection
+from ..knowledge_pagination import KnowledgePage, render_counts
 from ..tags import KnowledgeTag
 from ..relationships import KnowledgeRelationship
 from settings import (
@@ -10,6 +13,7 @@ from settings import (
 )
 
 import inspect
+from network_layer.mobility import move_towards_targets
 from network_layer.ue import UE
 
 
@@ -24,6 +28,7 @@ SUPPORTED_UE_ATTRIBUTES = [
     "slice_type",
     "qos_profile",
     "connected",
+    "rrc_state",
     "downlink_bitrate",
     # "downlink_latency",
     "downlink_sinr",
@@ -49,7 +54,6 @@ SUPPORTED_UE_METHODS = [
     "set_downlink_mcs_data",
     "set_downlink_sinr",
     "set_downlink_cqi",
-    "move_towards_target",
     "setup_rrc_measurement_event_monitors",
     "check_rrc_meas_events_to_monitor",
     "execute_handover",
@@ -59,6 +63,13 @@ SUPPORTED_UE_METHODS = [
     "step",
 ]
 
+UE_COLLECTION = KnowledgeCollection(
+    name="UEs",
+    source_attribute="ue_list",
+    id_attribute="ue_imsi",
+    attributes=SUPPORTED_UE_ATTRIBUTES + ["current_bs"],
+)
+
 
 @knowledge_entry(
     key="/docs/user_equipments",
@@ -70,11 +81,14 @@ def ue_knowledge_help(sim, knowledge_router, query_key, params):
         "📘 **Welcome to the User Equipment (UE) Knowledge Base**\n\n"
         "You can query live data and explanations for User Equipments (UEs) in the simulation.\n\n"
         "### Available Endpoints:\n"
-        "- **List all UEs (identifiers only)**: `/user_equipments`\n"
+        "- **List all UEs (identifiers only, paginated)**: `/user_equipments`, next pages with `/user_equipments?cursor={next_cursor}`, page size with `page_size={n}` (`page_size=all` for the full list)\n"
         "- **Get all attributes values for a specific UE**: `/user_equipments/{ue_imsi}`\n"
         "- **Get a specific attribute value of a specific UE**: `/user_equipments/{ue_imsi}/attributes/{attribute_name}`\n"
+        "- **Get the recorded history of an attribute of a specific UE**: `/user_equipments/{ue_imsi}/history/{attribute_name}?from=-300` (see `/docs/kpi_history`)\n"
         "- **Explain what an attribute of UE means**: `/docs/user_equipments/attributes/{attribute_name}`\n"
         "- **Explain what a method in UE class does**: `/docs/user_equipments/methods/{method_name}`\n"
+        "- **Explain how UEs move (the mobility models)**: `/docs/user_equipments/mobility`\n"
+        "- **Filter, sort and aggregate UEs**: `/user_equipments?where=...&fields=...&sort=...&limit=...&agg=...&group_by=...`, e.g. `/user_equipments?where=downlink_cqi<5,current_bs=bs_12&fields=ue_imsi,current_cell&agg=count` (see `/docs/knowledge_queries`)\n"
         "### Supported UE Attributes:\n"
         f"{', '.join(SUPPORTED_UE_ATTRIBUTES)}\n\n"
         "### Supported UE Methods:\n"
@@ -82,6 +96,33 @@ def ue_knowledge_help(sim, knowledge_router, query_key, params):
     )
 
 
+def render_ue_summary(ue_list):
+    return render_counts(
+        "UEs per cell",
+        [ue.current_cell.cell_id if ue.current_cell else None for ue in ue_list.values()],
+    ) + render_counts("UEs per slice", [ue.slice_type for ue in ue_list.values()])
+
+
+def get_ue_list_data(sim, knowledge_router, query_key, params):
+    page = KnowledgePage.from_dict(sim.ue_list, params)
+    data = page.to_json()
+    data["items"] = [
+        get_attributes_data(ue, SUPPORTED_UE_ATTRIBUTES) for ue in page.items
+    ]
+    return data
+
+
+def get_ue_data(sim, knowledge_router, query_key, params):
+    ue = sim.ue_list.get(params["ue_imsi"])
+    if ue is None:
+        return None
+    if "attribute_name" in params:
+        if params["attribute_name"] not in SUPPORTED_UE_ATTRIBUTES:
+            return None
+        return get_attributes_data(ue, [params["attribute_name"]])
+    return get_attributes_data(ue, SUPPORTED_UE_ATTRIBUTES)
+
+
 # ------------------------------------------
 #     GET /user_equipments
 #       → List all UEs (representations) in the simulation
@@ -90,12 +131,19 @@ def ue_knowledge_help(sim, knowledge_router, query_key, params):
     key="/user_equipments",
     tags=[KnowledgeTag.UE],
     related=[],
+    data_func=get_ue_list_data,
+    collection=UE_COLLECTION,
+    paginated=True,
 )
 def get_ue_repr_list(sim, knowledge_router, query_key, params):
-    list_of_ue_repr = [repr(ue) for ue in sim.ue_list.values()]
+    page = KnowledgePage.from_dict(sim.ue_list, params)
+    list_of_ue_repr = [repr(ue) for ue in page.items]
     return (
-        f"Currently there are {len(list_of_ue_repr)} UEs in the simulation:\n"
-        f"{"\n".join(list_of_ue_repr)}\n"
+        f"Currently there are {len(sim.ue_list)} UEs in the simulation.\n"
+        f"{render_ue_summary(sim.ue_list)}"
+        f"{page.render_header("UEs")}"
+        f"{"".join(f"{ue_repr}\n" for ue_repr in list_of_ue_repr)}"
+        f"{page.render_footer("/user_equipments")}"
     )
 
 
@@ -107,6 +155,7 @@ def get_ue_repr_list(sim, knowledge_router, query_key, params):
     key="/user_equipments/{ue_imsi}",
     tags=[KnowledgeTag.UE],
     related=[],
+    data_func=get_ue_data,
 )
 def get_ue_attributes(sim, knowledge_router, query_key, params):
     ue_imsi = params["ue_imsi"]
@@ -129,6 +178,7 @@ def get_ue_attributes(sim, knowledge_router, query_key, params):
     key="/user_equipments/{ue_imsi}/attributes/{attribute_name}",
     tags=[KnowledgeTag.UE],
     related=[],
+    data_func=get_ue_data,
 )
 def get_ue_attribute_value(sim, knowledge_router, query_key, params):
     ue_imsi = params["ue_imsi"]
@@ -164,7 +214,7 @@ def ue_imsi_explainer(sim, knowledge_router, query_key, params):
     related=[
         (
             KnowledgeRelationship.SET_BY_METHOD,
-            "/docs/user_equipments/methods/move_towards_target",
+            "/docs/user_equipments/mobility",
         ),
         (
             KnowledgeRelationship.ASSOCIATED_WITH,
@@ -182,7 +232,7 @@ def ue_position_x_explainer(sim, knowledge_router, query_key, params):
     related=[
         (
             KnowledgeRelationship.SET_BY_METHOD,
-            "/docs/user_equipments/methods/move_towards_target",
+            "/docs/user_equipments/mobility",
         ),
         (
             KnowledgeRelationship.ASSOCIATED_WITH,
@@ -200,7 +250,7 @@ def ue_position_y_explainer(sim, knowledge_router, query_key, params):
     related=[
         (
             KnowledgeRelationship.USED_BY_METHOD,
-            "/docs/user_equipments/methods/move_towards_target",
+            "/docs/user_equipments/mobility",
         )
     ],
 )
@@ -214,7 +264,7 @@ def ue_target_x_explainer(sim, knowledge_router, query_key, params):
     related=[
         (
             KnowledgeRelationship.USED_BY_METHOD,
-            "/docs/user_equipments/methods/move_towards_target",
+            "/docs/user_equipments/mobility",
         )
     ],
 )
@@ -228,7 +278,7 @@ def ue_target_y_explainer(sim, knowledge_router, query_key, params):
     related=[
         (
             KnowledgeRelationship.USED_BY_METHOD,
-            "/docs/user_equipments/methods/move_towards_target",
+            "/docs/user_equipments/mobility",
         )
     ],
 )
@@ -340,6 +390,26 @@ def ue_connected_explainer(sim, knowledge_router, query_key, params):
     return "A boolean representing whether the UE is connected or not to the network (served by a cell and registered with the core)."
 
 
+@knowledge_entry(
+    "/docs/user_equipments/attributes/rrc_state",
+    tags=[KnowledgeTag.UE, KnowledgeTag.SIMULATION],
+    related=[
+        (
+            KnowledgeRelationship.SET_BY_METHOD,
+            "/docs/user_equipments/methods/step",
+        ),
+    ],
+)
+def ue_rrc_state_explainer(sim, knowledge_router, query_key, params):
+    return (
+        "The RRC state of a registered UE: `RRC_CONNECTED`, `RRC_INACTIVE` or `RRC_IDLE`. "
+        "UEs of slices with a sparse traffic pattern (e.g., mMTC devices sending periodic reports) release the connection "
+        "after an inactivity timer and become `RRC_INACTIVE`, then `RRC_IDLE`. Idle and inactive UEs stay camped on their cell "
+        "but get no PRBs, report no measurement events and only measure the cells every few seconds. They resume "
+        "`RRC_CONNECTED` right away for uplink traffic, or at their next paging occasion when paged by the network."
+    )
+
+
 @knowledge_entry(
     "/docs/user_equipments/attributes/downlink_bitrate",
     tags=[KnowledgeTag.UE, KnowledgeTag.QoS],
@@ -574,6 +644,10 @@ def ue_monitor_signal_strength_explainer(sim, knowledge_router, query_key, param
     explanation_text = (
         "The `monitor_signal_strength` method allows the UE to scan for available cells "
         "and measure their downlink signal strength. This process involves:\n\n"
+        "0. **Change Check**: The measurements only change with the UE position, the serving cell and the radio "
+        "configuration of the cells (transmit power, CIO, ...). A UE that moved less than "
+        "`UE_MEASUREMENT_POSITION_TOLERANCE_M` since its last measurements keeps them, and only re-measures "
+        "the cells whose configuration changed since then (`radio_config_version`).\n\n"
         "1. **Path Loss Calculation**: The UE calculates the received power from each cell "
         "based on the cell's transmit power, distance, and the path loss model.\n\n"
         "2. **Filtering Detected Cells**: Only cells with received power above the detection threshold "
@@ -878,7 +952,7 @@ def ue_set_downlink_cqi_explainer(sim, knowledge_router, query_key, params):
 
 
 @knowledge_entry(
-    "/docs/user_equipments/methods/move_towards_target",
+    "/docs/user_equipments/mobility",
     tags=[KnowledgeTag.UE, KnowledgeTag.MOBILITY, KnowledgeTag.CODE],
     related=[
         (
@@ -901,25 +975,32 @@ def ue_set_downlink_cqi_explainer(sim, knowledge_router, query_key, params):
             KnowledgeRelationship.USES_ATTRIBUTE,
             "/docs/user_equipments/attributes/speed_mps",
         ),
+        (KnowledgeRelationship.CALLED_BY_METHOD, "/docs/sim_engine/methods/step_UEs"),
     ],
 )
-def ue_move_towards_target_explainer(sim, knowledge_router, query_key, params):
+def ue_mobility_explainer(sim, knowledge_router, query_key, params):
+    mobility_model = type(sim.mobility)
     try:
-        method_source = inspect.getsource(getattr(UE, "move_towards_target"))
-        code_block = f"```python\n{method_source}\n```\n"
+        code_block = (
+            f"```python\n{inspect.getsource(move_towards_targets)}\n```\n"
+            f"```python\n{inspect.getsource(mobility_model)}\n```\n"
+        )
     except Exception:
         code_block = "*Source code unavailable.*\n\n"
     explanation_text = (
-        "The `move_towards_target` method updates the UE's position by moving it towards its target coordinates (`target_x`, `target_y`) "
-        "based on its current speed (`speed_mps`) and the elapsed simulation time (`delta_time`).\n\n"
-        "Detailed behavior:\n"
-        "1. **Distance Calculation**: The method first calculates the straight-line (Euclidean) distance between the UE's current position (`position_x`, `position_y`) and its target position.\n"
-        "2. **Movement Determination**: It computes the maximum distance the UE can move in this simulation step as `speed_mps * delta_time`.\n"
-        "3. **Position Update**:\n"
-        "   - If the target is within reach (i.e., the distance to the target is less than or equal to the maximum move distance), the UE's position is set directly to the target coordinates.\n"
-        "   - Otherwise, the UE moves along the straight line towards the target by the maximum allowed distance, updating both `position_x` and `position_y` proportionally.\n"
-        "   - The new position is rounded to the nearest integer to reflect discrete simulation steps.\n"
-        "4. **No Movement**: If the UE is already at the target, its position remains unchanged."
+        "UEs do not move themselves: once per simulation step, `SimulationEngine.step_UEs` calls the mobility model "
+        "(`network_layer/mobility.py`), which moves all UEs at once and writes the new `position_x` and `position_y` back to them. "
+        "The model keeps the positions, targets (`target_x`, `target_y`), speeds (`speed_mps`) and operation regions "
+        "of its UEs in arrays, one row per UE.\n\n"
+        f"The mobility model of this simulation is `{mobility_model.name}` (`settings.UE_MOBILITY_MODEL`). Models:\n"
+        "- **random_waypoint** (`RandomWaypointMobility`): UEs move at a constant speed in a straight line towards a random target "
+        "in their operation region (`move_towards_targets`), and draw a new target when they reach it.\n"
+        "- **gauss_markov** (`GaussMarkovMobility`): the speed and direction of UEs are Gauss-Markov processes around their spawn speed "
+        "and a mean direction; UEs reflect at the borders of their operation region.\n"
+        "- **fixed_route** (`FixedRouteMobility`): UEs loop over the waypoints of a route, moving towards one waypoint after the other.\n"
+        "- **trace** (`TraceMobility`): UEs follow the positions of a mobility trace file, and enter and leave the network with the trace.\n\n"
+        "`move_towards_targets` moves each position by at most `speed_mps * delta_time` towards its target, lands on the target when it is "
+        "within reach, and rounds the positions to `settings.UE_POSITION_ROUNDING_DECIMALS`."
     )
     return code_block + explanation_text
 
@@ -1140,10 +1221,6 @@ def ue_calculate_sinr_and_cqi_explainer(sim, knowledge_router, query_key, params
     "/docs/user_equipments/methods/step",
     tags=[KnowledgeTag.UE, KnowledgeTag.SIMULATION, KnowledgeTag.CODE],
     related=[
-        (
-            KnowledgeRelationship.CALL_METHOD,
-            "/docs/user_equipments/methods/move_towards_target",
-        ),
         (
             KnowledgeRelationship.CALL_METHOD,
             "/docs/user_equipments/methods/monitor_signal_strength",
@@ -1167,13 +1244,17 @@ def ue_step_explainer(sim, knowledge_router, query_key, params):
         code_block = "*Source code unavailable.*\n\n"
     explanation_text = (
         "The `step` method advances the UE's state by one simulation time step. "
-        "It orchestrates mobility, radio measurements, event monitoring, and lifecycle management for the UE.\n\n"
+        "It orchestrates radio measurements, event monitoring, and lifecycle management for the UE; "
+        "its position has already been updated by the simulation engine's vectorized mobility stage, "
+        "which moves all UEs at once according to the configured mobility model.\n\n"
         "**Detailed behavior:**\n"
-        "1. Calls `move_towards_target(delta_time)` to update the UE's position based on its speed and target coordinates.\n"
-        "2. Calls `monitor_signal_strength()` to update the UE's received power measurements and recalculate SINR and CQI.\n"
-        "3. Calls `check_rrc_meas_events_to_monitor()` to evaluate RRC measurement events and trigger handover or reporting if needed.\n"
-        "4. Decrements the `time_remaining` attribute by the elapsed simulation time (`delta_time`).\n"
-        "5. If `time_remaining` reaches zero or below, calls `deregister()` to remove the UE from the network and simulation.\n\n"
+        "1. Calls `step_rrc_state(delta_time)` to follow the UE's traffic pattern, if any: the UE releases the connection "
+        "(`RRC_INACTIVE`, then `RRC_IDLE`) between traffic bursts, and resumes it for uplink traffic or when paged.\n"
+        "2. In `RRC_CONNECTED`, calls `monitor_signal_strength()` to update the UE's received power measurements and recalculate SINR and CQI, "
+        "`check_rrc_meas_events_to_monitor()` to evaluate RRC measurement events and trigger handover or reporting if needed, "
+        "and `request_ai_service()`. Idle and inactive UEs only measure the received power every `UE_IDLE_MEASUREMENT_PERIOD_S` seconds.\n"
+        "3. Decrements the `time_remaining` attribute by the elapsed simulation time (`delta_time`).\n"
+        "4. If `time_remaining` reaches zero or below, calls `deregister()` to remove the UE from the network and simulation.\n\n"
         "This method is typically called once per simulation tick, ensuring the UE's mobility, connectivity, and lifecycle are accurately modeled."
     )
     return code_block + explanation_text
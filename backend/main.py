@@ -11,15 +11,24 @@ from utils import (
     handle_start_simulation,
     handle_stop_simulation,
     handle_get_simulation_state,
+    handle_start_trace_replay,
+    handle_seek_trace_replay,
+    handle_stop_trace_replay,
+    handle_save_checkpoint,
+    handle_load_checkpoint,
     handle_get_routes,
     handle_query_knowledge,
+    handle_query_knowledge_bulk,
     stream_agent_chat,
     handle_network_user_action,
 )
 
-from network_layer.simulation_engine import SimulationEngine
-from utils import setup_logging, WebSocketSingleton
-from knowledge_layer import KnowledgeRouter
+from network_layer.simulation_registry import (
+    SimulationSessionError,
+    get_simulation_registry,
+    set_current_session,
+)
+from utils import setup_logging
 from functools import partial
 
 from intelligence_layer import engineer_chat_agent
@@ -33,8 +42,14 @@ COMMAND_HANDLERS = {
     ("network_layer", "start_simulation"): handle_start_simulation,
     ("network_layer", "stop_simulation"): handle_stop_simulation,
     ("network_layer", "get_simulation_state"): handle_get_simulation_state,
+    ("network_layer", "start_trace_replay"): handle_start_trace_replay,
+    ("network_layer", "seek_trace_replay"): handle_seek_trace_replay,
+    ("network_layer", "stop_trace_replay"): handle_stop_trace_replay,
+    ("network_layer", "save_checkpoint"): handle_save_checkpoint,
+    ("network_layer", "load_checkpoint"): handle_load_checkpoint,
     ("knowledge_layer", "get_routes"): handle_get_routes,
     ("knowledge_layer", "query_knowledge"): handle_query_knowledge,
+    ("knowledge_layer", "query_knowledge_bulk"): handle_query_knowledge_bulk,
     ("intelligence_layer", "ai_service_pipeline"): handle_ai_service_pipeline_chat,
     ("intelligence_layer", "network_engineer_chat"): partial(
         stream_agent_chat,
@@ -51,48 +66,67 @@ COMMAND_HANDLERS = {
 
 
 async def websocket_handler(websocket):
-    WebSocketSingleton().set_websocket(websocket)
-    simulation_engine = SimulationEngine()
-    simulation_engine.reset_network()
-    simulation_engine.network_setup()
-    knowledge_router = KnowledgeRouter()
-    knowledge_router.import_routes(simulation_engine)
-    while True:
-        message = await websocket.recv()
-        try:
-            message_json = json.loads(message)
-            layer = message_json.get("layer")
-            command = message_json.get("command")
-            data = message_json.get("data", {})
-        except (json.JSONDecodeError, KeyError):
-            response = WebSocketResponse(
-                layer=None, command=None, response=None, error="Invalid message format"
-            )
-            await websocket.send(response.to_json())
-            continue
-
-        try:
-            handler = COMMAND_HANDLERS.get((layer, command))
-            if handler:
-                await handler(
-                    websocket=websocket,
-                    simulation_engine=simulation_engine,
-                    knowledge_router=knowledge_router,
-                    data=data,
+    # every connection gets its own simulated network, stepped by the shared scheduler
+    registry = get_simulation_registry()
+    try:
+        session = registry.create_session(websocket=websocket)
+    except SimulationSessionError as e:
+        response = WebSocketResponse(layer=None, command=None, response=None, error=str(e))
+        await websocket.send(response.to_json())
+        await websocket.close()
+        return
+    # agent runs and tool calls started by this connection resolve the session from the context
+    set_current_session(session)
+    simulation_engine = session.simulation_engine
+    knowledge_router = session.knowledge_router
+    try:
+        # a failed setup (e.g., a bad warm start checkpoint) still frees the session slot
+        simulation_engine.reset_network()
+        if settings.SIM_WARM_START_CHECKPOINT:
+            simulation_engine.load_checkpoint(settings.SIM_WARM_START_CHECKPOINT)
+        else:
+            simulation_engine.network_setup()
+        while True:
+            try:
+                message = await websocket.recv()
+            except websockets.ConnectionClosed:
+                break
+            try:
+                message_json = json.loads(message)
+                layer = message_json.get("layer")
+                command = message_json.get("command")
+                data = message_json.get("data", {})
+            except (json.JSONDecodeError, KeyError):
+                response = WebSocketResponse(
+                    layer=None, command=None, response=None, error="Invalid message format"
                 )
-            else:
+                await websocket.send(response.to_json())
+                continue
+
+            try:
+                handler = COMMAND_HANDLERS.get((layer, command))
+                if handler:
+                    await handler(
+                        websocket=websocket,
+                        simulation_engine=simulation_engine,
+                        knowledge_router=knowledge_router,
+                        data=data,
+                    )
+                else:
+                    response = WebSocketResponse(
+                        layer=layer,
+                        command=command,
+                        response=None,
+                        error=f"Unknown command: {command}",
+                    )
+                    await websocket.send(response.to_json())
+            except Exception as e:
                 response = WebSocketResponse(
-                    layer=layer,
-                    command=command,
-                    response=None,
-                    error=f"Unknown command: {command}",
+                    layer=layer, command=command, response=None, error=str(e)
                 )
                 await websocket.send(response.to_json())
-        except Exception as e:
-            response = WebSocketResponse(
-                layer=layer, command=command, response=None, error=str(e)
-            )
-            await websocket.send(response.to_json())
+    finally:
+        registry.remove_session(session.session_id)
 
 
 async def main():
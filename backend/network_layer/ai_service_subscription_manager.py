@@ -1,7 +1,10 @@
+import heapq
 import logging
 from utils.class_utils import generate_short_hash
 from typing import Optional
+import settings
 from settings import AI_SERVICE_UNDEPLOYMENT_COUNT_DOWN_STEPS
+from .ai_service_warm_pool import predict_next_base_station
 
 
 logger = logging.getLogger(__name__)
@@ -47,77 +50,139 @@ class AIServiceSubscription:
             "subscription_id": self.subscription_id,
         }
 
-    def step(self):
-        """manage the current AI service subscription
-        for each base station,
-          if there are any subscribing UEs connected to it
-              if the AI service has not started.
-                  try to start the AI service at the edge cluster of the base station
-                  configure the local breakout and start the QoS monitoring xApp
-              else
-                  do nothing
-          else:
-              if the AI service has started
-                  stop the AI service at the edge cluster of the base station,
-                  clean the local breakout rules and stop the QoS monitoring xApp
+    def reconcile(self, base_station):
+        """manage the current AI service subscription at the given base station
+        if there are any subscribing UEs connected to it
+            cancel any scheduled undeployment
+            if the AI service has not started.
+                try to start the AI service at the edge cluster of the base station
+                configure the local breakout and start the QoS monitoring xApp
+            else
+                do nothing
+        else:
+            if the AI service has started
+                schedule the undeployment of the AI service at the edge cluster of the base station,
+                which also cleans the local breakout rules and stops the QoS monitoring xApp
+
+        Returns:
+            bool: True if the AI service could not be deployed and reconciliation should be retried.
         """
-        logger.info(
-            f"Stepping through AI service subscription {self.subscription_id} for service {self.ai_service_name} with UEs {self.ue_id_list}"
+        ai_service_deployment = base_station.edge_server.get_ai_service_deployment(self)
+        found_subscribing_ue = any(
+            ue_imsi in base_station.ue_registry for ue_imsi in self.ue_id_list
         )
-        for base_station in self.base_station_list.values():
-            ai_service_deployment = base_station.edge_server.get_ai_service_deployment(
-                self
+
+        if not found_subscribing_ue:
+            if ai_service_deployment:
+                self.sub_manager.schedule_undeployment(self, base_station)
+            return False
+
+        self.sub_manager.cancel_undeployment(self, base_station)
+        if ai_service_deployment:
+            ai_service_deployment["countdown_steps"] = (
+                AI_SERVICE_UNDEPLOYMENT_COUNT_DOWN_STEPS
             )
-            found_subscribing_ue = None
-            for ue_imsi in self.ue_id_list:
-                if ue_imsi in base_station.ue_registry:
-                    found_subscribing_ue = ue_imsi
-                    break
-            logger.info(
-                f"Base station {base_station.bs_id} found subscribing UE: {found_subscribing_ue}"
+            return False
+
+        logger.info(
+            f"getting or creating AI service deployment for subscription {self.subscription_id} at base station {base_station.bs_id}"
+        )
+        error, ai_service_deployment = (
+            base_station.edge_server.create_ai_service_deployment(self)
+        )
+        if error:
+            logger.error(
+                f"Failed to get or create AI service deployment for subscription {self.subscription_id}: {error}"
             )
-            if found_subscribing_ue:
-                if ai_service_deployment:
-                    # Reset countdown if deployment exists
-                    ai_service_deployment["countdown_steps"] = (
-                        AI_SERVICE_UNDEPLOYMENT_COUNT_DOWN_STEPS
-                    )
-                    continue
+            return True
 
-                logger.info(
-                    f"getting or creating AI service deployment for subscription {self.subscription_id} at base station {base_station.bs_id}"
-                )
+        logger.info(
+            f"AI service deployment for subscription {self.subscription_id} is ready. Container name: {ai_service_deployment['container_name']}"
+        )
+        return False
 
-                error, ai_service_deployment = (
-                    base_station.edge_server.create_ai_service_deployment(self)
-                )
-                if error:
-                    logger.error(
-                        f"Failed to get or create AI service deployment for subscription {self.subscription_id}: {error}"
-                    )
-                else:
-                    logger.info(
-                        f"AI service deployment for subscription {self.subscription_id} is ready. Container name: {ai_service_deployment['container_name']}"
-                    )
-            else:
-                logger.info(
-                    f"No subscribing UEs found at base station {base_station.bs_id} for subscription {self.subscription_id}. Handling AI service undeployment countdown."
-                )
 
-                if ai_service_deployment:
-                    # Decrement countdown, undeploy if reaches zero
-                    ai_service_deployment["countdown_steps"] -= 1
-                    if ai_service_deployment["countdown_steps"] <= 0:
-                        logger.info(
-                            f"AI service deployment for subscription {self.subscription_id} has reached countdown zero. Undeploying AI service."
-                        )
-                        base_station.edge_server.undeploy_ai_service(self)
+class AIServiceSubscriptionManager:
+    """Reconciles AI service deployments with where the subscribing UEs are.
 
+    Reconciliation is event driven: base stations report UEs entering or leaving their registry,
+    which marks only the affected (subscription, base station) pairs dirty, and deployments without
+    subscribing UEs are undeployed by timers instead of per step countdowns.
+    The warm pool demand is kept up to date the same way: the next base station of a subscribing UE
+    is only predicted again when the UE changes serving base station or target.
+    """
 
-class AIServiceSubscriptionManager:
     def __init__(self, ric=None):
         self.ric = ric
         self.subscriptions = {}
+        # (ai_service_name, frozenset(ue_id_list)) -> subscription, used to dedupe subscriptions
+        self.subscription_index = {}
+        # ue_imsi -> set of subscription ids the UE belongs to
+        self.ue_subscription_ids = {}
+        # (subscription_id, bs_id) pairs to reconcile in the next step
+        self.dirty_pairs = set()
+        # (subscription_id, bs_id) -> step at which the AI service deployment is undeployed
+        self.undeployment_timers = {}
+        self.undeployment_timer_heap = []
+        self.step_count = 0
+        # ue_imsi -> (serving bs_id, target_x, target_y, predicted bs_id) of the subscribing UEs
+        self.warm_pool_predictions = {}
+        # bs_id -> subscription_id -> [subscribing UEs served by the base station, subscribing UEs predicted to reach it]
+        self.warm_pool_demand = {}
+
+    def start(self):
+        for base_station in self.base_station_list.values():
+            base_station.add_ue_registry_event_handler(self.handle_ue_registry_event)
+
+    def handle_ue_registry_event(self, event_type, ue_imsi, base_station):
+        for subscription_id in self.ue_subscription_ids.get(ue_imsi, ()):
+            self.dirty_pairs.add((subscription_id, base_station.bs_id))
+
+    def schedule_undeployment(self, subscription, base_station):
+        timer_key = (subscription.subscription_id, base_station.bs_id)
+        if timer_key in self.undeployment_timers:
+            return
+        due_step = self.step_count + AI_SERVICE_UNDEPLOYMENT_COUNT_DOWN_STEPS - 1
+        self.undeployment_timers[timer_key] = due_step
+        heapq.heappush(self.undeployment_timer_heap, (due_step, timer_key))
+        self._update_countdown(timer_key, due_step)
+        logger.info(
+            f"No subscribing UEs found at base station {base_station.bs_id} for subscription {subscription.subscription_id}. AI service undeployment scheduled at step {due_step}."
+        )
+
+    def cancel_undeployment(self, subscription, base_station):
+        # the heap entry is left behind and skipped when it pops
+        self.undeployment_timers.pop(
+            (subscription.subscription_id, base_station.bs_id), None
+        )
+
+    def _update_countdown(self, timer_key, due_step):
+        subscription_id, bs_id = timer_key
+        ai_service_deployment = self.base_station_list[
+            bs_id
+        ].edge_server.ai_service_deployments.get(subscription_id, None)
+        if ai_service_deployment:
+            ai_service_deployment["countdown_steps"] = due_step - self.step_count
+
+    def _fire_undeployment_timers(self):
+        while (
+            self.undeployment_timer_heap
+            and self.undeployment_timer_heap[0][0] <= self.step_count
+        ):
+            due_step, timer_key = heapq.heappop(self.undeployment_timer_heap)
+            if self.undeployment_timers.get(timer_key, None) != due_step:
+                # cancelled or rescheduled
+                continue
+            del self.undeployment_timers[timer_key]
+            subscription_id, bs_id = timer_key
+            subscription = self.subscriptions.get(subscription_id, None)
+            base_station = self.base_station_list.get(bs_id, None)
+            if subscription is None or base_station is None:
+                continue
+            logger.info(
+                f"AI service deployment for subscription {subscription_id} has reached countdown zero. Undeploying AI service."
+            )
+            base_station.edge_server.undeploy_ai_service(subscription)
 
     @property
     def base_station_list(self):
@@ -135,18 +200,29 @@ class AIServiceSubscriptionManager:
         self, ai_service_name: str, ai_service_data, ue_id_list: list[str]
     ) -> AIServiceSubscription:
         # check if the AI service subscription has already be created by matching the AI service name and UE IDs
-        for subscription in self.subscriptions.values():
-            if subscription.ai_service_name == ai_service_name and set(
-                subscription.ue_id_list
-            ) == set(ue_id_list):
-                logger.info(
-                    f"AI service subscription already exists: {subscription.subscription_id}"
-                )
-                return subscription
+        index_key = (ai_service_name, frozenset(ue_id_list))
+        subscription = self.subscription_index.get(index_key, None)
+        if subscription is not None:
+            logger.info(
+                f"AI service subscription already exists: {subscription.subscription_id}"
+            )
+            return subscription
         subscription = AIServiceSubscription(
             self, ai_service_name, ai_service_data, ue_id_list
         )
         self.subscriptions[subscription.subscription_id] = subscription
+        self.subscription_index[index_key] = subscription
+        for ue_id in set(ue_id_list):
+            self.ue_subscription_ids.setdefault(ue_id, set()).add(
+                subscription.subscription_id
+            )
+            if ue_id in self.warm_pool_predictions:
+                self._count_warm_pool_demand(
+                    [subscription.subscription_id], self.warm_pool_predictions[ue_id], 1
+                )
+        # subscribing UEs may already be connected anywhere
+        for bs_id in self.base_station_list.keys():
+            self.dirty_pairs.add((subscription.subscription_id, bs_id))
         for ue_id in ue_id_list:
             if ue_id not in self.ue_list:
                 logger.warning(
@@ -174,6 +250,26 @@ class AIServiceSubscriptionManager:
                         subscription.subscription_id
                     )
             del self.subscriptions[subscription_id]
+            self.subscription_index.pop(
+                (subscription.ai_service_name, frozenset(subscription.ue_id_list)),
+                None,
+            )
+            for ue_id in set(subscription.ue_id_list):
+                if ue_id in self.warm_pool_predictions:
+                    self._count_warm_pool_demand(
+                        [subscription_id], self.warm_pool_predictions[ue_id], -1
+                    )
+                subscription_ids = self.ue_subscription_ids.get(ue_id, set())
+                subscription_ids.discard(subscription_id)
+                if not subscription_ids:
+                    self.ue_subscription_ids.pop(ue_id, None)
+                    self.warm_pool_predictions.pop(ue_id, None)
+            for base_station in self.base_station_list.values():
+                self.dirty_pairs.discard((subscription_id, base_station.bs_id))
+                self.undeployment_timers.pop(
+                    (subscription_id, base_station.bs_id), None
+                )
+                base_station.edge_server.undeploy_ai_service(subscription)
             logger.info(
                 f"Deleted AI service subscription: {subscription_id} for service {subscription.ai_service_name}"
             )
@@ -195,6 +291,119 @@ class AIServiceSubscriptionManager:
             ]
         }
 
-    def step(self):
+    def get_popular_ai_services(self):
+        """the AI services with the most subscribing UEs, only these are kept warm"""
+        subscriber_count = {}
         for subscription in self.subscriptions.values():
-            subscription.step()
+            subscriber_count[subscription.ai_service_name] = subscriber_count.get(
+                subscription.ai_service_name, 0
+            ) + len(subscription.ue_id_list)
+        return set(
+            sorted(subscriber_count, key=subscriber_count.get, reverse=True)[
+                : settings.AI_SERVICE_WARM_POOL_MAX_POPULAR_SERVICES
+            ]
+        )
+
+    def _count_warm_pool_demand(self, subscription_ids, prediction, sign):
+        serving_bs_id, _, _, predicted_bs_id = prediction
+        for subscription_id in subscription_ids:
+            for bs_id, index in ((serving_bs_id, 0), (predicted_bs_id, 1)):
+                if bs_id is None:
+                    continue
+                bs_demand = self.warm_pool_demand.setdefault(bs_id, {})
+                counts = bs_demand.setdefault(subscription_id, [0, 0])
+                counts[index] += sign
+                if counts == [0, 0]:
+                    del bs_demand[subscription_id]
+                    if not bs_demand:
+                        del self.warm_pool_demand[bs_id]
+
+    def _update_warm_pool_predictions(self):
+        """predict the next base station of the subscribing UEs that changed serving base station or target"""
+        for ue_imsi, subscription_ids in self.ue_subscription_ids.items():
+            ue = self.ue_list.get(ue_imsi, None)
+            previous = self.warm_pool_predictions.get(ue_imsi, None)
+            if ue is None or ue.current_bs is None:
+                prediction = None
+            elif previous is not None and previous[:3] == (
+                ue.current_bs.bs_id,
+                ue.target_x,
+                ue.target_y,
+            ):
+                continue
+            else:
+                predicted_bs = predict_next_base_station(ue, self.base_station_list)
+                prediction = (
+                    ue.current_bs.bs_id,
+                    ue.target_x,
+                    ue.target_y,
+                    predicted_bs.bs_id if predicted_bs else None,
+                )
+            if prediction == previous:
+                continue
+            if previous is not None:
+                self._count_warm_pool_demand(subscription_ids, previous, -1)
+            if prediction is None:
+                del self.warm_pool_predictions[ue_imsi]
+            else:
+                self.warm_pool_predictions[ue_imsi] = prediction
+                self._count_warm_pool_demand(subscription_ids, prediction, 1)
+
+    def step_warm_pools(self):
+        """feed each edge server's warm pool with the AI service demand around it:
+        images are pre-pulled where subscribing UEs are or are heading to,
+        idle containers are pre-started for popular services where subscribing UEs are heading to
+        and the subscription is not deployed yet.
+        """
+        warm_pool_base_stations = [
+            base_station
+            for base_station in self.base_station_list.values()
+            if base_station.edge_server.warm_pool is not None
+        ]
+        if not warm_pool_base_stations:
+            return
+        self._update_warm_pool_predictions()
+
+        popular_ai_services = self.get_popular_ai_services()
+        for base_station in warm_pool_base_stations:
+            service_demand = {}
+            for subscription_id, (_, heading_ue_count) in self.warm_pool_demand.get(
+                base_station.bs_id, {}
+            ).items():
+                subscription = self.subscriptions[subscription_id]
+                demand = service_demand.setdefault(
+                    subscription.ai_service_name,
+                    {
+                        "ai_service_data": subscription.ai_service_data,
+                        "prepull": True,
+                        "warm": False,
+                    },
+                )
+                if (
+                    heading_ue_count > 0
+                    and subscription.ai_service_name in popular_ai_services
+                    and base_station.edge_server.get_ai_service_deployment(subscription)
+                    is None
+                ):
+                    demand["warm"] = True
+            base_station.edge_server.warm_pool.step(service_demand)
+
+    def step(self):
+        self.step_count += 1
+
+        dirty_pairs = self.dirty_pairs
+        self.dirty_pairs = set()
+        for subscription_id, bs_id in dirty_pairs:
+            subscription = self.subscriptions.get(subscription_id, None)
+            base_station = self.base_station_list.get(bs_id, None)
+            if subscription is None or base_station is None:
+                continue
+            if subscription.reconcile(base_station):
+                # failed deployments are retried in the next step
+                self.dirty_pairs.add((subscription_id, bs_id))
+
+        self._fire_undeployment_timers()
+        for timer_key, due_step in self.undeployment_timers.items():
+            self._update_countdown(timer_key, due_step)
+
+        self.step_warm_pools()
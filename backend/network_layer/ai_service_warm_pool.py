@@ -0,0 +1,397 @@
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import settings
+from utils import (
+    dist_between,
+    generate_short_hash,
+    get_container_runtime,
+    get_ai_service_container_health,
+    is_ai_service_container_ready,
+    start_ai_service_in_docker,
+    remove_ai_service_in_docker,
+)
+
+logger = logging.getLogger(__name__)
+
+_warm_pool_executor = None
+
+
+def get_warm_pool_executor():
+    # image pulls and container boots take seconds to minutes,
+    # so they run in the background instead of blocking the simulation step.
+    global _warm_pool_executor
+    if _warm_pool_executor is None:
+        _warm_pool_executor = ThreadPoolExecutor(
+            max_workers=settings.AI_SERVICE_WARM_POOL_WORKERS,
+            thread_name_prefix="ai-service-warm-pool",
+        )
+    return _warm_pool_executor
+
+
+def predict_next_base_station(
+    ue,
+    base_station_list,
+    lookahead_seconds=None,
+):
+    """Predict the base station the UE will reach next from its target_x/target_y heading.
+
+    The UE is extrapolated along the straight line towards its target for the lookahead time
+    (but not beyond the target) and the closest base station to that point is returned.
+    The lookahead defaults to settings.AI_SERVICE_WARM_POOL_PREDICTION_LOOKAHEAD_SECONDS.
+
+    Returns:
+        BaseStation: the predicted base station if it differs from the current one, otherwise None.
+    """
+    if ue.target_x is None or ue.target_y is None:
+        return None
+    if lookahead_seconds is None:
+        lookahead_seconds = settings.AI_SERVICE_WARM_POOL_PREDICTION_LOOKAHEAD_SECONDS
+
+    dist_to_target = ue.dist_to_target
+    travel_dist = min(ue.speed_mps * lookahead_seconds, dist_to_target)
+    if dist_to_target > 0:
+        ratio = travel_dist / dist_to_target
+        future_x = ue.position_x + (ue.target_x - ue.position_x) * ratio
+        future_y = ue.position_y + (ue.target_y - ue.position_y) * ratio
+    else:
+        future_x, future_y = ue.position_x, ue.position_y
+
+    predicted_bs = None
+    predicted_bs_dist = None
+    for bs in base_station_list.values():
+        dist = dist_between(future_x, future_y, bs.position_x, bs.position_y)
+        if predicted_bs_dist is None or dist < predicted_bs_dist:
+            predicted_bs = bs
+            predicted_bs_dist = dist
+
+    if predicted_bs is None or predicted_bs is ue.current_bs:
+        return None
+    return predicted_bs
+
+
+def submit_after(future, function, **kwargs):
+    """Submit a function to the warm pool executor once a future is done, without holding a worker meanwhile.
+
+    Returns:
+        Future: The result of the function, cancelling it before the future is done skips the function.
+    """
+    chained = Future()
+
+    def copy_outcome(inner):
+        if inner.exception() is not None:
+            chained.set_exception(inner.exception())
+        else:
+            chained.set_result(inner.result())
+
+    def submit(_):
+        if not chained.set_running_or_notify_cancel():
+            return
+        try:
+            get_warm_pool_executor().submit(function, **kwargs).add_done_callback(
+                copy_outcome
+            )
+        except Exception as e:
+            chained.set_exception(e)
+
+    future.add_done_callback(submit)
+    return chained
+
+
+def _pull_image(image_repository_url):
+    runtime = get_container_runtime()
+    if not runtime.has_image(image_repository_url):
+        runtime.pull_image(image_repository_url)
+
+
+class AIServiceWarmPool:
+    """Pre-pulled images and idle pre-started AI service containers of an edge server.
+
+    The pool is fed by the AI service subscription manager with the demand observed at the edge:
+    images are pre-pulled for every AI service with active subscriptions, and idle containers are
+    pre-started for the popular services that subscribing UEs are predicted to reach.
+    Idle containers reserve memory in the edge resource ledger and are handed over to
+    AI service deployments on demand, skipping the cold start.
+    """
+
+    def __init__(self, edge_server):
+        self.edge_server = edge_server
+        self.pulled_images = set()
+        self.pending_pulls = {}  # image_repository_url -> Future
+        # ai_service_name -> list of warm containers, each container is a dict (see _start_container)
+        self.warm_containers = {}
+
+    @property
+    def edge_id(self):
+        return self.edge_server.edge_id
+
+    @property
+    def cpu_memory_usage_GB(self):
+        return sum(
+            container["cpu_memory_usage_GB"]
+            for containers in self.warm_containers.values()
+            for container in containers
+        )
+
+    @property
+    def device_memory_usage_GB(self):
+        return sum(
+            container["device_memory_usage_GB"]
+            for containers in self.warm_containers.values()
+            for container in containers
+        )
+
+    def is_image_pulled(self, image_repository_url):
+        return image_repository_url in self.pulled_images
+
+    def count_idle_containers(self, ai_service_name):
+        return len(self.warm_containers.get(ai_service_name, []))
+
+    def acquire(self, ai_service_name):
+        """Hand out a ready idle container of the AI service, or None if there is none.
+
+        The returned container is removed from the pool; its memory stays reserved in the edge resource
+        ledger under the container name and is released by whoever removes the container.
+        """
+        containers = self.warm_containers.get(ai_service_name, [])
+        for container in containers:
+            if container["ready"]:
+                containers.remove(container)
+                logger.info(
+                    f"Warm pool {self.edge_id}: handing out idle container {container['container_name']} for {ai_service_name}."
+                )
+                return container
+        return None
+
+    def prepull(self, image_repository_url):
+        if (
+            image_repository_url in self.pulled_images
+            or image_repository_url in self.pending_pulls
+        ):
+            return
+        logger.info(
+            f"Warm pool {self.edge_id}: pre-pulling image {image_repository_url}."
+        )
+        self.pending_pulls[image_repository_url] = get_warm_pool_executor().submit(
+            _pull_image, image_repository_url
+        )
+
+    def _start_container(self, ai_service_name, ai_service_data):
+        error, cpu_memory_usage_GB, device_memory_usage_GB = (
+            self.edge_server.get_ai_service_memory_usage(
+                ai_service_name, ai_service_data
+            )
+        )
+        if error:
+            logger.info(f"Warm pool {self.edge_id}: {error}")
+            return False
+
+        if (
+            cpu_memory_usage_GB > self.edge_server.available_cpu_memory_GB
+            or device_memory_usage_GB > self.edge_server.available_device_memory_GB
+        ):
+            logger.info(
+                f"Warm pool {self.edge_id}: not enough memory to keep {ai_service_name} warm."
+            )
+            return False
+
+        image_repository_url = ai_service_data["image_repository_url"]
+        container_name = f"{self.edge_id}_warm_{generate_short_hash()}_{ai_service_name.replace(' ', '_')}"
+        logger.info(
+            f"Warm pool {self.edge_id}: pre-starting idle container {container_name} for {ai_service_name}."
+        )
+        # the memory is reserved right away so that concurrent deployments cannot overbook the edge
+        self.edge_server.resource_ledger.reserve(
+            container_name, cpu_memory_usage_GB, device_memory_usage_GB
+        )
+        if self.is_image_pulled(image_repository_url):
+            future = get_warm_pool_executor().submit(
+                start_ai_service_in_docker,
+                ai_service_image_url=image_repository_url,
+                container_name=container_name,
+                pull=False,
+            )
+        else:
+            # start once the (pending) pre-pull of the image is done, rather than pulling it twice
+            self.prepull(image_repository_url)
+            future = submit_after(
+                self.pending_pulls[image_repository_url],
+                start_ai_service_in_docker,
+                ai_service_image_url=image_repository_url,
+                container_name=container_name,
+                pull=False,
+            )
+        self.warm_containers.setdefault(ai_service_name, []).append(
+            {
+                "ai_service_name": ai_service_name,
+                "image_repository_url": image_repository_url,
+                "container_name": container_name,
+                "ai_service_endpoint": None,
+                "cpu_memory_usage_GB": cpu_memory_usage_GB,
+                "device_memory_usage_GB": device_memory_usage_GB,
+                "ready": False,
+                "future": future,
+                "idle_steps": 0,
+            }
+        )
+        return True
+
+    def _release_container(self, ai_service_name, container):
+        self.warm_containers[ai_service_name].remove(container)
+        if not self.warm_containers[ai_service_name]:
+            del self.warm_containers[ai_service_name]
+        self.edge_server.resource_ledger.release(container["container_name"])
+        container_name = container["container_name"]
+        future = container["future"]
+        if future.cancel():
+            # the start had not begun, there is no container to remove
+            return
+        if future.done():
+            get_warm_pool_executor().submit(
+                remove_ai_service_in_docker, container_name=container_name
+            )
+        else:
+            # the container is being started: remove it once it exists, a removal running
+            # before the start would leave it running
+            future.add_done_callback(
+                lambda _: get_warm_pool_executor().submit(
+                    remove_ai_service_in_docker, container_name=container_name
+                )
+            )
+
+    def _collect_background_results(self):
+        for image_repository_url, future in list(self.pending_pulls.items()):
+            if not future.done():
+                continue
+            del self.pending_pulls[image_repository_url]
+            if future.cancelled():
+                # not done when a checkpoint was taken, the next prepull retries it
+                continue
+            try:
+                future.result()
+                self.pulled_images.add(image_repository_url)
+                logger.info(
+                    f"Warm pool {self.edge_id}: image {image_repository_url} pre-pulled."
+                )
+            except Exception as e:
+                logger.error(
+                    f"Warm pool {self.edge_id}: failed to pre-pull {image_repository_url}: {e}"
+                )
+
+        for ai_service_name, containers in list(self.warm_containers.items()):
+            for container in list(containers):
+                future = container["future"]
+                if container["ready"] or not future.done():
+                    continue
+                if future.cancelled():
+                    # not started when a checkpoint was taken, the container may not exist
+                    logger.info(
+                        f"Warm pool {self.edge_id}: dropping {container['container_name']}, its start did not complete."
+                    )
+                    self._release_container(ai_service_name, container)
+                    continue
+                try:
+                    error, ai_service_endpoint = future.result()
+                except Exception as e:
+                    error, ai_service_endpoint = str(e), None
+                if error:
+                    logger.error(
+                        f"Warm pool {self.edge_id}: failed to pre-start {ai_service_name}: {error}"
+                    )
+                    self._release_container(ai_service_name, container)
+                    continue
+                container["ai_service_endpoint"] = ai_service_endpoint
+                self.pulled_images.add(container["image_repository_url"])
+
+        # started containers are handed out once they pass their health check
+        started_containers = [
+            (ai_service_name, container)
+            for ai_service_name, containers in self.warm_containers.items()
+            for container in containers
+            if not container["ready"] and container["ai_service_endpoint"] is not None
+        ]
+        if not started_containers:
+            return
+        container_health = get_ai_service_container_health(
+            [container["container_name"] for _, container in started_containers]
+        )
+        for ai_service_name, container in started_containers:
+            health = container_health[container["container_name"]]
+            if is_ai_service_container_ready(health):
+                container["ready"] = True
+            elif health != "starting":
+                logger.error(
+                    f"Warm pool {self.edge_id}: idle container {container['container_name']} is {health}, removing it."
+                )
+                self._release_container(ai_service_name, container)
+
+    def step(self, service_demand):
+        """Reconcile the pool with the AI service demand at this edge server.
+
+        Args:
+            service_demand (dict): ai_service_name -> {
+                "ai_service_data": dict,
+                "prepull": bool,  # the service has active subscriptions around this edge
+                "warm": bool,  # a subscribing UE is predicted to reach this edge and the service is popular
+            }
+        """
+        self._collect_background_results()
+
+        for ai_service_name, demand in service_demand.items():
+            if demand["prepull"] or demand["warm"]:
+                self.prepull(demand["ai_service_data"]["image_repository_url"])
+
+            if not demand["warm"]:
+                continue
+            while (
+                self.count_idle_containers(ai_service_name)
+                < settings.AI_SERVICE_WARM_POOL_SIZE_PER_SERVICE
+            ):
+                if not self._start_container(
+                    ai_service_name, demand["ai_service_data"]
+                ):
+                    break
+
+        # free the memory of idle containers that are no longer expected to be used
+        for ai_service_name, containers in list(self.warm_containers.items()):
+            demand = service_demand.get(ai_service_name, None)
+            for container in list(containers):
+                if demand and demand["warm"]:
+                    container["idle_steps"] = 0
+                    continue
+                container["idle_steps"] += 1
+                if (
+                    container["ready"]
+                    and container["idle_steps"]
+                    >= settings.AI_SERVICE_WARM_POOL_IDLE_TIMEOUT_STEPS
+                ):
+                    logger.info(
+                        f"Warm pool {self.edge_id}: removing idle container {container['container_name']}."
+                    )
+                    self._release_container(ai_service_name, container)
+
+    def clear(self):
+        """Remove all idle containers of the pool, e.g., when the network is reset."""
+        for ai_service_name, containers in list(self.warm_containers.items()):
+            for container in list(containers):
+                self._release_container(ai_service_name, container)
+
+    def to_json(self):
+        return {
+            "pulled_images": sorted(self.pulled_images),
+            "pending_pulls": sorted(self.pending_pulls.keys()),
+            "warm_containers": {
+                ai_service_name: [
+                    {
+                        "container_name": container["container_name"],
+                        "ai_service_endpoint": container["ai_service_endpoint"],
+                        "ready": container["ready"],
+                        "idle_steps": container["idle_steps"],
+                    }
+                    for container in containers
+                ]
+                for ai_service_name, containers in self.warm_containers.items()
+            },
+            "cpu_memory_usage_GB": self.cpu_memory_usage_GB,
+            "device_memory_usage_GB": self.device_memory_usage_GB,
+        }
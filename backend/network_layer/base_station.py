@@ -9,6 +9,9 @@ import base64
 
 logger = logging.getLogger(__name__)
 
+UE_REGISTERED = "UE_REGISTERED"
+UE_DEREGISTERED = "UE_DEREGISTERED"
+
 
 class BaseStation:
     def __init__(self, simulation_engine, bs_init_data):
@@ -39,6 +42,8 @@ class BaseStation:
         self.ric_control_actions = []
 
         self.ai_service_event_handler = None
+        # called with (event_type, ue_imsi, base_station) whenever a UE enters or leaves ue_registry
+        self.ue_registry_event_handlers = []
 
     def __repr__(self):
         return f"BS {self.bs_id}"
@@ -67,6 +72,7 @@ class BaseStation:
         }
         self.ue_registry[ue.ue_imsi] = ue_reg_data
         ue.current_cell.register_ue(ue)
+        self.notify_ue_registry_event(UE_REGISTERED, ue.ue_imsi)
         return ue_reg_data.copy()
 
     def handle_deregistration_request(self, ue):
@@ -75,6 +81,7 @@ class BaseStation:
         ue.current_cell.deregister_ue(ue)
         if ue.ue_imsi in self.ue_registry:
             del self.ue_registry[ue.ue_imsi]
+            self.notify_ue_registry_event(UE_DEREGISTERED, ue.ue_imsi)
 
         # remove rrc measurement events for the UE
         events_to_remove = []
@@ -113,6 +120,14 @@ class BaseStation:
         assert handler is not None, "Handler cannot be None"
         self.ai_service_event_handler = handler
 
+    def add_ue_registry_event_handler(self, handler):
+        assert handler is not None, "Handler cannot be None"
+        self.ue_registry_event_handlers.append(handler)
+
+    def notify_ue_registry_event(self, event_type, ue_imsi):
+        for handler in self.ue_registry_event_handlers:
+            handler(event_type, ue_imsi, self)
+
     def process_ric_control_actions(self):
         # only handover actions are supported for now
 
@@ -180,6 +195,8 @@ class BaseStation:
             ue.execute_handover(target_cell)
             source_cell.deregister_ue(ue)
             del source_bs.ue_registry[ue.ue_imsi]
+            target_bs.notify_ue_registry_event(UE_REGISTERED, ue.ue_imsi)
+            source_bs.notify_ue_registry_event(UE_DEREGISTERED, ue.ue_imsi)
             logger.info(
                 f"gNB {self.bs_id} Handover UE {ue.ue_imsi} from cell {source_cell.cell_id} to BS: {target_bs.bs_id} cell {target_cell.cell_id} (different BS)"
             )
@@ -235,6 +252,9 @@ class BaseStation:
         )
         if not ai_service_subscription:
             return
+        if not self.edge_server.is_ai_service_ready(ai_service_subscription):
+            # the container of the AI service is still starting
+            return
 
         # forward the request to the edge server
         start_time = time.time() * 1000  # convert to milliseconds
@@ -265,7 +285,9 @@ class BaseStation:
                         "request_files_size": request_files_size,
                     },
                     "response": response,
-                    "service_response_time_ms": end_time - start_time,
+                    "service_response_time_ms": response.get(
+                        "request_time_ms", end_time - start_time
+                    ),
                 }
             )
 
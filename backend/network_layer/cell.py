@@ -1,13 +1,33 @@
 import math
 import settings
 from utils import dist_between, estimate_throughput
+from .ue import RRC_CONNECTED
+
+# attributes the UE measurements of a cell depend on, see Cell.__setattr__
+RADIO_CONFIG_ATTRIBUTES = frozenset(
+    [
+        "carrier_frequency_MHz",
+        "bandwidth_Hz",
+        "transmit_power_dBm",
+        "cell_individual_offset_dBm",
+        "frequency_priority",
+        "qrx_level_min",
+        "azimuth_deg",
+    ]
+)
 
 
 class Cell:
+    # the uplink path losses are only a cache of monitor_ue_signal_strength(), see SimulationSnapshot
+    snapshot_excluded_attributes = ("uplink_path_loss_cache",)
+
     def __init__(self, base_station, cell_init_data):
         assert base_station is not None, "Base station cannot be None"
         assert cell_init_data is not None, "Cell init data cannot be None"
         self.base_station = base_station
+        # the simulation engine radio_config_version of the last change of the radio configuration,
+        # the UEs measured before recompute their measurement of the cell
+        self.radio_config_version = 0
 
         self.cell_id = cell_init_data["cell_id"]
         self.frequency_band = cell_init_data["frequency_band"]
@@ -21,10 +41,27 @@ class Cell:
         self.cell_individual_offset_dBm = cell_init_data["cell_individual_offset_dBm"]
         self.frequency_priority = cell_init_data["frequency_priority"]
         self.qrx_level_min = cell_init_data["qrx_level_min"]
+        # main lobe direction of a sector cell (degrees, counter-clockwise from the x axis), None if omnidirectional
+        self.azimuth_deg = cell_init_data.get("azimuth_deg", None)
 
         self.prb_ue_allocation_dict = {}  # { "ue_imsi": {"downlink": 30, "uplink": 5}}
+        # optional slicing of the downlink PRBs, e.g. {"eMBB": 0.6, "URLLC": 0.3, "mMTC": 0.1}:
+        # the UEs of each slice are scheduled within their share of max_dl_prb, None shares all PRBs
+        self.slice_dl_prb_share = None
         self.connected_ue_list = {}
+        # the UEs of connected_ue_list in RRC_CONNECTED, the ones scheduled
+        self.rrc_connected_ue_list = {}
         self.ue_uplink_signal_strength_dict = {}
+        # ue_imsi -> (UE measured position, radio_config_version, path loss, antenna gain)
+        self.uplink_path_loss_cache = {}
+
+    def __setattr__(self, name, value):
+        if name in RADIO_CONFIG_ATTRIBUTES and name in self.__dict__ and self.__dict__[name] != value:
+            # e.g., a transmit power or CIO change by an xApp or a what-if scenario
+            simulation_engine = self.base_station.simulation_engine
+            simulation_engine.radio_config_version += 1
+            self.radio_config_version = simulation_engine.radio_config_version
+        super().__setattr__(name, value)
 
     def __repr__(self):
         return f"Cell({self.cell_id}, base_station={self.base_station.bs_id}, frequency_band={self.frequency_band}, carrier_frequency_MHz={self.carrier_frequency_MHz})"
@@ -77,34 +114,78 @@ class Cell:
     def position_y(self):
         return self.base_station.position_y
 
+    def get_antenna_gain_dB(self, position_x, position_y):
+        """Gain of the sector antenna pattern towards a position, relative to the main lobe."""
+        if self.azimuth_deg is None:
+            return 0
+        angle_deg = math.degrees(
+            math.atan2(position_y - self.position_y, position_x - self.position_x)
+        )
+        off_axis_deg = (angle_deg - self.azimuth_deg + 180) % 360 - 180
+        return -min(
+            12 * (off_axis_deg / settings.RAN_SECTOR_BEAMWIDTH_DEG) ** 2,
+            settings.RAN_SECTOR_MAX_ATTENUATION_dB,
+        )
+
     def register_ue(self, ue):
         self.connected_ue_list[ue.ue_imsi] = ue
         self.prb_ue_allocation_dict[ue.ue_imsi] = {
             "downlink": 0,
             "uplink": 0,
         }
+        self.update_ue_rrc_state(ue)
+
+    def update_ue_rrc_state(self, ue):
+        if ue.rrc_state == RRC_CONNECTED:
+            self.rrc_connected_ue_list[ue.ue_imsi] = ue
+            return
+        self.rrc_connected_ue_list.pop(ue.ue_imsi, None)
+        self.ue_uplink_signal_strength_dict.pop(ue.ue_imsi, None)
+        if ue.ue_imsi in self.prb_ue_allocation_dict:
+            self.prb_ue_allocation_dict[ue.ue_imsi] = {"downlink": 0, "uplink": 0}
 
     def monitor_ue_signal_strength(self):
         self.ue_uplink_signal_strength_dict = {}
+        uplink_path_loss_cache = {}
         pass_loss_model = settings.CHANNEL_PASS_LOSS_MODEL_MAP[
             settings.CHANNEL_PASS_LOSS_MODEL_URBAN_MACRO_NLOS
         ]
         # monitor the ue uplink signal strength
-        for ue in self.connected_ue_list.values():
-            # calculate the received power based on distance and transmit power
-            distance = dist_between(
-                self.position_x,
-                self.position_y,
-                ue.position_x,
-                ue.position_y,
-            )
-            received_power = ue.uplink_transmit_power_dBm - pass_loss_model(
-                distance_m=distance, frequency_ghz=self.carrier_frequency_MHz / 1000
+        for ue in self.rrc_connected_ue_list.values():
+            ue.update_measured_position()
+            cached = self.uplink_path_loss_cache.get(ue.ue_imsi, None)
+            if (
+                cached is not None
+                and cached[0] == ue.measured_position
+                and cached[1] == self.radio_config_version
+            ):
+                # the UE did not move and the cell did not change
+                path_loss_dB, antenna_gain_dB = cached[2], cached[3]
+            else:
+                # calculate the received power based on distance and transmit power
+                position_x, position_y = ue.measured_position
+                distance = dist_between(
+                    self.position_x,
+                    self.position_y,
+                    position_x,
+                    position_y,
+                )
+                path_loss_dB = pass_loss_model(
+                    distance_m=distance, frequency_ghz=self.carrier_frequency_MHz / 1000
+                )
+                antenna_gain_dB = self.get_antenna_gain_dB(position_x, position_y)
+            uplink_path_loss_cache[ue.ue_imsi] = (
+                ue.measured_position,
+                self.radio_config_version,
+                path_loss_dB,
+                antenna_gain_dB,
             )
+            received_power = ue.uplink_transmit_power_dBm - path_loss_dB + antenna_gain_dB
             self.ue_uplink_signal_strength_dict[ue.ue_imsi] = received_power
+        self.uplink_path_loss_cache = uplink_path_loss_cache
 
     def select_ue_mcs(self):
-        for ue in self.connected_ue_list.values():
+        for ue in self.rrc_connected_ue_list.values():
             ue.set_downlink_mcs_index(-1)
             ue.set_downlink_mcs_data(None)
             ue_cqi_mcs_data = settings.UE_CQI_MCS_SPECTRAL_EFFICIENCY_TABLE.get(
@@ -149,7 +230,7 @@ class Cell:
         # QoS-aware Proportional Fair Scheduling (PFS)
 
         # reset PRB allocation for all UEs
-        for ue in self.connected_ue_list.values():
+        for ue in self.rrc_connected_ue_list.values():
             self.prb_ue_allocation_dict[ue.ue_imsi]["downlink"] = 0
             self.prb_ue_allocation_dict[ue.ue_imsi]["uplink"] = 0
 
@@ -157,7 +238,7 @@ class Cell:
         ue_prb_requirements = {}
 
         # Step 1: Calculate required PRBs for GBR
-        for ue in self.connected_ue_list.values():
+        for ue in self.rrc_connected_ue_list.values():
             dl_gbr = ue.qos_profile["GBR_DL"]
             dl_mcs = ue.downlink_mcs_data  # Assume this attribute exists
             if dl_mcs is None:
@@ -174,12 +255,38 @@ class Cell:
                 "dl_throughput_per_prb": dl_throughput_per_prb,
             }
 
+        if self.slice_dl_prb_share is None:
+            self.allocate_dl_prb(
+                list(self.rrc_connected_ue_list.values()),
+                ue_prb_requirements,
+                self.max_dl_prb,
+            )
+            return
+
+        for slice_type, share in self.slice_dl_prb_share.items():
+            self.allocate_dl_prb(
+                [
+                    ue
+                    for ue in self.rrc_connected_ue_list.values()
+                    if ue.slice_type == slice_type
+                ],
+                ue_prb_requirements,
+                int(share * self.max_dl_prb),
+            )
+
+    def allocate_dl_prb(self, ue_list, ue_prb_requirements, max_dl_prb):
+        ue_prb_requirements = {
+            ue.ue_imsi: ue_prb_requirements[ue.ue_imsi]
+            for ue in ue_list
+            if ue.ue_imsi in ue_prb_requirements
+        }
+
         # Step 2: Allocate PRBs to meet GBR
         dl_total_prb_demand = sum(
             req["dl_required_prbs"] for req in ue_prb_requirements.values()
         )
 
-        if dl_total_prb_demand <= self.max_dl_prb:
+        if dl_total_prb_demand <= max_dl_prb:
             # allocate PRBs based on the required PRBs
             for ue_imsi, req in ue_prb_requirements.items():
                 self.prb_ue_allocation_dict[ue_imsi]["downlink"] = req[
@@ -188,8 +295,8 @@ class Cell:
         else:
             # allocate PRBs based on the proportion
             # first allocate at least one PRB to each UE to ensure minimum service
-            dl_remaining_prbs = self.max_dl_prb
-            for ue in self.connected_ue_list.values():
+            dl_remaining_prbs = max_dl_prb
+            for ue in ue_list:
                 prb = min(1, dl_remaining_prbs)
                 self.prb_ue_allocation_dict[ue.ue_imsi]["downlink"] = prb
                 dl_remaining_prbs -= prb
@@ -208,7 +315,7 @@ class Cell:
         #     )
 
     def estimate_ue_bitrate_and_latency(self):
-        for ue in self.connected_ue_list.values():
+        for ue in self.rrc_connected_ue_list.values():
             if ue.downlink_mcs_data is None:
                 print(
                     f"Cell {self.cell_id}: UE {ue.ue_imsi} has no downlink MCS data. Skipping."
@@ -231,6 +338,7 @@ class Cell:
         else:
             print(f"Cell {self.cell_id}: No resources to release for UE {ue.ue_imsi}")
 
+        self.rrc_connected_ue_list.pop(ue.ue_imsi, None)
         if ue.ue_imsi in self.connected_ue_list:
             del self.connected_ue_list[ue.ue_imsi]
             print(f"Cell {self.cell_id}: Deregistered UE {ue.ue_imsi}")
@@ -245,6 +353,7 @@ class Cell:
             "bandwidth_Hz": self.bandwidth_Hz,
             "max_prb": self.max_prb,
             "cell_radius": self.cell_radius,
+            "azimuth_deg": self.azimuth_deg,
             "vis_cell_radius": self.cell_radius
             * settings.REAL_LIFE_DISTANCE_MULTIPLIER,
             "position_x": self.position_x,
@@ -252,6 +361,7 @@ class Cell:
             "vis_position_x": self.position_x * settings.REAL_LIFE_DISTANCE_MULTIPLIER,
             "vis_position_y": self.position_y * settings.REAL_LIFE_DISTANCE_MULTIPLIER,
             "prb_ue_allocation_dict": self.prb_ue_allocation_dict,
+            "slice_dl_prb_share": self.slice_dl_prb_share,
             "max_dl_prb": self.max_dl_prb,
             "max_ul_prb": self.max_ul_prb,
             "allocated_dl_prb": self.allocated_dl_prb,
@@ -260,4 +370,5 @@ class Cell:
             "current_ul_load": self.allocated_ul_prb / self.max_ul_prb,
             "current_load": self.current_load,
             "connected_ue_list": list(self.connected_ue_list.keys()),
+            "rrc_connected_ue_count": len(self.rrc_connected_ue_list),
         }
@@ -0,0 +1,355 @@
+import asyncio
+import io
+import json
+import logging
+import os
+import pickle
+import random
+import struct
+import time
+import zlib
+from concurrent.futures import Future
+
+import numpy as np
+
+import settings
+import utils
+from .edge_resource_ledger import EdgeResourceLedger
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_MAGIC = b"AIRANCKP"
+# bumped whenever the pickled network state changes (attributes added, removed or renamed), checkpoints
+# of other versions are rejected instead of being restored into objects missing attributes
+CHECKPOINT_FORMAT_VERSION = 6
+# magic, format version, flags, header length, payload length
+_CHECKPOINT_PREAMBLE = struct.Struct("<8sHHIQ")
+_FLAG_ZLIB = 1
+
+# attributes of the simulation engine that are bound to the running process, not to the network state
+CHECKPOINT_EXCLUDED_ATTRIBUTES = {
+    "websocket",
+    "snapshot",
+    "trace_writer",
+    "trace_replay",
+    "trace_replay_task",
+    "sim_started",
+    "checkpoint_holds",
+    "node_resource_ledgers",
+}
+
+_PID_ENGINE = "simulation_engine"
+_PID_WEBSOCKET = "websocket"
+_PID_FUTURE = "future"
+_PID_NODE_LEDGER = "node_resource_ledger"
+
+
+class CheckpointError(Exception):
+    pass
+
+
+class _CheckpointPickler(pickle.Pickler):
+    """Pickles the network state, replacing references to process bound objects by persistent IDs.
+
+    - the simulation engine itself: restored as the engine the checkpoint is loaded into.
+    - the websocket: restored as the websocket of the loading engine.
+    - background futures (e.g., warm pool image pulls and container starts): saved with their outcome when
+      they are done, never waited for. Unfinished ones are restored as cancelled futures: the warm pool
+      retries the pull or drops the container.
+    - the ledgers of the shared edge nodes (possibly shared with other sessions): saved with the
+      reservations of the engine only, restored into the ledgers of the loading engine.
+    """
+
+    def __init__(self, file, simulation_engine):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.simulation_engine = simulation_engine
+        self.node_resource_reservations = (
+            simulation_engine.get_node_resource_reservations()
+        )
+
+    def persistent_id(self, obj):
+        if obj is self.simulation_engine:
+            return (_PID_ENGINE,)
+        if obj is not None and obj is self.simulation_engine.websocket:
+            return (_PID_WEBSOCKET,)
+        if isinstance(obj, Future):
+            # pulls and container starts take minutes, a checkpoint does not wait for them
+            if not obj.done() or obj.cancelled():
+                return (_PID_FUTURE, None, None, None)
+            try:
+                return (_PID_FUTURE, True, obj.result(), None)
+            except Exception as e:
+                return (_PID_FUTURE, False, None, e)
+        if (
+            isinstance(obj, EdgeResourceLedger)
+            and self.simulation_engine.node_resource_ledgers.get(obj.ledger_id, None) is obj
+        ):
+            return (
+                _PID_NODE_LEDGER,
+                obj.ledger_id,
+                obj.cpu_memory_GB,
+                obj.device_memory_GB,
+                self.node_resource_reservations.get(obj.ledger_id, {}),
+            )
+        return None
+
+
+class _CheckpointUnpickler(pickle.Unpickler):
+    def __init__(self, file, simulation_engine):
+        super().__init__(file)
+        self.simulation_engine = simulation_engine
+        # node_id -> reservations of the checkpoint, reserved once the whole checkpoint is loaded
+        self.node_resource_reservations = {}
+
+    def persistent_load(self, pid):
+        if pid[0] == _PID_ENGINE:
+            return self.simulation_engine
+        if pid[0] == _PID_WEBSOCKET:
+            return self.simulation_engine.websocket
+        if pid[0] == _PID_FUTURE:
+            _, succeeded, result, exception = pid
+            future = Future()
+            if succeeded is None:
+                future.cancel()
+            elif succeeded:
+                future.set_result(result)
+            else:
+                future.set_exception(exception)
+            return future
+        if pid[0] == _PID_NODE_LEDGER:
+            _, node_id, cpu_memory_GB, device_memory_GB, reservations = pid
+            self.node_resource_reservations[node_id] = reservations
+            return self.simulation_engine.get_node_resource_ledger(
+                node_id, cpu_memory_GB, device_memory_GB
+            )
+        raise pickle.UnpicklingError(f"Unknown persistent ID {pid} in checkpoint.")
+
+
+def _get_engine_state(simulation_engine):
+    return {
+        name: value
+        for name, value in simulation_engine.__dict__.items()
+        if name not in CHECKPOINT_EXCLUDED_ATTRIBUTES
+    }
+
+
+def dumps(simulation_engine, compress=True):
+    """
+    Serialize the network state of a simulation engine into a checkpoint.
+
+    The checkpoint holds every network object reachable from the engine (base stations, cells with
+    their PRB allocations, UEs with their RRC measurement monitors, core network subscriptions,
+    RIC and xApps, edge servers with their AI service deployments and warm pools), the KPI history
+    and the state of the random number generators, so a restored engine continues exactly as the
+    saved one would have. AI service containers are not part of the checkpoint, deployments refer
+    to the containers that were running when it was saved.
+
+    Args:
+        simulation_engine (SimulationEngine): The engine to save, between two steps.
+        compress (bool): zlib compress the payload (the KPI history compresses well).
+
+    Returns:
+        bytes: The checkpoint.
+    """
+    payload_file = io.BytesIO()
+    _CheckpointPickler(payload_file, simulation_engine).dump(
+        {
+            "engine": _get_engine_state(simulation_engine),
+            "random_state": random.getstate(),
+            "numpy_random_state": np.random.get_state(),
+        }
+    )
+    payload = payload_file.getvalue()
+    flags = 0
+    if compress:
+        payload = zlib.compress(payload, settings.SIM_CHECKPOINT_COMPRESSION_LEVEL)
+        flags |= _FLAG_ZLIB
+
+    header = json.dumps(
+        {
+            "created_at": time.time(),
+            "sim_step": simulation_engine.sim_step,
+            "sim_time": simulation_engine.sim_time,
+            "base_station_count": len(simulation_engine.base_station_list),
+            "cell_count": len(simulation_engine.cell_list),
+            "ue_count": len(simulation_engine.ue_list),
+        }
+    ).encode("utf-8")
+    return (
+        _CHECKPOINT_PREAMBLE.pack(
+            CHECKPOINT_MAGIC,
+            CHECKPOINT_FORMAT_VERSION,
+            flags,
+            len(header),
+            len(payload),
+        )
+        + header
+        + payload
+    )
+
+
+async def dumps_in_background(simulation_engine, compress=True):
+    """
+    dumps() in a worker thread, the event loop and the other simulations of the process keep running.
+
+    The SimulationScheduler does not step the engine until the checkpoint is taken, so it is
+    still taken at a step boundary.
+    """
+    simulation_engine.checkpoint_holds += 1
+    try:
+        return await asyncio.to_thread(dumps, simulation_engine, compress)
+    finally:
+        simulation_engine.checkpoint_holds -= 1
+
+
+def _read_preamble(data):
+    if len(data) < _CHECKPOINT_PREAMBLE.size:
+        raise CheckpointError("Not a simulation checkpoint: the data is too short.")
+    magic, version, flags, header_length, payload_length = _CHECKPOINT_PREAMBLE.unpack_from(
+        data
+    )
+    if magic != CHECKPOINT_MAGIC:
+        raise CheckpointError("Not a simulation checkpoint.")
+    if version != CHECKPOINT_FORMAT_VERSION:
+        raise CheckpointError(
+            f"Unsupported checkpoint version {version}, expected {CHECKPOINT_FORMAT_VERSION}."
+        )
+    if len(data) != _CHECKPOINT_PREAMBLE.size + header_length + payload_length:
+        raise CheckpointError("The checkpoint is truncated.")
+    return flags, header_length
+
+
+def read_header(data):
+    """The summary of a checkpoint (step, time, element counts) without restoring it."""
+    flags, header_length = _read_preamble(data)
+    start = _CHECKPOINT_PREAMBLE.size
+    return json.loads(bytes(data[start : start + header_length]))
+
+
+def loads(simulation_engine, data):
+    """
+    Restore a checkpoint into a simulation engine, replacing its network state.
+
+    The engine keeps its websocket, whether it is running and its trace recording/replay.
+    Snapshots and cached knowledge are invalidated.
+
+    Returns:
+        dict: The checkpoint header.
+    """
+    flags, header_length = _read_preamble(data)
+    payload_start = _CHECKPOINT_PREAMBLE.size + header_length
+    payload = memoryview(data)[payload_start:]
+    if flags & _FLAG_ZLIB:
+        payload = zlib.decompress(payload)
+    unpickler = _CheckpointUnpickler(io.BytesIO(payload), simulation_engine)
+    state = unpickler.load()
+
+    engine_state = state["engine"]
+    simulation_engine.expire_snapshot()
+    # the node ledgers outlive the replaced network state, move its reservations to the restored one
+    for node_id, reservations in simulation_engine.get_node_resource_reservations().items():
+        for container_name in reservations:
+            simulation_engine.node_resource_ledgers[node_id].release(container_name)
+    for node_id, reservations in unpickler.node_resource_reservations.items():
+        ledger = simulation_engine.node_resource_ledgers[node_id]
+        for container_name, (cpu_memory_GB, device_memory_GB) in reservations.items():
+            # e.g., a fork loaded next to the engine it was taken from refers to the same containers
+            if container_name not in ledger.reservations:
+                ledger.reserve(container_name, cpu_memory_GB, device_memory_GB)
+    # the state version only moves forward, so readers never mistake the restored state for a cached one
+    engine_state["state_version"] = (
+        max(simulation_engine.state_version, engine_state.get("state_version", 0)) + 1
+    )
+    for name in list(simulation_engine.__dict__.keys()):
+        if name not in CHECKPOINT_EXCLUDED_ATTRIBUTES and name not in engine_state:
+            delattr(simulation_engine, name)
+    simulation_engine.__dict__.update(engine_state)
+    random.setstate(state["random_state"])
+    np.random.set_state(state["numpy_random_state"])
+    return read_header(data)
+
+
+def get_checkpoint_path(name):
+    """
+    Path of a checkpoint of settings.SIM_CHECKPOINT_DIRECTORY, for names sent by clients (e.g., the frontend).
+
+    Only bare file names are accepted: checkpoints are unpickled when loaded, so clients must not be able
+    to load (or overwrite) any other file.
+
+    Args:
+        name (str): The checkpoint file name, e.g. "warm_network.ckpt".
+
+    Raises:
+        CheckpointError: If the name is missing or not a bare file name.
+    """
+    if not isinstance(name, str) or not name:
+        raise CheckpointError("A checkpoint name is required.")
+    if (
+        "/" in name
+        or "\\" in name
+        or ".." in name
+        or "\0" in name
+        or name.startswith(".")
+    ):
+        raise CheckpointError(
+            f"Invalid checkpoint name '{name}', expected a file name without a directory."
+        )
+    return os.path.join(settings.SIM_CHECKPOINT_DIRECTORY, name)
+
+
+def _get_default_checkpoint_path(simulation_engine):
+    return os.path.join(
+        settings.SIM_CHECKPOINT_DIRECTORY,
+        f"checkpoint_{time.strftime('%Y%m%d-%H%M%S')}_step_{simulation_engine.sim_step}.ckpt",
+    )
+
+
+def _write_checkpoint(path, data):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # write then rename, an interrupted save never leaves a truncated checkpoint behind
+    with open(path + ".tmp", "wb") as file:
+        file.write(data)
+    os.replace(path + ".tmp", path)
+
+
+def save_checkpoint(simulation_engine, path=None, compress=True):
+    """
+    Save a checkpoint of the simulation engine to a file.
+
+    Args:
+        path (str, optional): The checkpoint file, by default a timestamped file in settings.SIM_CHECKPOINT_DIRECTORY.
+
+    Returns:
+        str: The path of the checkpoint file.
+    """
+    if path is None:
+        path = _get_default_checkpoint_path(simulation_engine)
+    data = dumps(simulation_engine, compress=compress)
+    _write_checkpoint(path, data)
+    logger.info(
+        f"Checkpoint of step {simulation_engine.sim_step} saved to {path} ({utils.bytes_pretty_printer(len(data))})"
+    )
+    return path
+
+
+async def save_checkpoint_in_background(simulation_engine, path=None, compress=True):
+    """save_checkpoint() without blocking the event loop, see dumps_in_background()."""
+    if path is None:
+        path = _get_default_checkpoint_path(simulation_engine)
+    data = await dumps_in_background(simulation_engine, compress=compress)
+    await asyncio.to_thread(_write_checkpoint, path, data)
+    logger.info(
+        f"Checkpoint of step {read_header(data)['sim_step']} saved to {path} ({utils.bytes_pretty_printer(len(data))})"
+    )
+    return path
+
+
+def load_checkpoint(simulation_engine, path):
+    """Restore a checkpoint file into the simulation engine, see loads()."""
+    with open(path, "rb") as file:
+        data = file.read()
+    header = loads(simulation_engine, data)
+    logger.info(f"Checkpoint {path} of step {header['sim_step']} restored.")
+    return header
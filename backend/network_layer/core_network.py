@@ -1,5 +1,4 @@
 import settings
-import random
 from .ue import UE
 
 class CoreNetwork:
@@ -27,7 +26,9 @@ class CoreNetwork:
         if requested_slice and requested_slice in subscribed_slice_types:
             slice_type = requested_slice
         else:
-            slice_type = random.choice(subscribed_slice_types)
+            slice_type = self.simulation_engine.rng.choice(
+                "slicing", subscribed_slice_types
+            )
         qos_profile = settings.NETWORK_SLICES[slice_type].copy()
         return slice_type, qos_profile
 
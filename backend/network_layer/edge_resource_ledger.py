@@ -0,0 +1,64 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EdgeResourceLedger:
+    """Running account of the memory reserved on an edge node.
+
+    Every AI service container (deployed or kept warm) reserves its memory under its container name
+    when it is started and releases it when it is removed, so capacity queries are O(1)
+    instead of summing up all deployments.
+
+    Depending on settings.RAN_EDGE_RESOURCE_ACCOUNTING_MODE, a ledger is either shared by all edge
+    servers running on the same node ("shared_node") or owned by a single edge server ("per_edge").
+    """
+
+    def __init__(self, ledger_id, cpu_memory_GB, device_memory_GB):
+        self.ledger_id = ledger_id
+        self.cpu_memory_GB = cpu_memory_GB
+        self.device_memory_GB = device_memory_GB
+        self.used_cpu_memory_GB = 0.0
+        self.used_device_memory_GB = 0.0
+        # container_name -> (cpu_memory_GB, device_memory_GB)
+        self.reservations = {}
+
+    @property
+    def available_cpu_memory_GB(self):
+        return self.cpu_memory_GB - self.used_cpu_memory_GB
+
+    @property
+    def available_device_memory_GB(self):
+        return self.device_memory_GB - self.used_device_memory_GB
+
+    def reserve(self, container_name, cpu_memory_GB, device_memory_GB):
+        if container_name in self.reservations:
+            logger.warning(
+                f"Edge resource ledger {self.ledger_id}: {container_name} has already reserved memory."
+            )
+            return
+        self.reservations[container_name] = (cpu_memory_GB, device_memory_GB)
+        self.used_cpu_memory_GB += cpu_memory_GB
+        self.used_device_memory_GB += device_memory_GB
+
+    def release(self, container_name):
+        reservation = self.reservations.pop(container_name, None)
+        if reservation is None:
+            return
+        if not self.reservations:
+            # avoid carrying floating point residue once nothing is reserved
+            self.used_cpu_memory_GB = 0.0
+            self.used_device_memory_GB = 0.0
+            return
+        self.used_cpu_memory_GB -= reservation[0]
+        self.used_device_memory_GB -= reservation[1]
+
+    def to_json(self):
+        return {
+            "ledger_id": self.ledger_id,
+            "cpu_memory_GB": self.cpu_memory_GB,
+            "device_memory_GB": self.device_memory_GB,
+            "used_cpu_memory_GB": self.used_cpu_memory_GB,
+            "used_device_memory_GB": self.used_device_memory_GB,
+            "reservations": len(self.reservations),
+        }
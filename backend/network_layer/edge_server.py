@@ -3,8 +3,12 @@ from utils import (
     parse_memory_usage_string,
     start_ai_service_in_docker,
     remove_ai_service_in_docker,
+    get_ai_service_container_health,
+    is_ai_service_container_ready,
 )
+import settings
 from settings import AI_SERVICE_UNDEPLOYMENT_COUNT_DOWN_STEPS
+from .ai_service_warm_pool import AIServiceWarmPool
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,7 +23,21 @@ class EdgeServer:
         self.cpu_memory_GB = edge_server_init_data.get("cpu_memory_GB", 10.0)
         self.device_memory_GB = edge_server_init_data.get("device_memory_GB", 0.0)
 
+        # per node (shared by the sessions of the process) or per edge server,
+        # see settings.RAN_EDGE_RESOURCE_ACCOUNTING_MODE
+        self.resource_ledger = (
+            base_station.simulation_engine.get_edge_resource_ledger(self)
+        )
+        # ai_service_name -> (cpu_memory_usage_GB, device_memory_usage_GB) parsed from the profile of this node
+        self.ai_service_memory_usage = {}
+
         self.ai_service_deployments = {}
+        # (ai_service_name, ue_imsi) -> {subscription_id: deployment} for local breakout routing
+        self.ue_subscription_index = {}
+        # read when the edge server is built, so that sweeps and forks can turn the warm pool on
+        self.warm_pool = (
+            AIServiceWarmPool(self) if settings.AI_SERVICE_WARM_POOL_ENABLED else None
+        )
 
     def to_json(self):
         return {
@@ -46,58 +64,63 @@ class EdgeServer:
                         "edge_specific_device_memory_usage_GB"
                     ],
                     "countdown_steps": deployment["countdown_steps"],
+                    "ready": deployment["ready"],
                     "ue_id_list": deployment["ai_service_subscription"].ue_id_list,
                 }
                 for sub_id, deployment in self.ai_service_deployments.items()
             },
             "available_cpu_memory_GB": self.available_cpu_memory_GB,
             "available_device_memory_GB": self.available_device_memory_GB,
+            "resource_ledger": self.resource_ledger.to_json(),
+            "warm_pool": self.warm_pool.to_json() if self.warm_pool else None,
         }
 
     @property
     def available_cpu_memory_GB(self):
-        cpu_memory_used_GB = 0
-        # below code is used when you have real multiple edge servers
-        # for deployed_ai_service in self.ai_service_deployments.values():
-        #     cpu_memory_used_GB += deployed_ai_service.get(
-        #         "edge_specific_cpu_memory_usage_GB", 0.0
-        #     )
-
-        # below code is used when you have a single edge server that's shared by all base stations
-        for (
-            base_station
-        ) in self.base_station.simulation_engine.base_station_list.values():
-            if base_station.edge_server is not None:
-                for (
-                    deployed_ai_service
-                ) in base_station.edge_server.ai_service_deployments.values():
-                    cpu_memory_used_GB += deployed_ai_service.get(
-                        "edge_specific_cpu_memory_usage_GB", 0.0
-                    )
-        return self.cpu_memory_GB - cpu_memory_used_GB
+        return self.resource_ledger.available_cpu_memory_GB
 
     @property
     def available_device_memory_GB(self):
-        device_memory_used_GB = 0
-        # below code is used when you have real multiple edge servers
-        # for deployed_ai_service in self.ai_service_deployments.values():
-        #     device_memory_used_GB += deployed_ai_service.get(
-        #         "edge_specific_device_memory_usage_GB", 0.0
-        #     )
-
-        # below code is used when you have a single edge server that's shared by all base stations
-        for (
-            base_station
-        ) in self.base_station.simulation_engine.base_station_list.values():
-            if base_station.edge_server is not None:
-                for (
-                    deployed_ai_service
-                ) in base_station.edge_server.ai_service_deployments.values():
-                    device_memory_used_GB += deployed_ai_service.get(
-                        "edge_specific_device_memory_usage_GB", 0.0
-                    )
-
-        return self.device_memory_GB - device_memory_used_GB
+        return self.resource_ledger.available_device_memory_GB
+
+    def get_ai_service_memory_usage(self, ai_service_name, ai_service_data):
+        """
+        Get the idle container memory usage of the AI service profiled on this edge server's node.
+
+        Args:
+            ai_service_name (str): The name of the AI service.
+            ai_service_data (dict): The AI service data, including the per node "profiles".
+
+        Returns:
+            error (str): Error message if the AI service has not been profiled on this node, otherwise None.
+            cpu_memory_usage_GB (float): The CPU memory used by an idle container.
+            device_memory_usage_GB (float): The device memory used by an idle container.
+        """
+        if ai_service_name in self.ai_service_memory_usage:
+            return None, *self.ai_service_memory_usage[ai_service_name]
+
+        edge_specific_profile = None
+        for profile in ai_service_data["profiles"]:
+            if profile["node_id"] == self.node_id:
+                edge_specific_profile = profile
+                break
+
+        if edge_specific_profile is None:
+            # the AI service has not been tested on this edge server yet
+            return (
+                f"This {ai_service_name} AI service is not compatible with the edge server {self.edge_id}.",
+                None,
+                None,
+            )
+        self.ai_service_memory_usage[ai_service_name] = (
+            parse_memory_usage_string(
+                edge_specific_profile.get("idle_container_cpu_memory_usage")
+            ),
+            parse_memory_usage_string(
+                edge_specific_profile.get("idle_container_device_memory_usage")
+            ),
+        )
+        return None, *self.ai_service_memory_usage[ai_service_name]
 
     def format_container_name(self, ai_service_subscription):
         """
@@ -127,29 +150,38 @@ class EdgeServer:
                 self.ai_service_deployments[ai_service_subscription.subscription_id],
             )
 
-        subscription_id = ai_service_subscription.subscription_id
         ai_service_name = ai_service_subscription.ai_service_name
 
         # check if the edge server has enough resources to deploy the AI serivce
-        edge_specific_profile = None
-        for profile in ai_service_subscription.ai_service_data["profiles"]:
-            if profile["node_id"] == self.node_id:
-                edge_specific_profile = profile
-                break
-
-        if edge_specific_profile is None:
-            # the AI service has not been tested on this edge server yet
-            return (
-                f"This {ai_service_name} AI service is not compatible with the edge server {self.edge_id}.",
-                None,
+        error, edge_specific_cpu_memory_usage_GB, edge_specific_device_memory_usage_GB = (
+            self.get_ai_service_memory_usage(
+                ai_service_name, ai_service_subscription.ai_service_data
             )
-        edge_specific_cpu_memory_usage_GB = parse_memory_usage_string(
-            edge_specific_profile.get("idle_container_cpu_memory_usage")
         )
+        if error:
+            return error, None
 
-        edge_specific_device_memory_usage_GB = parse_memory_usage_string(
-            edge_specific_profile.get("idle_container_device_memory_usage")
+        # deploy the AI service and return the deployment data
+        ai_service_data = ai_service_subscription.ai_service_data
+        # AI service docker image repository url
+        # e.g., docker.io/cranfield6g/cranfield-edge-trpakov-vit-face-expression
+        image_repository_url = ai_service_data["image_repository_url"]
+
+        # hand over an idle pre-started container if the warm pool has one,
+        # its memory is already reserved under the container name so no resource check is needed
+        warm_container = (
+            self.warm_pool.acquire(ai_service_name) if self.warm_pool else None
         )
+        if warm_container is not None:
+            return None, self._add_ai_service_deployment(
+                ai_service_subscription,
+                ai_service_endpoint=warm_container["ai_service_endpoint"],
+                container_name=warm_container["container_name"],
+                edge_specific_cpu_memory_usage_GB=edge_specific_cpu_memory_usage_GB,
+                edge_specific_device_memory_usage_GB=edge_specific_device_memory_usage_GB,
+                # warm containers are only handed out once they passed their health check
+                ready=True,
+            )
 
         available_cpu_memory_GB = self.available_cpu_memory_GB
         available_device_memory_GB = self.available_device_memory_GB
@@ -167,16 +199,13 @@ class EdgeServer:
                 None,
             )
 
-        # deploy the AI service and return the deployment data
-        ai_service_data = ai_service_subscription.ai_service_data
-        # AI service docker image repository url
-        # e.g., docker.io/cranfield6g/cranfield-edge-trpakov-vit-face-expression
-        image_repository_url = ai_service_data["image_repository_url"]
-
         container_name = self.format_container_name(ai_service_subscription)
         error, ai_service_endpoint = start_ai_service_in_docker(
             ai_service_image_url=image_repository_url,
             container_name=container_name,
+            pull=not (
+                self.warm_pool and self.warm_pool.is_image_pulled(image_repository_url)
+            ),
         )
 
         if error:
@@ -185,24 +214,59 @@ class EdgeServer:
                 None,
             )
 
-        self.ai_service_deployments[subscription_id] = {
+        self.resource_ledger.reserve(
+            container_name,
+            edge_specific_cpu_memory_usage_GB,
+            edge_specific_device_memory_usage_GB,
+        )
+        return None, self._add_ai_service_deployment(
+            ai_service_subscription,
+            ai_service_endpoint=ai_service_endpoint,
+            container_name=container_name,
+            edge_specific_cpu_memory_usage_GB=edge_specific_cpu_memory_usage_GB,
+            edge_specific_device_memory_usage_GB=edge_specific_device_memory_usage_GB,
+            ready=is_ai_service_container_ready(
+                get_ai_service_container_health([container_name])[container_name]
+            ),
+        )
+
+    def _add_ai_service_deployment(
+        self,
+        ai_service_subscription,
+        ai_service_endpoint,
+        container_name,
+        edge_specific_cpu_memory_usage_GB,
+        edge_specific_device_memory_usage_GB,
+        ready,
+    ):
+        ai_service_data = ai_service_subscription.ai_service_data
+        ai_service_deployment = {
             "ai_service_subscription": ai_service_subscription,
             "base_station_id": self.base_station.bs_id,
             "edge_id": self.edge_id,
             "node_id": self.node_id,
             "ai_service_endpoint": ai_service_endpoint,
             "ai_service_data": ai_service_data,
-            "image_repository_url": image_repository_url,
-            "container_name": self.format_container_name(ai_service_subscription),
+            "image_repository_url": ai_service_data["image_repository_url"],
+            "container_name": container_name,
             "edge_specific_cpu_memory_usage_GB": edge_specific_cpu_memory_usage_GB,
             "edge_specific_device_memory_usage_GB": edge_specific_device_memory_usage_GB,
             "countdown_steps": AI_SERVICE_UNDEPLOYMENT_COUNT_DOWN_STEPS,
+            # the container passed its health check, requests are only forwarded to ready deployments
+            "ready": ready,
         }
+        self.ai_service_deployments[ai_service_subscription.subscription_id] = (
+            ai_service_deployment
+        )
+        for ue_imsi in ai_service_subscription.ue_id_list:
+            self.ue_subscription_index.setdefault(
+                (ai_service_subscription.ai_service_name, ue_imsi), {}
+            )[ai_service_subscription.subscription_id] = ai_service_deployment
 
         logger.info(
-            f"Deployed AI service {ai_service_name} on edge server {self.edge_id} with endpoint {ai_service_endpoint}."
+            f"Deployed AI service {ai_service_subscription.ai_service_name} on edge server {self.edge_id} with endpoint {ai_service_endpoint}."
         )
-        return None, self.ai_service_deployments[subscription_id]
+        return ai_service_deployment
 
     def undeploy_ai_service(self, ai_service_subscription):
         """
@@ -219,7 +283,30 @@ class EdgeServer:
             remove_ai_service_in_docker(
                 container_name=ai_service_deployment["container_name"],
             )
+            self.resource_ledger.release(ai_service_deployment["container_name"])
             del self.ai_service_deployments[ai_service_subscription.subscription_id]
+            for ue_imsi in ai_service_subscription.ue_id_list:
+                index_key = (ai_service_subscription.ai_service_name, ue_imsi)
+                deployments = self.ue_subscription_index.get(index_key, {})
+                deployments.pop(ai_service_subscription.subscription_id, None)
+                if not deployments:
+                    self.ue_subscription_index.pop(index_key, None)
+
+    def undeploy_all_ai_services(self):
+        """Stop every AI service deployment of the edge server, e.g., when the network is reset."""
+        for ai_service_deployment in list(self.ai_service_deployments.values()):
+            self.undeploy_ai_service(ai_service_deployment["ai_service_subscription"])
+
+    def get_container_names(self):
+        """Names of the AI service containers of the edge server, deployed and kept warm."""
+        container_names = [
+            deployment["container_name"]
+            for deployment in self.ai_service_deployments.values()
+        ]
+        if self.warm_pool is not None:
+            for containers in self.warm_pool.warm_containers.values():
+                container_names.extend(container["container_name"] for container in containers)
+        return container_names
 
     def get_ai_service_deployment(self, ai_service_subscription):
         """
@@ -235,14 +322,24 @@ class EdgeServer:
             ai_service_subscription.subscription_id, None
         )
 
+    def is_ai_service_ready(self, ai_service_subscription):
+        """Whether the AI service deployment of the subscription can serve requests, i.e., its container is healthy."""
+        ai_service_deployment = self.get_ai_service_deployment(ai_service_subscription)
+        if ai_service_deployment is None:
+            return False
+        if not ai_service_deployment["ready"]:
+            container_name = ai_service_deployment["container_name"]
+            ai_service_deployment["ready"] = is_ai_service_container_ready(
+                get_ai_service_container_health([container_name])[container_name]
+            )
+        return ai_service_deployment["ready"]
+
     def check_ue_subscription(self, ai_service_name, ue_imsi):
-        for deployment in self.ai_service_deployments.values():
-            if (
-                deployment["ai_service_subscription"].ai_service_name == ai_service_name
-                and ue_imsi in deployment["ai_service_subscription"].ue_id_list
-            ):
-                return deployment["ai_service_subscription"]
-        return None
+        deployments = self.ue_subscription_index.get((ai_service_name, ue_imsi), None)
+        if not deployments:
+            return None
+        # the earliest deployment wins if the UE is in several subscriptions of the same AI service
+        return next(iter(deployments.values()))["ai_service_subscription"]
 
     def handle_ai_service_request(
         self, ai_service_subscription, request_data, request_files=None
@@ -272,7 +369,7 @@ class EdgeServer:
                 "error": f"AI service {ai_service_subscription.ai_service_name} is not deployed on edge server {self.edge_id}.",
             }
 
-        response, process_time, node_id, k8s_pod_name = send_post_request(
+        response, process_time, node_id, k8s_pod_name, request_time_ms = send_post_request(
             url=f"http://{ai_service_endpoint}/model/run",
             data=request_data,
             files=request_files or {},
@@ -294,4 +391,5 @@ class EdgeServer:
             "process_time": process_time,
             "node_id": node_id,
             "k8s_pod_name": k8s_pod_name,
+            "request_time_ms": request_time_ms,
         }
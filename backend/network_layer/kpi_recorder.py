@@ -0,0 +1,508 @@
+import logging
+import math
+
+import numpy as np
+
+import settings
+
+logger = logging.getLogger(__name__)
+
+UE_KPI_ATTRIBUTES = [
+    "downlink_bitrate",
+    "downlink_latency",
+    "downlink_sinr",
+    "downlink_cqi",
+    "downlink_mcs_index",
+    "position_x",
+    "position_y",
+]
+
+CELL_KPI_ATTRIBUTES = [
+    "current_load",
+    "current_dl_load",
+    "current_ul_load",
+    "allocated_dl_prb",
+    "allocated_ul_prb",
+    "connected_ue_count",
+]
+
+BS_KPI_ATTRIBUTES = [
+    "current_load",
+    "current_dl_load",
+    "current_ul_load",
+    "allocated_dl_prb",
+    "allocated_ul_prb",
+    "connected_ue_count",
+]
+
+
+def _kpi_value(value):
+    return np.nan if value is None else value
+
+
+def get_ue_kpis(ue):
+    return [_kpi_value(getattr(ue, attr, None)) for attr in UE_KPI_ATTRIBUTES]
+
+
+def get_cell_kpis(cell):
+    allocated_dl_prb = cell.allocated_dl_prb
+    allocated_ul_prb = cell.allocated_ul_prb
+    return [
+        (allocated_dl_prb + allocated_ul_prb) / cell.max_prb,
+        allocated_dl_prb / cell.max_dl_prb,
+        allocated_ul_prb / cell.max_ul_prb,
+        allocated_dl_prb,
+        allocated_ul_prb,
+        len(cell.connected_ue_list),
+    ]
+
+
+def get_bs_kpis(bs):
+    cells = list(bs.cell_list.values())
+    if not cells:
+        return [np.nan] * 5 + [len(bs.ue_registry)]
+    allocated_dl_prb = sum(cell.allocated_dl_prb for cell in cells)
+    allocated_ul_prb = sum(cell.allocated_ul_prb for cell in cells)
+    return [
+        (allocated_dl_prb + allocated_ul_prb) / sum(cell.max_prb for cell in cells),
+        allocated_dl_prb / sum(cell.max_dl_prb for cell in cells),
+        allocated_ul_prb / sum(cell.max_ul_prb for cell in cells),
+        allocated_dl_prb,
+        allocated_ul_prb,
+        len(bs.ue_registry),
+    ]
+
+
+class KPIRingBuffer:
+    """Ring buffer of KPI samples, stored column-wise as a (sample, slot, attribute) array.
+
+    Each network element owns a slot while the buffer holds samples of it, so recording a step is a
+    single vectorized assignment. Elements absent at a sample are NaN. The slot of an element that
+    disappeared is reused once the buffer wrapped past the time it disappeared, so the buffer only
+    grows with the elements alive within its time span.
+
+    A downsampling buffer (factor > 1) accumulates `factor` steps and appends their average.
+    """
+
+    def __init__(self, capacity, attribute_count, factor=1):
+        self.capacity = capacity
+        self.factor = factor
+        self.attribute_count = attribute_count
+        self.sim_times = np.full(capacity, np.nan)
+        self.values = np.full((capacity, 0, attribute_count), np.nan, dtype=np.float32)
+        self.head = 0  # next write position
+        self.size = 0
+        self.slots = {}  # element ID -> slot
+        self.slot_ids = []  # slot -> element ID, None if free
+        # slot -> sim time of the first sample without its element, NaN while it has one
+        self.retired_times = np.zeros(0)
+        self.free_slots = []
+        # running sums of the steps not yet averaged, downsampling buffers only
+        self.accumulated_sums = np.zeros((0, attribute_count))
+        self.accumulated_counts = np.zeros((0, attribute_count))
+        self.accumulated_steps = 0
+
+    @property
+    def slot_capacity(self):
+        return self.values.shape[1]
+
+    @property
+    def oldest_time(self):
+        if self.size == 0:
+            return None
+        return self.sim_times[(self.head - self.size) % self.capacity]
+
+    @property
+    def memory_bytes(self):
+        return self.values.nbytes + self.accumulated_sums.nbytes + self.accumulated_counts.nbytes
+
+    def _grow_slots(self, slot_capacity):
+        old_capacity = self.slot_capacity
+        values = np.full(
+            (self.capacity, slot_capacity, self.attribute_count), np.nan, dtype=np.float32
+        )
+        values[:, :old_capacity] = self.values
+        self.values = values
+        self.retired_times = np.concatenate(
+            [self.retired_times, np.full(slot_capacity - old_capacity, np.nan)]
+        )
+        if self.factor > 1:
+            for name in ("accumulated_sums", "accumulated_counts"):
+                grown = np.zeros((slot_capacity, self.attribute_count))
+                grown[:old_capacity] = getattr(self, name)
+                setattr(self, name, grown)
+        self.slot_ids.extend([None] * (slot_capacity - old_capacity))
+        # lowest slots first
+        self.free_slots.extend(range(slot_capacity - 1, old_capacity - 1, -1))
+
+    def resize(self, capacity):
+        """Change the number of samples kept, dropping the oldest samples when shrinking."""
+        if capacity == self.capacity:
+            return
+        kept = min(self.size, capacity)
+        positions = np.arange(self.head - kept, self.head) % self.capacity
+        sim_times = np.full(capacity, np.nan)
+        sim_times[:kept] = self.sim_times[positions]
+        values = np.full(
+            (capacity, self.slot_capacity, self.attribute_count), np.nan, dtype=np.float32
+        )
+        values[:kept] = self.values[positions]
+        self.sim_times = sim_times
+        self.values = values
+        self.capacity = capacity
+        self.size = kept
+        self.head = kept % capacity
+        # the slots of elements only present in the dropped samples are free again
+        self._release_expired_slots()
+
+    def _release_expired_slots(self):
+        # the samples of a retired element are gone once the buffer wrapped past its retire time
+        if self.size < self.capacity:
+            return
+        with np.errstate(invalid="ignore"):
+            expired = np.flatnonzero(self.retired_times <= self.oldest_time)
+        for slot in expired.tolist():
+            del self.slots[self.slot_ids[slot]]
+            self.slot_ids[slot] = None
+        self.retired_times[expired] = np.nan
+        self.free_slots.extend(reversed(expired.tolist()))
+
+    def _assign_slots(self, element_ids):
+        if len(self.free_slots) < len(element_ids):
+            self._release_expired_slots()
+        missing = len(element_ids) - len(self.free_slots)
+        if missing > 0:
+            # sized to the elements, with some headroom so that growing stays amortized
+            needed = self.slot_capacity + missing
+            self._grow_slots(needed + needed // 8)
+        for element_id in element_ids:
+            slot = self.free_slots.pop()
+            self.slots[element_id] = slot
+            self.slot_ids[slot] = element_id
+
+    def get_slots(self, element_ids):
+        """Slots of the elements of a new step, assigning slots to the new elements."""
+        slots = [self.slots.get(element_id, None) for element_id in element_ids]
+        if None in slots:
+            self._assign_slots(
+                [element_id for element_id, slot in zip(element_ids, slots) if slot is None]
+            )
+            slots = [self.slots[element_id] for element_id in element_ids]
+        slots = np.array(slots, dtype=int)
+        # elements back before their slot was reused keep it
+        self.retired_times[slots] = np.nan
+        return slots
+
+    def append(self, sim_time, slots, rows):
+        self.values[self.head] = np.nan
+        self.values[self.head, slots] = rows
+        self.sim_times[self.head] = sim_time
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+        # the elements without a value in this sample retire from now on
+        absent = np.ones(self.slot_capacity, dtype=bool)
+        absent[slots] = False
+        absent[self.free_slots] = False
+        self.retired_times[absent & np.isnan(self.retired_times)] = sim_time
+
+    def record(self, sim_time, slots, rows, valid):
+        """Record the rows of a step: appended as is, or accumulated into the average of `factor` steps."""
+        if self.factor == 1:
+            self.append(sim_time, slots, rows)
+            return
+        self.accumulated_sums[slots] += np.where(valid, rows, 0.0)
+        self.accumulated_counts[slots] += valid
+        self.accumulated_steps += 1
+        if self.accumulated_steps < self.factor:
+            return
+        counts = self.accumulated_counts
+        with np.errstate(invalid="ignore", divide="ignore"):
+            averages = self.accumulated_sums / counts
+        recorded_slots = np.flatnonzero(counts.any(axis=1))
+        self.append(sim_time, recorded_slots, averages[recorded_slots])
+        self.accumulated_sums[:] = 0.0
+        self.accumulated_counts[:] = 0.0
+        self.accumulated_steps = 0
+
+    def get_range(self, slot, attribute_index, from_time, to_time):
+        positions = np.arange(self.head - self.size, self.head) % self.capacity
+        sim_times = self.sim_times[positions]
+        mask = (sim_times >= from_time) & (sim_times <= to_time)
+        positions = positions[mask]
+        values = self.values[positions, slot, attribute_index].astype(float)
+        present = ~np.isnan(values)
+        return sim_times[mask][present], values[present]
+
+
+class KPITable:
+    """Recorded KPI history of one kind of network element (UEs, cells or base stations).
+
+    The first tier keeps every recorded step, each further tier keeps the average of
+    `factor` consecutive steps, so long runs stay queryable at a coarser resolution.
+    Each tier only keeps capacity samples, at most the samples of a run of settings.SIM_MAX_STEP steps.
+    """
+
+    def __init__(self, name, attributes, capacity, downsampling_factors):
+        self.name = name
+        self.attributes = list(attributes)
+        factors = [1] + list(downsampling_factors)
+        self.max_capacities = [
+            max(1, min(capacity, math.ceil(settings.SIM_MAX_STEP / factor)))
+            for factor in factors
+        ]
+        self.tiers = [
+            KPIRingBuffer(max_capacity, len(self.attributes), factor)
+            for max_capacity, factor in zip(self.max_capacities, factors)
+        ]
+
+    @property
+    def memory_bytes(self):
+        return sum(buffer.memory_bytes for buffer in self.tiers)
+
+    @property
+    def bytes_per_element(self):
+        return sum(buffer.capacity * len(self.attributes) * 4 for buffer in self.tiers)
+
+    @property
+    def max_bytes_per_element(self):
+        """Bytes per element at the configured capacities."""
+        return sum(self.max_capacities) * len(self.attributes) * 4
+
+    def set_capacity_scale(self, scale):
+        """Keep the given fraction of the configured capacity of each tier, the newest samples."""
+        for buffer, max_capacity in zip(self.tiers, self.max_capacities):
+            buffer.resize(max(1, int(max_capacity * scale)))
+
+    @property
+    def element_count(self):
+        """Elements with recorded samples, the ones of the tier keeping them the longest."""
+        return max(len(buffer.slots) for buffer in self.tiers)
+
+    def has_element(self, element_id):
+        return any(element_id in buffer.slots for buffer in self.tiers)
+
+    def record(self, sim_time, element_ids, rows):
+        rows = np.asarray(rows, dtype=float).reshape(len(element_ids), len(self.attributes))
+        valid = ~np.isnan(rows)
+        for buffer in self.tiers:
+            buffer.record(sim_time, buffer.get_slots(element_ids), rows, valid)
+
+    def get_history(self, element_id, attribute, from_time, to_time):
+        """
+        Returns:
+            tuple: (sim_times, values, factor) from the finest tier that still covers from_time,
+                   factor being the number of steps averaged per value.
+        """
+        attribute_index = self.attributes.index(attribute)
+        buffer = None
+        for tier_buffer in self.tiers:
+            if tier_buffer.size == 0:
+                break
+            if element_id not in tier_buffer.slots:
+                # e.g., gone for longer than the finer tiers keep
+                continue
+            buffer = tier_buffer
+            if (
+                tier_buffer.size < tier_buffer.capacity
+                or tier_buffer.oldest_time <= from_time
+            ):
+                break
+        if buffer is None:
+            return np.array([]), np.array([]), 1
+        sim_times, values = buffer.get_range(
+            buffer.slots[element_id], attribute_index, from_time, to_time
+        )
+        return sim_times, values, buffer.factor
+
+
+class KPIRecorder:
+    """In-process time-series recorder of per-step UE, cell and base station KPIs.
+
+    Sample times are simulated seconds since the network setup (SimulationEngine.sim_time).
+    The recorder only appends; snapshots share it with the live engine and clip their
+    history queries to their own sim_time.
+    """
+
+    def __init__(self, simulation_engine):
+        self.simulation_engine = simulation_engine
+        self.enabled = settings.SIM_KPI_RECORDER_ENABLED
+        self.latest_time = None
+        self.clear()
+
+    def clear(self):
+        capacity = settings.SIM_KPI_RECORDER_CAPACITY
+        factors = settings.SIM_KPI_RECORDER_DOWNSAMPLING_FACTORS
+        self.tables = {
+            "user_equipments": KPITable(
+                "user_equipments", UE_KPI_ATTRIBUTES, capacity, factors
+            ),
+            "cells": KPITable("cells", CELL_KPI_ATTRIBUTES, capacity, factors),
+            "base_stations": KPITable(
+                "base_stations", BS_KPI_ATTRIBUTES, capacity, factors
+            ),
+        }
+        self.latest_time = None
+        # fraction of the configured tier capacities kept, below 1 while the population outgrows
+        # SIM_KPI_RECORDER_MAX_MEMORY_MB
+        self.capacity_scale = 1.0
+        # set while even SIM_KPI_RECORDER_MIN_CAPACITY samples per element exceed the budget
+        self.paused = False
+
+    def _set_capacity_scale(self, scale):
+        for table in self.tables.values():
+            table.set_capacity_scale(scale)
+        self.capacity_scale = scale
+
+    def _fit_memory_budget(self):
+        """Scale the time span kept to the memory budget of the current population.
+
+        The history shrinks (dropping the oldest samples) as soon as the population outgrows the
+        budget and grows back once it dropped again. Recording pauses, keeping the history, while
+        even the minimum capacity does not fit.
+
+        Returns:
+            bool: Whether the step can be recorded.
+        """
+        engine = self.simulation_engine
+        # each element costs its samples in every tier
+        full_memory_bytes = sum(
+            table.max_bytes_per_element * max(len(elements), table.element_count)
+            for table, elements in (
+                (self.tables["user_equipments"], engine.ue_list),
+                (self.tables["cells"], engine.cell_list),
+                (self.tables["base_stations"], engine.base_station_list),
+            )
+        )
+        budget_bytes = settings.SIM_KPI_RECORDER_MAX_MEMORY_MB * 1024 * 1024
+        scale = min(1.0, budget_bytes / full_memory_bytes) if full_memory_bytes else 1.0
+
+        min_scale = min(
+            1.0, settings.SIM_KPI_RECORDER_MIN_CAPACITY / settings.SIM_KPI_RECORDER_CAPACITY
+        )
+        if scale < min_scale:
+            if not self.paused:
+                logger.warning(
+                    f"KPI recorder paused: the history of {len(engine.ue_list)} UEs would take "
+                    f"{full_memory_bytes * min_scale / 1024 / 1024:.0f} MB at the minimum capacity, "
+                    "more than SIM_KPI_RECORDER_MAX_MEMORY_MB."
+                )
+                self.paused = True
+            return False
+        if self.paused:
+            logger.info("KPI recorder resumed.")
+            self.paused = False
+
+        # resize with some margin, so that a growing population or one around the budget does not
+        # resize the history every step
+        if scale < self.capacity_scale:
+            if self.capacity_scale == 1.0:
+                logger.warning(
+                    f"KPI recorder keeps a shorter history for {len(engine.ue_list)} UEs "
+                    "to stay within SIM_KPI_RECORDER_MAX_MEMORY_MB."
+                )
+            self._set_capacity_scale(max(min_scale, scale * 0.8))
+        elif scale >= min(1.0, self.capacity_scale * 1.25) and scale > self.capacity_scale:
+            self._set_capacity_scale(scale)
+        return True
+
+    def record(self, sim_time):
+        if not self.enabled:
+            return
+        if not self._fit_memory_budget():
+            return
+        engine = self.simulation_engine
+        self.tables["user_equipments"].record(
+            sim_time,
+            list(engine.ue_list.keys()),
+            [get_ue_kpis(ue) for ue in engine.ue_list.values()],
+        )
+        self.tables["cells"].record(
+            sim_time,
+            list(engine.cell_list.keys()),
+            [get_cell_kpis(cell) for cell in engine.cell_list.values()],
+        )
+        self.tables["base_stations"].record(
+            sim_time,
+            list(engine.base_station_list.keys()),
+            [get_bs_kpis(bs) for bs in engine.base_station_list.values()],
+        )
+        self.latest_time = sim_time
+
+    def get_history(
+        self,
+        table_name,
+        element_id,
+        attribute,
+        from_time=None,
+        to_time=None,
+        latest_time=None,
+    ):
+        """
+        Get the recorded values of an attribute of a network element.
+
+        Args:
+            table_name (str): "user_equipments", "cells" or "base_stations".
+            element_id (str): The ID of the UE, cell or base station.
+            attribute (str): One of the recorded KPI attributes of the table.
+            from_time (float, optional): Start of the window in simulated seconds, negative values are
+                relative to latest_time (e.g., -300 for the last 5 minutes). Defaults to the oldest sample.
+            to_time (float, optional): End of the window, negative values are relative to latest_time.
+                Defaults to latest_time.
+            latest_time (float, optional): The latest sim time visible to the caller, defaults to the
+                latest recorded sample.
+
+        Returns:
+            tuple: (error, history) where history is a dict with the sim_times and values lists
+                   and the number of steps averaged per value ("resolution_steps").
+        """
+        table = self.tables.get(table_name, None)
+        if table is None:
+            return f"No KPI history is recorded for {table_name}.", None
+        if attribute not in table.attributes:
+            return (
+                f"The history of '{attribute}' is not recorded. Recorded attributes: {', '.join(table.attributes)}",
+                None,
+            )
+        if not table.has_element(element_id):
+            return f"No KPI history is recorded for {element_id}.", None
+
+        if latest_time is None or (
+            self.latest_time is not None and latest_time > self.latest_time
+        ):
+            latest_time = self.latest_time
+        if latest_time is None:
+            return "No KPI history has been recorded yet.", None
+        if from_time is None:
+            from_time = -np.inf
+        elif from_time < 0:
+            from_time = latest_time + from_time
+        if to_time is None:
+            to_time = latest_time
+        elif to_time < 0:
+            to_time = latest_time + to_time
+        to_time = min(to_time, latest_time)
+
+        sim_times, values, factor = table.get_history(
+            element_id, attribute, from_time, to_time
+        )
+        return None, {
+            "element_id": element_id,
+            "attribute": attribute,
+            "from_time": None if np.isinf(from_time) else float(from_time),
+            "to_time": float(to_time),
+            "resolution_steps": factor,
+            "sim_times": sim_times.tolist(),
+            "values": values.tolist(),
+        }
+
+    def to_json(self):
+        return {
+            "enabled": self.enabled,
+            "paused": self.paused,
+            "capacity_scale": self.capacity_scale,
+            "latest_time": self.latest_time,
+            "recorded_elements": {
+                name: table.element_count for name, table in self.tables.items()
+            },
+        }
@@ -0,0 +1,434 @@
+"""
+Vectorized UE mobility: the positions of all UEs move, and the UEs that arrived get their next
+targets, in one batched stage per simulation step (see SimulationEngine.step_UEs).
+
+Models (settings.UE_MOBILITY_MODEL):
+    random_waypoint: UEs move at a constant speed towards a random target in their operation region,
+        and draw a new target when they reach it.
+    gauss_markov: the speed and direction of UEs are Gauss-Markov processes around the spawn speed
+        and a mean direction, UEs reflect at the borders of their operation region.
+    fixed_route: UEs loop over the waypoints of a route, one of settings.UE_MOBILITY_FIXED_ROUTES or,
+        if none is configured, waypoints drawn in their operation region when they spawn.
+    trace: UEs follow the positions of settings.UE_MOBILITY_TRACE_FILE (see network_layer/mobility_trace.py),
+        and enter and leave the network with the trace instead of being spawned randomly.
+
+A model keeps the positions, targets, speeds and operation regions of its UEs in arrays (one row per
+UE, added and removed with the UEs of the simulation), so a step only writes the new coordinates back
+to the UE objects. UEs changed outside the model (e.g., UE.set_target) are re-read with update_ue().
+Positions are rounded to settings.UE_POSITION_ROUNDING_DECIMALS.
+"""
+
+import logging
+import math
+
+import numpy as np
+
+import settings
+from .mobility_trace import MobilityTraceError, MobilityTraceReader
+
+logger = logging.getLogger(__name__)
+
+
+def round_positions(positions):
+    decimals = settings.UE_POSITION_ROUNDING_DECIMALS
+    if decimals is None:
+        return positions
+    return np.round(positions, decimals)
+
+
+def coordinates_to_list(coordinates):
+    """Array of coordinates as Python numbers, integers when positions are rounded to the metre."""
+    if settings.UE_POSITION_ROUNDING_DECIMALS == 0:
+        return np.rint(coordinates).astype(np.int64).tolist()
+    return coordinates.tolist()
+
+
+def move_towards_targets(positions, targets, max_move_distances):
+    """
+    Move positions in a straight line towards their targets.
+
+    Returns:
+        tuple: The new positions and whether each position reached its target.
+    """
+    offsets = targets - positions
+    distances = np.hypot(offsets[:, 0], offsets[:, 1])
+    arrived = distances <= max_move_distances
+    ratios = np.divide(
+        max_move_distances,
+        distances,
+        out=np.ones_like(distances),
+        where=~arrived,
+    )
+    moved = round_positions(positions + offsets * ratios[:, None])
+    new_positions = np.where(arrived[:, None], targets, moved)
+    # rounding can land a slow UE on its target
+    arrived |= np.all(new_positions == targets, axis=1)
+    return new_positions, arrived
+
+
+def draw_targets(rng, regions):
+    """Random integer targets in operation regions (n, 4: min_x, min_y, max_x, max_y), from the mobility stream."""
+    regions = regions.astype(np.int64)
+    return rng.mobility.integers(regions[:, 0:2], regions[:, 2:4], endpoint=True).astype(
+        np.float64
+    )
+
+
+class MobilityModel:
+    name = None
+    # names of the per-UE state columns of the model, see init_state()
+    state_columns = []
+    # the model decides which UEs are in the network, see update_population()
+    controls_population = False
+
+    def __init__(self):
+        # UEs of the rows of the arrays, and the row of each UE by IMSI
+        self.ues = []
+        self.rows = {}
+        self.positions = np.zeros((0, 2))
+        self.targets = np.zeros((0, 2))
+        self.speeds = np.zeros(0)
+        self.regions = np.zeros((0, 4))  # min_x, min_y, max_x, max_y
+        self.state = np.zeros((0, len(self.state_columns)))
+
+    def init_state(self, ue, rng):
+        """
+        Set up the model state of a UE joining the model: returns its row of the state columns,
+        anything else goes to ue.mobility_state. Draws from the mobility stream of rng if needed.
+        """
+        ue.mobility_state = {"model": self.name}
+        return []
+
+    def update_population(self, simulation_engine, delta_time):
+        """Add and remove the UEs of the simulation for the next step, for models that control the population."""
+        raise NotImplementedError
+
+    def move(self, delta_time, rng):
+        """
+        Move the UEs of the arrays for delta_time seconds.
+
+        Returns:
+            numpy.ndarray: The rows of the UEs whose target changed.
+        """
+        raise NotImplementedError
+
+    def _read_ue(self, row, ue):
+        self.positions[row] = (ue.position_x, ue.position_y)
+        self.targets[row] = (ue.target_x, ue.target_y)
+        self.speeds[row] = ue.speed_mps
+        self.regions[row] = (
+            ue.operation_region["min_x"],
+            ue.operation_region["min_y"],
+            ue.operation_region["max_x"],
+            ue.operation_region["max_y"],
+        )
+
+    def add_ue(self, ue, rng):
+        """Start moving a UE, called when it joins the simulation."""
+        if ue.ue_imsi in self.rows:
+            self.remove_ue(self.ues[self.rows[ue.ue_imsi]])
+        state = self.init_state(ue, rng)
+        row = len(self.ues)
+        if row == len(self.speeds):
+            # grow the arrays geometrically, so adding UEs one by one stays amortised O(1)
+            capacity = max(2 * row, 64)
+            self.positions = np.resize(self.positions, (capacity, 2))
+            self.targets = np.resize(self.targets, (capacity, 2))
+            self.speeds = np.resize(self.speeds, capacity)
+            self.regions = np.resize(self.regions, (capacity, 4))
+            self.state = np.resize(self.state, (capacity, len(self.state_columns)))
+        self.ues.append(ue)
+        self.rows[ue.ue_imsi] = row
+        self._read_ue(row, ue)
+        self.state[row] = state
+
+    def remove_ue(self, ue):
+        """Stop moving a UE, called when it leaves the simulation."""
+        row = self.rows.get(ue.ue_imsi, None)
+        if row is None or self.ues[row] is not ue:
+            return
+        del self.rows[ue.ue_imsi]
+        # the last row takes the place of the removed one
+        last = len(self.ues) - 1
+        if row != last:
+            moved_ue = self.ues[last]
+            self.ues[row] = moved_ue
+            self.rows[moved_ue.ue_imsi] = row
+            for array in (self.positions, self.targets, self.speeds, self.regions, self.state):
+                array[row] = array[last]
+        self.ues.pop()
+
+    def update_ue(self, ue):
+        """Re-read the position, target, speed and operation region of a UE changed outside the model."""
+        row = self.rows.get(ue.ue_imsi, None)
+        if row is not None and self.ues[row] is ue:
+            self._read_ue(row, ue)
+
+    def sync(self, ue_list, rng):
+        """Add and remove UEs so that the model moves exactly the UEs of ue_list (IMSI -> UE)."""
+        for ue in list(self.ues):
+            if ue_list.get(ue.ue_imsi, None) is not ue:
+                self.remove_ue(ue)
+        for ue in ue_list.values():
+            if ue.ue_imsi not in self.rows:
+                self.add_ue(ue, rng)
+
+    def step(self, ue_list, delta_time, rng):
+        """Move the UEs of ue_list (IMSI -> UE) for delta_time seconds."""
+        if len(self.ues) != len(ue_list):
+            # UEs were added or removed without add_ue()/remove_ue()
+            self.sync(ue_list, rng)
+        count = len(self.ues)
+        if count == 0:
+            return
+        retargeted_rows = self.move(delta_time, rng)
+
+        for ue, position_x, position_y in zip(
+            self.ues,
+            coordinates_to_list(self.positions[:count, 0]),
+            coordinates_to_list(self.positions[:count, 1]),
+        ):
+            ue.position_x = position_x
+            ue.position_y = position_y
+        for row, (target_x, target_y) in zip(
+            retargeted_rows.tolist(), coordinates_to_list(self.targets[retargeted_rows])
+        ):
+            ue = self.ues[row]
+            ue.target_x = target_x
+            ue.target_y = target_y
+
+    def write_speeds(self):
+        for ue, speed in zip(self.ues, self.speeds[: len(self.ues)].tolist()):
+            ue.speed_mps = speed
+
+
+class RandomWaypointMobility(MobilityModel):
+    name = "random_waypoint"
+
+    def move(self, delta_time, rng):
+        count = len(self.ues)
+        positions, arrived = move_towards_targets(
+            self.positions[:count], self.targets[:count], self.speeds[:count] * delta_time
+        )
+        self.positions[:count] = positions
+        arrived_rows = np.flatnonzero(arrived)
+        if arrived_rows.size > 0:
+            self.targets[arrived_rows] = draw_targets(rng, self.regions[arrived_rows])
+            logger.info(f"{arrived_rows.size} UEs reached their targets.")
+        return arrived_rows
+
+
+class GaussMarkovMobility(MobilityModel):
+    name = "gauss_markov"
+    state_columns = ["mean_speed", "direction", "mean_direction"]
+
+    def init_state(self, ue, rng):
+        ue.mobility_state = {"model": self.name}
+        # head towards the spawn target at the spawn speed
+        direction = math.atan2(ue.target_y - ue.position_y, ue.target_x - ue.position_x)
+        return [ue.speed_mps, direction, direction]
+
+    def move(self, delta_time, rng):
+        count = len(self.ues)
+        speeds = self.speeds[:count]
+        mean_speeds = self.state[:count, 0]
+        directions = self.state[:count, 1]
+        mean_directions = self.state[:count, 2]
+
+        alpha = settings.UE_GAUSS_MARKOV_ALPHA
+        noise_scale = math.sqrt(1 - alpha**2)
+        noise = rng.mobility.standard_normal((count, 2))
+        speeds[:] = np.maximum(
+            alpha * speeds
+            + (1 - alpha) * mean_speeds
+            + noise_scale * settings.UE_GAUSS_MARKOV_SPEED_STD_MPS * noise[:, 0],
+            0,
+        )
+        directions[:] = (
+            alpha * directions
+            + (1 - alpha) * mean_directions
+            + noise_scale * math.radians(settings.UE_GAUSS_MARKOV_DIRECTION_STD_DEG) * noise[:, 1]
+        )
+
+        lows, highs = self.regions[:count, 0:2], self.regions[:count, 2:4]
+        headings = np.stack([np.cos(directions), np.sin(directions)], axis=1)
+        positions = self.positions[:count] + headings * (speeds * delta_time)[:, None]
+        # reflect at the borders of the operation region, turning the UE (and its mean direction) around
+        reflected = (positions < lows) | (positions > highs)
+        positions = np.where(positions < lows, 2 * lows - positions, positions)
+        positions = np.where(positions > highs, 2 * highs - positions, positions)
+        self.positions[:count] = round_positions(np.clip(positions, lows, highs))
+        for turn, axis_reflected in ((np.pi, reflected[:, 0]), (0, reflected[:, 1])):
+            directions[:] = np.where(axis_reflected, turn - directions, directions)
+            mean_directions[:] = np.where(axis_reflected, turn - mean_directions, mean_directions)
+
+        # the target shows where the UE heads to in the next step
+        headings = np.stack([np.cos(directions), np.sin(directions)], axis=1)
+        self.targets[:count] = round_positions(
+            np.clip(self.positions[:count] + headings * (speeds * delta_time)[:, None], lows, highs)
+        )
+        return np.arange(count)
+
+    def step(self, ue_list, delta_time, rng):
+        super().step(ue_list, delta_time, rng)
+        self.write_speeds()
+
+
+class FixedRouteMobility(MobilityModel):
+    name = "fixed_route"
+
+    def init_state(self, ue, rng):
+        if settings.UE_MOBILITY_FIXED_ROUTES:
+            route = rng.choice("mobility", settings.UE_MOBILITY_FIXED_ROUTES)
+            route = [list(waypoint) for waypoint in route]
+            # join the route at its closest waypoint
+            waypoint = min(
+                range(len(route)),
+                key=lambda i: math.hypot(
+                    route[i][0] - ue.position_x, route[i][1] - ue.position_y
+                ),
+            )
+        else:
+            # the spawn target is the first waypoint of the UE's own route
+            region = np.array(
+                [
+                    [
+                        ue.operation_region["min_x"],
+                        ue.operation_region["min_y"],
+                        ue.operation_region["max_x"],
+                        ue.operation_region["max_y"],
+                    ]
+                ]
+                * (settings.UE_FIXED_ROUTE_WAYPOINTS - 1)
+            ).reshape(-1, 4)
+            route = [[ue.target_x, ue.target_y]] + draw_targets(rng, region).astype(
+                np.int64
+            ).tolist()
+            waypoint = 0
+        ue.target_x, ue.target_y = route[waypoint]
+        ue.mobility_state = {"model": self.name, "route": route, "waypoint": waypoint}
+        return []
+
+    def move(self, delta_time, rng):
+        count = len(self.ues)
+        positions, arrived = move_towards_targets(
+            self.positions[:count], self.targets[:count], self.speeds[:count] * delta_time
+        )
+        self.positions[:count] = positions
+        arrived_rows = np.flatnonzero(arrived)
+        for row in arrived_rows.tolist():
+            state = self.ues[row].mobility_state
+            state["waypoint"] = (state["waypoint"] + 1) % len(state["route"])
+            self.targets[row] = state["route"][state["waypoint"]]
+        return arrived_rows
+
+
+class TraceMobility(MobilityModel):
+    name = "trace"
+    controls_population = True
+
+    def __init__(self):
+        super().__init__()
+        if not settings.UE_MOBILITY_TRACE_FILE:
+            raise MobilityTraceError(
+                "The trace mobility model requires settings.UE_MOBILITY_TRACE_FILE."
+            )
+        self.trace = MobilityTraceReader(settings.UE_MOBILITY_TRACE_FILE)
+        # simulation time the UE positions are at
+        self.time = 0.0
+        # IMSIs of the UEs added from the trace, the others (e.g., registered by agents) stay where they are
+        self.trace_imsis = set()
+        # trace positions, next sample positions and speeds of the next step, by IMSI
+        self.pending = {}
+
+    @staticmethod
+    def get_ue_imsi(ue_id):
+        return ue_id if ue_id.startswith("IMSI_") else f"IMSI_{ue_id}"
+
+    def update_population(self, simulation_engine, delta_time):
+        self.time += delta_time
+        ue_ids, positions, targets, speeds = self.trace.positions_at(self.time, delta_time)
+        self.pending = {
+            self.get_ue_imsi(ue_id): (position, target, speed)
+            for ue_id, position, target, speed in zip(
+                ue_ids,
+                coordinates_to_list(positions),
+                coordinates_to_list(targets),
+                speeds.tolist(),
+            )
+        }
+
+        retired = 0
+        for ue_imsi in list(self.trace_imsis):
+            if ue_imsi in self.pending:
+                continue
+            self.trace_imsis.discard(ue_imsi)
+            ue = simulation_engine.ue_list.get(ue_imsi, None)
+            if ue is not None:
+                ue.deregister()
+                simulation_engine.remove_UE(ue)
+                retired += 1
+
+        spawned = 0
+        for ue_imsi, ((position_x, position_y), (target_x, target_y), speed) in self.pending.items():
+            if ue_imsi in simulation_engine.ue_list:
+                continue
+            # UEs of the trace without a subscription use the eMBB slice
+            simulation_engine.core_network.ue_subscription_data.setdefault(
+                ue_imsi, [settings.NETWORK_SLICE_EMBB_NAME]
+            )
+            if simulation_engine.spawn_ue_at(
+                ue_imsi,
+                position_x,
+                position_y,
+                target_x,
+                target_y,
+                speed,
+                # UEs of the trace leave with the trace, not by a timeout
+                connection_time=settings.SIM_MAX_STEP * settings.SIM_STEP_TIME_DEFAULT,
+            ):
+                self.trace_imsis.add(ue_imsi)
+                spawned += 1
+        if spawned or retired:
+            logger.info(
+                f"Mobility trace at {self.time:.1f} s: {spawned} UEs entered, {retired} UEs left, "
+                f"{len(self.pending)} UEs in the trace."
+            )
+
+    def move(self, delta_time, rng):
+        rows = []
+        for ue_imsi, (position, target, speed) in self.pending.items():
+            row = self.rows.get(ue_imsi, None)
+            if row is None:
+                continue
+            self.positions[row] = position
+            self.targets[row] = target
+            self.speeds[row] = speed
+            rows.append(row)
+        return np.array(rows, dtype=np.int64)
+
+    def step(self, ue_list, delta_time, rng):
+        super().step(ue_list, delta_time, rng)
+        self.write_speeds()
+
+
+MOBILITY_MODELS = {
+    model.name: model
+    for model in [
+        RandomWaypointMobility,
+        GaussMarkovMobility,
+        FixedRouteMobility,
+        TraceMobility,
+    ]
+}
+
+
+def get_mobility_model(name=None):
+    """A new mobility model by name, settings.UE_MOBILITY_MODEL by default."""
+    if name is None:
+        name = settings.UE_MOBILITY_MODEL
+    if name not in MOBILITY_MODELS:
+        raise ValueError(
+            f"Unknown mobility model '{name}', expected one of {', '.join(MOBILITY_MODELS)}."
+        )
+    return MOBILITY_MODELS[name]()
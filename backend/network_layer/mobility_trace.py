@@ -0,0 +1,248 @@
+"""
+Streaming reader of external mobility traces (e.g., drive tests, SUMO floating car data exports):
+time-stamped UE positions in a CSV or Parquet file, one row per UE sample, sorted by time.
+
+The file is read in chunks of settings.UE_MOBILITY_TRACE_CHUNK_ROWS rows (memory-mapped), never as a
+whole: only the rows up to settings.UE_MOBILITY_TRACE_MAX_GAP_S seconds ahead of the simulation time
+are buffered, plus the last sample of each UE. Positions between two samples of a UE are linearly
+interpolated. A UE is in the trace from its first sample, and leaves it when it has no further sample
+within the maximum gap (it re-enters with its next sample).
+
+The trace time of the first row is the simulation time 0. Positions are in metres of the coverage area.
+The column names are settings.UE_MOBILITY_TRACE_COLUMNS. Parquet traces require pyarrow.
+"""
+
+import logging
+import os
+
+import numpy as np
+
+import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MobilityTraceError(ValueError):
+    pass
+
+
+def iter_trace_chunks(path, columns, chunk_rows):
+    """
+    Read a trace file chunk by chunk.
+
+    Args:
+        path (str): The CSV or Parquet (.parquet, .pq) file.
+        columns (dict): Column names of "time", "ue_id", "x" and "y".
+        chunk_rows (int): Rows per chunk.
+
+    Yields:
+        tuple: The times, UE ids (str), x and y numpy arrays of the next rows.
+    """
+    names = [columns["time"], columns["ue_id"], columns["x"], columns["y"]]
+    if os.path.splitext(path)[1].lower() in (".parquet", ".pq"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise MobilityTraceError(
+                "Reading Parquet mobility traces requires pyarrow (pip install pyarrow)."
+            )
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=names):
+            times, ue_ids, xs, ys = (batch.column(name) for name in names)
+            yield (
+                times.to_numpy().astype(np.float64),
+                np.asarray(ue_ids.cast("string").to_pylist(), dtype=object),
+                xs.to_numpy().astype(np.float64),
+                ys.to_numpy().astype(np.float64),
+            )
+        return
+
+    import pandas as pd
+
+    try:
+        reader = pd.read_csv(
+            path,
+            usecols=names,
+            dtype={columns["ue_id"]: str},
+            chunksize=chunk_rows,
+            memory_map=True,
+        )
+        for chunk in reader:
+            yield (
+                chunk[columns["time"]].to_numpy(dtype=np.float64),
+                chunk[columns["ue_id"]].to_numpy(dtype=object),
+                chunk[columns["x"]].to_numpy(dtype=np.float64),
+                chunk[columns["y"]].to_numpy(dtype=np.float64),
+            )
+    except ValueError as e:
+        raise MobilityTraceError(f"Invalid mobility trace {path}: {e}")
+
+
+class MobilityTraceReader:
+    """
+    Positions of the UEs of a trace file at increasing simulation times, see the module docstring.
+
+    Args:
+        path (str): The CSV or Parquet trace file.
+        columns (dict, optional): Column names, settings.UE_MOBILITY_TRACE_COLUMNS by default.
+        chunk_rows (int, optional): Rows read at a time, settings.UE_MOBILITY_TRACE_CHUNK_ROWS by default.
+        max_gap_s (float, optional): Longest time between two samples of a UE in the network,
+            settings.UE_MOBILITY_TRACE_MAX_GAP_S by default.
+    """
+
+    def __init__(self, path, columns=None, chunk_rows=None, max_gap_s=None):
+        if not os.path.isfile(path):
+            raise MobilityTraceError(f"Mobility trace {path} not found.")
+        self.path = path
+        self.columns = columns or settings.UE_MOBILITY_TRACE_COLUMNS
+        self.chunk_rows = chunk_rows or settings.UE_MOBILITY_TRACE_CHUNK_ROWS
+        self.max_gap_s = (
+            max_gap_s if max_gap_s is not None else settings.UE_MOBILITY_TRACE_MAX_GAP_S
+        )
+        # trace time of the simulation time 0, the time of the first row
+        self.start_time = None
+        self.rows_read = 0
+        self.last_read_time = -np.inf
+        self.end_of_trace = False
+        # UE ids of the trace, indexed by their code in the arrays
+        self.ue_ids = []
+        self.ue_codes = {}
+        # rows read but not yet reached by the simulation time, in trace order
+        self.buffer_times = np.zeros(0)
+        self.buffer_codes = np.zeros(0, dtype=np.int64)
+        self.buffer_positions = np.zeros((0, 2))
+        # last sample of each UE at or before the current time, nan if none yet
+        self.previous_times = np.zeros(0)
+        self.previous_positions = np.zeros((0, 2))
+        self._chunks = None
+
+    def __getstate__(self):
+        # the open file is not part of the state (e.g., of checkpoints), it is reopened after rows_read
+        state = self.__dict__.copy()
+        state["_chunks"] = None
+        return state
+
+    def _open(self):
+        self._chunks = iter_trace_chunks(self.path, self.columns, self.chunk_rows)
+        skipped = 0
+        while skipped < self.rows_read:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            skip = min(len(chunk[0]), self.rows_read - skipped)
+            skipped += skip
+            if skip < len(chunk[0]):
+                return tuple(column[skip:] for column in chunk)
+        return None
+
+    def _encode_ue_ids(self, ue_ids):
+        unique_ids, inverse = np.unique(ue_ids, return_inverse=True)
+        unique_codes = np.empty(len(unique_ids), dtype=np.int64)
+        for i, ue_id in enumerate(unique_ids.tolist()):
+            code = self.ue_codes.get(ue_id, None)
+            if code is None:
+                code = len(self.ue_ids)
+                self.ue_codes[ue_id] = code
+                self.ue_ids.append(ue_id)
+            unique_codes[i] = code
+        if len(self.ue_ids) > len(self.previous_times):
+            new_count = len(self.ue_ids) - len(self.previous_times)
+            self.previous_times = np.concatenate([self.previous_times, np.full(new_count, np.nan)])
+            self.previous_positions = np.concatenate(
+                [self.previous_positions, np.zeros((new_count, 2))]
+            )
+        return unique_codes[inverse]
+
+    def _read_chunk(self):
+        chunk = None
+        if self._chunks is None:
+            chunk = self._open()
+        if chunk is None:
+            chunk = next(self._chunks, None)
+        if chunk is None:
+            self.end_of_trace = True
+            return
+        times, ue_ids, xs, ys = chunk
+        if len(times) == 0:
+            return
+        if self.start_time is None:
+            self.start_time = float(times[0])
+        times = times - self.start_time
+        if np.any(np.diff(times) < 0) or times[0] < self.last_read_time:
+            raise MobilityTraceError(
+                f"Mobility trace {self.path} is not sorted by time (around row {self.rows_read})."
+            )
+        self.rows_read += len(times)
+        self.last_read_time = times[-1]
+        self.buffer_times = np.concatenate([self.buffer_times, times])
+        self.buffer_codes = np.concatenate([self.buffer_codes, self._encode_ue_ids(ue_ids)])
+        self.buffer_positions = np.concatenate(
+            [self.buffer_positions, np.stack([xs, ys], axis=1)]
+        )
+
+    def positions_at(self, time, step_time):
+        """
+        Positions of the UEs in the trace at a simulation time, which must not decrease between calls.
+
+        Args:
+            time (float): The simulation time (s).
+            step_time (float): The simulation step time, a UE stays in the network for one step after its
+                last sample.
+
+        Returns:
+            tuple: The UE ids (list), positions (n, 2), next sample positions (n, 2) and speeds (n,)
+                of the UEs in the trace.
+        """
+        while not self.end_of_trace and (
+            len(self.buffer_times) == 0 or self.buffer_times[-1] <= time + self.max_gap_s
+        ):
+            self._read_chunk()
+
+        # the rows reached by the time become the last samples of their UEs
+        reached = int(np.searchsorted(self.buffer_times, time, side="right"))
+        if reached > 0:
+            codes = self.buffer_codes[:reached]
+            # last occurrence of each UE in the reached rows
+            unique_codes, reversed_indices = np.unique(codes[::-1], return_index=True)
+            last_indices = reached - 1 - reversed_indices
+            self.previous_times[unique_codes] = self.buffer_times[last_indices]
+            self.previous_positions[unique_codes] = self.buffer_positions[last_indices]
+            self.buffer_times = self.buffer_times[reached:]
+            self.buffer_codes = self.buffer_codes[reached:]
+            self.buffer_positions = self.buffer_positions[reached:]
+
+        # first occurrence of each UE in the rows ahead, within the maximum gap
+        ahead = int(np.searchsorted(self.buffer_times, time + self.max_gap_s, side="right"))
+        next_codes, next_indices = np.unique(self.buffer_codes[:ahead], return_index=True)
+        next_times = np.full(len(self.previous_times), np.nan)
+        next_positions = self.previous_positions.copy()
+        next_times[next_codes] = self.buffer_times[next_indices]
+        next_positions[next_codes] = self.buffer_positions[next_indices]
+
+        with np.errstate(invalid="ignore"):
+            gaps = next_times - self.previous_times
+            interpolated = gaps <= self.max_gap_s
+            # after its last sample, a UE stays for the step its sample was in
+            holding = ~interpolated & (time - self.previous_times < step_time)
+        in_trace = np.flatnonzero(interpolated | holding)
+
+        previous_positions = self.previous_positions[in_trace]
+        upcoming_positions = next_positions[in_trace]
+        fractions = np.where(
+            interpolated[in_trace],
+            (time - self.previous_times[in_trace]) / np.where(gaps[in_trace] > 0, gaps[in_trace], 1),
+            0,
+        )
+        positions = previous_positions + (upcoming_positions - previous_positions) * fractions[:, None]
+        distances = np.hypot(*(upcoming_positions - previous_positions).T)
+        speeds = np.where(
+            interpolated[in_trace],
+            distances / np.where(gaps[in_trace] > 0, gaps[in_trace], 1),
+            0,
+        )
+        return (
+            [self.ue_ids[code] for code in in_trace.tolist()],
+            positions,
+            upcoming_positions,
+            speeds,
+        )
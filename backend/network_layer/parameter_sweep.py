@@ -0,0 +1,376 @@
+"""Parallel parameter sweeps of headless simulations.
+
+Usage (from the backend directory):
+    python -m network_layer.parameter_sweep --grid sweep.json --output sweep_results.csv
+
+sweep.json:
+    {
+        "parameters": {
+            "rrc.A3.power_threshold": [1, 3, 5],
+            "rrc.A3.time_to_trigger_in_sim_steps": [1, 3],
+            "cell.n258.cell_individual_offset_dBm": [7, 13],
+            "slice.eMBB.GBR_DL": [5e6, 10e6]
+        },
+        "seeds": [1, 2, 3],
+        "steps": 300,
+        "warmup_steps": 30,
+        "ai_service_subscriptions": {"facebook-convnext-tiny-224": 10}
+    }
+
+Parameter names:
+    rrc.<event_id>.<key>          RRC measurement event config of every base station (of the default topology), e.g. rrc.A3.power_threshold
+    cell.<band|*>.<key>           init data of the cells of a frequency band (or all cells), e.g. cell.n78.transmit_power_dBm
+    slice.<slice_type>.<key>      QoS profile of a network slice, e.g. slice.URLLC.GBR_DL
+    settings.<NAME>               any other setting, e.g. settings.UE_DEFAULT_MAX_COUNT
+
+AI service subscriptions (optional): AI service name -> number of UEs subscribed to it after the warm-up,
+so the runs report AI service latencies (the requests are answered by the in-memory container runtime).
+
+Every combination of parameter values is run once per seed, each run in a fresh worker process,
+so the runs are isolated from each other (the simulation engine and the settings are per process).
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import settings
+from .topology import get_default_topology
+from .ue import RRC_CONNECTED
+from .what_if import init_headless_process, summarize_step
+
+logger = logging.getLogger(__name__)
+
+SWEEP_KPIS = [
+    "mean_ue_count",
+    "mean_downlink_bitrate_mbps",
+    "mean_downlink_sinr",
+    "mean_downlink_cqi",
+    "mean_cell_load",
+    "handovers",
+    "handover_rate_per_ue_minute",
+    "ping_pongs",
+    "ping_pong_rate",
+    "mean_ai_service_latency_ms",
+]
+
+
+class ParameterSweepError(ValueError):
+    pass
+
+
+def apply_parameter(name, value):
+    """Apply a sweep parameter to the settings (of this worker process), before the network setup."""
+    kind, _, path = name.partition(".")
+    if kind == "settings":
+        if not hasattr(settings, path):
+            raise ParameterSweepError(f"Unknown setting '{path}'.")
+        setattr(settings, path, value)
+        return
+
+    target, _, key = path.partition(".")
+    if not target or not key:
+        raise ParameterSweepError(f"Invalid parameter name '{name}'.")
+    updated = 0
+    if kind == "rrc":
+        for bs_init_data in get_default_topology()["bs_list"]:
+            for event in bs_init_data["rrc_measurement_events"]:
+                if event["event_id"] == target:
+                    event[key] = value
+                    updated += 1
+    elif kind == "cell":
+        for bs_init_data in get_default_topology()["bs_list"]:
+            for cell_init_data in bs_init_data["cell_list"]:
+                if target == "*" or cell_init_data["frequency_band"] == target:
+                    if key not in cell_init_data:
+                        raise ParameterSweepError(f"Unknown cell parameter '{key}'.")
+                    cell_init_data[key] = value
+                    updated += 1
+    elif kind == "slice":
+        if target not in settings.NETWORK_SLICES:
+            raise ParameterSweepError(f"Unknown network slice '{target}'.")
+        if key not in settings.NETWORK_SLICES[target]:
+            raise ParameterSweepError(f"Unknown slice parameter '{key}'.")
+        settings.NETWORK_SLICES[target][key] = value
+        updated += 1
+    else:
+        raise ParameterSweepError(
+            f"Invalid parameter name '{name}', expected rrc.*, cell.*, slice.* or settings.*"
+        )
+    if updated == 0:
+        raise ParameterSweepError(f"Parameter '{name}' does not match any {kind}.")
+
+
+class HandoverTracker:
+    """Counts handovers and ping-pongs (a handover back to the previous cell within the ping-pong window)."""
+
+    def __init__(self, ping_pong_window_seconds):
+        self.ping_pong_window_seconds = ping_pong_window_seconds
+        self.serving_cells = {}  # UE IMSI -> cell ID
+        self.last_handovers = {}  # UE IMSI -> (source cell ID, target cell ID, sim time)
+        self.handovers = 0
+        self.ping_pongs = 0
+
+    def update(self, simulation_engine):
+        serving_cells = {}
+        for ue in simulation_engine.ue_list.values():
+            cell_id = ue.current_cell.cell_id if ue.current_cell else None
+            serving_cells[ue.ue_imsi] = cell_id
+            previous_cell_id = self.serving_cells.get(ue.ue_imsi, None)
+            if previous_cell_id is None or cell_id is None or previous_cell_id == cell_id:
+                continue
+            if ue.rrc_state != RRC_CONNECTED:
+                # idle mode cell reselection, not a handover
+                continue
+            self.handovers += 1
+            last_handover = self.last_handovers.get(ue.ue_imsi, None)
+            if (
+                last_handover is not None
+                and last_handover[0] == cell_id
+                and last_handover[1] == previous_cell_id
+                and simulation_engine.sim_time - last_handover[2]
+                <= self.ping_pong_window_seconds
+            ):
+                self.ping_pongs += 1
+            self.last_handovers[ue.ue_imsi] = (
+                previous_cell_id,
+                cell_id,
+                simulation_engine.sim_time,
+            )
+        # UEs that left the network are forgotten, their IMSI may be reused
+        self.serving_cells = serving_cells
+        self.last_handovers = {
+            ue_imsi: handover
+            for ue_imsi, handover in self.last_handovers.items()
+            if ue_imsi in serving_cells
+        }
+
+
+def _mean(values):
+    values = [v for v in values if v is not None]
+    return float(np.mean(values)) if values else None
+
+
+def subscribe_ai_services(simulation_engine, ai_service_subscriptions):
+    """Subscribe the first UEs (by IMSI) of the network to AI services, ai_service_subscriptions: name -> UE count."""
+    from knowledge_layer.knowledge_sources.ai_service_knowledge import (
+        AI_SERVICE_NAME_MAP,
+    )
+
+    ue_ids = sorted(simulation_engine.ue_list.keys())
+    for ai_service_name, ue_count in ai_service_subscriptions.items():
+        if ai_service_name not in AI_SERVICE_NAME_MAP:
+            raise ParameterSweepError(f"Unknown AI service '{ai_service_name}'.")
+        simulation_engine.ric.ai_service_subscription_manager.create_subscription(
+            ai_service_name=ai_service_name,
+            ai_service_data=AI_SERVICE_NAME_MAP[ai_service_name],
+            ue_id_list=ue_ids[:ue_count],
+        )
+
+
+def run_simulation(
+    parameters, seed, steps, warmup_steps=0, ai_service_subscriptions=None
+):
+    """
+    Run one headless simulation in this (worker) process.
+
+    Args:
+        parameters (dict): Sweep parameter name -> value, see apply_parameter().
+        seed (int): Seed of the random number generators.
+        steps (int): Steps over which the KPIs are collected.
+        warmup_steps (int): Steps run before the KPIs are collected, e.g., while the UEs spawn.
+        ai_service_subscriptions (dict, optional): AI service name -> number of UEs subscribed after the warm-up.
+
+    Returns:
+        dict: SWEEP_KPIS -> value, plus "elapsed_seconds".
+    """
+    from .simulation_engine import SimulationEngine
+
+    started_at = time.perf_counter()
+    for name, value in parameters.items():
+        apply_parameter(name, value)
+
+    simulation_engine = SimulationEngine(seed=seed)
+    simulation_engine.reset_network()
+    simulation_engine.network_setup()
+
+    def step():
+        simulation_engine.sim_step += 1
+        simulation_engine.step(settings.SIM_STEP_TIME_DEFAULT)
+
+    for _ in range(warmup_steps):
+        step()
+    if ai_service_subscriptions:
+        subscribe_ai_services(simulation_engine, ai_service_subscriptions)
+
+    handover_tracker = HandoverTracker(settings.SIM_SWEEP_PING_PONG_WINDOW_SECONDS)
+    handover_tracker.update(simulation_engine)
+    handover_tracker.handovers = handover_tracker.ping_pongs = 0
+    previous_serving_cells = {}
+    step_kpis = []
+    ue_seconds = 0
+    for _ in range(steps):
+        step()
+        handover_tracker.update(simulation_engine)
+        step_kpis.append(summarize_step(simulation_engine, previous_serving_cells))
+        ue_seconds += len(simulation_engine.ue_list) * settings.SIM_STEP_TIME_DEFAULT
+
+    mean_bitrate = _mean([s["mean_downlink_bitrate"] for s in step_kpis])
+    handovers = handover_tracker.handovers
+    return {
+        "mean_ue_count": _mean([s["ue_count"] for s in step_kpis]),
+        "mean_downlink_bitrate_mbps": (
+            None if mean_bitrate is None else mean_bitrate / 1e6
+        ),
+        "mean_downlink_sinr": _mean([s["mean_downlink_sinr"] for s in step_kpis]),
+        "mean_downlink_cqi": _mean([s["mean_downlink_cqi"] for s in step_kpis]),
+        "mean_cell_load": _mean([s["mean_cell_load"] for s in step_kpis]),
+        "handovers": handovers,
+        "handover_rate_per_ue_minute": (
+            handovers / ue_seconds * 60 if ue_seconds > 0 else None
+        ),
+        "ping_pongs": handover_tracker.ping_pongs,
+        "ping_pong_rate": (
+            handover_tracker.ping_pongs / handovers if handovers > 0 else None
+        ),
+        "mean_ai_service_latency_ms": _mean(
+            [s["mean_ai_service_latency_ms"] for s in step_kpis]
+        ),
+        "elapsed_seconds": time.perf_counter() - started_at,
+    }
+
+
+def expand_grid(parameter_grid, seeds):
+    """[(run_id, parameters, seed)] for every combination of parameter values and every seed."""
+    names = list(parameter_grid.keys())
+    for name, values in parameter_grid.items():
+        if not isinstance(values, list) or not values:
+            raise ParameterSweepError(f"Parameter '{name}' needs a non-empty list of values.")
+    runs = []
+    for combination in itertools.product(*(parameter_grid[n] for n in names)):
+        for seed in seeds:
+            runs.append((len(runs), dict(zip(names, combination)), seed))
+    return runs
+
+
+def run_sweep(
+    parameter_grid,
+    seeds,
+    steps,
+    warmup_steps=0,
+    output_path=None,
+    max_workers=None,
+    ai_service_subscriptions=None,
+):
+    """
+    Run every combination of the parameter grid and seed in a process pool.
+
+    Args:
+        parameter_grid (dict): Parameter name -> list of values.
+        seeds (list[int]): Seeds each combination is run with.
+        steps (int): Steps per run over which the KPIs are collected.
+        warmup_steps (int): Steps per run before the KPIs are collected.
+        output_path (str, optional): CSV file the results are written to, one row per run, as the runs finish.
+        max_workers (int, optional): Worker processes, settings.SIM_SWEEP_WORKERS by default.
+        ai_service_subscriptions (dict, optional): AI service name -> number of UEs subscribed per run.
+
+    Returns:
+        list[dict]: One row per run, ordered by run ID.
+    """
+    runs = expand_grid(parameter_grid, seeds)
+    columns = (
+        ["run_id", "seed"]
+        + list(parameter_grid.keys())
+        + SWEEP_KPIS
+        + ["elapsed_seconds", "error"]
+    )
+    output_file = None
+    writer = None
+    if output_path:
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        output_file = open(output_path, "w", newline="")
+        writer = csv.DictWriter(output_file, fieldnames=columns)
+        writer.writeheader()
+
+    rows = []
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers or settings.SIM_SWEEP_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_headless_process,
+            # one fresh process per run, runs change the settings of their process
+            max_tasks_per_child=1,
+        ) as executor:
+            futures = {
+                executor.submit(
+                    run_simulation,
+                    parameters,
+                    seed,
+                    steps,
+                    warmup_steps,
+                    ai_service_subscriptions,
+                ): (run_id, parameters, seed)
+                for run_id, parameters, seed in runs
+            }
+            for future in as_completed(futures):
+                run_id, parameters, seed = futures[future]
+                row = {"run_id": run_id, "seed": seed, **parameters, "error": None}
+                try:
+                    row.update(future.result())
+                except Exception as e:
+                    logger.error(f"Sweep run {run_id} {parameters} seed={seed} failed: {e}")
+                    row["error"] = str(e)
+                rows.append(row)
+                logger.info(f"Sweep run {len(rows)}/{len(runs)} done: {row}")
+                if writer is not None:
+                    writer.writerow(row)
+                    output_file.flush()
+    finally:
+        if output_file is not None:
+            output_file.close()
+    return sorted(rows, key=lambda row: row["run_id"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a parameter sweep of headless simulations")
+    parser.add_argument("--grid", required=True, help="JSON file with the parameter grid")
+    parser.add_argument("--output", default="sweep_results.csv", help="CSV file for the results table")
+    parser.add_argument("--steps", type=int, default=None, help="Steps per run (overrides the grid file)")
+    parser.add_argument("--warmup-steps", type=int, default=None, help="Warm-up steps per run (overrides the grid file)")
+    parser.add_argument("--seeds", type=int, nargs="+", default=None, help="Seeds (overrides the grid file)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logger.setLevel(logging.INFO)
+    with open(args.grid, "r") as file:
+        grid = json.load(file)
+    rows = run_sweep(
+        grid.get("parameters", {}),
+        seeds=args.seeds or grid.get("seeds", [0]),
+        steps=args.steps or grid.get("steps", settings.SIM_SWEEP_DEFAULT_STEPS),
+        warmup_steps=(
+            args.warmup_steps
+            if args.warmup_steps is not None
+            else grid.get("warmup_steps", settings.SIM_SWEEP_DEFAULT_WARMUP_STEPS)
+        ),
+        output_path=args.output,
+        max_workers=args.workers,
+        ai_service_subscriptions=grid.get("ai_service_subscriptions", None),
+    )
+    failed = sum(1 for row in rows if row["error"])
+    print(f"{len(rows)} runs ({failed} failed), results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,557 @@
+"""Gym-style environments over the simulation engine, for training RIC policies offline.
+
+    env = RANEnv(disable_xapps=["xAppA3HandoverBlind"])
+    observation, info = env.reset(seed=1)
+    while True:
+        action = {
+            "handover": np.full(env.max_ue_count, -1),  # target cell index per UE slot, -1 keeps the serving cell
+            "cio": np.full(len(env.cell_ids), np.nan),  # cell individual offset (dB) per cell, NaN keeps it
+            "prb_share": ...,  # (cells, slices) downlink PRB share per slice, a NaN row shares all PRBs
+        }
+        observation, reward, terminated, truncated, info = env.step(action)
+        if terminated or truncated:
+            break
+
+Observations are float32 arrays (see CELL_FEATURES and UE_FEATURES):
+    "cell"     (cells, CELL_FEATURES)    KPIs of the cells, in the order of env.cell_ids
+    "ue"       (UE slots, UE_FEATURES)   KPIs of the UEs, UE IMSI_<n> is in slot n, "connected" is 0 for free slots
+    "ue_rsrp"  (UE slots, cells)         received power with CIO (dBm), RSRP_NOT_DETECTED_dBm for undetected cells
+
+VectorRANEnv batches independent environments, either in the calling process or across
+subprocess workers that write the observations straight into shared memory.
+"""
+
+import contextlib
+import logging
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import settings
+from utils import SimulationRNG
+from . import checkpoint
+from .topology import get_default_topology
+from .what_if import init_headless_process, stop_xapp
+
+logger = logging.getLogger(__name__)
+
+CELL_FEATURES = [
+    "dl_load",
+    "ul_load",
+    "connected_ue_count",
+    "cell_individual_offset_dBm",
+    "downlink_bitrate_mbps",
+]
+UE_FEATURES = [
+    "connected",
+    "serving_cell",  # index in env.cell_ids, -1 if not served
+    "slice",  # index in env.slice_types, -1 if not registered
+    "downlink_sinr",
+    "downlink_cqi",
+    "downlink_bitrate_mbps",
+    "position_x",
+    "position_y",
+]
+RSRP_NOT_DETECTED_dBm = -200.0
+
+
+def get_cell_ids():
+    return sorted(
+        cell_init_data["cell_id"]
+        for bs_init_data in get_default_topology()["bs_list"]
+        for cell_init_data in bs_init_data["cell_list"]
+    )
+
+
+def get_observation_shapes(cell_count, max_ue_count):
+    return {
+        "cell": (cell_count, len(CELL_FEATURES)),
+        "ue": (max_ue_count, len(UE_FEATURES)),
+        "ue_rsrp": (max_ue_count, cell_count),
+    }
+
+
+def downlink_bitrate_reward(env, info):
+    """Mean downlink bitrate of the connected UEs (Mbps), minus a penalty per agent handover."""
+    ue_observation = env.observation["ue"]
+    connected = ue_observation[:, UE_FEATURES.index("connected")] > 0
+    mean_bitrate_mbps = (
+        float(ue_observation[connected, UE_FEATURES.index("downlink_bitrate_mbps")].mean())
+        if connected.any()
+        else 0.0
+    )
+    return (
+        mean_bitrate_mbps
+        - settings.SIM_ENV_HANDOVER_PENALTY_MBPS * info["handovers"]
+    )
+
+
+class RANEnv:
+    """A simulated network stepped by a RIC policy, with the reset()/step() API of gym environments.
+
+    Args:
+        episode_steps (int, optional): Steps after which the episode is truncated.
+        warmup_steps (int, optional): Steps run at each reset before the first observation.
+        disable_xapps (list[str], optional): IDs of the xApps to stop, e.g., the built-in handover xApp
+            when the policy decides the handovers.
+        checkpoint_data (bytes, optional): Checkpoint (see network_layer/checkpoint.py) every episode starts from,
+            instead of a fresh network setup.
+        reward_fn (callable, optional): (env, info) -> reward, downlink_bitrate_reward by default.
+        quiet (bool): Discard what the simulation prints while stepping.
+    """
+
+    def __init__(
+        self,
+        episode_steps=None,
+        warmup_steps=None,
+        disable_xapps=None,
+        checkpoint_data=None,
+        reward_fn=None,
+        quiet=True,
+    ):
+        self.episode_steps = (
+            settings.SIM_ENV_EPISODE_STEPS if episode_steps is None else episode_steps
+        )
+        self.warmup_steps = (
+            settings.SIM_ENV_WARMUP_STEPS if warmup_steps is None else warmup_steps
+        )
+        self.disable_xapps = list(disable_xapps or [])
+        self.checkpoint_data = checkpoint_data
+        self.reward_fn = reward_fn or downlink_bitrate_reward
+        self.quiet = quiet
+
+        self.cell_ids = get_cell_ids()
+        self.cell_index = {cell_id: i for i, cell_id in enumerate(self.cell_ids)}
+        self.slice_types = list(settings.NETWORK_SLICES.keys())
+        self.slice_index = {
+            slice_type: i for i, slice_type in enumerate(self.slice_types)
+        }
+        self.max_ue_count = settings.UE_DEFAULT_MAX_COUNT
+        self.observation_shapes = get_observation_shapes(
+            len(self.cell_ids), self.max_ue_count
+        )
+        self.observation = {
+            key: np.zeros(shape, dtype=np.float32)
+            for key, shape in self.observation_shapes.items()
+        }
+
+        self.simulation_engine = None
+        self.episode_step = 0
+        # seeds the network of each episode, re-created by a seeded reset()
+        self.np_random = np.random.default_rng()
+        self._devnull = None
+
+    def set_observation_buffers(self, buffers):
+        """Write the observations into the given arrays (e.g., views of a shared batch) instead of own ones."""
+        for key, shape in self.observation_shapes.items():
+            assert buffers[key].shape == shape, f"Invalid buffer shape for {key}"
+        self.observation = buffers
+
+    @contextlib.contextmanager
+    def _output(self):
+        if not self.quiet:
+            yield
+            return
+        if self._devnull is None:
+            self._devnull = open(os.devnull, "w")
+        with contextlib.redirect_stdout(self._devnull):
+            yield
+
+    def _step_engine(self):
+        self.simulation_engine.sim_step += 1
+        self.simulation_engine.step(settings.SIM_STEP_TIME_DEFAULT)
+
+    def reset(self, seed=None, options=None):
+        from .simulation_engine import SimulationEngine
+
+        if seed is not None:
+            self.np_random = np.random.default_rng(seed)
+        episode_seed = int(self.np_random.integers(2**63))
+
+        with self._output():
+            simulation_engine = SimulationEngine(seed=episode_seed)
+            simulation_engine.reset_network()
+            if self.checkpoint_data is not None:
+                checkpoint.loads(simulation_engine, self.checkpoint_data)
+                # the episodes start from the same network but do not replay the same random draws
+                simulation_engine.rng = SimulationRNG(episode_seed)
+            else:
+                simulation_engine.network_setup()
+            # the observations are read from the state, no KPI history is needed
+            simulation_engine.kpi_recorder.enabled = False
+            assert (
+                sorted(simulation_engine.cell_list.keys()) == self.cell_ids
+            ), "The network cells do not match the observation layout."
+            for xapp_id in self.disable_xapps:
+                xapp = simulation_engine.ric.xapp_list.get(xapp_id, None)
+                if xapp is None:
+                    logger.warning(f"xApp {xapp_id} is not running, cannot disable it.")
+                    continue
+                stop_xapp(simulation_engine.ric, xapp)
+            self.simulation_engine = simulation_engine
+            for _ in range(self.warmup_steps):
+                self._step_engine()
+
+        self.episode_step = 0
+        return self.observe(), self.get_info()
+
+    def step(self, action):
+        assert self.simulation_engine is not None, "reset() must be called first"
+        with self._output():
+            info = self.apply_action(action)
+            self._step_engine()
+        self.episode_step += 1
+        observation = self.observe()
+        info.update(self.get_info())
+        reward = self.reward_fn(self, info)
+        truncated = self.episode_step >= self.episode_steps
+        return observation, reward, False, truncated, info
+
+    def apply_action(self, action):
+        """
+        Apply an action to the network before the next step.
+
+        Args:
+            action (dict): Any of
+                "handover" (UE slots,) int: target cell index, -1 keeps the serving cell.
+                    Handovers to cells the UE does not detect are rejected.
+                "cio" (cells,) float: cell individual offset (dB), clipped to settings.SIM_ENV_CIO_RANGE_dB, NaN keeps it.
+                "prb_share" (cells, slices) float: downlink PRB share of each slice (normalized if above 1),
+                    a row of NaN (or zeros) shares all PRBs of the cell between the slices.
+
+        Returns:
+            dict: {"handovers": executed handovers, "rejected_handovers": ...}
+        """
+        info = {"handovers": 0, "rejected_handovers": 0}
+        if not action:
+            return info
+        simulation_engine = self.simulation_engine
+
+        cio = action.get("cio", None)
+        if cio is not None:
+            cio_min, cio_max = settings.SIM_ENV_CIO_RANGE_dB
+            for i, value in enumerate(np.asarray(cio, dtype=float)):
+                if np.isnan(value):
+                    continue
+                simulation_engine.cell_list[
+                    self.cell_ids[i]
+                ].cell_individual_offset_dBm = float(np.clip(value, cio_min, cio_max))
+
+        prb_share = action.get("prb_share", None)
+        if prb_share is not None:
+            for i, shares in enumerate(np.asarray(prb_share, dtype=float)):
+                cell = simulation_engine.cell_list[self.cell_ids[i]]
+                shares = np.clip(np.nan_to_num(shares, nan=0.0), 0.0, None)
+                total = shares.sum()
+                if total <= 0:
+                    cell.slice_dl_prb_share = None
+                    continue
+                if total > 1:
+                    shares = shares / total
+                cell.slice_dl_prb_share = {
+                    slice_type: float(share)
+                    for slice_type, share in zip(self.slice_types, shares)
+                }
+
+        handover = action.get("handover", None)
+        if handover is not None:
+            handover = np.asarray(handover, dtype=int)
+            for slot in np.flatnonzero(handover >= 0):
+                ue = simulation_engine.ue_list.get(f"IMSI_{slot}", None)
+                target = handover[slot]
+                if (
+                    ue is None
+                    or ue.current_cell is None
+                    or target >= len(self.cell_ids)
+                ):
+                    info["rejected_handovers"] += 1
+                    continue
+                target_cell = simulation_engine.cell_list[self.cell_ids[target]]
+                if target_cell is ue.current_cell:
+                    continue
+                if target_cell.cell_id not in ue.downlink_received_power_dBm_dict:
+                    info["rejected_handovers"] += 1
+                    continue
+                ue.current_bs.execute_handover(ue, ue.current_cell, target_cell)
+                info["handovers"] += 1
+        return info
+
+    def _ue_slot(self, ue_imsi):
+        prefix, _, number = ue_imsi.partition("_")
+        if prefix != "IMSI" or not number.isdigit():
+            return None
+        slot = int(number)
+        return slot if slot < self.max_ue_count else None
+
+    def observe(self):
+        """Write the current network state into the observation arrays and return them."""
+        simulation_engine = self.simulation_engine
+        cell_observation = self.observation["cell"]
+        ue_observation = self.observation["ue"]
+        ue_rsrp = self.observation["ue_rsrp"]
+
+        for i, cell_id in enumerate(self.cell_ids):
+            cell = simulation_engine.cell_list[cell_id]
+            cell_observation[i] = (
+                cell.current_dl_load,
+                cell.current_ul_load,
+                len(cell.connected_ue_list),
+                cell.cell_individual_offset_dBm,
+                sum(ue.downlink_bitrate for ue in cell.connected_ue_list.values())
+                / 1e6,
+            )
+
+        ue_observation.fill(0)
+        ue_observation[:, 1:3] = -1
+        ue_rsrp.fill(RSRP_NOT_DETECTED_dBm)
+        for ue in simulation_engine.ue_list.values():
+            slot = self._ue_slot(ue.ue_imsi)
+            if slot is None:
+                continue
+            ue_observation[slot] = (
+                1.0 if ue.connected else 0.0,
+                self.cell_index[ue.current_cell.cell_id] if ue.current_cell else -1,
+                self.slice_index.get(ue.slice_type, -1),
+                ue.downlink_sinr,
+                ue.downlink_cqi,
+                ue.downlink_bitrate / 1e6,
+                ue.position_x,
+                ue.position_y,
+            )
+            for cell_id, cell_data in ue.downlink_received_power_dBm_dict.items():
+                ue_rsrp[slot, self.cell_index[cell_id]] = cell_data[
+                    "received_power_with_cio_dBm"
+                ]
+        return self.observation
+
+    def get_info(self):
+        return {
+            "sim_step": self.simulation_engine.sim_step,
+            "episode_step": self.episode_step,
+            "ue_count": len(self.simulation_engine.ue_list),
+        }
+
+    def close(self):
+        self.simulation_engine = None
+        if self._devnull is not None:
+            self._devnull.close()
+            self._devnull = None
+
+
+def _vector_env_worker(connection, env_indices, env_kwargs, settings_overrides):
+    """Loop of a VectorRANEnv subprocess, stepping the environments at env_indices of the batch."""
+    init_headless_process()
+    for name, value in settings_overrides.items():
+        setattr(settings, name, value)
+
+    envs = [RANEnv(**env_kwargs) for _ in env_indices]
+    # the observation shapes depend on the settings of the worker, the parent allocates the batch from them
+    connection.send(envs[0].observation_shapes)
+    shared_batch = connection.recv()  # key -> (shared memory name, batch shape)
+    shared_blocks = {
+        key: shared_memory.SharedMemory(name=name)
+        for key, (name, _) in shared_batch.items()
+    }
+    batch = {
+        key: np.ndarray(shape, dtype=np.float32, buffer=shared_blocks[key].buf)
+        for key, (_, shape) in shared_batch.items()
+    }
+    for env, index in zip(envs, env_indices):
+        env.set_observation_buffers({key: value[index] for key, value in batch.items()})
+
+    try:
+        while True:
+            command, data = connection.recv()
+            if command == "reset":
+                connection.send(
+                    [env.reset(seed=seed)[1] for env, seed in zip(envs, data)]
+                )
+            elif command == "step":
+                connection.send(
+                    [
+                        _step_with_autoreset(env, action)
+                        for env, action in zip(envs, data)
+                    ]
+                )
+            elif command == "close":
+                break
+    finally:
+        for env in envs:
+            env.close()
+        del batch
+        for block in shared_blocks.values():
+            block.close()
+        connection.close()
+
+
+def _step_with_autoreset(env, action):
+    observation, reward, terminated, truncated, info = env.step(action)
+    if terminated or truncated:
+        # the final observation is copied before the reset overwrites it
+        info["final_observation"] = {
+            key: value.copy() for key, value in observation.items()
+        }
+        _, info["reset_info"] = env.reset()
+    return reward, terminated, truncated, info
+
+
+class VectorRANEnv:
+    """A batch of independent RANEnv instances stepped together.
+
+    Observations are arrays with the batch as first dimension, e.g., (num_envs, cells, CELL_FEATURES),
+    the same arrays are updated in place by every reset() and step().
+    An environment whose episode ends is reset right away, the observation of its last step is in
+    info["final_observation"].
+
+    Args:
+        num_envs (int): Number of environments.
+        workers (int, optional): Subprocesses the environments are spread across (settings.SIM_ENV_WORKERS by default),
+            0 steps all of them in the calling process. The subprocesses write the observations into shared memory.
+        env_kwargs (dict, optional): Arguments of each RANEnv.
+        settings_overrides (dict, optional): settings name -> value, applied in the subprocesses.
+    """
+
+    def __init__(self, num_envs, workers=None, env_kwargs=None, settings_overrides=None):
+        self.num_envs = num_envs
+        workers = settings.SIM_ENV_WORKERS if workers is None else workers
+        self.workers = min(workers, num_envs)
+        env_kwargs = env_kwargs or {}
+        settings_overrides = settings_overrides or {}
+
+        self.envs = []
+        self.processes = []
+        self.connections = []
+        self.shared_blocks = []
+        self.closed = False
+
+        if self.workers == 0:
+            for name, value in settings_overrides.items():
+                setattr(settings, name, value)
+            self.envs = [RANEnv(**env_kwargs) for _ in range(num_envs)]
+            self.observation = {
+                key: np.zeros((num_envs,) + shape, dtype=np.float32)
+                for key, shape in self.envs[0].observation_shapes.items()
+            }
+            for i, env in enumerate(self.envs):
+                env.set_observation_buffers(
+                    {key: value[i] for key, value in self.observation.items()}
+                )
+            return
+
+        context = multiprocessing.get_context("spawn")
+        self.env_indices = [
+            indices.tolist()
+            for indices in np.array_split(np.arange(num_envs), self.workers)
+        ]
+        for indices in self.env_indices:
+            parent_connection, child_connection = context.Pipe()
+            process = context.Process(
+                target=_vector_env_worker,
+                args=(child_connection, indices, env_kwargs, settings_overrides),
+                daemon=True,
+            )
+            process.start()
+            child_connection.close()
+            self.connections.append(parent_connection)
+            self.processes.append(process)
+
+        observation_shapes = [connection.recv() for connection in self.connections]
+        assert all(
+            shapes == observation_shapes[0] for shapes in observation_shapes
+        ), "The workers report different observation shapes."
+        self.observation = {}
+        shared_batch = {}
+        for key, shape in observation_shapes[0].items():
+            shape = (num_envs,) + tuple(shape)
+            block = shared_memory.SharedMemory(
+                create=True, size=int(np.prod(shape)) * np.dtype(np.float32).itemsize
+            )
+            self.shared_blocks.append(block)
+            self.observation[key] = np.ndarray(shape, dtype=np.float32, buffer=block.buf)
+            self.observation[key].fill(0)
+            shared_batch[key] = (block.name, shape)
+        for connection in self.connections:
+            connection.send(shared_batch)
+
+    def reset(self, seed=None):
+        """
+        Reset all environments, environment i is seeded with seed + i.
+
+        Returns:
+            tuple: (observation, infos)
+        """
+        seeds = [None if seed is None else seed + i for i in range(self.num_envs)]
+        if self.workers == 0:
+            infos = [env.reset(seed=seed)[1] for env, seed in zip(self.envs, seeds)]
+            return self.observation, infos
+
+        for connection, indices in zip(self.connections, self.env_indices):
+            connection.send(("reset", [seeds[i] for i in indices]))
+        infos = []
+        for connection in self.connections:
+            infos += connection.recv()
+        return self.observation, infos
+
+    def step(self, actions):
+        """
+        Step all environments.
+
+        Args:
+            actions (list[dict]): The action of each environment, see RANEnv.apply_action().
+
+        Returns:
+            tuple: (observation, rewards, terminated, truncated, infos)
+        """
+        assert len(actions) == self.num_envs, "Expected one action per environment"
+        if self.workers == 0:
+            results = [
+                _step_with_autoreset(env, action)
+                for env, action in zip(self.envs, actions)
+            ]
+        else:
+            # all workers step at the same time
+            for connection, indices in zip(self.connections, self.env_indices):
+                connection.send(("step", [actions[i] for i in indices]))
+            results = []
+            for connection in self.connections:
+                results += connection.recv()
+
+        rewards, terminated, truncated, infos = zip(*results)
+        return (
+            self.observation,
+            np.array(rewards, dtype=np.float32),
+            np.array(terminated, dtype=bool),
+            np.array(truncated, dtype=bool),
+            list(infos),
+        )
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for env in self.envs:
+            env.close()
+        for connection in self.connections:
+            try:
+                connection.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for connection in self.connections:
+            connection.close()
+        self.observation = None
+        for block in self.shared_blocks:
+            block.close()
+            block.unlink()
+        self.shared_blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -17,6 +17,7 @@ class RIC:
         self.simulation_engine = simulation_engine
         self.xapp_list = {}
         self.ai_service_subscription_manager = AIServiceSubscriptionManager(ric=self)
+        self.ai_service_subscription_manager.start()
 
     @property
     def base_station_list(self):
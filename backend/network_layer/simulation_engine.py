@@ -1,35 +1,184 @@
 import asyncio
 import json
-import random
+import os
+import time
 
-from utils import get_random_ue_operational_region
+from utils import SimulationRNG, get_random_ue_operational_region
+from . import checkpoint
 from .core_network import CoreNetwork
 from .base_station import BaseStation
 from .cell import Cell
+from .edge_resource_ledger import EdgeResourceLedger
+from .kpi_recorder import KPIRecorder
+from .mobility import get_mobility_model
+from .simulation_snapshot import SimulationSnapshot, SnapshotObject
+from .simulation_scheduler import get_simulation_scheduler
+from .simulation_trace import SimulationTraceWriter, SimulationTraceReplay
+from .topology import get_default_topology
 from .ric import RIC
 from .ue import UE
 import settings
-import utils
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class SimulationEngine(metaclass=utils.SingletonMeta):
-    def __init__(self):
-        self.websocket = utils.WebSocketSingleton().get_websocket()
+class SimulationEngine:
+    def __init__(self, websocket=None, seed=None, node_resource_ledgers=None):
+        # frontend connection the state updates are sent to, None for headless simulations
+        self.websocket = websocket
+        # seed of the random number streams, settings.SIM_RANDOM_SEED if None
+        self.seed = seed
+        self.rng = SimulationRNG(
+            self.seed if self.seed is not None else settings.SIM_RANDOM_SEED
+        )
+        # moves all UEs at once each step, settings.UE_MOBILITY_MODEL
+        self.mobility = get_mobility_model()
         self.core_network = None
         self.ric = None
 
         self.base_station_list = {}
         self.cell_list = {}
         self.ue_list = {}
+        # edge_id -> EdgeResourceLedger, see settings.RAN_EDGE_RESOURCE_ACCOUNTING_MODE
+        self.edge_resource_ledgers = {}
+        # node_id -> EdgeResourceLedger of the shared edge nodes: the SimulationRegistry's for the engines of
+        # its sessions, which run their containers on the same nodes, engines running on their own
+        # (e.g., sweep and what-if runs) account for their own
+        self.node_resource_ledgers = (
+            {} if node_resource_ledgers is None else node_resource_ledgers
+        )
+        # area (m) the base stations and UEs are placed in, set by the network topology
+        self.coverage_width = settings.NETWORK_COVERAGE_WIDTH
+        self.coverage_height = settings.NETWORK_COVERAGE_HEIGHT
 
         self.sim_started = False
+        # checkpoints being taken in the background, the scheduler does not step the engine meanwhile
+        self.checkpoint_holds = 0
         self.sim_step = 0
+        # simulated seconds since the network setup, the time axis of the KPI history
+        self.sim_time = 0.0
+        self.kpi_recorder = KPIRecorder(self)
+        # bumped whenever the network state moves on (step, reset, setup), readers use it to invalidate caches
+        self.state_version = 0
+        # bumped whenever the cells or their radio configuration change (see Cell.__setattr__), the UEs
+        # then recompute their measurements of the changed cells
+        self.radio_config_version = 0
+        # read-only view of the network state at the last step boundary, captured when first read, see get_snapshot()
+        self.snapshot = None
+        # on-disk trace of the steps being recorded, see network_layer/simulation_trace.py
+        self.trace_writer = None
+        # recorded trace being replayed, its current step is served instead of the live state
+        self.trace_replay = None
+        # task sending the frames of the replayed trace, see play_trace_replay()
+        self.trace_replay_task = None
 
         self.logs = []
 
+    def expire_snapshot(self):
+        """
+        Called before the network state changes: the snapshot of the current step boundary must not
+        copy the changed state. The next get_snapshot() captures a new one, steps nobody reads are never copied.
+        """
+        if self.snapshot is not None:
+            self.snapshot.expire()
+            self.snapshot = None
+
+    def get_snapshot(self):
+        """
+        Get the read-only snapshot of the simulation state published at the last step boundary.
+
+        Knowledge queries, agent tools and state updates should read the snapshot instead of the live
+        engine, so that they always see a consistent step and never race with the stepper.
+        Changes to the network must still go through the live engine.
+        """
+        if isinstance(self, SnapshotObject):
+            return self
+        if self.trace_replay is not None:
+            return self.trace_replay.get_snapshot()
+        if self.snapshot is None or self.snapshot.state_version != self.state_version:
+            # the stepper is synchronous, so readers always run at a step boundary
+            self.expire_snapshot()
+            self.snapshot = SimulationSnapshot.capture(self)
+        return self.snapshot.engine
+
+    def start_trace_recording(self, trace_dir=None):
+        """
+        Start streaming the state of every following step to an on-disk trace.
+
+        Args:
+            trace_dir (str, optional): An empty or new directory for the trace,
+                by default a timestamped directory under settings.SIM_TRACE_DIRECTORY.
+
+        Returns:
+            str: The trace directory.
+        """
+        if self.trace_writer is not None:
+            return self.trace_writer.trace_dir
+        if trace_dir is None:
+            trace_dir = os.path.join(
+                settings.SIM_TRACE_DIRECTORY, time.strftime("%Y%m%d-%H%M%S")
+            )
+        self.trace_writer = SimulationTraceWriter(trace_dir)
+        logger.info(f"Recording simulation trace to {trace_dir}")
+        return trace_dir
+
+    def stop_trace_recording(self):
+        if self.trace_writer is None:
+            return None
+        trace_writer = self.trace_writer
+        self.trace_writer = None
+        trace_writer.close()
+        return trace_writer.trace_dir
+
+    def open_trace_replay(self, trace_dir):
+        """
+        Replay a recorded trace. Until close_trace_replay() is called, get_snapshot() returns the
+        state of the current replay step, so knowledge queries and state reads are served from the trace.
+        """
+        self.close_trace_replay()
+        self.sim_started = False
+        self.trace_replay = SimulationTraceReplay(trace_dir)
+        logger.info(
+            f"Replaying simulation trace {trace_dir} ({self.trace_replay.trace.step_count} steps)"
+        )
+        return self.trace_replay
+
+    def play_trace_replay(self, websocket, speed=1.0):
+        """Send the frames of the replayed trace to the websocket, in a task of the running event loop."""
+        if self.trace_replay_task is not None:
+            self.trace_replay_task.cancel()
+        self.trace_replay_task = asyncio.create_task(
+            self.trace_replay.play(websocket, speed=speed)
+        )
+        return self.trace_replay_task
+
+    def close_trace_replay(self):
+        if self.trace_replay_task is not None:
+            # also ends a replay blocked in a send to a closed websocket
+            self.trace_replay_task.cancel()
+            self.trace_replay_task = None
+        if self.trace_replay is None:
+            return
+        self.trace_replay.stop()
+        self.trace_replay = None
+
+    def save_checkpoint(self, path=None):
+        """Save the network state to a checkpoint file, see network_layer/checkpoint.py."""
+        return checkpoint.save_checkpoint(self, path)
+
+    async def save_checkpoint_in_background(self, path=None):
+        """save_checkpoint() off the event loop, the engine is not stepped until the checkpoint is taken."""
+        return await checkpoint.save_checkpoint_in_background(self, path)
+
+    def load_checkpoint(self, path):
+        """Restore the network state from a checkpoint file, e.g., to start from a warmed-up network."""
+        return checkpoint.load_checkpoint(self, path)
+
+    def get_checkpoint_path(self, name):
+        """Path of a checkpoint name sent by a client, see checkpoint.get_checkpoint_path()."""
+        return checkpoint.get_checkpoint_path(name)
+
     def add_base_station(self, bs):
         assert isinstance(bs, BaseStation)
         assert bs.simulation_engine == self
@@ -39,30 +188,105 @@ class SimulationEngine(metaclass=utils.SingletonMeta):
         for cell in bs.cell_list.values():
             self.add_cell(cell)
 
+    def get_edge_resource_ledger(self, edge_server):
+        if settings.RAN_EDGE_RESOURCE_ACCOUNTING_MODE != "per_edge":
+            return self.get_node_resource_ledger(
+                edge_server.node_id,
+                edge_server.cpu_memory_GB,
+                edge_server.device_memory_GB,
+            )
+        if edge_server.edge_id not in self.edge_resource_ledgers:
+            self.edge_resource_ledgers[edge_server.edge_id] = EdgeResourceLedger(
+                ledger_id=edge_server.edge_id,
+                cpu_memory_GB=edge_server.cpu_memory_GB,
+                device_memory_GB=edge_server.device_memory_GB,
+            )
+        return self.edge_resource_ledgers[edge_server.edge_id]
+
+    def get_node_resource_ledger(self, node_id, cpu_memory_GB, device_memory_GB):
+        """The ledger of a shared edge node, the memory of a node is the one of the first edge server on it."""
+        if node_id not in self.node_resource_ledgers:
+            self.node_resource_ledgers[node_id] = EdgeResourceLedger(
+                ledger_id=node_id,
+                cpu_memory_GB=cpu_memory_GB,
+                device_memory_GB=device_memory_GB,
+            )
+        return self.node_resource_ledgers[node_id]
+
+    def get_node_resource_reservations(self):
+        """
+        The memory the containers of this engine reserve on the shared edge nodes.
+
+        Returns:
+            dict: node_id -> {container_name: (cpu_memory_GB, device_memory_GB)}
+        """
+        reservations = {}
+        for base_station in self.base_station_list.values():
+            edge_server = base_station.edge_server
+            ledger = edge_server.resource_ledger
+            if self.node_resource_ledgers.get(ledger.ledger_id, None) is not ledger:
+                continue
+            node_reservations = reservations.setdefault(ledger.ledger_id, {})
+            for container_name in edge_server.get_container_names():
+                if container_name in ledger.reservations:
+                    node_reservations[container_name] = ledger.reservations[container_name]
+        return reservations
+
     def add_cell(self, cell):
         assert isinstance(cell, Cell)
         assert cell.cell_id is not None
         assert cell.cell_id not in self.cell_list
         self.cell_list[cell.cell_id] = cell
+        # a new cell to measure for every UE
+        self.radio_config_version += 1
+        cell.radio_config_version = self.radio_config_version
 
     def reset_network(self):
         logger.info("Resetting network...")
+        self.expire_snapshot()
+        for base_station in self.base_station_list.values():
+            base_station.edge_server.undeploy_all_ai_services()
+            if base_station.edge_server.warm_pool is not None:
+                base_station.edge_server.warm_pool.clear()
         self.base_station_list = {}
         self.cell_list = {}
         self.ue_list = {}
+        # the node ledgers stay, possibly shared with other sessions, the containers above released their memory
+        self.edge_resource_ledgers = {}
         self.global_UE_counter = 0
         self.sim_started = False
         self.sim_step = 0
+        self.sim_time = 0.0
+        self.kpi_recorder.clear()
         self.logs = []
         self.core_network = None
         self.ric = None
-        logger.info("Network reset complete.")
+        # every network starts from the seed, so runs with the same seed are identical
+        self.rng = SimulationRNG(
+            self.seed if self.seed is not None else settings.SIM_RANDOM_SEED
+        )
+        self.mobility = get_mobility_model()
+        self.radio_config_version += 1
+        self.state_version += 1
+        logger.info(f"Network reset complete (random seed {self.rng.seed}).")
+
+    def network_setup(self, topology=None):
+        """
+        Set up the core network, the base stations and the RIC.
 
-    def network_setup(self):
+        Args:
+            topology (dict, optional): The base stations and coverage area (see network_layer/topology.py),
+                by default settings.RAN_DEFAULT_BS_LIST or the scenario of settings.NETWORK_TOPOLOGY_SCENARIO_FILE.
+        """
+        if topology is None:
+            topology = get_default_topology()
+        self.expire_snapshot()
+        self.coverage_width = topology["coverage_width"]
+        self.coverage_height = topology["coverage_height"]
         self.core_network = CoreNetwork(self)
 
         # init base station list
-        for bs_init_data in settings.RAN_DEFAULT_BS_LIST:
+        for bs_init_data in topology["bs_list"]:
             assert (
                 bs_init_data["bs_id"] not in self.base_station_list
             ), f"Base station ID {bs_init_data["bs_id"]} already exists"
@@ -77,23 +301,28 @@ class SimulationEngine(metaclass=utils.SingletonMeta):
         # so that the xApps can subscribe information from the base stations.
         self.ric = RIC(self)
         self.ric.load_xApps()
+        self.state_version += 1
 
     def spawn_random_ue(self):
-        ue_operation_region = get_random_ue_operational_region()
+        ue_operation_region = get_random_ue_operational_region(
+            self.rng, self.coverage_width, self.coverage_height
+        )
 
-        position_x = random.randint(
-            ue_operation_region["min_x"], ue_operation_region["max_x"]
+        position_x = self.rng.randint(
+            "spawning", ue_operation_region["min_x"], ue_operation_region["max_x"]
         )
-        position_y = random.randint(
-            ue_operation_region["min_y"], ue_operation_region["max_y"]
+        position_y = self.rng.randint(
+            "spawning", ue_operation_region["min_y"], ue_operation_region["max_y"]
         )
-        target_x = random.randint(
-            ue_operation_region["min_x"], ue_operation_region["max_x"]
+        target_x = self.rng.randint(
+            "mobility", ue_operation_region["min_x"], ue_operation_region["max_x"]
         )
-        target_y = random.randint(
-            ue_operation_region["min_y"], ue_operation_region["max_y"]
+        target_y = self.rng.randint(
+            "mobility", ue_operation_region["min_y"], ue_operation_region["max_y"]
+        )
+        speed_mps = self.rng.randint(
+            "spawning", settings.UE_speed_mps_MIN, settings.UE_speed_mps_MAX
         )
-        speed_mps = random.randint(settings.UE_speed_mps_MIN, settings.UE_speed_mps_MAX)
 
         # get the next available UE IMSI
         new_ue_IMSI = None
@@ -107,15 +336,54 @@ class SimulationEngine(metaclass=utils.SingletonMeta):
             logger.error("No available IMSI for new UE. Cannot spawn UE.")
             return None
 
-        ue = UE(
-            ue_imsi=new_ue_IMSI,
+        return self.spawn_ue_at(
+            new_ue_IMSI,
+            position_x,
+            position_y,
+            target_x,
+            target_y,
+            speed_mps,
             operation_region=ue_operation_region,
+        )
+
+    def spawn_ue_at(
+        self,
+        ue_imsi,
+        position_x,
+        position_y,
+        target_x,
+        target_y,
+        speed_mps,
+        operation_region=None,
+        connection_time=settings.UE_DEFAULT_TIMEOUT,
+    ):
+        """
+        Power up a UE at a given position and add it to the simulation.
+
+        Args:
+            operation_region (dict, optional): Region the UE moves in, the coverage area by default.
+            connection_time (float): Seconds until the UE deregisters.
+
+        Returns:
+            UE: The UE, None if it could not register (e.g., no cell detected).
+        """
+        if operation_region is None:
+            operation_region = {
+                "min_x": 0,
+                "min_y": 0,
+                "max_x": self.coverage_width,
+                "max_y": self.coverage_height,
+            }
+        ue = UE(
+            ue_imsi=ue_imsi,
+            operation_region=operation_region,
             position_x=position_x,
             position_y=position_y,
             target_x=target_x,
             target_y=target_y,
             speed_mps=speed_mps,
             simulation_engine=self,
+            connection_time=connection_time,
         )
         if not ue.power_up():
             logger.error(
@@ -131,6 +399,7 @@ class SimulationEngine(metaclass=utils.SingletonMeta):
         assert ue.ue_imsi is not None
         assert ue.ue_imsi not in self.ue_list
         self.ue_list[ue.ue_imsi] = ue
+        self.mobility.add_ue(ue, self.rng)
         self.global_UE_counter += 1
 
     def spawn_UEs(self):
@@ -144,7 +413,8 @@ class SimulationEngine(metaclass=utils.SingletonMeta):
             )
             return
 
-        number_of_UEs_to_spawn = random.randint(
+        number_of_UEs_to_spawn = self.rng.randint(
+            "spawning",
             settings.UE_DEFAULT_SPAWN_RATE_MIN,
             settings.UE_DEFAULT_SPAWN_RATE_MAX,
         )
@@ -160,24 +430,12 @@ class SimulationEngine(metaclass=utils.SingletonMeta):
             num_us_spawned += 1
 
     def step_UEs(self, delta_time):
+        # move all UEs (and give the ones that arrived their next targets) in one batch
+        self.mobility.step(self.ue_list, delta_time, self.rng)
+
         ue_to_remove = []
         for ue in self.ue_list.values():
             ue.step(delta_time)
-            if ue.target_reached:
-                logger.info(
-                    f"UE {ue.ue_imsi} reached target: ({ue.target_x}, {ue.target_y})"
-                )
-                # assign a new target for the UE
-                target_x = random.randint(
-                    ue.operation_region["min_x"],
-                    ue.operation_region["max_x"],
-                )
-                target_y = random.randint(
-                    ue.operation_region["min_y"],
-                    ue.operation_region["max_y"],
-                )
-                ue.set_target(target_x, target_y)
-
             if not ue.connected:
                 ue_to_remove.append(ue)
 
@@ -189,6 +447,7 @@ class SimulationEngine(metaclass=utils.SingletonMeta):
         assert isinstance(ue, UE)
         assert ue.ue_imsi in self.ue_list
         del self.ue_list[ue.ue_imsi]
+        self.mobility.remove_ue(ue)
         logger.info(f"UE {ue.ue_imsi} deregistered and removed from simulation.")
 
     def deregister_ue(self, ue_imsi):
@@ -199,11 +458,13 @@ class SimulationEngine(metaclass=utils.SingletonMeta):
         if not ue:
             logger.warning(f"UE {ue_imsi} not found in simulation.")
             return False
+        self.expire_snapshot()
         # Deregister from CoreNetwork
         if self.core_network:
             self.core_network.handle_deregistration_request(ue)
         # Remove from SimulationEngine's list
         del self.ue_list[ue_imsi]
+        self.mobility.remove_ue(ue)
         logger.info(f"UE {ue_imsi} deregistered and fully removed from simulation.")
         return True
 
@@ -226,6 +487,7 @@ class SimulationEngine(metaclass=utils.SingletonMeta):
                 f"Subscribed_slices for UE {ue_imsi} is not a valid list: {subscribed_slices}"
             )
             return False
+        self.expire_snapshot()
         # Update core network with slice subscription
         self.core_network.ue_subscription_data[ue_imsi] = subscribed_slices
         # Validate register_slice
@@ -236,12 +498,19 @@ class SimulationEngine(metaclass=utils.SingletonMeta):
             )
             return False
         # Generate parameters for new UE
-        op_region = {"min_x": 0, "min_y": 0, "max_x": 2000, "max_y": 2000}
-        pos_x = random.randint(op_region["min_x"], op_region["max_x"])
-        pos_y = random.randint(op_region["min_y"], op_region["max_y"])
-        target_x = random.randint(op_region["min_x"], op_region["max_x"])
-        target_y = random.randint(op_region["min_y"], op_region["max_y"])
-        speed_mps = random.randint(settings.UE_speed_mps_MIN, settings.UE_speed_mps_MAX)
+        op_region = {
+            "min_x": 0,
+            "min_y": 0,
+            "max_x": self.coverage_width,
+            "max_y": self.coverage_height,
+        }
+        pos_x = self.rng.randint("spawning", op_region["min_x"], op_region["max_x"])
+        pos_y = self.rng.randint("spawning", op_region["min_y"], op_region["max_y"])
+        target_x = self.rng.randint("mobility", op_region["min_x"], op_region["max_x"])
+        target_y = self.rng.randint("mobility", op_region["min_y"], op_region["max_y"])
+        speed_mps = self.rng.randint(
+            "spawning", settings.UE_speed_mps_MIN, settings.UE_speed_mps_MAX
+        )
         from .ue import UE
 
         ue = UE(
@@ -262,6 +531,7 @@ class SimulationEngine(metaclass=utils.SingletonMeta):
                 ue, requested_slice=attach_slice
             )
             self.ue_list[ue_imsi] = ue
+            self.mobility.add_ue(ue, self.rng)
             logger.info(
                 f"UE {ue_imsi} added and registered at runtime. Subscribed to slices: {subscribed_slices}. Registered on: {attach_slice}"
             )
@@ -285,11 +555,16 @@ class SimulationEngine(metaclass=utils.SingletonMeta):
             f"Simulation step {self.sim_step} started with delta_time {delta_time} seconds."
         )
 
+        self.expire_snapshot()
         self.logs = []
 
         # spawn new UEs if needed
         logger.info("Spawning new UEs if needed...")
-        self.spawn_UEs()
+        if self.mobility.controls_population:
+            # UEs enter and leave the network with the mobility model, e.g., a mobility trace
+            self.mobility.update_population(self, delta_time)
+        else:
+            self.spawn_UEs()
 
         # move UEs towards their targets, monitor signal quality, report measurement events ...
         logger.info("Stepping through UEs...")
@@ -302,32 +577,53 @@ class SimulationEngine(metaclass=utils.SingletonMeta):
         logger.info("Stepping through RIC...")
         self.step_ric(delta_time)
 
+        self.sim_time += delta_time
+        self.kpi_recorder.record(self.sim_time)
+        if self.trace_writer is not None:
+            self.trace_writer.write_step(self)
+
+        self.state_version += 1
+
     async def start_simulation(self):
         assert not self.sim_started
+        self.close_trace_replay()
+        simulation_scheduler = get_simulation_scheduler()
+        if simulation_scheduler.is_scheduled(self):
+            # the previous run was stopped within the current tick, its trace ends here
+            self.stop_trace_recording()
         self.sim_step = 0
         self.sim_started = True
+        if settings.SIM_TRACE_RECORDING_ENABLED:
+            self.start_trace_recording()
 
-        while self.sim_started and self.sim_step < settings.SIM_MAX_STEP:
-            print(f"\n========= TIME STEP: {self.sim_step} ==========\n")
-            self.sim_step += 1
-            self.step(settings.SIM_STEP_TIME_DEFAULT)
-            if self.websocket is None:
-                print("No websocket connection. Cannot send simulation state updates.")
-                continue
-            await self.websocket.send(
-                json.dumps(
-                    {
-                        "layer": "network_layer",
-                        "command": "simulation_state_update",
-                        "response": self.to_json(),
-                        "error": None,
-                    }
-                )
-            )
-            await asyncio.sleep(settings.SIM_STEP_TIME_DEFAULT)
+        # the scheduler steps all running simulations of the process, until this one is stopped
+        ended = await simulation_scheduler.run(self)
 
+        if ended:
+            self.stop_trace_recording()
         print("simulation ended")
 
+    def scheduled_step(self):
+        """Advance a running simulation by one step, called by the SimulationScheduler."""
+        print(f"\n========= TIME STEP: {self.sim_step} ==========\n")
+        self.sim_step += 1
+        self.step(settings.SIM_STEP_TIME_DEFAULT)
+
+    async def send_state_update(self):
+        if self.websocket is None:
+            print("No websocket connection. Cannot send simulation state updates.")
+            return
+        await self.websocket.send(
+            json.dumps(
+                {
+                    "layer": "network_layer",
+                    "command": "simulation_state_update",
+                    "response": self.to_json(),
+                    "error": None,
+                }
+            )
+        )
+
     def stop(self):
         self.sim_started = False
         self.logs.append("Simulation stopped")
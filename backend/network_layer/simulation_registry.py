@@ -0,0 +1,144 @@
+import contextvars
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+
+import settings
+from .simulation_engine import SimulationEngine
+
+logger = logging.getLogger(__name__)
+
+# session of the websocket connection (or evaluation run) the current task is serving,
+# copied into the tasks it creates, e.g., the agent runs and their tool calls
+_current_session = contextvars.ContextVar("simulation_session", default=None)
+
+_simulation_registry = None
+
+
+class SimulationSessionError(RuntimeError):
+    pass
+
+
+class SimulationSession:
+    """An independent simulated network: its simulation engine, knowledge router and frontend websocket."""
+
+    def __init__(self, session_id, websocket=None, node_resource_ledgers=None):
+        # the knowledge layer reads the network layer, so it is imported where the session is built
+        from knowledge_layer import KnowledgeRouter
+
+        self.session_id = session_id
+        self.websocket = websocket
+        self.created_at = time.time()
+        self.simulation_engine = SimulationEngine(
+            websocket=websocket, node_resource_ledgers=node_resource_ledgers
+        )
+        self.knowledge_router = KnowledgeRouter()
+        self.knowledge_router.import_routes(self.simulation_engine)
+
+    def close(self):
+        simulation_engine = self.simulation_engine
+        if simulation_engine.sim_started:
+            simulation_engine.stop()
+        simulation_engine.stop_trace_recording()
+        simulation_engine.close_trace_replay()
+        # removes the AI service containers (deployed and warm) of the session
+        simulation_engine.reset_network()
+
+    def to_json(self):
+        return {
+            "session_id": self.session_id,
+            "created_at": self.created_at,
+            "sim_started": self.simulation_engine.sim_started,
+            "sim_step": self.simulation_engine.sim_step,
+        }
+
+
+class SimulationRegistry:
+    """The simulation sessions hosted by this process."""
+
+    def __init__(self):
+        self.sessions = {}
+        # node_id -> EdgeResourceLedger, the sessions run their AI service containers on the same edge nodes
+        # (settings.RAN_EDGE_RESOURCE_ACCOUNTING_MODE "shared_node")
+        self.node_resource_ledgers = {}
+
+    def create_session(self, session_id=None, websocket=None):
+        if len(self.sessions) >= settings.SIM_MAX_SESSIONS:
+            raise SimulationSessionError(
+                f"The server already hosts the maximum of {settings.SIM_MAX_SESSIONS} simulations."
+            )
+        session_id = session_id or uuid.uuid4().hex[:12]
+        if session_id in self.sessions:
+            raise SimulationSessionError(f"Session {session_id} already exists.")
+        session = SimulationSession(
+            session_id,
+            websocket=websocket,
+            node_resource_ledgers=self.node_resource_ledgers,
+        )
+        self.sessions[session_id] = session
+        logger.info(
+            f"Simulation session {session_id} created ({len(self.sessions)} active)."
+        )
+        return session
+
+    def get_session(self, session_id):
+        return self.sessions.get(session_id, None)
+
+    def remove_session(self, session_id):
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            return
+        session.close()
+        logger.info(
+            f"Simulation session {session_id} closed ({len(self.sessions)} active)."
+        )
+
+    def to_json(self):
+        return [session.to_json() for session in self.sessions.values()]
+
+
+def get_simulation_registry():
+    global _simulation_registry
+    if _simulation_registry is None:
+        _simulation_registry = SimulationRegistry()
+    return _simulation_registry
+
+
+def set_current_session(session):
+    """Bind a session to the current context (and the tasks created from it), returns the reset token."""
+    return _current_session.set(session)
+
+
+def reset_current_session(token):
+    _current_session.reset(token)
+
+
+@contextmanager
+def use_session(session):
+    token = set_current_session(session)
+    try:
+        yield session
+    finally:
+        reset_current_session(token)
+
+
+def get_current_session():
+    session = _current_session.get()
+    if session is None:
+        raise SimulationSessionError(
+            "No simulation session is bound to the current context."
+        )
+    return session
+
+
+def get_current_simulation_engine():
+    return get_current_session().simulation_engine
+
+
+def get_current_knowledge_router():
+    return get_current_session().knowledge_router
+
+
+def get_current_websocket():
+    return get_current_session().websocket
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+
+import settings
+
+logger = logging.getLogger(__name__)
+
+_simulation_scheduler = None
+
+
+def get_simulation_scheduler():
+    global _simulation_scheduler
+    if _simulation_scheduler is None:
+        _simulation_scheduler = SimulationScheduler()
+    return _simulation_scheduler
+
+
+class SimulationScheduler:
+    """Steps every running simulation engine of the process from a single asyncio task.
+
+    At each tick (settings.SIM_STEP_TIME_DEFAULT seconds of wall time) every running engine is
+    stepped once, then the state updates of all engines are sent concurrently. Engines being
+    checkpointed in the background skip the tick. Engines leave
+    the schedule when they are stopped or reach settings.SIM_MAX_STEP.
+    """
+
+    def __init__(self):
+        # id(simulation engine) -> (simulation engine, future resolved when it leaves the schedule)
+        self.engines = {}
+        self.task = None
+
+    def is_scheduled(self, simulation_engine):
+        """Whether the engine is in the schedule, a stopped engine leaves it at the next tick."""
+        return id(simulation_engine) in self.engines
+
+    async def run(self, simulation_engine):
+        """
+        Schedule a started engine and wait until it stops.
+
+        Returns:
+            bool: True when the run ended, False when it was replaced by a new run of the engine
+                before it left the schedule (i.e., stopped and restarted within one tick).
+        """
+        loop = asyncio.get_running_loop()
+        previous = self.engines.get(id(simulation_engine), None)
+        if previous is not None and not previous[1].done():
+            previous[1].set_result(False)
+        done = loop.create_future()
+        self.engines[id(simulation_engine)] = (simulation_engine, done)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+        return await done
+
+    def _finish(self, simulation_engine, exception=None):
+        _, done = self.engines.pop(id(simulation_engine))
+        if done.done():
+            return
+        if exception is None:
+            done.set_result(True)
+        else:
+            done.set_exception(exception)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self.engines:
+            tick_started_at = loop.time()
+            stepped = []
+            for simulation_engine, _ in list(self.engines.values()):
+                if (
+                    not simulation_engine.sim_started
+                    or simulation_engine.sim_step >= settings.SIM_MAX_STEP
+                ):
+                    self._finish(simulation_engine)
+                    continue
+                if simulation_engine.checkpoint_holds:
+                    # a checkpoint of the engine is being taken, it skips this tick
+                    continue
+                try:
+                    simulation_engine.scheduled_step()
+                except Exception as e:
+                    logger.exception("Simulation step failed, stopping the simulation.")
+                    simulation_engine.sim_started = False
+                    self._finish(simulation_engine, e)
+                    continue
+                stepped.append(simulation_engine)
+
+            results = await asyncio.gather(
+                *(engine.send_state_update() for engine in stepped),
+                return_exceptions=True,
+            )
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.error(f"Failed to send a simulation state update: {result}")
+
+            # the tick length is kept regardless of how many engines were stepped
+            await asyncio.sleep(
+                max(
+                    settings.SIM_STEP_TIME_DEFAULT - (loop.time() - tick_started_at),
+                    0,
+                )
+            )
+
+    def to_json(self):
+        return {
+            "running_simulations": len(self.engines),
+        }
@@ -0,0 +1,187 @@
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# attributes of the simulation engine that are not part of the network state
+SNAPSHOT_EXCLUDED_ATTRIBUTES = {"snapshot", "trace_writer", "trace_replay"}
+# append-only attributes of the simulation engine shared with (not copied into) the snapshots
+SNAPSHOT_SHARED_ATTRIBUTES = {"kpi_recorder"}
+
+_frozen_classes = {}
+_IMMUTABLE_TYPES = {str, int, float, bool, type(None)}
+# attribute of a clone whose attributes have not been copied yet: (snapshot, original)
+_SOURCE_ATTRIBUTE = "_snapshot_source"
+
+
+class SnapshotMutationError(AttributeError):
+    pass
+
+
+class SnapshotExpiredError(RuntimeError):
+    pass
+
+
+class SnapshotObject:
+    """Base class of the read-only objects of simulation snapshots, including trace snapshots.
+
+    Readers tell a snapshot from the live simulation with isinstance(obj, SnapshotObject).
+    """
+
+    __slots__ = ()
+
+
+class FrozenNetworkObject(SnapshotObject):
+    """Read-only clone of a network layer object, its attributes are copied from the original when first read."""
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise SnapshotMutationError(
+            f"Cannot set attribute '{name}' of {type(self).__name__}: simulation snapshots are read-only."
+        )
+
+    def __delattr__(self, name):
+        raise SnapshotMutationError(
+            f"Cannot delete attribute '{name}' of {type(self).__name__}: simulation snapshots are read-only."
+        )
+
+    def __getattr__(self, name):
+        # only called for attributes that are not found, e.g., before the attributes are copied
+        source = object.__getattribute__(self, "__dict__").get(_SOURCE_ATTRIBUTE, None)
+        if source is None:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
+        snapshot, original = source
+        snapshot._copy_attributes(original, self)
+        return object.__getattribute__(self, name)
+
+
+def get_frozen_class(cls):
+    """Read-only subclass of a network layer class.
+
+    The subclass keeps the name, module and qualname of the original class so that repr(),
+    type(obj).__name__ and inspect.getsource() behave exactly as for the live object.
+    """
+    if cls not in _frozen_classes:
+        _frozen_classes[cls] = type(
+            cls.__name__,
+            (FrozenNetworkObject, cls),
+            {
+                "__module__": cls.__module__,
+                "__qualname__": cls.__qualname__,
+            },
+        )
+    return _frozen_classes[cls]
+
+
+_network_types = {}
+
+
+def _is_network_object(value):
+    value_type = type(value)
+    is_network_type = _network_types.get(value_type, None)
+    if is_network_type is None:
+        is_network_type = (
+            value_type.__module__.startswith("network_layer.")
+            and not issubclass(value_type, type)
+            and not issubclass(value_type, SnapshotObject)
+            and hasattr(value, "__dict__")
+        )
+        _network_types[value_type] = is_network_type
+    return is_network_type
+
+
+class SimulationSnapshot:
+    """A consistent, read-only view of the simulation state at a step boundary.
+
+    Every network layer object reachable from the simulation engine (base stations, cells, UEs,
+    edge servers, RIC, ...) is represented by a clone, an instance of a frozen subclass of its own
+    class. The attributes of a clone are copied from its original the first time one of them is
+    read: references between network objects are relinked to their clones and containers (dicts,
+    lists, sets, numpy arrays) are copied, as the stepper mutates them in place. Other values
+    (numbers, strings, enums, ...) are shared. A reader of a few UEs only copies these UEs (and
+    the containers they hold), not the whole network.
+
+    Methods and properties of the original classes keep working on the clones, so readers
+    can use a snapshot exactly like the live simulation engine. A snapshot is captured by
+    SimulationEngine.get_snapshot() the first time a state version is read, and expired by the
+    engine before its state changes: reading a clone of an expired snapshot whose attributes were
+    not copied yet raises SnapshotExpiredError instead of mixing two steps. Readers are synchronous,
+    they only hold a snapshot within a step boundary.
+    """
+
+    def __init__(self, simulation_engine):
+        self.simulation_engine = simulation_engine
+        self.state_version = simulation_engine.state_version
+        self.expired = False
+        self.clones = {}  # id(original) -> (original, clone)
+        self.copied_containers = {}  # id(original container) -> (original container, copy)
+        self.engine = self._clone(simulation_engine)
+
+    @classmethod
+    def capture(cls, simulation_engine):
+        return cls(simulation_engine)
+
+    def expire(self):
+        self.expired = True
+        self.clones = {}
+        self.copied_containers = {}
+
+    def _copy_attributes(self, original, clone):
+        if self.expired:
+            raise SnapshotExpiredError(
+                f"The snapshot of state version {self.state_version} expired before {type(original).__name__} "
+                "was read, read the current snapshot with get_snapshot()."
+            )
+        clone_dict = object.__getattribute__(clone, "__dict__")
+        del clone_dict[_SOURCE_ATTRIBUTE]
+        is_engine = original is self.simulation_engine
+        # e.g., caches of the stepper, not part of the state
+        excluded_attributes = getattr(type(original), "snapshot_excluded_attributes", ())
+        for name, value in original.__dict__.items():
+            if (is_engine and name in SNAPSHOT_EXCLUDED_ATTRIBUTES) or name in excluded_attributes:
+                clone_dict[name] = None
+                continue
+            if is_engine and name in SNAPSHOT_SHARED_ATTRIBUTES:
+                clone_dict[name] = value
+                continue
+            clone_dict[name] = self._relink(value)
+
+    def _clone(self, original):
+        entry = self.clones.get(id(original), None)
+        if entry is None:
+            clone = object.__new__(get_frozen_class(type(original)))
+            object.__getattribute__(clone, "__dict__")[_SOURCE_ATTRIBUTE] = (
+                self,
+                original,
+            )
+            entry = (original, clone)
+            self.clones[id(original)] = entry
+        return entry[1]
+
+    def _relink(self, value):
+        value_type = type(value)
+        if value_type in _IMMUTABLE_TYPES:
+            return value
+        if _is_network_object(value):
+            return self._clone(value)
+        if value_type in (dict, list, set, tuple) or isinstance(value, np.ndarray):
+            entry = self.copied_containers.get(id(value), None)
+            if entry is not None:
+                return entry[1]
+            if value_type is dict:
+                copied = {key: self._relink(item) for key, item in value.items()}
+            elif value_type is list:
+                copied = [self._relink(item) for item in value]
+            elif value_type is set:
+                copied = {self._relink(item) for item in value}
+            elif value_type is tuple:
+                copied = tuple(self._relink(item) for item in value)
+            else:
+                copied = value.copy()
+            self.copied_containers[id(value)] = (value, copied)
+            return copied
+        return value
@@ -0,0 +1,627 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+import settings
+from .base_station import BaseStation
+from .cell import Cell
+from .kpi_recorder import (
+    UE_KPI_ATTRIBUTES,
+    CELL_KPI_ATTRIBUTES,
+    BS_KPI_ATTRIBUTES,
+    get_ue_kpis,
+    get_cell_kpis,
+    get_bs_kpis,
+)
+from .simulation_snapshot import SnapshotObject, get_frozen_class
+from .ue import UE
+
+logger = logging.getLogger(__name__)
+
+TRACE_FORMAT = "ai-ran-sim-trace"
+TRACE_FORMAT_VERSION = 1
+TRACE_METADATA_FILE = "metadata.json"
+TRACE_FRAMES_FILE = "frames.bin"
+
+# table name -> (column name prefix, KPI attributes)
+TRACE_TABLES = {
+    "user_equipments": ("ue", UE_KPI_ATTRIBUTES),
+    "cells": ("cell", CELL_KPI_ATTRIBUTES),
+    "base_stations": ("bs", BS_KPI_ATTRIBUTES),
+}
+# event tables: ragged per step rows of int32/float32 columns
+TRACE_EVENT_COLUMNS = {
+    "handover": {"ue": np.int32, "source_cell": np.int32, "target_cell": np.int32},
+    "ai": {"ue": np.int32, "ai_service": np.int32, "latency_ms": np.float32},
+}
+
+
+class SimulationTraceError(Exception):
+    pass
+
+
+class _IdTable:
+    """Interns element IDs into dense int32 indices stored in the trace columns."""
+
+    def __init__(self, ids=None):
+        self.ids = list(ids or [])
+        self.indices = {element_id: i for i, element_id in enumerate(self.ids)}
+
+    def get_index(self, element_id):
+        if element_id is None:
+            return -1
+        index = self.indices.get(element_id, None)
+        if index is None:
+            index = len(self.ids)
+            self.ids.append(element_id)
+            self.indices[element_id] = index
+        return index
+
+
+class SimulationTraceWriter:
+    """Streams the per-step state of a simulation into a chunked, columnar trace directory.
+
+    Layout of a trace directory:
+        metadata.json           format, element ID tables, chunk index (rewritten after every chunk)
+        chunk_00000/
+            sim_step.npy, sim_time.npy                           one value per step
+            ue_offsets.npy, ue_id.npy, ue_serving_cell.npy,
+            ue_<kpi>.npy                                          one row per UE per step
+            cell_*.npy, bs_*.npy                                  same for cells and base stations
+            handover_*.npy, ai_*.npy                              handover and AI service latency events
+            frame_offsets.npy, frames.bin                         JSON simulation_state_update frames
+
+    Every step owns the rows offsets[i]:offsets[i + 1] of a table. Chunks are plain .npy files,
+    so readers memory-map them and seek to any step without parsing the rest of the run.
+    """
+
+    def __init__(self, trace_dir, chunk_steps=None, record_frames=None):
+        self.trace_dir = trace_dir
+        self.chunk_steps = chunk_steps or settings.SIM_TRACE_CHUNK_STEPS
+        self.record_frames = (
+            settings.SIM_TRACE_RECORD_FRAMES if record_frames is None else record_frames
+        )
+        os.makedirs(trace_dir, exist_ok=True)
+        if os.path.exists(os.path.join(trace_dir, TRACE_METADATA_FILE)):
+            raise SimulationTraceError(f"Trace directory {trace_dir} is not empty.")
+
+        self.trace_id = uuid.uuid4().hex[:8]
+        self.id_tables = {
+            "ue": _IdTable(),
+            "cell": _IdTable(),
+            "bs": _IdTable(),
+            "ai_service": _IdTable(),
+        }
+        self.chunks = []
+        self.step_count = 0
+        self.previous_serving_cells = {}  # ue index -> cell index
+        self.recorded_ai_responses = {}  # (ue imsi, subscription id) -> id of the response recorded
+        self.closed = False
+        self._reset_chunk()
+
+    def _reset_chunk(self):
+        self.chunk_columns = {"sim_step": [], "sim_time": []}
+        for prefix, attributes in TRACE_TABLES.values():
+            self.chunk_columns[f"{prefix}_offsets"] = [0]
+            self.chunk_columns[f"{prefix}_id"] = []
+            for attribute in attributes:
+                self.chunk_columns[f"{prefix}_{attribute}"] = []
+        self.chunk_columns["ue_serving_cell"] = []
+        for prefix, columns in TRACE_EVENT_COLUMNS.items():
+            self.chunk_columns[f"{prefix}_offsets"] = [0]
+            for column in columns:
+                self.chunk_columns[f"{prefix}_{column}"] = []
+        self.chunk_frames = []
+
+    def write_step(self, simulation_engine):
+        if self.closed:
+            raise SimulationTraceError("Cannot write to a closed trace.")
+        columns = self.chunk_columns
+        columns["sim_step"].append(simulation_engine.sim_step)
+        columns["sim_time"].append(simulation_engine.sim_time)
+
+        ue_ids = self.id_tables["ue"]
+        cell_ids = self.id_tables["cell"]
+        handovers = []
+        serving_cells = {}
+        for ue in simulation_engine.ue_list.values():
+            ue_index = ue_ids.get_index(ue.ue_imsi)
+            cell_index = cell_ids.get_index(
+                ue.current_cell.cell_id if ue.current_cell else None
+            )
+            columns["ue_id"].append(ue_index)
+            columns["ue_serving_cell"].append(cell_index)
+            for attribute, value in zip(UE_KPI_ATTRIBUTES, get_ue_kpis(ue)):
+                columns[f"ue_{attribute}"].append(value)
+
+            previous_cell_index = self.previous_serving_cells.get(ue_index, -1)
+            if previous_cell_index >= 0 and cell_index >= 0 and previous_cell_index != cell_index:
+                handovers.append((ue_index, previous_cell_index, cell_index))
+            serving_cells[ue_index] = cell_index
+        # UEs that left the network are dropped, so a reused IMSI does not count as a handover
+        self.previous_serving_cells = serving_cells
+        columns["ue_offsets"].append(len(columns["ue_id"]))
+
+        for cell in simulation_engine.cell_list.values():
+            columns["cell_id"].append(cell_ids.get_index(cell.cell_id))
+            for attribute, value in zip(CELL_KPI_ATTRIBUTES, get_cell_kpis(cell)):
+                columns[f"cell_{attribute}"].append(value)
+        columns["cell_offsets"].append(len(columns["cell_id"]))
+
+        for bs in simulation_engine.base_station_list.values():
+            columns["bs_id"].append(self.id_tables["bs"].get_index(bs.bs_id))
+            for attribute, value in zip(BS_KPI_ATTRIBUTES, get_bs_kpis(bs)):
+                columns[f"bs_{attribute}"].append(value)
+        columns["bs_offsets"].append(len(columns["bs_id"]))
+
+        for ue_index, source_cell_index, target_cell_index in handovers:
+            columns["handover_ue"].append(ue_index)
+            columns["handover_source_cell"].append(source_cell_index)
+            columns["handover_target_cell"].append(target_cell_index)
+        columns["handover_offsets"].append(len(columns["handover_ue"]))
+
+        for ue in simulation_engine.ue_list.values():
+            for subscription_id, response in ue.ai_service_responses.items():
+                # responses stay on the UE until its next request, record each one once
+                key = (ue.ue_imsi, subscription_id)
+                if self.recorded_ai_responses.get(key, None) == id(response):
+                    continue
+                self.recorded_ai_responses[key] = id(response)
+                columns["ai_ue"].append(ue_ids.get_index(ue.ue_imsi))
+                columns["ai_ai_service"].append(
+                    self.id_tables["ai_service"].get_index(response["ai_service_name"])
+                )
+                columns["ai_latency_ms"].append(response["latency"])
+        columns["ai_offsets"].append(len(columns["ai_ue"]))
+
+        if self.record_frames:
+            self.chunk_frames.append(
+                json.dumps(simulation_engine.to_json(), default=str).encode("utf-8")
+            )
+
+        self.step_count += 1
+        if len(columns["sim_step"]) >= self.chunk_steps:
+            self.flush()
+
+    def _column_dtype(self, name):
+        if name.endswith("_offsets"):
+            return np.int64
+        if name == "sim_step":
+            return np.int64
+        if name == "sim_time":
+            return np.float64
+        if name.endswith("_id") or name == "ue_serving_cell":
+            return np.int32
+        for prefix, columns in TRACE_EVENT_COLUMNS.items():
+            if name.startswith(f"{prefix}_") and name[len(prefix) + 1 :] in columns:
+                return columns[name[len(prefix) + 1 :]]
+        return np.float32
+
+    def flush(self):
+        step_count = len(self.chunk_columns["sim_step"])
+        if step_count == 0:
+            return
+        chunk_name = f"chunk_{len(self.chunks):05d}"
+        chunk_dir = os.path.join(self.trace_dir, chunk_name)
+        os.makedirs(chunk_dir, exist_ok=True)
+        for name, values in self.chunk_columns.items():
+            np.save(
+                os.path.join(chunk_dir, f"{name}.npy"),
+                np.array(
+                    [np.nan if v is None else v for v in values],
+                    dtype=self._column_dtype(name),
+                ),
+            )
+        if self.record_frames:
+            frame_offsets = np.zeros(step_count + 1, dtype=np.int64)
+            frame_offsets[1:] = np.cumsum([len(frame) for frame in self.chunk_frames])
+            with open(os.path.join(chunk_dir, TRACE_FRAMES_FILE), "wb") as file:
+                for frame in self.chunk_frames:
+                    file.write(frame)
+            np.save(os.path.join(chunk_dir, "frame_offsets.npy"), frame_offsets)
+
+        sim_times = self.chunk_columns["sim_time"]
+        self.chunks.append(
+            {
+                "name": chunk_name,
+                "first_step": self.step_count - step_count,
+                "step_count": step_count,
+                "first_sim_time": sim_times[0],
+                "last_sim_time": sim_times[-1],
+            }
+        )
+        self._write_metadata()
+        self._reset_chunk()
+
+    def _write_metadata(self):
+        metadata = {
+            "format": TRACE_FORMAT,
+            "version": TRACE_FORMAT_VERSION,
+            "trace_id": self.trace_id,
+            "created_at": time.time(),
+            "chunk_steps": self.chunk_steps,
+            "step_count": self.step_count,
+            "record_frames": self.record_frames,
+            "step_time": settings.SIM_STEP_TIME_DEFAULT,
+            "tables": {
+                table_name: {"prefix": prefix, "attributes": attributes}
+                for table_name, (prefix, attributes) in TRACE_TABLES.items()
+            },
+            "ids": {name: table.ids for name, table in self.id_tables.items()},
+            "chunks": self.chunks,
+        }
+        # write then rename, so readers never see a half written index
+        metadata_path = os.path.join(self.trace_dir, TRACE_METADATA_FILE)
+        with open(metadata_path + ".tmp", "w") as file:
+            json.dump(metadata, file)
+        os.replace(metadata_path + ".tmp", metadata_path)
+
+    def close(self):
+        if self.closed:
+            return
+        self.flush()
+        if not self.chunks:
+            self._write_metadata()
+        self.closed = True
+        logger.info(f"Trace {self.trace_dir} closed after {self.step_count} steps.")
+
+
+class SimulationTrace:
+    """Read access to a trace directory written by SimulationTraceWriter.
+
+    Chunks are memory-mapped on first access (the most recently used ones are kept open),
+    so seeking to a step only touches the pages of that step.
+    """
+
+    MAX_OPEN_CHUNKS = 8
+
+    def __init__(self, trace_dir):
+        self.trace_dir = trace_dir
+        metadata_path = os.path.join(trace_dir, TRACE_METADATA_FILE)
+        if not os.path.exists(metadata_path):
+            raise SimulationTraceError(f"No trace found in {trace_dir}.")
+        with open(metadata_path, "r") as file:
+            self.metadata = json.load(file)
+        if self.metadata.get("format") != TRACE_FORMAT:
+            raise SimulationTraceError(f"{trace_dir} is not a simulation trace.")
+        if self.metadata.get("version") != TRACE_FORMAT_VERSION:
+            raise SimulationTraceError(
+                f"Unsupported trace version {self.metadata.get('version')}."
+            )
+        self.trace_id = self.metadata["trace_id"]
+        self.chunks = self.metadata["chunks"]
+        # only completely written chunks are readable
+        self.step_count = sum(chunk["step_count"] for chunk in self.chunks)
+        self.ids = self.metadata["ids"]
+        self.id_indices = {
+            name: {element_id: i for i, element_id in enumerate(ids)}
+            for name, ids in self.ids.items()
+        }
+        self.open_chunks = OrderedDict()
+
+    def _get_chunk(self, chunk_index):
+        chunk = self.open_chunks.get(chunk_index, None)
+        if chunk is not None:
+            self.open_chunks.move_to_end(chunk_index)
+            return chunk
+        chunk_dir = os.path.join(self.trace_dir, self.chunks[chunk_index]["name"])
+        chunk = {}
+        for file_name in os.listdir(chunk_dir):
+            if file_name.endswith(".npy"):
+                chunk[file_name[:-4]] = np.load(
+                    os.path.join(chunk_dir, file_name), mmap_mode="r"
+                )
+        frames_path = os.path.join(chunk_dir, TRACE_FRAMES_FILE)
+        if os.path.exists(frames_path) and os.path.getsize(frames_path) > 0:
+            chunk["frames"] = np.memmap(frames_path, dtype=np.uint8, mode="r")
+        self.open_chunks[chunk_index] = chunk
+        if len(self.open_chunks) > self.MAX_OPEN_CHUNKS:
+            self.open_chunks.popitem(last=False)
+        return chunk
+
+    def locate(self, step):
+        """Returns (chunk_index, position of the step in the chunk)."""
+        if step < 0 or step >= self.step_count:
+            raise SimulationTraceError(
+                f"Step {step} is out of the trace range [0, {self.step_count})."
+            )
+        chunk_steps = self.metadata["chunk_steps"]
+        return step // chunk_steps, step % chunk_steps
+
+    def get_sim_time(self, step):
+        chunk_index, position = self.locate(step)
+        return float(self._get_chunk(chunk_index)["sim_time"][position])
+
+    def get_sim_step(self, step):
+        chunk_index, position = self.locate(step)
+        return int(self._get_chunk(chunk_index)["sim_step"][position])
+
+    def get_frame_bytes(self, step):
+        """The JSON encoded simulation state (SimulationEngine.to_json()) of a step."""
+        chunk_index, position = self.locate(step)
+        chunk = self._get_chunk(chunk_index)
+        if "frames" not in chunk:
+            raise SimulationTraceError("The trace was recorded without state frames.")
+        offsets = chunk["frame_offsets"]
+        return chunk["frames"][offsets[position] : offsets[position + 1]].tobytes()
+
+    def get_frame(self, step):
+        return json.loads(self.get_frame_bytes(step))
+
+    def get_rows(self, step, prefix):
+        """The rows of a table ("ue", "cell", "bs", "handover", "ai") at a step, as {column: array}."""
+        chunk_index, position = self.locate(step)
+        chunk = self._get_chunk(chunk_index)
+        offsets = chunk[f"{prefix}_offsets"]
+        start, end = offsets[position], offsets[position + 1]
+        return {
+            name[len(prefix) + 1 :]: np.asarray(values[start:end])
+            for name, values in chunk.items()
+            if name.startswith(f"{prefix}_") and name != f"{prefix}_offsets"
+        }
+
+    def find_step(self, sim_time):
+        """The last step recorded at or before sim_time (0 if none)."""
+        for chunk_index in range(len(self.chunks) - 1, -1, -1):
+            if self.chunks[chunk_index]["first_sim_time"] <= sim_time:
+                sim_times = self._get_chunk(chunk_index)["sim_time"]
+                position = int(np.searchsorted(sim_times, sim_time, side="right")) - 1
+                return self.chunks[chunk_index]["first_step"] + max(position, 0)
+        return 0
+
+    def get_history(
+        self,
+        table_name,
+        element_id,
+        attribute,
+        from_time=None,
+        to_time=None,
+        latest_time=None,
+    ):
+        """Same interface as KPIRecorder.get_history, served from the trace columns."""
+        table = self.metadata["tables"].get(table_name, None)
+        if table is None:
+            return f"No KPI history is recorded for {table_name}.", None
+        if attribute not in table["attributes"]:
+            return (
+                f"The history of '{attribute}' is not recorded. Recorded attributes: {', '.join(table['attributes'])}",
+                None,
+            )
+        prefix = table["prefix"]
+        element_index = self.id_indices[prefix].get(element_id, None)
+        if element_index is None:
+            return f"No KPI history is recorded for {element_id}.", None
+        if not self.chunks:
+            return "No KPI history has been recorded yet.", None
+
+        last_time = self.chunks[-1]["last_sim_time"]
+        if latest_time is None or latest_time > last_time:
+            latest_time = last_time
+        if from_time is None:
+            from_time = -np.inf
+        elif from_time < 0:
+            from_time = latest_time + from_time
+        if to_time is None:
+            to_time = latest_time
+        elif to_time < 0:
+            to_time = latest_time + to_time
+        to_time = min(to_time, latest_time)
+
+        all_sim_times = []
+        all_values = []
+        for chunk_index, chunk_info in enumerate(self.chunks):
+            if (
+                chunk_info["last_sim_time"] < from_time
+                or chunk_info["first_sim_time"] > to_time
+            ):
+                continue
+            chunk = self._get_chunk(chunk_index)
+            offsets = np.asarray(chunk[f"{prefix}_offsets"])
+            rows = np.flatnonzero(np.asarray(chunk[f"{prefix}_id"]) == element_index)
+            if len(rows) == 0:
+                continue
+            row_steps = np.searchsorted(offsets, rows, side="right") - 1
+            sim_times = np.asarray(chunk["sim_time"])[row_steps]
+            values = np.asarray(chunk[f"{prefix}_{attribute}"])[rows].astype(float)
+            mask = (sim_times >= from_time) & (sim_times <= to_time) & ~np.isnan(values)
+            all_sim_times.append(sim_times[mask])
+            all_values.append(values[mask])
+
+        return None, {
+            "element_id": element_id,
+            "attribute": attribute,
+            "from_time": None if np.isinf(from_time) else float(from_time),
+            "to_time": float(to_time),
+            "resolution_steps": 1,
+            "sim_times": np.concatenate(all_sim_times).tolist() if all_sim_times else [],
+            "values": np.concatenate(all_values).tolist() if all_values else [],
+        }
+
+    def to_json(self):
+        return {
+            "trace_dir": self.trace_dir,
+            "trace_id": self.trace_id,
+            "step_count": self.step_count,
+            "chunk_count": len(self.chunks),
+            "record_frames": self.metadata["record_frames"],
+        }
+
+
+def _new_frozen(cls, attributes):
+    obj = object.__new__(get_frozen_class(cls))
+    object.__getattribute__(obj, "__dict__").update(attributes)
+    return obj
+
+
+class TraceSnapshot(SnapshotObject):
+    """Read-only simulation state of one step of a trace.
+
+    Base stations, cells and UEs are rebuilt from the recorded frame as read-only instances of
+    their network layer classes (like SimulationSnapshot), so knowledge handlers and state
+    readers work on a replayed step exactly as on a live one. The KPI history is served from
+    the trace itself, up to this step.
+    """
+
+    def __init__(self, trace, step):
+        self.trace = trace
+        self.trace_step = step
+        self.state_version = f"trace:{trace.trace_id}:{step}"
+        self.sim_started = False
+        self.sim_step = trace.get_sim_step(step)
+        self.sim_time = trace.get_sim_time(step)
+        self.kpi_recorder = trace
+        self.ric = None
+        self.core_network = None
+        self.frame = trace.get_frame(step)
+        self.logs = self.frame.get("logs", [])
+        self._build_network(self.frame)
+        self.global_UE_counter = len(self.ue_list)
+
+    def _build_network(self, frame):
+        self.base_station_list = {}
+        self.cell_list = {}
+        self.ue_list = {}
+        for bs_data in frame.get("base_stations", []):
+            bs_attributes = dict(bs_data)
+            cell_data_list = bs_attributes.pop("cell_list", [])
+            ue_registry = bs_attributes.pop("ue_registry", [])
+            bs_attributes["ue_registry"] = {ue_imsi: {} for ue_imsi in ue_registry}
+            bs_attributes["cell_list"] = {}
+            bs = _new_frozen(BaseStation, bs_attributes)
+            for cell_data in cell_data_list:
+                cell_attributes = {
+                    k: v
+                    for k, v in cell_data.items()
+                    if not isinstance(getattr(Cell, k, None), property)
+                }
+                cell_attributes["base_station"] = bs
+                cell_attributes["connected_ue_list"] = {}
+                cell = _new_frozen(Cell, cell_attributes)
+                bs.cell_list[cell.cell_id] = cell
+                self.cell_list[cell.cell_id] = cell
+            self.base_station_list[bs.bs_id] = bs
+
+        for ue_data in frame.get("UE_list", []):
+            ue_attributes = {
+                k: v
+                for k, v in ue_data.items()
+                if not isinstance(getattr(UE, k, None), property)
+            }
+            cell = self.cell_list.get(ue_data.get("current_cell", None), None)
+            ue_attributes["current_cell"] = cell
+            ue = _new_frozen(UE, ue_attributes)
+            self.ue_list[ue.ue_imsi] = ue
+
+        for cell_data in frame.get("cells", []):
+            cell = self.cell_list.get(cell_data["cell_id"], None)
+            if cell is None:
+                continue
+            for ue_imsi in cell_data.get("connected_ue_list", []):
+                if ue_imsi in self.ue_list:
+                    cell.connected_ue_list[ue_imsi] = self.ue_list[ue_imsi]
+
+    def get_snapshot(self):
+        return self
+
+    def get_handovers(self):
+        rows = self.trace.get_rows(self.trace_step, "handover")
+        return [
+            {
+                "ue_imsi": self.trace.ids["ue"][ue],
+                "source_cell": self.trace.ids["cell"][source],
+                "target_cell": self.trace.ids["cell"][target],
+            }
+            for ue, source, target in zip(
+                rows["ue"], rows["source_cell"], rows["target_cell"]
+            )
+        ]
+
+    def to_json(self):
+        return self.frame
+
+
+class SimulationTraceReplay:
+    """Replays a recorded trace.
+
+    The recorded frames are sent over the websocket as simulation_state_update messages without
+    being decoded or re-encoded, so playback costs a memory-mapped read and a send per step.
+    get_snapshot() returns the state of the current step for knowledge queries.
+    """
+
+    def __init__(self, trace_dir):
+        self.trace = SimulationTrace(trace_dir)
+        self.position = 0
+        self.playing = False
+        self.speed = 1.0
+        self._snapshot = None
+
+    def seek(self, step):
+        if self.trace.step_count == 0:
+            raise SimulationTraceError("The trace is empty.")
+        self.position = max(0, min(int(step), self.trace.step_count - 1))
+        return self.position
+
+    def seek_time(self, sim_time):
+        return self.seek(self.trace.find_step(sim_time))
+
+    def get_snapshot(self):
+        if self.trace.step_count == 0:
+            return None
+        if self._snapshot is None or self._snapshot.trace_step != self.position:
+            self._snapshot = TraceSnapshot(self.trace, self.position)
+        return self._snapshot
+
+    def get_frame_message(self, step):
+        return (
+            b'{"layer": "network_layer", "command": "simulation_state_update", "response": '
+            + self.trace.get_frame_bytes(step)
+            + b', "error": null}'
+        ).decode("utf-8")
+
+    async def play(self, websocket, speed=1.0, start_step=None):
+        """
+        Send the frames from start_step (default: the current position) to the end of the trace.
+
+        Args:
+            websocket: The websocket to send the frames to.
+            speed (float): Playback speed relative to the simulated time, 0 or less sends the frames
+                as fast as the websocket takes them.
+            start_step (int, optional): The step to start from.
+        """
+        if start_step is not None:
+            self.seek(start_step)
+        self.speed = speed
+        self.playing = True
+        try:
+            while self.playing and self.position < self.trace.step_count:
+                step = self.position
+                await websocket.send(self.get_frame_message(step))
+                if step + 1 >= self.trace.step_count:
+                    break
+                if self.speed > 0:
+                    step_time = self.trace.get_sim_time(step + 1) - self.trace.get_sim_time(step)
+                    await asyncio.sleep(max(step_time, 0) / self.speed)
+                else:
+                    await asyncio.sleep(0)
+                if self.position == step:
+                    # seek() during the sleep moves the position instead
+                    self.position = step + 1
+        finally:
+            self.playing = False
+
+    def stop(self):
+        self.playing = False
+
+    def to_json(self):
+        return {
+            "trace": self.trace.to_json(),
+            "position": self.position,
+            "playing": self.playing,
+            "speed": self.speed,
+        }
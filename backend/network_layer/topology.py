@@ -0,0 +1,280 @@
+"""Synthetic network topologies: base station sites, their sectors and cells, over a coverage area.
+
+A topology is a dict {"coverage_width": m, "coverage_height": m, "bs_list": [bs_init_data, ...]}, the
+bs_init_data having the structure of settings.RAN_DEFAULT_BS_LIST. SimulationEngine.network_setup()
+builds the network of a topology, by default the one of get_default_topology().
+
+Scenario files (JSON) either list the base stations:
+    {"coverage_width": 2000, "coverage_height": 2000, "bs_list": [...]}
+or describe a generated topology, with the arguments of generate_topology():
+    {
+        "generator": {
+            "layout": "hexagonal",
+            "coverage_width": 20000,
+            "coverage_height": 20000,
+            "inter_site_distance": 500,
+            "sectors": 3,
+            "band_mix": {"n78": 1.0, "n258": 0.3},
+            "seed": 1
+        }
+    }
+Set settings.NETWORK_TOPOLOGY_SCENARIO_FILE to use a scenario instead of settings.RAN_DEFAULT_BS_LIST.
+
+Generate a scenario file (from the backend directory):
+    python -m network_layer.topology --layout hexagonal --width 20000 --height 20000 \
+        --inter-site-distance 500 --sectors 3 --band-mix '{"n78": 1, "n258": 0.3}' --output scenario.json
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+
+import numpy as np
+
+import settings
+
+logger = logging.getLogger(__name__)
+
+TOPOLOGY_LAYOUTS = ["hexagonal", "poisson"]
+
+# scenario file path -> (modification time, topology)
+_scenario_cache = {}
+
+
+class TopologyError(ValueError):
+    pass
+
+
+def hexagonal_sites(coverage_width, coverage_height, inter_site_distance):
+    """Sites on a hexagonal grid (every other row shifted by half the inter-site distance) covering the area."""
+    if inter_site_distance <= 0:
+        raise TopologyError("The inter-site distance must be positive.")
+    row_distance = inter_site_distance * math.sqrt(3) / 2
+    margin = inter_site_distance / 2
+    sites = []
+    row = 0
+    y = min(margin, coverage_height / 2)
+    while y <= coverage_height:
+        x = min(margin, coverage_width / 2) + (margin if row % 2 else 0)
+        while x <= coverage_width:
+            sites.append((round(x), round(y)))
+            x += inter_site_distance
+        row += 1
+        y += row_distance
+    return sites
+
+
+def poisson_sites(coverage_width, coverage_height, rng, site_density_per_km2=None, site_count=None):
+    """
+    Sites of a Poisson point process over the area.
+
+    Args:
+        rng (numpy.random.Generator): The random number generator.
+        site_density_per_km2 (float, optional): Mean sites per km², the count is Poisson distributed.
+        site_count (int, optional): Exact number of sites instead of a density.
+    """
+    if site_count is None:
+        if site_density_per_km2 is None or site_density_per_km2 <= 0:
+            raise TopologyError("A positive site density or a site count is required.")
+        site_count = int(
+            rng.poisson(site_density_per_km2 * coverage_width * coverage_height / 1e6)
+        )
+    positions = rng.uniform((0, 0), (coverage_width, coverage_height), size=(site_count, 2))
+    return [(round(x), round(y)) for x, y in positions]
+
+
+def generate_topology(
+    layout="hexagonal",
+    coverage_width=None,
+    coverage_height=None,
+    inter_site_distance=1000,
+    site_density_per_km2=None,
+    site_count=None,
+    sectors=1,
+    band_mix=None,
+    seed=0,
+):
+    """
+    Generate the base stations of a topology.
+
+    Args:
+        layout (str): "hexagonal" (sites every inter_site_distance) or "poisson" (random sites).
+        coverage_width (float, optional): Width of the area (m), settings.NETWORK_COVERAGE_WIDTH by default.
+        coverage_height (float, optional): Height of the area (m), settings.NETWORK_COVERAGE_HEIGHT by default.
+        inter_site_distance (float): Distance between neighbouring sites of the hexagonal layout (m).
+        site_density_per_km2 (float, optional): Mean site density of the Poisson layout.
+        site_count (int, optional): Number of sites of the Poisson layout, instead of a density.
+        sectors (int | dict): Sectors per site (1 for omnidirectional cells), or frequency band -> sectors.
+        band_mix (dict, optional): Frequency band -> share of the sites with cells of this band,
+            e.g. {"n78": 1.0, "n258": 0.3}. By default every site has the cells of RAN_BS_DEFAULT_CELLS.
+        seed (int): Seed of the site positions and of the band mix.
+
+    Returns:
+        dict: The topology.
+    """
+    if coverage_width is None:
+        coverage_width = settings.NETWORK_COVERAGE_WIDTH
+    if coverage_height is None:
+        coverage_height = settings.NETWORK_COVERAGE_HEIGHT
+    rng = np.random.default_rng(seed)
+    if layout == "hexagonal":
+        sites = hexagonal_sites(coverage_width, coverage_height, inter_site_distance)
+    elif layout == "poisson":
+        sites = poisson_sites(
+            coverage_width,
+            coverage_height,
+            rng,
+            site_density_per_km2=site_density_per_km2,
+            site_count=site_count,
+        )
+    else:
+        raise TopologyError(
+            f"Unknown layout '{layout}', expected one of {', '.join(TOPOLOGY_LAYOUTS)}."
+        )
+    if band_mix is None:
+        band_mix = {
+            cell_init_data["frequency_band"]: 1.0
+            for cell_init_data in settings.RAN_BS_DEFAULT_CELLS("bs")
+        }
+    for band in band_mix:
+        if band not in settings.RAN_BAND_CELL_PROFILES:
+            raise TopologyError(
+                f"Unknown frequency band '{band}', expected one of {', '.join(settings.RAN_BAND_CELL_PROFILES)}."
+            )
+
+    bs_list = []
+    for i, (position_x, position_y) in enumerate(sites):
+        bs_id = f"bs_{i}"
+        # one draw per band and site, so the mix of a site does not depend on the other bands
+        band_draws = rng.random(len(band_mix))
+        cell_list = []
+        for (band, share), draw in zip(band_mix.items(), band_draws):
+            if draw >= share:
+                continue
+            band_sectors = sectors.get(band, 1) if isinstance(sectors, dict) else sectors
+            if band_sectors <= 1:
+                cell_list.append(settings.RAN_BAND_CELL(bs_id, band))
+                continue
+            for sector in range(band_sectors):
+                cell_list.append(
+                    settings.RAN_BAND_CELL(
+                        bs_id,
+                        band,
+                        sector=sector,
+                        azimuth_deg=sector * 360 / band_sectors,
+                    )
+                )
+        if not cell_list:
+            continue
+        bs_list.append(
+            {
+                "bs_id": bs_id,
+                "position_x": position_x,
+                "position_y": position_y,
+                "cell_list": cell_list,
+                "rrc_measurement_events": settings.RAN_BS_DEFAULT_RRC_MEASUREMENT_EVENTS(),
+                "edge_server": settings.RAN_BS_EDGE_DEFAULT_SERVER(),
+            }
+        )
+    logger.info(
+        f"Generated a {layout} topology of {len(bs_list)} base stations and "
+        f"{sum(len(bs['cell_list']) for bs in bs_list)} cells over {coverage_width} x {coverage_height} m."
+    )
+    return {
+        "coverage_width": coverage_width,
+        "coverage_height": coverage_height,
+        "bs_list": bs_list,
+    }
+
+
+def load_scenario(path):
+    """Load the topology of a scenario file, see the module docstring. Loaded topologies are cached per file."""
+    modified_at = os.path.getmtime(path)
+    cached = _scenario_cache.get(path, None)
+    if cached is not None and cached[0] == modified_at:
+        return cached[1]
+
+    with open(path, "r") as file:
+        scenario = json.load(file)
+    if "generator" in scenario:
+        try:
+            topology = generate_topology(**scenario["generator"])
+        except TypeError as e:
+            raise TopologyError(f"Invalid generator of scenario {path}: {e}")
+    elif "bs_list" in scenario:
+        topology = {
+            "coverage_width": scenario.get(
+                "coverage_width", settings.NETWORK_COVERAGE_WIDTH
+            ),
+            "coverage_height": scenario.get(
+                "coverage_height", settings.NETWORK_COVERAGE_HEIGHT
+            ),
+            "bs_list": scenario["bs_list"],
+        }
+    else:
+        raise TopologyError(f"Scenario {path} has neither a generator nor a bs_list.")
+    _scenario_cache[path] = (modified_at, topology)
+    return topology
+
+
+def save_scenario(topology, path):
+    """Save a (e.g., generated) topology as a scenario file listing its base stations."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(topology, file, indent=2)
+
+
+def get_default_topology():
+    """
+    The topology networks are set up with: the scenario of settings.NETWORK_TOPOLOGY_SCENARIO_FILE
+    if set, otherwise settings.RAN_DEFAULT_BS_LIST over the settings coverage area.
+
+    The base station list is shared, not copied, so that process-wide changes (e.g., a parameter sweep) apply to it.
+    """
+    if settings.NETWORK_TOPOLOGY_SCENARIO_FILE:
+        return load_scenario(settings.NETWORK_TOPOLOGY_SCENARIO_FILE)
+    return {
+        "coverage_width": settings.NETWORK_COVERAGE_WIDTH,
+        "coverage_height": settings.NETWORK_COVERAGE_HEIGHT,
+        "bs_list": settings.RAN_DEFAULT_BS_LIST,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a network topology scenario file")
+    parser.add_argument("--layout", choices=TOPOLOGY_LAYOUTS, default="hexagonal")
+    parser.add_argument("--width", type=float, default=None, help="Coverage width (m)")
+    parser.add_argument("--height", type=float, default=None, help="Coverage height (m)")
+    parser.add_argument("--inter-site-distance", type=float, default=1000, help="Hexagonal layout: distance between sites (m)")
+    parser.add_argument("--site-density", type=float, default=None, help="Poisson layout: mean sites per km²")
+    parser.add_argument("--site-count", type=int, default=None, help="Poisson layout: number of sites")
+    parser.add_argument("--sectors", type=int, default=1, help="Sectors per site")
+    parser.add_argument("--band-mix", default=None, help='JSON frequency band -> share of the sites, e.g. \'{"n78": 1, "n258": 0.3}\'')
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", required=True, help="Scenario file to write")
+    args = parser.parse_args()
+
+    topology = generate_topology(
+        layout=args.layout,
+        coverage_width=args.width,
+        coverage_height=args.height,
+        inter_site_distance=args.inter_site_distance,
+        site_density_per_km2=args.site_density,
+        site_count=args.site_count,
+        sectors=args.sectors,
+        band_mix=json.loads(args.band_mix) if args.band_mix else None,
+        seed=args.seed,
+    )
+    save_scenario(topology, args.output)
+    print(
+        f"{len(topology['bs_list'])} base stations, "
+        f"{sum(len(bs['cell_list']) for bs in topology['bs_list'])} cells written to {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,12 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# RRC states, UEs with a traffic pattern (settings.UE_SLICE_TRAFFIC_PATTERNS) release the connection
+# between their traffic bursts and are not scheduled by their cell meanwhile
+RRC_CONNECTED = "RRC_CONNECTED"
+RRC_INACTIVE = "RRC_INACTIVE"
+RRC_IDLE = "RRC_IDLE"
+
 
 class UE:
     def __init__(
@@ -38,6 +44,8 @@ class UE:
         self.target_x = target_x
         self.target_y = target_y
         self.speed_mps = speed_mps
+        # state of the mobility model moving the UE, see network_layer/mobility.py
+        self.mobility_state = {}
         self.time_remaining = connection_time
         self.simulation_engine = simulation_engine
 
@@ -45,10 +53,23 @@ class UE:
         self.qos_profile = None
         self.connected = False
 
+        # see step_rrc_state()
+        self.rrc_state = RRC_CONNECTED
+        self.rrc_state_time = 0  # seconds in the state, without traffic for RRC_CONNECTED
+        self.traffic_pattern = None
+        self.traffic_countdown = 0  # seconds until the next traffic burst
+        self.traffic_burst_remaining = 0
+        self.paging_pending = False
+        self.paging_countdown = 0  # seconds until the next paging occasion
+        self.idle_measurement_countdown = 0
+
         self.downlink_bitrate = 0
         self.downlink_latency = 0
         self.rrc_measurement_event_monitors = []
         self.downlink_received_power_dBm_dict = {}
+        # position and engine radio_config_version of the measurements, see monitor_signal_strength()
+        self.measured_position = None
+        self.measured_radio_config_version = None
         self.downlink_sinr = 0
         self.downlink_cqi = 0
         self.downlink_mcs_index = -1
@@ -101,6 +122,8 @@ class UE:
         ), f"Target Y {target_y} is out of operation region bounds."
         self.target_x = target_x
         self.target_y = target_y
+        if self.simulation_engine is not None:
+            self.simulation_engine.mobility.update_ue(self)
         logger.info(
             f"UE {self.ue_imsi}: Target set to ({self.target_x}, {self.target_y})"
         )
@@ -181,6 +204,40 @@ class UE:
         self.set_current_cell(cells_detected[0]["cell"])
         return True
 
+    def reselect_cell(self):
+        """
+        Idle mode cell reselection after the measurements of an idle or inactive UE.
+
+        The UE camps on the best detected cell (by frequency priority, then received power with CIO)
+        if it has a higher frequency priority than the serving cell, or is stronger by more than
+        settings.UE_IDLE_RESELECTION_HYSTERESIS_dB.
+
+        Returns:
+            bool: True if the UE camped on another cell.
+        """
+        if self.current_cell is None or self.current_bs is None:
+            return False
+        serving = self.downlink_received_power_dBm_dict.get(self.current_cell.cell_id, None)
+        best = max(
+            self.downlink_received_power_dBm_dict.values(),
+            key=lambda x: (x["frequency_priority"], x["received_power_with_cio_dBm"]),
+            default=None,
+        )
+        if best is None or serving is None or best["cell"] is self.current_cell:
+            return False
+        if best["frequency_priority"] == serving["frequency_priority"] and (
+            best["received_power_with_cio_dBm"]
+            <= serving["received_power_with_cio_dBm"]
+            + settings.UE_IDLE_RESELECTION_HYSTERESIS_dB
+        ):
+            return False
+        logger.info(
+            f"UE {self.ue_imsi}: idle mode reselection from cell {self.current_cell.cell_id} to cell {best['cell'].cell_id}"
+        )
+        # no signalling with the network while idle, but the registries and cells move as in a handover
+        self.current_bs.execute_handover(self, self.current_cell, best["cell"])
+        return True
+
     def setup_rrc_measurement_event_monitors(self, rrc_meas_events_to_monitor=[]):
         self.rrc_measurement_event_monitors = [
             get_rrc_measurement_event_monitor(event["event_id"], event_params=event)
@@ -199,8 +256,98 @@ class UE:
         self.slice_type = ue_reg_res["slice_type"]
         self.qos_profile = ue_reg_res["qos_profile"]
         self.setup_rrc_measurement_event_monitors(ue_reg_res["rrc_meas_events"])
+        self.setup_traffic_pattern()
         return True
 
+    def setup_traffic_pattern(self):
+        self.traffic_pattern = (
+            settings.UE_SLICE_TRAFFIC_PATTERNS.get(self.slice_type, None)
+            if settings.UE_RRC_IDLE_MODE_ENABLED
+            else None
+        )
+        if self.traffic_pattern is None or self.simulation_engine is None:
+            return
+        # spread the bursts of the UEs over the period
+        self.traffic_countdown = float(
+            self.simulation_engine.rng.traffic.uniform(0, self.traffic_pattern["period_s"])
+        )
+        self.rrc_state_time = 0
+
+    def set_rrc_state(self, rrc_state):
+        if rrc_state == self.rrc_state:
+            return
+        logger.info(f"UE {self.ue_imsi}: {self.rrc_state} -> {rrc_state}")
+        previous_rrc_state = self.rrc_state
+        self.rrc_state = rrc_state
+        self.rrc_state_time = 0
+        self.invalidate_measurements()
+        if rrc_state == RRC_CONNECTED:
+            self.paging_pending = False
+        elif previous_rrc_state == RRC_CONNECTED:
+            # released: no radio resources, no measurement reports until the connection resumes
+            self.paging_countdown = settings.UE_PAGING_DRX_CYCLE_S
+            self.idle_measurement_countdown = settings.UE_IDLE_MEASUREMENT_PERIOD_S
+            self.set_downlink_sinr(0)
+            self.set_downlink_cqi(0)
+            self.set_downlink_mcs_index(-1)
+            self.set_downlink_mcs_data(None)
+            self.set_downlink_bitrate(0)
+            for event_monitor in self.rrc_measurement_event_monitors:
+                event_monitor.reset_trigger_history()
+        if self.current_cell is not None:
+            self.current_cell.update_ue_rrc_state(self)
+
+    def page(self):
+        """Network initiated wake-up: an idle or inactive UE resumes the connection at its next paging occasion."""
+        if self.rrc_state != RRC_CONNECTED:
+            self.paging_pending = True
+
+    def step_rrc_state(self, delta_time):
+        if self.traffic_pattern is None:
+            # always active
+            return
+
+        # traffic bursts of the pattern, e.g., the periodic reports of an IoT device
+        self.traffic_countdown -= delta_time
+        burst_started = self.traffic_countdown <= 0
+        if burst_started:
+            self.traffic_countdown += self.traffic_pattern["period_s"]
+            self.traffic_burst_remaining = self.traffic_pattern["burst_s"]
+        burst_active = self.traffic_burst_remaining > 0
+        self.traffic_burst_remaining = max(self.traffic_burst_remaining - delta_time, 0)
+        # AI service requests are traffic too
+        has_traffic = burst_active or len(self.ai_service_subscriptions) > 0
+
+        if self.rrc_state == RRC_CONNECTED:
+            self.rrc_state_time = 0 if has_traffic else self.rrc_state_time + delta_time
+            if self.rrc_state_time >= settings.UE_RRC_INACTIVITY_TIMER_S:
+                self.set_rrc_state(RRC_INACTIVE)
+            return
+
+        if self.traffic_pattern.get("mobile_terminated", False):
+            # downlink traffic: the network pages the UE
+            if burst_started:
+                self.page()
+            has_traffic = len(self.ai_service_subscriptions) > 0
+        if has_traffic:
+            # uplink traffic resumes the connection right away
+            self.set_rrc_state(RRC_CONNECTED)
+            return
+
+        self.paging_countdown -= delta_time
+        if self.paging_countdown <= 0:
+            self.paging_countdown += settings.UE_PAGING_DRX_CYCLE_S
+            if self.paging_pending:
+                self.set_rrc_state(RRC_CONNECTED)
+                return
+
+        self.rrc_state_time += delta_time
+        if (
+            self.rrc_state == RRC_INACTIVE
+            and self.rrc_state_time >= settings.UE_RRC_INACTIVE_TO_IDLE_S
+        ):
+            self.set_rrc_state(RRC_IDLE)
+
     def power_up(self):
         print(f"UE {self.ue_imsi} Powering up")
         self.monitor_signal_strength()
@@ -240,6 +387,8 @@ class UE:
 
     def set_current_cell(self, cell):
         self.current_cell = cell
+        # the SINR is the one of the serving cell
+        self.invalidate_measurements()
 
         if cell is None:
             if len(self.serving_cell_history) > 0:
@@ -266,27 +415,50 @@ class UE:
         self.set_current_cell(None)
         self.connected = False
 
-    def move_towards_target(self, delta_time):
-        if self.target_x is not None and self.target_y is not None:
-            dist_to_target = self.dist_to_target
-            max_move_dist = self.speed_mps * delta_time
-            if dist_to_target <= max_move_dist:
-                self.position_x = self.target_x
-                self.position_y = self.target_y
-            else:
-                # move towards the target for the distance of max_move_dist, but round to nearest integer
-                ratio = max_move_dist / dist_to_target
-                self.position_x += (self.target_x - self.position_x) * ratio
-                self.position_y += (self.target_y - self.position_y) * ratio
-                self.position_x = round(self.position_x)
-                self.position_y = round(self.position_y)
-
-    def monitor_signal_strength(self):
+    def invalidate_measurements(self):
+        """Recompute all the downlink measurements and the SINR at the next monitor_signal_strength()."""
+        self.measured_radio_config_version = None
+
+    def update_measured_position(self):
+        """
+        Move the position of the measurements to the UE position, if the UE moved further than
+        settings.UE_MEASUREMENT_POSITION_TOLERANCE_M since the last measurements.
+
+        Returns:
+            bool: True if the position of the measurements moved.
+        """
+        if self.measured_position is not None and (
+            dist_between(
+                self.measured_position[0],
+                self.measured_position[1],
+                self.position_x,
+                self.position_y,
+            )
+            <= settings.UE_MEASUREMENT_POSITION_TOLERANCE_M
+        ):
+            return False
+        self.measured_position = (self.position_x, self.position_y)
+        return True
+
+    def monitor_signal_strength(self, calculate_sinr=True):
         if self.simulation_engine is None:
             return False
 
+        # the measurements only change with the UE position, the serving cell (see
+        # invalidate_measurements()) and the radio configuration of the cells (Cell.radio_config_version):
+        # a UE that did not move only measures the cells changed since its last measurements
+        radio_config_version = self.simulation_engine.radio_config_version
+        moved = self.update_measured_position()
+        if moved or self.measured_radio_config_version is None:
+            changed_since = None
+        elif calculate_sinr and self.measured_radio_config_version == radio_config_version:
+            return True
+        else:
+            changed_since = self.measured_radio_config_version
+
         # monitors the downlink signal strength from the cells
 
+        previous_received_power_dBm_dict = self.downlink_received_power_dBm_dict
         self.downlink_received_power_dBm_dict = {}
         self.set_downlink_sinr(0)
         self.set_downlink_cqi(0)
@@ -294,17 +466,29 @@ class UE:
         pass_loss_model = settings.CHANNEL_PASS_LOSS_MODEL_MAP[
             settings.CHANNEL_PASS_LOSS_MODEL_URBAN_MACRO_NLOS
         ]
+        position_x, position_y = self.measured_position
         for cell in self.simulation_engine.cell_list.values():
+            if changed_since is not None and cell.radio_config_version <= changed_since:
+                # unchanged cell, same measurement (or still not detected)
+                power_data = previous_received_power_dBm_dict.get(cell.cell_id, None)
+                if power_data is not None:
+                    self.downlink_received_power_dBm_dict[cell.cell_id] = power_data
+                continue
+
             # Check if the cell is within the UE's range
             distance = dist_between(
-                self.position_x,
-                self.position_y,
+                position_x,
+                position_y,
                 cell.position_x,
                 cell.position_y,
             )
 
-            received_power_dBm = cell.transmit_power_dBm - pass_loss_model(
-                distance_m=distance, frequency_ghz=cell.carrier_frequency_MHz / 1000
+            received_power_dBm = (
+                cell.transmit_power_dBm
+                - pass_loss_model(
+                    distance_m=distance, frequency_ghz=cell.carrier_frequency_MHz / 1000
+                )
+                + cell.get_antenna_gain_dB(position_x, position_y)
             )
             received_power_with_cio_dBm = (
                 received_power_dBm + cell.cell_individual_offset_dBm
@@ -329,7 +513,12 @@ class UE:
                     + cell.cell_individual_offset_dBm,
                 }
 
-        self.calculate_SINR_and_CQI()
+        self.measured_radio_config_version = radio_config_version
+        if calculate_sinr:
+            self.calculate_SINR_and_CQI()
+        else:
+            # the SINR is calculated with the next measurements
+            self.invalidate_measurements()
 
         return True
 
@@ -412,6 +601,10 @@ class UE:
             self.ai_service_responses = {}
             return
 
+        if not settings.UE_AI_SERVICE_REQUESTS_ENABLED:
+            self.ai_service_responses = {}
+            return
+
         if self.downlink_bitrate == 0:
             logger.warning(
                 f"UE {self.ue_imsi}: Downlink bitrate is 0, cannot request AI service."
@@ -429,7 +622,9 @@ class UE:
         self.ai_service_request_countdonw = settings.UE_AI_SERVICE_REQUEST_COUNTDOWN
         for ai_service_subscription in self.ai_service_subscriptions.values():
 
-            sample_request_data = get_random_ai_service_request_data()
+            sample_request_data = get_random_ai_service_request_data(
+                self.simulation_engine.rng
+            )
             files, size, name = (
                 sample_request_data["files"],
                 sample_request_data["size"],
@@ -447,12 +642,18 @@ class UE:
                 self, ai_service_request_data
             )
             end_time_ms = time.time() * 1000  # Convert to milliseconds
+            if response is None:
+                # the AI service is not deployed at the edge of the serving base station (yet)
+                self.ai_service_responses.pop(
+                    ai_service_subscription.subscription_id, None
+                )
+                continue
 
             # total latency is the time taken to process the request plus the air transmission time.
             # for the moment we use both achivable downlink bitrate to estimate the air transmission time
+            # (the in-memory container runtime of headless runs models the request time)
             ai_service_latency_ms = (
-                end_time_ms
-                - start_time_ms
+                response.get("request_time_ms", end_time_ms - start_time_ms)
                 + size * 8 / self.downlink_bitrate * 1000 * 2
             )
 
@@ -466,10 +667,19 @@ class UE:
             }
 
     def step(self, delta_time):
-        self.move_towards_target(delta_time)
-        self.monitor_signal_strength()
-        self.check_rrc_meas_events_to_monitor()
-        self.request_ai_service()
+        # the UE has been moved by the mobility stage of the simulation engine
+        self.step_rrc_state(delta_time)
+        if self.rrc_state == RRC_CONNECTED:
+            self.monitor_signal_strength()
+            self.check_rrc_meas_events_to_monitor()
+            self.request_ai_service()
+        else:
+            # idle and inactive UEs are not scheduled, they only measure the cells every now and then
+            self.idle_measurement_countdown -= delta_time
+            if self.idle_measurement_countdown <= 0:
+                self.idle_measurement_countdown += settings.UE_IDLE_MEASUREMENT_PERIOD_S
+                self.monitor_signal_strength(calculate_sinr=False)
+                self.reselect_cell()
         self.time_remaining -= delta_time
         if self.time_remaining <= 0:
             self.deregister()
@@ -492,6 +702,7 @@ class UE:
             "current_cell": self.current_cell.cell_id if self.current_cell else None,
             "current_bs": self.current_bs.bs_id if self.current_bs else None,
             "connected": self.connected,
+            "rrc_state": self.rrc_state,
             "time_remaining": self.time_remaining,
             "serving_cell_history": [cell_id for cell_id in self.serving_cell_history],
             "downlink_bitrate": self.downlink_bitrate,
@@ -0,0 +1,468 @@
+import asyncio
+import importlib
+import inspect
+import logging
+import multiprocessing
+import os
+import pkgutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import settings
+import utils
+from . import checkpoint
+from .ue import RRC_CONNECTED
+from .xApps.xapp_base import xAppBase
+
+logger = logging.getLogger(__name__)
+
+# per step network KPIs compared between the baseline and the variant fork
+WHAT_IF_KPIS = [
+    "ue_count",
+    "mean_downlink_bitrate",
+    "mean_downlink_sinr",
+    "mean_downlink_cqi",
+    "mean_downlink_latency",
+    "mean_cell_load",
+    "max_cell_load",
+    "handovers",
+    "mean_ai_service_latency_ms",
+]
+
+_what_if_runner = None
+
+
+def get_what_if_runner():
+    global _what_if_runner
+    if _what_if_runner is None:
+        _what_if_runner = WhatIfRunner()
+    return _what_if_runner
+
+
+class WhatIfScenario:
+    """A change to preview on a fork of the simulation.
+
+    Args:
+        steps (int): How many steps to run the fork ahead.
+        cell_overrides (dict): cell_id -> {attribute: value}, e.g.,
+            {"bs_11_cell_mid_freq": {"cell_individual_offset_dBm": 3}}.
+        settings_overrides (dict): settings name -> value, applied in the fork only.
+        disable_xapps (list[str]): IDs of running xApps to stop in the fork.
+        enable_xapps (list[str]): IDs (class names) of xApps in network_layer/xApps to start in the fork.
+    """
+
+    def __init__(
+        self,
+        steps,
+        cell_overrides=None,
+        settings_overrides=None,
+        disable_xapps=None,
+        enable_xapps=None,
+    ):
+        self.steps = steps
+        self.cell_overrides = cell_overrides or {}
+        self.settings_overrides = settings_overrides or {}
+        self.disable_xapps = list(disable_xapps or [])
+        self.enable_xapps = list(enable_xapps or [])
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(
+            steps=data["steps"],
+            cell_overrides=data.get("cell_overrides", None),
+            settings_overrides=data.get("settings_overrides", None),
+            disable_xapps=data.get("disable_xapps", None),
+            enable_xapps=data.get("enable_xapps", None),
+        )
+
+    def validate(self, simulation_engine):
+        """
+        Check the scenario against the live engine before forking.
+
+        Returns:
+            str | None: The error, None if the scenario can be run.
+        """
+        if not isinstance(self.steps, int) or self.steps <= 0:
+            return f"Invalid number of steps {self.steps}, expected a positive integer."
+        if self.steps > settings.SIM_WHAT_IF_MAX_STEPS:
+            return f"A what-if fork runs at most {settings.SIM_WHAT_IF_MAX_STEPS} steps ahead, got {self.steps}."
+        for cell_id, overrides in self.cell_overrides.items():
+            cell = simulation_engine.cell_list.get(cell_id, None)
+            if cell is None:
+                return f"Cell {cell_id} not found."
+            for attribute, value in overrides.items():
+                current_value = getattr(cell, attribute, None)
+                if (
+                    attribute not in cell.__dict__
+                    or not isinstance(current_value, (int, float, str, bool))
+                    or isinstance(current_value, bool) != isinstance(value, bool)
+                    or isinstance(current_value, str) != isinstance(value, str)
+                ):
+                    return f"Attribute '{attribute}' of cell {cell_id} cannot be set to {value!r}."
+        for name in self.settings_overrides:
+            if not name.isupper() or not hasattr(settings, name):
+                return f"Unknown setting '{name}'."
+        running_xapps = (
+            simulation_engine.ric.xapp_list if simulation_engine.ric else {}
+        )
+        for xapp_id in self.disable_xapps:
+            if xapp_id not in running_xapps:
+                return f"xApp {xapp_id} is not running."
+        available_xapps = get_available_xapp_classes()
+        for xapp_id in self.enable_xapps:
+            if xapp_id in running_xapps:
+                return f"xApp {xapp_id} is already running."
+            if xapp_id not in available_xapps:
+                return f"xApp {xapp_id} not found. Available xApps: {', '.join(available_xapps)}"
+        return None
+
+    def apply(self, simulation_engine):
+        for name, value in self.settings_overrides.items():
+            setattr(settings, name, value)
+        for cell_id, overrides in self.cell_overrides.items():
+            cell = simulation_engine.cell_list[cell_id]
+            for attribute, value in overrides.items():
+                setattr(cell, attribute, value)
+        ric = simulation_engine.ric
+        for xapp_id in self.disable_xapps:
+            stop_xapp(ric, ric.xapp_list[xapp_id])
+        available_xapps = get_available_xapp_classes()
+        for xapp_id in self.enable_xapps:
+            xapp = available_xapps[xapp_id](ric=ric)
+            ric.xapp_list[xapp_id] = xapp
+            xapp.start()
+
+    def to_json(self):
+        return {
+            "steps": self.steps,
+            "cell_overrides": self.cell_overrides,
+            "settings_overrides": self.settings_overrides,
+            "disable_xapps": self.disable_xapps,
+            "enable_xapps": self.enable_xapps,
+        }
+
+
+def get_available_xapp_classes():
+    """xApp ID -> class of every xApp in network_layer/xApps, like RIC.load_xApps()."""
+    xapp_classes = {}
+    xapps_dir = os.path.join(os.path.dirname(__file__), "xApps")
+    for _, module_name, is_pkg in pkgutil.iter_modules([xapps_dir]):
+        if is_pkg or module_name == "xapp_base":
+            continue
+        module = importlib.import_module(f"network_layer.xApps.{module_name}")
+        for name, obj in inspect.getmembers(module, inspect.isclass):
+            if issubclass(obj, xAppBase) and obj is not xAppBase:
+                xapp_classes[name] = obj
+    return xapp_classes
+
+
+def stop_xapp(ric, xapp):
+    """Remove an xApp from the RIC and its event handlers from the base stations."""
+
+    def is_xapp_handler(handler):
+        return getattr(handler, "__self__", None) is xapp
+
+    for bs in ric.base_station_list.values():
+        for event_id, handler in list(bs.ue_rrc_meas_event_handers.items()):
+            if is_xapp_handler(handler):
+                del bs.ue_rrc_meas_event_handers[event_id]
+        if is_xapp_handler(bs.ai_service_event_handler):
+            bs.ai_service_event_handler = None
+        bs.ue_registry_event_handlers = [
+            handler
+            for handler in bs.ue_registry_event_handlers
+            if not is_xapp_handler(handler)
+        ]
+    del ric.xapp_list[xapp.xapp_id]
+
+
+def _nanmean(values):
+    values = np.array([np.nan if v is None else v for v in values], dtype=float)
+    if len(values) == 0 or np.all(np.isnan(values)):
+        return None
+    return float(np.nanmean(values))
+
+
+def summarize_step(simulation_engine, previous_serving_cells):
+    """The WHAT_IF_KPIS of the current step. previous_serving_cells (UE IMSI -> cell ID) is updated in place."""
+    ues = list(simulation_engine.ue_list.values())
+    cell_loads = [cell.current_load for cell in simulation_engine.cell_list.values()]
+    handovers = 0
+    serving_cells = {}
+    ai_service_latencies = []
+    for ue in ues:
+        cell_id = ue.current_cell.cell_id if ue.current_cell else None
+        serving_cells[ue.ue_imsi] = cell_id
+        previous_cell_id = previous_serving_cells.get(ue.ue_imsi, None)
+        if (
+            previous_cell_id is not None
+            and cell_id is not None
+            and previous_cell_id != cell_id
+            # idle and inactive UEs reselect cells, they are not handed over
+            and ue.rrc_state == RRC_CONNECTED
+        ):
+            handovers += 1
+        ai_service_latencies += [
+            response["latency"] for response in ue.ai_service_responses.values()
+        ]
+    previous_serving_cells.clear()
+    previous_serving_cells.update(serving_cells)
+    # idle and inactive UEs are not scheduled, they have no downlink to average
+    connected_ues = [ue for ue in ues if ue.rrc_state == RRC_CONNECTED]
+    return {
+        "ue_count": len(ues),
+        "mean_downlink_bitrate": _nanmean([ue.downlink_bitrate for ue in connected_ues]),
+        "mean_downlink_sinr": _nanmean([ue.downlink_sinr for ue in connected_ues]),
+        "mean_downlink_cqi": _nanmean([ue.downlink_cqi for ue in connected_ues]),
+        "mean_downlink_latency": _nanmean(
+            [ue.downlink_latency for ue in connected_ues]
+        ),
+        "mean_cell_load": _nanmean(cell_loads),
+        "max_cell_load": max(cell_loads) if cell_loads else None,
+        "handovers": handovers,
+        "mean_ai_service_latency_ms": _nanmean(ai_service_latencies),
+    }
+
+
+def init_headless_process():
+    """Initializer of worker processes running simulations in the background (what-if forks, sweeps).
+
+    They must not touch the outside world: containers only exist in memory, the AI service requests
+    of the UEs are answered by the in-memory runtime (with a modeled latency) instead of the live AI
+    services, and there is no websocket to update.
+    """
+    utils.set_container_runtime(utils.InMemoryContainerRuntime())
+    settings.SIM_TRACE_RECORDING_ENABLED = False
+    # their KPIs are summarized per step by the runs themselves
+    settings.SIM_KPI_RECORDER_ENABLED = False
+
+
+def run_fork(checkpoint_data, scenario_data):
+    """
+    Restore a checkpoint in this (worker) process, apply the scenario and run it ahead.
+
+    Returns:
+        dict: {"steps", "from_step", "to_step", "kpis": {kpi: mean over the steps (sum for handovers)},
+               "cell_load": {cell_id: mean load}, "elapsed_seconds"}
+    """
+    from .simulation_engine import SimulationEngine
+
+    started_at = time.perf_counter()
+    scenario = WhatIfScenario.from_json(scenario_data)
+    simulation_engine = SimulationEngine()
+    checkpoint.loads(simulation_engine, checkpoint_data)
+    # the restored recorder of the live engine would keep recording
+    simulation_engine.kpi_recorder.enabled = settings.SIM_KPI_RECORDER_ENABLED
+    from_step = simulation_engine.sim_step
+    scenario.apply(simulation_engine)
+
+    previous_serving_cells = {
+        ue.ue_imsi: ue.current_cell.cell_id if ue.current_cell else None
+        for ue in simulation_engine.ue_list.values()
+    }
+    step_kpis = []
+    cell_loads = {cell_id: [] for cell_id in simulation_engine.cell_list}
+    for _ in range(scenario.steps):
+        simulation_engine.sim_step += 1
+        simulation_engine.step(settings.SIM_STEP_TIME_DEFAULT)
+        step_kpis.append(summarize_step(simulation_engine, previous_serving_cells))
+        for cell_id, cell in simulation_engine.cell_list.items():
+            cell_loads.setdefault(cell_id, []).append(cell.current_load)
+
+    kpis = {}
+    for kpi in WHAT_IF_KPIS:
+        values = [s[kpi] for s in step_kpis]
+        kpis[kpi] = (
+            int(sum(values)) if kpi == "handovers" else _nanmean(values)
+        )
+    return {
+        "steps": scenario.steps,
+        "from_step": from_step,
+        "to_step": simulation_engine.sim_step,
+        "kpis": kpis,
+        "cell_load": {
+            cell_id: _nanmean(loads) for cell_id, loads in cell_loads.items()
+        },
+        "elapsed_seconds": time.perf_counter() - started_at,
+    }
+
+
+def compare_runs(baseline, variant):
+    comparison = {}
+    for kpi in WHAT_IF_KPIS:
+        baseline_value = baseline["kpis"][kpi]
+        variant_value = variant["kpis"][kpi]
+        delta = None
+        relative_change = None
+        if baseline_value is not None and variant_value is not None:
+            delta = variant_value - baseline_value
+            if baseline_value != 0:
+                relative_change = delta / abs(baseline_value)
+        comparison[kpi] = {
+            "baseline": baseline_value,
+            "variant": variant_value,
+            "delta": delta,
+            "relative_change": relative_change,
+        }
+    return comparison
+
+
+class WhatIfRunner:
+    """Runs what-if forks of the live simulation in background worker processes.
+
+    A fork is a checkpoint of the live engine (see network_layer/checkpoint.py) restored in a worker
+    process, so the live simulation keeps stepping while forks run. Every what-if runs two forks from
+    the same checkpoint, including the RNG state: the baseline without changes and the variant with
+    the scenario applied, so the KPI differences come from the change alone.
+    """
+
+    def __init__(self):
+        self.executor = None
+        self.jobs = {}
+        self.next_id = 1
+
+    def _get_executor(self):
+        if self.executor is None:
+            # a fresh process per fork, scenarios may change module level settings
+            self.executor = ProcessPoolExecutor(
+                max_workers=settings.SIM_WHAT_IF_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_headless_process,
+                max_tasks_per_child=1,
+            )
+        return self.executor
+
+    async def fork(self, simulation_engine, scenario):
+        """
+        Start a what-if in the background.
+
+        The fork is a full checkpoint of the live engine (not a copy-on-write view), pickled in a
+        worker thread while the engine is held at its step boundary, so the event loop and the
+        other simulations keep running meanwhile.
+
+        Returns:
+            tuple: (error, what_if_id)
+        """
+        error = scenario.validate(simulation_engine)
+        if error:
+            return error, None
+        # the engine is not stepped until the checkpoint is taken
+        from_step = simulation_engine.sim_step
+        checkpoint_data = await checkpoint.dumps_in_background(
+            simulation_engine, compress=False
+        )
+        executor = self._get_executor()
+        what_if_id = f"what_if_{self.next_id}"
+        self.next_id += 1
+        self.jobs[what_if_id] = {
+            "what_if_id": what_if_id,
+            "scenario": scenario,
+            "from_step": from_step,
+            "baseline": executor.submit(
+                run_fork, checkpoint_data, WhatIfScenario(scenario.steps).to_json()
+            ),
+            "variant": executor.submit(run_fork, checkpoint_data, scenario.to_json()),
+        }
+        while len(self.jobs) > settings.SIM_WHAT_IF_MAX_KEPT_RESULTS:
+            oldest_id = next(iter(self.jobs))
+            self.jobs[oldest_id]["variant"].cancel()
+            self.jobs[oldest_id]["baseline"].cancel()
+            del self.jobs[oldest_id]
+        logger.info(
+            f"What-if {what_if_id} forked at step {from_step}: {scenario.to_json()}"
+        )
+        return None, what_if_id
+
+    def get_result(self, what_if_id):
+        """
+        Returns:
+            tuple: (error, result), result["status"] is "running" until both forks are done.
+        """
+        job = self.jobs.get(what_if_id, None)
+        if job is None:
+            return f"What-if {what_if_id} not found.", None
+        result = {
+            "what_if_id": what_if_id,
+            "scenario": job["scenario"].to_json(),
+            "from_step": job["from_step"],
+        }
+        if not (job["baseline"].done() and job["variant"].done()):
+            result["status"] = "running"
+            return None, result
+        try:
+            baseline = job["baseline"].result()
+            variant = job["variant"].result()
+        except Exception as e:
+            return f"What-if {what_if_id} failed: {e}", None
+        result["status"] = "done"
+        result["baseline"] = baseline
+        result["variant"] = variant
+        result["comparison"] = compare_runs(baseline, variant)
+        return None, result
+
+    async def run(self, simulation_engine, scenario):
+        """Fork and wait for the result without blocking the event loop (and the live simulation)."""
+        error, what_if_id = await self.fork(simulation_engine, scenario)
+        if error:
+            return error, None
+        job = self.jobs[what_if_id]
+        try:
+            await asyncio.gather(
+                asyncio.wrap_future(job["baseline"]),
+                asyncio.wrap_future(job["variant"]),
+            )
+        except Exception:
+            pass  # reported by get_result()
+        return self.get_result(what_if_id)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+def render_what_if_result(result):
+    scenario = result["scenario"]
+    response = f"What-if {result['what_if_id']} forked at step {result['from_step']}, {scenario['steps']} steps ahead.\n"
+    changes = []
+    for cell_id, overrides in scenario["cell_overrides"].items():
+        changes += [f"{cell_id}.{a}={v}" for a, v in overrides.items()]
+    changes += [f"settings.{n}={v}" for n, v in scenario["settings_overrides"].items()]
+    changes += [f"disable xApp {x}" for x in scenario["disable_xapps"]]
+    changes += [f"enable xApp {x}" for x in scenario["enable_xapps"]]
+    response += "Changes: " + (", ".join(changes) if changes else "none") + "\n"
+    if result["status"] != "done":
+        return response + "Status: still running.\n"
+
+    def format_value(value):
+        return "n/a" if value is None else f"{value:.4g}"
+
+    response += "KPIs (mean per step, handovers in total): baseline -> variant (change)\n"
+    unavailable = []
+    for kpi, values in result["comparison"].items():
+        if values["baseline"] is None and values["variant"] is None:
+            unavailable.append(kpi)
+            continue
+        change = ""
+        if values["relative_change"] is not None:
+            change = f" ({values['relative_change'] * 100:+.1f}%)"
+        elif values["delta"] is not None:
+            change = f" ({values['delta']:+.4g})"
+        response += f"- {kpi}: {format_value(values['baseline'])} -> {format_value(values['variant'])}{change}\n"
+    if unavailable:
+        # e.g., no AI service latency without AI service subscriptions
+        response += f"Not measured in either run: {', '.join(unavailable)}\n"
+
+    load_changes = []
+    for cell_id, baseline_load in result["baseline"]["cell_load"].items():
+        variant_load = result["variant"]["cell_load"].get(cell_id, None)
+        if baseline_load is None or variant_load is None:
+            continue
+        load_changes.append((abs(variant_load - baseline_load), cell_id, baseline_load, variant_load))
+    if load_changes:
+        response += "Cells with the largest load change:\n"
+        for _, cell_id, baseline_load, variant_load in sorted(load_changes, reverse=True)[:5]:
+            response += f"- {cell_id}: {baseline_load:.3f} -> {variant_load:.3f}\n"
+    return response
@@ -8,4 +8,5 @@ from .sim_config import *
 from .channel_config import *
 from .agent_config import *
 from .core_config import *
-from .ai_service_config import *
\ No newline at end of file
+from .ai_service_config import *
+from .docker_config import *
\ No newline at end of file
@@ -3,3 +3,9 @@ OPENAI_NON_REASONING_MODEL_NAME = "gpt-4.1"
 # OPENAI_NON_REASONING_MODEL_NAME = "gpt-4.1-mini"
 # OPENAI_NON_REASONING_MODEL_NAME = "gpt-4.1-nano"
 OPENAI_REASONING_MODEL_NAME = "o3"
+
+# Knowledge listings (UEs, cells, base stations, ...) are paginated to keep tool outputs small.
+# Full listings are opt-in with page_size=all.
+KNOWLEDGE_LIST_PAGE_SIZE = 50
+# KPI history answers render at most this many (averaged) points
+KNOWLEDGE_HISTORY_MAX_POINTS = 30
@@ -1,10 +1,18 @@
 import os
-import random
 import copy
 import cv2
 
 AI_SERVICE_UNDEPLOYMENT_COUNT_DOWN_STEPS = 20
 
+# warm pool of pre-pulled images and idle pre-started AI service containers at each edge server,
+# opt-in: idle containers hold edge memory and pre-pulls download images nobody may request
+AI_SERVICE_WARM_POOL_ENABLED = False
+AI_SERVICE_WARM_POOL_SIZE_PER_SERVICE = 1  # idle containers kept per popular AI service
+AI_SERVICE_WARM_POOL_MAX_POPULAR_SERVICES = 3  # only the most subscribed services are kept warm
+AI_SERVICE_WARM_POOL_IDLE_TIMEOUT_STEPS = 30  # remove idle containers nobody is heading to anymore
+AI_SERVICE_WARM_POOL_PREDICTION_LOOKAHEAD_SECONDS = 30
+AI_SERVICE_WARM_POOL_WORKERS = 2  # background threads pulling images and starting containers
+
 AI_SERVICE_SAMPLE_REQUEST_DATA = []
 AI_SERVICE_SAMPLE_IMAGE_FILES = ["puppy_in_cup.png", "dog_and_kitten.jpg", "squirrel.png"]
 
@@ -33,8 +41,9 @@ for image_file_name in AI_SERVICE_SAMPLE_IMAGE_FILES:
     )
 
 
-def get_random_ai_service_request_data():
-    return copy.deepcopy(random.choice(AI_SERVICE_SAMPLE_REQUEST_DATA))
+def get_random_ai_service_request_data(rng):
+    # rng: the SimulationRNG of the simulation, the sample is drawn from its traffic stream
+    return copy.deepcopy(rng.choice("traffic", AI_SERVICE_SAMPLE_REQUEST_DATA))
 
 
 def prepare_ai_service_sample_request(ai_service_name: str, ue_id: str, files: dict):
@@ -5,16 +5,20 @@ from .slice_config import (
 )
 from .ue_config import UE_DEFAULT_MAX_COUNT
 
-import random
+import numpy as np
+
+# the subscriptions are drawn from a fixed seed, so every process (and run) has the same subscribers
+CORE_UE_SUBSCRIPTION_SEED = 0
 
 CORE_UE_SUBSCRIPTION_DATA = {}
 
+_subscription_rng = np.random.default_rng(CORE_UE_SUBSCRIPTION_SEED)
 for i in range(UE_DEFAULT_MAX_COUNT):
     UE_IMSI = f"IMSI_{i}"
 
     # randomly pick the slice subscriptions for UEs
     # first roughly 20% of UE is an IoT device, meaning that it is subscribed to mMTC slice
-    if random.random() < 0.2:
+    if _subscription_rng.random() < 0.2:
         CORE_UE_SUBSCRIPTION_DATA[UE_IMSI] = [NETWORK_SLICE_MTC_NAME]
         continue
 
@@ -22,5 +26,5 @@ for i in range(UE_DEFAULT_MAX_COUNT):
     CORE_UE_SUBSCRIPTION_DATA[UE_IMSI] = [NETWORK_SLICE_EMBB_NAME]
 
     # then 50% chance the UE also subscribes to URLLC slice
-    if random.random() < 0.5:
+    if _subscription_rng.random() < 0.5:
         CORE_UE_SUBSCRIPTION_DATA[UE_IMSI].append(NETWORK_SLICE_URLLC_NAME)
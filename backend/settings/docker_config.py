@@ -0,0 +1,14 @@
+# ---------------------------
+# Container Runtime Configuration
+# ---------------------------
+# "docker" talks to the Docker Engine API over its unix socket,
+# "in_memory" is a fake backend that never touches the host (useful for tests and headless runs).
+CONTAINER_RUNTIME_BACKEND = "docker"
+DOCKER_ENGINE_SOCKET_PATH = "/var/run/docker.sock"
+DOCKER_ENGINE_API_VERSION = "v1.41"
+DOCKER_ENGINE_REQUEST_TIMEOUT_SECONDS = 30
+# image pulls can take minutes, so they are not bounded by the request timeout above
+DOCKER_ENGINE_PULL_TIMEOUT_SECONDS = None
+# the health of starting AI service containers comes from the container events, it is inspected again
+# after this many seconds in case an event was missed
+DOCKER_CONTAINER_HEALTH_RECHECK_SECONDS = 10
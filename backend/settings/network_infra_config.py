@@ -3,4 +3,7 @@
 # ---------------------------
 NETWORK_COVERAGE_WIDTH = 2000
 NETWORK_COVERAGE_HEIGHT = 2000
-REAL_LIFE_DISTANCE_MULTIPLIER = 0.5
\ No newline at end of file
+REAL_LIFE_DISTANCE_MULTIPLIER = 0.5
+# scenario file of the network topology (see network_layer/topology.py), None uses RAN_DEFAULT_BS_LIST
+# over the coverage area above
+NETWORK_TOPOLOGY_SCENARIO_FILE = None
\ No newline at end of file
@@ -86,50 +86,82 @@ RAN_MCS_SPECTRAL_EFFICIENCY_TABLE = {
 }
 
 
+# cells each frequency band can contribute to a base station, see RAN_BAND_CELL
+RAN_BAND_CELL_PROFILES = {
+    "n1": {
+        "cell_name": "cell_low_freq",
+        "frequency_band": "n1",
+        "carrier_frequency_MHz": 2100,
+        "bandwidth_Hz": 20e6,
+        "max_prb": 106,
+        "max_dl_prb": int(RAN_CELL_DL_UL_PRB_SPLIT["n1"][0] * 106),
+        "max_ul_prb": 106 - int(RAN_CELL_DL_UL_PRB_SPLIT["n1"][0] * 106),
+        "cell_radius": 1500,
+        "transmit_power_dBm": 40,
+        "cell_individual_offset_dBm": 0,
+        "frequency_priority": 3,
+        "qrx_level_min": -110,
+    },
+    "n78": {
+        "cell_name": "cell_mid_freq",
+        "frequency_band": "n78",
+        "carrier_frequency_MHz": 3500,
+        "bandwidth_Hz": 100e6,
+        "max_prb": 273,
+        "max_dl_prb": int(RAN_CELL_DL_UL_PRB_SPLIT["n78"][0] * 273),
+        "max_ul_prb": 273 - int(RAN_CELL_DL_UL_PRB_SPLIT["n78"][0] * 273),
+        "cell_radius": 800,
+        "transmit_power_dBm": 40,
+        "cell_individual_offset_dBm": 0,
+        "frequency_priority": 5,
+        "qrx_level_min": -98,
+    },
+    "n258": {
+        "cell_name": "cell_high_freq",
+        "frequency_band": "n258",
+        "carrier_frequency_MHz": 26000,
+        "bandwidth_Hz": 400e6,
+        "max_prb": 264,
+        "max_dl_prb": int(RAN_CELL_DL_UL_PRB_SPLIT["n258"][0] * 264),
+        "max_ul_prb": 264 - int(RAN_CELL_DL_UL_PRB_SPLIT["n258"][0] * 264),
+        "cell_radius": 300,
+        "transmit_power_dBm": 50,  # assume achieved by beamforming
+        "cell_individual_offset_dBm": 13,
+        "frequency_priority": 7,
+        "qrx_level_min": -89,
+    },
+}
+
+# horizontal antenna pattern of sector cells (3GPP TR 38.901): -min(12 * (angle / beamwidth)^2, max attenuation)
+RAN_SECTOR_BEAMWIDTH_DEG = 65
+RAN_SECTOR_MAX_ATTENUATION_dB = 30
+
+
+def RAN_BAND_CELL(bs_id, frequency_band, sector=None, azimuth_deg=None):
+    """
+    The init data of a cell of a frequency band at a base station.
+
+    Args:
+        sector (int, optional): Sector index, part of the cell ID of sector cells.
+        azimuth_deg (float, optional): Main lobe direction of a sector cell, counter-clockwise from the x axis.
+            None for an omnidirectional cell.
+    """
+    cell_init_data = dict(RAN_BAND_CELL_PROFILES[frequency_band])
+    cell_name = cell_init_data.pop("cell_name")
+    if sector is None:
+        cell_init_data["cell_id"] = f"{bs_id}_{cell_name}"
+    else:
+        cell_init_data["cell_id"] = f"{bs_id}_s{sector}_{cell_name}"
+    if azimuth_deg is not None:
+        cell_init_data["azimuth_deg"] = azimuth_deg
+    return cell_init_data
+
+
 def RAN_BS_DEFAULT_CELLS(bs_id):
     return [
-        # {
-        #     "cell_id": f"{bs_id}_cell_low_freq",
-        #     "frequency_band": "n1",
-        #     "carrier_frequency_MHz": 2100,
-        #     "bandwidth_Hz": 20e6,
-        #     "max_prb": 106,
-        #     "max_dl_prb": int(RAN_CELL_DL_UL_PRB_SPLIT["n1"][0] * 106),
-        #     "max_ul_prb": 106 - int(RAN_CELL_DL_UL_PRB_SPLIT["n1"][0] * 106),
-        #     "cell_radius": 1500,
-        #     "transmit_power_dBm": 40,
-        #     "cell_individual_offset_dBm": 0,
-        #     "frequency_priority": 3,
-        #     "qrx_level_min": -110,
-        # },
-        {
-            "cell_id": f"{bs_id}_cell_mid_freq",
-            "frequency_band": "n78",
-            "carrier_frequency_MHz": 3500,
-            "bandwidth_Hz": 100e6,
-            "max_prb": 273,
-            "max_dl_prb": int(RAN_CELL_DL_UL_PRB_SPLIT["n78"][0] * 273),
-            "max_ul_prb": 273 - int(RAN_CELL_DL_UL_PRB_SPLIT["n78"][0] * 273),
-            "cell_radius": 800,
-            "transmit_power_dBm": 40,
-            "cell_individual_offset_dBm": 0,
-            "frequency_priority": 5,
-            "qrx_level_min": -98,
-        },
-        {
-            "cell_id": f"{bs_id}_cell_high_freq",
-            "frequency_band": "n258",
-            "carrier_frequency_MHz": 26000,
-            "bandwidth_Hz": 400e6,
-            "max_prb": 264,
-            "max_dl_prb": int(RAN_CELL_DL_UL_PRB_SPLIT["n258"][0] * 264),
-            "max_ul_prb": 264 - int(RAN_CELL_DL_UL_PRB_SPLIT["n258"][0] * 264),
-            "cell_radius": 300,
-            "transmit_power_dBm": 50,  # assume achieved by beamforming
-            "cell_individual_offset_dBm": 13,
-            "frequency_priority": 7,
-            "qrx_level_min": -89,
-        },
+        # RAN_BAND_CELL(bs_id, "n1"),
+        RAN_BAND_CELL(bs_id, "n78"),
+        RAN_BAND_CELL(bs_id, "n258"),
     ]
 
 
@@ -160,6 +192,12 @@ def RAN_BS_EDGE_DEFAULT_SERVER():
     }
 
 
+# how edge server memory is accounted for:
+# "shared_node": edge servers with the same node_id share the memory of one physical node (e.g., a single docker host)
+# "per_edge": each edge server has its own memory
+RAN_EDGE_RESOURCE_ACCOUNTING_MODE = "shared_node"
+
+
 RAN_DEFAULT_BS_LIST = [
     {
         "bs_id": "bs_11",
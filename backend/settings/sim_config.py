@@ -4,4 +4,49 @@
 SIM_STEP_TIME_DEFAULT = 1
 SIM_HANDOVER_HISTORY_LENGTH = 3
 SIM_MAX_STEP = 20000
-SIM_SPAWN_UE_AFTER_LOAD_HISTORY_STABLIZED = True
\ No newline at end of file
+SIM_SPAWN_UE_AFTER_LOAD_HISTORY_STABLIZED = True
+# seed of the random number streams of the simulation (see utils/rng_utils.py), None draws a fresh seed
+# at each network reset, which is logged so that the run can be reproduced
+SIM_RANDOM_SEED = None
+# independent simulations (one per websocket connection) a backend process hosts
+SIM_MAX_SESSIONS = 16
+
+# per-step KPI history of UEs, cells and base stations (see network_layer/kpi_recorder.py)
+SIM_KPI_RECORDER_ENABLED = True
+SIM_KPI_RECORDER_CAPACITY = 600  # samples kept per tier
+# each further tier keeps the average of this many steps, e.g. 600 steps, 600 x 10 steps, 600 x 60 steps
+SIM_KPI_RECORDER_DOWNSAMPLING_FACTORS = [10, 60]
+# beyond this budget (e.g., for 100k UEs) the recorder keeps a shorter history, dropping the oldest samples
+SIM_KPI_RECORDER_MAX_MEMORY_MB = 512
+# samples kept per tier at least, recording pauses while even these do not fit in the budget
+SIM_KPI_RECORDER_MIN_CAPACITY = 60
+
+# on-disk trace of the per-step state (see network_layer/simulation_trace.py)
+SIM_TRACE_RECORDING_ENABLED = False  # record every simulation started from the UI
+SIM_TRACE_DIRECTORY = "traces"
+SIM_TRACE_CHUNK_STEPS = 256  # steps per chunk file
+SIM_TRACE_RECORD_FRAMES = True  # also store the simulation_state_update frames, needed for replay
+
+# checkpoints of the network state (see network_layer/checkpoint.py)
+SIM_CHECKPOINT_DIRECTORY = "checkpoints"
+SIM_CHECKPOINT_COMPRESSION_LEVEL = 1  # zlib level, 1 keeps saving and restoring in the milliseconds
+# checkpoint restored instead of the default network setup for new websocket connections, e.g. a warmed-up network
+SIM_WARM_START_CHECKPOINT = None
+
+# what-if forks of the live simulation (see network_layer/what_if.py)
+SIM_WHAT_IF_WORKERS = 2  # background worker processes, each what-if runs a baseline and a variant fork
+SIM_WHAT_IF_MAX_STEPS = 600
+SIM_WHAT_IF_MAX_KEPT_RESULTS = 20
+
+# parameter sweeps of headless simulations (see network_layer/parameter_sweep.py)
+SIM_SWEEP_WORKERS = 4
+SIM_SWEEP_DEFAULT_STEPS = 300
+SIM_SWEEP_DEFAULT_WARMUP_STEPS = 30
+SIM_SWEEP_PING_PONG_WINDOW_SECONDS = 5  # a handover back to the previous cell within this time is a ping-pong
+
+# gym-style environments for training RIC policies offline (see network_layer/ran_env.py)
+SIM_ENV_EPISODE_STEPS = 200
+SIM_ENV_WARMUP_STEPS = 10  # steps run at each reset before the first observation, e.g. to spawn UEs
+SIM_ENV_CIO_RANGE_dB = (-24, 24)  # cell individual offsets the agent can set
+SIM_ENV_HANDOVER_PENALTY_MBPS = 1.0  # reward cost of an agent handover, in Mbps of mean downlink bitrate
+SIM_ENV_WORKERS = 4  # subprocesses of a VectorRANEnv, 0 steps all environments in the calling process
@@ -1,4 +1,5 @@
 from .network_infra_config import NETWORK_COVERAGE_HEIGHT, NETWORK_COVERAGE_WIDTH
+from .slice_config import NETWORK_SLICE_MTC_NAME
 
 # ---------------------------
 # User Equipment (UE) Configuration
@@ -12,12 +13,52 @@ UE_DEFAULT_SPAWN_RATE_MIN = 1
 UE_DEFAULT_SPAWN_RATE_MAX = 5
 UE_speed_mps_MIN = 10
 UE_speed_mps_MAX = 20
+# how UEs move (see network_layer/mobility.py): "random_waypoint", "gauss_markov", "fixed_route" or "trace"
+UE_MOBILITY_MODEL = "random_waypoint"
+# decimals UE positions are rounded to after each move, None keeps them unrounded (e.g., sub-metre
+# movement of slow UEs at small step times)
+UE_POSITION_ROUNDING_DECIMALS = 0
+UE_GAUSS_MARKOV_ALPHA = 0.75  # memory of the speed and direction, 0 is memoryless, 1 is straight-line motion
+UE_GAUSS_MARKOV_SPEED_STD_MPS = 2
+UE_GAUSS_MARKOV_DIRECTION_STD_DEG = 30
+# routes of the fixed_route model as lists of (x, y) waypoints, each UE loops over one of them;
+# if empty, each UE loops over UE_FIXED_ROUTE_WAYPOINTS waypoints drawn in its operation region
+UE_MOBILITY_FIXED_ROUTES = []
+UE_FIXED_ROUTE_WAYPOINTS = 4
+# mobility trace of the trace model (see network_layer/mobility_trace.py), a CSV or Parquet file of
+# time-stamped UE positions sorted by time
+UE_MOBILITY_TRACE_FILE = None
+# columns of the trace, e.g. {"time": "timestep_time", "ue_id": "vehicle_id", "x": "vehicle_x", "y": "vehicle_y"}
+# for SUMO floating car data exported to CSV
+UE_MOBILITY_TRACE_COLUMNS = {"time": "time", "ue_id": "ue_id", "x": "x", "y": "y"}
+UE_MOBILITY_TRACE_CHUNK_ROWS = 100000
+UE_MOBILITY_TRACE_MAX_GAP_S = 10  # a UE without a sample for longer has left the network
 UE_DEFAULT_MAX_COUNT = 50
 UE_SERVING_CELL_HISTORY_LENGTH = 10
 UE_SSB_DETECTION_THRESHOLD = -110
 UE_TRANSMIT_POWER = 23
 UE_TEMPERATURE_K = 290
 UE_AI_SERVICE_REQUEST_COUNTDOWN = 10
+# send the AI service requests of UEs to the deployed AI services
+UE_AI_SERVICE_REQUESTS_ENABLED = True
+
+# RRC idle mode (see UE.step_rrc_state): UEs of the slices with a traffic pattern only have traffic in
+# bursts of burst_s seconds every period_s seconds (downlink bursts if mobile_terminated, the UE is then
+# paged), and release the connection in between; idle and inactive UEs are not scheduled by their cell.
+# Off by default as it changes the simulation results: idle and inactive UEs report no SINR, CQI or
+# bitrate (the what-if and sweep KPIs only average the connected UEs)
+UE_RRC_IDLE_MODE_ENABLED = False
+UE_SLICE_TRAFFIC_PATTERNS = {
+    NETWORK_SLICE_MTC_NAME: {"period_s": 60, "burst_s": 2, "mobile_terminated": False},
+}
+UE_RRC_INACTIVITY_TIMER_S = 5  # RRC_CONNECTED -> RRC_INACTIVE after this long without traffic
+UE_RRC_INACTIVE_TO_IDLE_S = 60  # RRC_INACTIVE -> RRC_IDLE
+UE_PAGING_DRX_CYCLE_S = 2.56  # time between the paging occasions of an idle or inactive UE
+UE_IDLE_MEASUREMENT_PERIOD_S = 10  # idle and inactive UEs measure the cells this often
+UE_IDLE_RESELECTION_HYSTERESIS_dB = 4  # idle cell reselection to a cell of the same frequency priority
+# the downlink measurements of a UE are only recomputed once it moved further than this (m) since the
+# last ones, or when the cells changed (see UE.monitor_signal_strength); 0 recomputes after any move
+UE_MEASUREMENT_POSITION_TOLERANCE_M = 0
 
 # 3GPP TS 38.214 version 15.3.0 Release 15
 # Table 5.2.2.1-3: 4-bit CQI Table 2
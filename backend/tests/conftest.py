@@ -0,0 +1,63 @@
+import pytest
+
+import settings
+import utils
+from network_layer.simulation_engine import SimulationEngine
+
+
+@pytest.fixture(autouse=True)
+def in_memory_container_runtime():
+    """The tests never start real containers."""
+    runtime = utils.InMemoryContainerRuntime()
+    utils.set_container_runtime(runtime)
+    return runtime
+
+
+@pytest.fixture
+def make_engine():
+    """Build a seeded simulation engine with the default network."""
+
+    def make(seed=3):
+        simulation_engine = SimulationEngine(seed=seed)
+        simulation_engine.reset_network()
+        simulation_engine.network_setup()
+        return simulation_engine
+
+    return make
+
+
+def run_steps(simulation_engine, steps):
+    for _ in range(steps):
+        simulation_engine.sim_step += 1
+        simulation_engine.step(settings.SIM_STEP_TIME_DEFAULT)
+
+
+def get_network_state(simulation_engine):
+    """The per UE and per cell state the tests compare between engines."""
+    return {
+        "sim_step": simulation_engine.sim_step,
+        "ues": {
+            ue.ue_imsi: (
+                ue.position_x,
+                ue.position_y,
+                ue.current_cell.cell_id if ue.current_cell else None,
+                ue.rrc_state,
+                ue.downlink_sinr,
+                ue.downlink_cqi,
+                ue.downlink_bitrate,
+                {
+                    cell_id: power_data["received_power_with_cio_dBm"]
+                    for cell_id, power_data in ue.downlink_received_power_dBm_dict.items()
+                },
+            )
+            for ue in simulation_engine.ue_list.values()
+        },
+        "cells": {
+            cell.cell_id: (
+                sorted(cell.connected_ue_list.keys()),
+                dict(cell.prb_ue_allocation_dict),
+                dict(cell.ue_uplink_signal_strength_dict),
+            )
+            for cell in simulation_engine.cell_list.values()
+        },
+    }
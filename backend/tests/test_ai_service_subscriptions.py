@@ -0,0 +1,109 @@
+"""AI service deployments and warm pool demand follow the subscribing UEs through registry events."""
+
+import pytest
+
+import settings
+from conftest import run_steps
+from knowledge_layer.knowledge_sources.ai_service_knowledge import AI_SERVICE_NAME_MAP
+from network_layer import ai_service_subscription_manager
+
+AI_SERVICE_NAME = "facebook-convnext-tiny-224"
+
+
+@pytest.fixture
+def simulation_engine(make_engine, monkeypatch):
+    monkeypatch.setattr(settings, "AI_SERVICE_WARM_POOL_ENABLED", True)
+    simulation_engine = make_engine(seed=7)
+    run_steps(simulation_engine, 5)
+    return simulation_engine
+
+
+def subscribe(simulation_engine, ue_count):
+    ue_ids = list(simulation_engine.ue_list)[:ue_count]
+    subscription_manager = simulation_engine.ric.ai_service_subscription_manager
+    return subscription_manager.create_subscription(
+        AI_SERVICE_NAME, AI_SERVICE_NAME_MAP[AI_SERVICE_NAME], ue_ids
+    )
+
+
+def get_deployment_bs_ids(simulation_engine, subscription):
+    return {
+        bs_id
+        for bs_id, bs in simulation_engine.base_station_list.items()
+        if bs.edge_server.get_ai_service_deployment(subscription) is not None
+    }
+
+
+def test_subscription_is_deployed_where_its_ues_are_served(simulation_engine):
+    subscription = subscribe(simulation_engine, 3)
+    subscription_manager = simulation_engine.ric.ai_service_subscription_manager
+
+    run_steps(simulation_engine, 1)
+
+    serving_bs_ids = {
+        simulation_engine.ue_list[ue_id].current_bs.bs_id
+        for ue_id in subscription.ue_id_list
+    }
+    assert get_deployment_bs_ids(simulation_engine, subscription) == serving_bs_ids
+    assert subscription_manager.dirty_pairs == set()
+
+    assert subscription_manager.delete_subscription(subscription.subscription_id)
+    assert get_deployment_bs_ids(simulation_engine, subscription) == set()
+
+
+def test_same_subscription_is_not_created_twice(simulation_engine):
+    subscription = subscribe(simulation_engine, 2)
+    assert subscribe(simulation_engine, 2) is subscription
+
+
+def test_warm_pool_demand_is_kept_up_to_date(simulation_engine):
+    subscription_manager = simulation_engine.ric.ai_service_subscription_manager
+    subscription = subscribe(simulation_engine, 6)
+    run_steps(simulation_engine, 40)
+    other_subscription = subscribe(simulation_engine, 3)
+    run_steps(simulation_engine, 40)
+    subscription_manager.delete_subscription(subscription.subscription_id)
+    run_steps(simulation_engine, 10)
+
+    # recount the demand from the current predictions
+    expected_demand = {}
+    for ue_imsi, prediction in subscription_manager.warm_pool_predictions.items():
+        ue = simulation_engine.ue_list[ue_imsi]
+        assert prediction[:3] == (ue.current_bs.bs_id, ue.target_x, ue.target_y)
+        serving_bs_id, _, _, predicted_bs_id = prediction
+        for subscription_id in subscription_manager.ue_subscription_ids[ue_imsi]:
+            for bs_id, index in ((serving_bs_id, 0), (predicted_bs_id, 1)):
+                if bs_id is not None:
+                    counts = expected_demand.setdefault(bs_id, {}).setdefault(
+                        subscription_id, [0, 0]
+                    )
+                    counts[index] += 1
+    assert set(subscription_manager.warm_pool_predictions) == set(
+        other_subscription.ue_id_list
+    )
+    assert subscription_manager.warm_pool_demand == expected_demand
+
+
+def test_next_base_station_is_only_predicted_on_changes(make_engine, monkeypatch):
+    monkeypatch.setattr(settings, "AI_SERVICE_WARM_POOL_ENABLED", True)
+    monkeypatch.setattr(settings, "UE_speed_mps_MIN", 0)
+    monkeypatch.setattr(settings, "UE_speed_mps_MAX", 0)
+    predictions = []
+    predict_next_base_station = ai_service_subscription_manager.predict_next_base_station
+
+    def count_predictions(ue, base_station_list):
+        predictions.append(ue.ue_imsi)
+        return predict_next_base_station(ue, base_station_list)
+
+    monkeypatch.setattr(
+        ai_service_subscription_manager, "predict_next_base_station", count_predictions
+    )
+    simulation_engine = make_engine(seed=7)
+    run_steps(simulation_engine, 5)
+    subscription = subscribe(simulation_engine, 4)
+    run_steps(simulation_engine, 1)
+    assert sorted(predictions) == sorted(subscription.ue_id_list)
+
+    # the UEs stand still, neither their serving base station nor their target changes
+    run_steps(simulation_engine, 20)
+    assert len(predictions) == len(subscription.ue_id_list)
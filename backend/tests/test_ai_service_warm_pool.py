@@ -0,0 +1,102 @@
+"""The warm pool pre-pulls images and pre-starts idle containers that deployments take over."""
+
+import time
+from concurrent.futures import wait
+
+import pytest
+
+import settings
+from knowledge_layer.knowledge_sources.ai_service_knowledge import AI_SERVICE_NAME_MAP
+
+AI_SERVICE_NAME = "facebook-convnext-tiny-224"
+AI_SERVICE_DATA = AI_SERVICE_NAME_MAP[AI_SERVICE_NAME]
+
+
+@pytest.fixture
+def edge_server(make_engine, monkeypatch):
+    monkeypatch.setattr(settings, "AI_SERVICE_WARM_POOL_ENABLED", True)
+    simulation_engine = make_engine(seed=5)
+    return next(iter(simulation_engine.base_station_list.values())).edge_server
+
+
+def step_until_settled(warm_pool, service_demand):
+    warm_pool.step(service_demand)
+    wait(
+        list(warm_pool.pending_pulls.values())
+        + [
+            container["future"]
+            for containers in warm_pool.warm_containers.values()
+            for container in containers
+        ]
+    )
+    warm_pool.step(service_demand)
+
+
+def test_warm_pool_is_opt_in(make_engine, monkeypatch):
+    simulation_engine = make_engine(seed=5)
+    assert all(
+        bs.edge_server.warm_pool is None
+        for bs in simulation_engine.base_station_list.values()
+    )
+    # read when the edge servers are built, not when the module is imported
+    monkeypatch.setattr(settings, "AI_SERVICE_WARM_POOL_ENABLED", True)
+    simulation_engine.reset_network()
+    simulation_engine.network_setup()
+    assert all(
+        bs.edge_server.warm_pool is not None
+        for bs in simulation_engine.base_station_list.values()
+    )
+
+
+def test_idle_container_is_handed_over_to_a_deployment(
+    edge_server, in_memory_container_runtime
+):
+    warm_pool = edge_server.warm_pool
+    demand = {
+        AI_SERVICE_NAME: {"ai_service_data": AI_SERVICE_DATA, "prepull": True, "warm": True}
+    }
+    step_until_settled(warm_pool, demand)
+
+    assert warm_pool.is_image_pulled(AI_SERVICE_DATA["image_repository_url"])
+    assert warm_pool.count_idle_containers(AI_SERVICE_NAME) == 1
+    (container,) = warm_pool.warm_containers[AI_SERVICE_NAME]
+    assert container["ready"]
+    assert container["container_name"] in in_memory_container_runtime.containers
+    assert container["container_name"] in edge_server.resource_ledger.reservations
+
+    simulation_engine = edge_server.base_station.simulation_engine
+    subscription = simulation_engine.ric.ai_service_subscription_manager.create_subscription(
+        AI_SERVICE_NAME, AI_SERVICE_DATA, []
+    )
+    error, deployment = edge_server.create_ai_service_deployment(subscription)
+
+    assert error is None
+    assert deployment["container_name"] == container["container_name"]
+    assert warm_pool.count_idle_containers(AI_SERVICE_NAME) == 0
+    # the container was started once, by the warm pool
+    assert [
+        call for call in in_memory_container_runtime.calls if call[0] == "run_container"
+    ] == [("run_container", AI_SERVICE_DATA["image_repository_url"], container["container_name"])]
+
+
+def test_unused_idle_container_is_removed(edge_server, in_memory_container_runtime):
+    warm_pool = edge_server.warm_pool
+    step_until_settled(
+        warm_pool,
+        {AI_SERVICE_NAME: {"ai_service_data": AI_SERVICE_DATA, "prepull": True, "warm": True}},
+    )
+    (container,) = warm_pool.warm_containers[AI_SERVICE_NAME]
+
+    for _ in range(settings.AI_SERVICE_WARM_POOL_IDLE_TIMEOUT_STEPS):
+        warm_pool.step({})
+
+    assert warm_pool.warm_containers == {}
+    assert edge_server.resource_ledger.reservations == {}
+    # the container is removed in the background
+    deadline = time.monotonic() + 10
+    while (
+        container["container_name"] in in_memory_container_runtime.containers
+        and time.monotonic() < deadline
+    ):
+        time.sleep(0.01)
+    assert container["container_name"] not in in_memory_container_runtime.containers
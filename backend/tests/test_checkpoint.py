@@ -0,0 +1,124 @@
+"""Checkpoints restore a network that continues exactly as the saved one."""
+
+import asyncio
+import struct
+from concurrent.futures import Future
+
+import pytest
+
+import settings
+from conftest import get_network_state, run_steps
+from network_layer import checkpoint
+from network_layer.ai_service_warm_pool import AIServiceWarmPool
+from network_layer.simulation_engine import SimulationEngine
+
+
+def test_restored_engine_continues_identically(make_engine):
+    simulation_engine = make_engine(seed=5)
+    run_steps(simulation_engine, 30)
+    data = checkpoint.dumps(simulation_engine)
+
+    restored_engine = SimulationEngine()
+    header = checkpoint.loads(restored_engine, data)
+
+    assert header["sim_step"] == simulation_engine.sim_step
+    assert get_network_state(restored_engine) == get_network_state(simulation_engine)
+    run_steps(simulation_engine, 30)
+    run_steps(restored_engine, 30)
+    assert get_network_state(restored_engine) == get_network_state(simulation_engine)
+
+
+def test_save_and_load_by_name(make_engine, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SIM_CHECKPOINT_DIRECTORY", str(tmp_path))
+    simulation_engine = make_engine(seed=5)
+    run_steps(simulation_engine, 10)
+    path = simulation_engine.get_checkpoint_path("warm.ckpt")
+    simulation_engine.save_checkpoint(path)
+
+    restored_engine = SimulationEngine()
+    restored_engine.load_checkpoint(restored_engine.get_checkpoint_path("warm.ckpt"))
+
+    assert path == str(tmp_path / "warm.ckpt")
+    assert get_network_state(restored_engine) == get_network_state(simulation_engine)
+
+
+@pytest.mark.parametrize(
+    "name", ["", None, "../warm.ckpt", "dir/warm.ckpt", "dir\\warm.ckpt", ".warm.ckpt", "/etc/passwd"]
+)
+def test_checkpoint_names_stay_in_the_checkpoint_directory(name):
+    with pytest.raises(checkpoint.CheckpointError):
+        checkpoint.get_checkpoint_path(name)
+
+
+def test_checkpoint_of_another_version_is_rejected(make_engine):
+    data = bytearray(checkpoint.dumps(make_engine(seed=5)))
+    # the format version follows the 8 bytes of the magic
+    struct.pack_into("<H", data, 8, checkpoint.CHECKPOINT_FORMAT_VERSION - 1)
+    with pytest.raises(checkpoint.CheckpointError):
+        checkpoint.loads(SimulationEngine(), bytes(data))
+
+
+def test_truncated_checkpoint_is_rejected(make_engine):
+    data = checkpoint.dumps(make_engine(seed=5))
+    with pytest.raises(checkpoint.CheckpointError):
+        checkpoint.loads(SimulationEngine(), data[:-1])
+
+
+def test_unfinished_warm_pool_futures_are_not_waited_for(make_engine):
+    simulation_engine = make_engine(seed=5)
+    edge_server = next(iter(simulation_engine.base_station_list.values())).edge_server
+    warm_pool = AIServiceWarmPool(edge_server)
+    edge_server.warm_pool = warm_pool
+    # a pull and a container start that never finish
+    warm_pool.pending_pulls["registry/image:latest"] = Future()
+    edge_server.resource_ledger.reserve("warm_container", 2.0, 0.0)
+    warm_pool.warm_containers["service"] = [
+        {
+            "ai_service_name": "service",
+            "image_repository_url": "registry/image:latest",
+            "container_name": "warm_container",
+            "ai_service_endpoint": None,
+            "cpu_memory_usage_GB": 2.0,
+            "device_memory_usage_GB": 0.0,
+            "ready": False,
+            "future": Future(),
+            "idle_steps": 0,
+        }
+    ]
+
+    restored_engine = SimulationEngine()
+    checkpoint.loads(restored_engine, checkpoint.dumps(simulation_engine))
+    restored_edge_server = restored_engine.base_station_list[
+        edge_server.base_station.bs_id
+    ].edge_server
+    restored_warm_pool = restored_edge_server.warm_pool
+    assert restored_warm_pool.pending_pulls["registry/image:latest"].cancelled()
+
+    restored_warm_pool._collect_background_results()
+
+    # the pull is retried by the next prepull, the container is dropped and its memory released
+    assert restored_warm_pool.pending_pulls == {}
+    assert not restored_warm_pool.is_image_pulled("registry/image:latest")
+    assert restored_warm_pool.warm_containers == {}
+    assert "warm_container" not in restored_edge_server.resource_ledger.reservations
+
+
+def test_background_save_holds_the_engine(make_engine, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SIM_CHECKPOINT_DIRECTORY", str(tmp_path))
+    simulation_engine = make_engine(seed=5)
+    run_steps(simulation_engine, 10)
+    holds = []
+    dumps = checkpoint.dumps
+
+    def dumps_and_check_hold(engine, compress=True):
+        holds.append(engine.checkpoint_holds)
+        return dumps(engine, compress)
+
+    monkeypatch.setattr(checkpoint, "dumps", dumps_and_check_hold)
+    path = asyncio.run(simulation_engine.save_checkpoint_in_background())
+
+    restored_engine = SimulationEngine()
+    restored_engine.load_checkpoint(path)
+    assert holds == [1]
+    assert simulation_engine.checkpoint_holds == 0
+    assert get_network_state(restored_engine) == get_network_state(simulation_engine)
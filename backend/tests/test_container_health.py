@@ -0,0 +1,98 @@
+"""AI service containers only serve requests once they pass their health check."""
+
+from concurrent.futures import wait
+
+import pytest
+
+import settings
+import utils
+from knowledge_layer.knowledge_sources.ai_service_knowledge import AI_SERVICE_NAME_MAP
+
+AI_SERVICE_NAME = "facebook-convnext-tiny-224"
+AI_SERVICE_DATA = AI_SERVICE_NAME_MAP[AI_SERVICE_NAME]
+
+
+@pytest.fixture
+def starting_runtime():
+    runtime = utils.InMemoryContainerRuntime(initial_health="starting")
+    utils.set_container_runtime(runtime)
+    return runtime
+
+
+def count_inspections(runtime):
+    return len([call for call in runtime.calls if call[0] == "inspect_containers"])
+
+
+def test_health_follows_the_container_events(starting_runtime):
+    error, _ = utils.start_ai_service_in_docker(
+        AI_SERVICE_DATA["image_repository_url"], "health_container"
+    )
+    assert error is None
+
+    assert utils.get_ai_service_container_health(["health_container", "no_container"]) == {
+        "health_container": "starting",
+        "no_container": "missing",
+    }
+    inspections = count_inspections(starting_runtime)
+
+    starting_runtime.set_container_health("health_container", "healthy")
+
+    assert utils.get_ai_service_container_health(["health_container"]) == {
+        "health_container": "healthy"
+    }
+    # the event was enough, the container was not inspected again
+    assert count_inspections(starting_runtime) == inspections
+
+
+def test_requests_wait_for_a_healthy_deployment(starting_runtime, make_engine):
+    simulation_engine = make_engine(seed=5)
+    edge_server = next(iter(simulation_engine.base_station_list.values())).edge_server
+    subscription = simulation_engine.ric.ai_service_subscription_manager.create_subscription(
+        AI_SERVICE_NAME, AI_SERVICE_DATA, []
+    )
+    error, deployment = edge_server.create_ai_service_deployment(subscription)
+    assert error is None
+
+    assert not edge_server.is_ai_service_ready(subscription)
+    starting_runtime.set_container_health(deployment["container_name"], "healthy")
+    assert edge_server.is_ai_service_ready(subscription)
+    assert edge_server.to_json()["ai_service_deployments"][subscription.subscription_id]["ready"]
+
+
+def test_warm_container_is_ready_once_healthy(starting_runtime, make_engine, monkeypatch):
+    monkeypatch.setattr(settings, "AI_SERVICE_WARM_POOL_ENABLED", True)
+    simulation_engine = make_engine(seed=5)
+    warm_pool = next(iter(simulation_engine.base_station_list.values())).edge_server.warm_pool
+    demand = {
+        AI_SERVICE_NAME: {"ai_service_data": AI_SERVICE_DATA, "prepull": True, "warm": True}
+    }
+    warm_pool.step(demand)
+    (container,) = warm_pool.warm_containers[AI_SERVICE_NAME]
+    wait([container["future"]])
+
+    warm_pool.step(demand)
+    assert not container["ready"]
+    assert warm_pool.acquire(AI_SERVICE_NAME) is None
+
+    starting_runtime.set_container_health(container["container_name"], "healthy")
+    warm_pool.step(demand)
+    assert container["ready"]
+    assert warm_pool.acquire(AI_SERVICE_NAME) is container
+
+
+def test_unhealthy_warm_container_is_removed(starting_runtime, make_engine, monkeypatch):
+    monkeypatch.setattr(settings, "AI_SERVICE_WARM_POOL_ENABLED", True)
+    simulation_engine = make_engine(seed=5)
+    edge_server = next(iter(simulation_engine.base_station_list.values())).edge_server
+    warm_pool = edge_server.warm_pool
+    warm_pool.step(
+        {AI_SERVICE_NAME: {"ai_service_data": AI_SERVICE_DATA, "prepull": True, "warm": True}}
+    )
+    (container,) = warm_pool.warm_containers[AI_SERVICE_NAME]
+    wait([container["future"]])
+
+    starting_runtime.set_container_health(container["container_name"], "unhealthy")
+    warm_pool.step({})
+
+    assert warm_pool.warm_containers == {}
+    assert container["container_name"] not in edge_server.resource_ledger.reservations
@@ -0,0 +1,135 @@
+"""Edge resource ledgers account for the memory the AI service containers reserve on the edge."""
+
+import settings
+from conftest import run_steps
+from knowledge_layer.knowledge_sources.ai_service_knowledge import AI_SERVICE_NAME_MAP
+from network_layer import checkpoint
+from network_layer.edge_resource_ledger import EdgeResourceLedger
+from network_layer.simulation_engine import SimulationEngine
+from network_layer.simulation_registry import SimulationRegistry
+
+AI_SERVICE_NAME = "facebook-convnext-tiny-224"
+
+
+def deploy_ai_service(simulation_engine):
+    """Subscribe a UE, returns the edge server the AI service is deployed on and the deployment."""
+    run_steps(simulation_engine, 5)
+    ue_imsi = next(iter(simulation_engine.ue_list))
+    subscription = simulation_engine.ric.ai_service_subscription_manager.create_subscription(
+        AI_SERVICE_NAME, AI_SERVICE_NAME_MAP[AI_SERVICE_NAME], [ue_imsi]
+    )
+    run_steps(simulation_engine, 1)
+    for bs in simulation_engine.base_station_list.values():
+        deployment = bs.edge_server.get_ai_service_deployment(subscription)
+        if deployment is not None:
+            return bs.edge_server, deployment
+    raise AssertionError("The AI service was not deployed.")
+
+
+def test_reservations_are_accounted_by_container():
+    ledger = EdgeResourceLedger("node", cpu_memory_GB=10.0, device_memory_GB=4.0)
+    ledger.reserve("first", 1.5, 1.0)
+    ledger.reserve("second", 2.0, 0.0)
+    # reserving the same container twice does not count it twice
+    ledger.reserve("first", 1.5, 1.0)
+    assert ledger.available_cpu_memory_GB == 6.5
+    assert ledger.available_device_memory_GB == 3.0
+
+    ledger.release("first")
+    ledger.release("unknown")
+    assert set(ledger.reservations) == {"second"}
+    assert ledger.available_device_memory_GB == 4.0
+
+    # nothing reserved, nothing used: no floating point residue
+    ledger.release("second")
+    assert ledger.used_cpu_memory_GB == 0.0
+    assert ledger.available_cpu_memory_GB == 10.0
+
+
+def test_accounting_mode_decides_who_shares_a_ledger(make_engine, monkeypatch):
+    simulation_engine = make_engine(seed=5)
+    edge_servers = [bs.edge_server for bs in simulation_engine.base_station_list.values()]
+    # the default edge servers all run on the same node
+    assert len({id(edge_server.resource_ledger) for edge_server in edge_servers}) == 1
+
+    monkeypatch.setattr(settings, "RAN_EDGE_RESOURCE_ACCOUNTING_MODE", "per_edge")
+    simulation_engine.reset_network()
+    simulation_engine.network_setup()
+    edge_servers = [bs.edge_server for bs in simulation_engine.base_station_list.values()]
+    assert len({id(edge_server.resource_ledger) for edge_server in edge_servers}) == len(
+        edge_servers
+    )
+    edge_server, deployment = deploy_ai_service(simulation_engine)
+    for other_edge_server in edge_servers:
+        if other_edge_server is not edge_server:
+            assert other_edge_server.available_cpu_memory_GB == other_edge_server.cpu_memory_GB
+    assert edge_server.available_cpu_memory_GB == (
+        edge_server.cpu_memory_GB - deployment["edge_specific_cpu_memory_usage_GB"]
+    )
+
+
+def create_session_engine(registry, session_id):
+    simulation_engine = registry.create_session(session_id).simulation_engine
+    simulation_engine.reset_network()
+    simulation_engine.network_setup()
+    return simulation_engine
+
+
+def test_sessions_share_the_ledgers_of_their_edge_nodes():
+    registry = SimulationRegistry()
+    first_engine = create_session_engine(registry, "first")
+    second_engine = create_session_engine(registry, "second")
+    edge_server, deployment = deploy_ai_service(first_engine)
+    other_edge_server = second_engine.base_station_list[
+        edge_server.base_station.bs_id
+    ].edge_server
+    ledger = registry.node_resource_ledgers[edge_server.node_id]
+    assert edge_server.resource_ledger is ledger
+    assert other_edge_server.resource_ledger is ledger
+    assert other_edge_server.available_cpu_memory_GB == (
+        ledger.cpu_memory_GB - deployment["edge_specific_cpu_memory_usage_GB"]
+    )
+
+    # closing a session releases the memory of its containers on the shared node
+    registry.remove_session("first")
+    assert other_edge_server.available_cpu_memory_GB == ledger.cpu_memory_GB
+    registry.remove_session("second")
+
+
+def test_engines_running_on_their_own_keep_their_own_ledgers(make_engine):
+    first_engine = make_engine(seed=5)
+    second_engine = make_engine(seed=5)
+    edge_server, _ = deploy_ai_service(first_engine)
+    other_edge_server = second_engine.base_station_list[
+        edge_server.base_station.bs_id
+    ].edge_server
+    assert other_edge_server.resource_ledger is not edge_server.resource_ledger
+    assert other_edge_server.resource_ledger.reservations == {}
+
+
+def test_checkpoint_moves_the_reservations_on_shared_nodes():
+    registry = SimulationRegistry()
+    simulation_engine = create_session_engine(registry, "saved")
+    edge_server, deployment = deploy_ai_service(simulation_engine)
+    bs_id = edge_server.base_station.bs_id
+    ledger = edge_server.resource_ledger
+    ledger.reserve("other_session_container", 1.0, 0.0)
+    data = checkpoint.dumps(simulation_engine)
+
+    # restored on its own, the engine only brings the reservations of its containers along
+    restored_engine = SimulationEngine()
+    checkpoint.loads(restored_engine, data)
+    restored_ledger = restored_engine.base_station_list[bs_id].edge_server.resource_ledger
+    assert restored_ledger is not ledger
+    assert set(restored_ledger.reservations) == {deployment["container_name"]}
+
+    # restored into a session, the reservations of the replaced network state are released
+    other_engine = create_session_engine(registry, "restored")
+    _, other_deployment = deploy_ai_service(other_engine)
+    assert other_deployment["container_name"] in ledger.reservations
+    checkpoint.loads(other_engine, data)
+    assert other_engine.base_station_list[bs_id].edge_server.resource_ledger is ledger
+    assert set(ledger.reservations) == {
+        "other_session_container",
+        deployment["container_name"],
+    }
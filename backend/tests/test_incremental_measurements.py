@@ -0,0 +1,64 @@
+"""The incremental UE measurements (UE.monitor_signal_strength) must match a full recomputation."""
+
+import pytest
+
+import settings
+from conftest import get_network_state, run_steps
+
+
+def invalidate_all_measurements(simulation_engine):
+    for ue in simulation_engine.ue_list.values():
+        ue.invalidate_measurements()
+        ue.measured_position = None
+    for cell in simulation_engine.cell_list.values():
+        cell.uplink_path_loss_cache.clear()
+
+
+def change_radio_configuration(simulation_engine, step):
+    cells = list(simulation_engine.cell_list.values())
+    if step == 30:
+        cells[0].cell_individual_offset_dBm += 6
+    elif step == 60:
+        cells[1].transmit_power_dBm -= 10
+    elif step == 90:
+        cells[2].qrx_level_min += 5
+    elif step == 100:
+        # sectorize the cells, their uplink antenna gains change too
+        for cell in cells:
+            cell.azimuth_deg = 120
+
+
+@pytest.mark.parametrize("speed_mps", [None, 0], ids=["moving", "stationary"])
+def test_incremental_measurements_match_full_recomputation(
+    make_engine, monkeypatch, speed_mps
+):
+    if speed_mps is not None:
+        # UEs that do not move only re-measure the changed cells
+        monkeypatch.setattr(settings, "UE_speed_mps_MIN", speed_mps)
+        monkeypatch.setattr(settings, "UE_speed_mps_MAX", speed_mps)
+    incremental_engine = make_engine(seed=3)
+    full_engine = make_engine(seed=3)
+    for step in range(120):
+        for simulation_engine in (incremental_engine, full_engine):
+            change_radio_configuration(simulation_engine, step)
+        invalidate_all_measurements(full_engine)
+        run_steps(incremental_engine, 1)
+        run_steps(full_engine, 1)
+        assert get_network_state(incremental_engine) == get_network_state(full_engine), (
+            f"state diverged at step {incremental_engine.sim_step}"
+        )
+
+
+def test_stationary_ue_remeasures_changed_cells(make_engine):
+    simulation_engine = make_engine(seed=3)
+    run_steps(simulation_engine, 20)
+    ue = next(u for u in simulation_engine.ue_list.values() if u.current_cell is not None)
+    cell = ue.current_cell
+    ue.monitor_signal_strength()
+    before = ue.downlink_received_power_dBm_dict[cell.cell_id]["received_power_dBm"]
+
+    cell.transmit_power_dBm -= 10
+    ue.monitor_signal_strength()
+
+    after = ue.downlink_received_power_dBm_dict[cell.cell_id]["received_power_dBm"]
+    assert after == before - 10
@@ -0,0 +1,80 @@
+"""Knowledge listings are paged by cursors that stay valid while UEs join and leave."""
+
+import pytest
+
+from conftest import run_steps
+from knowledge_layer import KnowledgeRouter
+from knowledge_layer.knowledge_pagination import KnowledgePage, KnowledgePaginationError
+
+ITEMS = {f"IMSI_{i}": i for i in range(1, 8)}
+
+
+def test_pages_follow_the_natural_order_of_the_ids():
+    first_page = KnowledgePage.from_dict(ITEMS, {"page_size": "3"})
+    assert first_page.items == [1, 2, 3]
+    assert first_page.next_cursor == "IMSI_3"
+
+    second_page = KnowledgePage.from_dict(ITEMS, {"page_size": "3", "cursor": "IMSI_3"})
+    assert second_page.items == [4, 5, 6]
+    last_page = KnowledgePage.from_dict(ITEMS, {"page_size": "3", "cursor": "IMSI_6"})
+    assert last_page.items == [7]
+    assert last_page.next_cursor is None
+
+    all_items = KnowledgePage.from_dict(ITEMS, {"page_size": "all"})
+    assert all_items.items == list(range(1, 8))
+    assert all_items.to_json() == {
+        "total": 7,
+        "cursor": None,
+        "next_cursor": None,
+        "page_size": None,
+    }
+
+
+def test_cursors_survive_items_leaving_and_joining():
+    items = dict(ITEMS)
+    cursor = KnowledgePage.from_dict(items, {"page_size": "3"}).next_cursor
+    # the item of the cursor left, an earlier and a later one joined
+    del items["IMSI_3"]
+    items["IMSI_0"] = 0
+    items["IMSI_10"] = 10
+    page = KnowledgePage.from_dict(items, {"page_size": "3", "cursor": cursor})
+    assert page.items == [4, 5, 6]
+    # a cursor past the last item is an empty page, not the first one again
+    assert KnowledgePage.from_dict(items, {"cursor": "IMSI_99"}).items == []
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"cursor": ""},
+        {"cursor": "bs_3"},
+        {"page_size": "0"},
+        {"page_size": "ten"},
+    ],
+)
+def test_invalid_cursors_and_page_sizes_are_rejected(params):
+    with pytest.raises(KnowledgePaginationError):
+        KnowledgePage.from_dict(ITEMS, params)
+
+
+def test_lists_are_paged_by_index():
+    items = list("abcde")
+    page = KnowledgePage.from_list(items, {"page_size": "2"})
+    assert page.items == ["a", "b"]
+    assert page.next_cursor == "1"
+    assert KnowledgePage.from_list(items, {"page_size": "2", "cursor": "3"}).items == ["e"]
+    for cursor in ["-3", "5", "x"]:
+        with pytest.raises(KnowledgePaginationError):
+            KnowledgePage.from_list(items, {"cursor": cursor})
+
+
+def test_list_routes_are_paged(make_engine):
+    simulation_engine = make_engine(seed=3)
+    run_steps(simulation_engine, 5)
+    router = KnowledgeRouter()
+    router.import_routes(simulation_engine)
+
+    first_page = router.query_knowledge("/user_equipments?page_size=2")
+    assert f"Showing 2 of {len(simulation_engine.ue_list)} " in first_page
+    assert "?cursor=" in first_page
+    assert "Invalid cursor" in router.query_knowledge("/user_equipments?cursor=bs_1")
@@ -0,0 +1,143 @@
+"""Collection queries filter, project, sort and aggregate the elements of a list route."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import run_steps
+from knowledge_layer import KnowledgeRouter
+from knowledge_layer.knowledge_query import (
+    CollectionColumns,
+    KnowledgeCollection,
+    KnowledgeQuery,
+    KnowledgeQueryError,
+)
+
+COLLECTION = KnowledgeCollection(
+    name="UEs",
+    source_attribute="ue_list",
+    id_attribute="ue_imsi",
+    attributes=["ue_imsi", "downlink_cqi", "slice_type", "current_bs"],
+)
+
+
+def ue(ue_imsi, downlink_cqi, slice_type, current_bs):
+    return SimpleNamespace(
+        ue_imsi=ue_imsi,
+        downlink_cqi=downlink_cqi,
+        slice_type=slice_type,
+        current_bs=current_bs,
+    )
+
+
+UES = [
+    ue("IMSI_1", 3, "eMBB", "bs_1"),
+    ue("IMSI_2", 12, "URLLC", "bs_1"),
+    ue("IMSI_3", None, "eMBB", "bs_2"),
+    ue("IMSI_4", 7, "mMTC", "bs_2"),
+    ue("IMSI_5", 15, "eMBB", None),
+]
+
+
+def evaluate(query_string, max_rows=None):
+    return KnowledgeQuery.parse(query_string).evaluate(
+        CollectionColumns(COLLECTION, UES), max_rows=max_rows
+    )
+
+
+def get_ids(result):
+    return [row["ue_imsi"] for row in result["rows"]]
+
+
+def test_conditions_are_joined_by_and():
+    assert get_ids(evaluate("where=downlink_cqi<10")) == ["IMSI_1", "IMSI_4"]
+    assert get_ids(evaluate("where=downlink_cqi>=7,slice_type=eMBB")) == ["IMSI_5"]
+    assert get_ids(evaluate("where=slice_type=URLLC|mMTC")) == ["IMSI_2", "IMSI_4"]
+    assert get_ids(evaluate("where=slice_type!=eMBB")) == ["IMSI_2", "IMSI_4"]
+    assert get_ids(evaluate("where=current_bs=None")) == ["IMSI_5"]
+    # a missing number only matches !=
+    assert "IMSI_3" not in get_ids(evaluate("where=downlink_cqi>=0"))
+    assert "IMSI_3" in get_ids(evaluate("where=downlink_cqi!=3"))
+
+
+def test_fields_sort_and_limit():
+    result = evaluate("fields=ue_imsi,downlink_cqi&sort=-downlink_cqi&limit=3")
+    assert result["matched"] == 5
+    assert result["rows"] == [
+        {"ue_imsi": "IMSI_5", "downlink_cqi": 15},
+        {"ue_imsi": "IMSI_2", "downlink_cqi": 12},
+        {"ue_imsi": "IMSI_4", "downlink_cqi": 7},
+    ]
+    # missing values are sorted last both ways
+    assert get_ids(evaluate("sort=downlink_cqi"))[-1] == "IMSI_3"
+    assert get_ids(evaluate("sort=slice_type")) == [
+        "IMSI_2",
+        "IMSI_1",
+        "IMSI_3",
+        "IMSI_5",
+        "IMSI_4",
+    ]
+
+
+def test_unlimited_queries_are_bounded_by_the_page_size():
+    result = evaluate("where=slice_type=eMBB", max_rows=2)
+    assert get_ids(result) == ["IMSI_1", "IMSI_3"]
+    assert result["more_rows"] == 1
+    assert "more_rows" not in evaluate("where=slice_type=eMBB&limit=3", max_rows=2)
+
+
+def test_aggregations_and_groups():
+    result = evaluate("agg=count,avg(downlink_cqi),max(downlink_cqi),sum(downlink_cqi)")
+    assert result["aggregations"] == {
+        "count": 5,
+        "avg(downlink_cqi)": pytest.approx(37 / 4),
+        "max(downlink_cqi)": 15.0,
+        "sum(downlink_cqi)": 37.0,
+    }
+    result = evaluate("group_by=current_bs&agg=count,min(downlink_cqi)")
+    assert result["groups"] == [
+        {"current_bs": "bs_1", "count": 2, "min(downlink_cqi)": 3.0},
+        {"current_bs": "bs_2", "count": 2, "min(downlink_cqi)": 7.0},
+        {"current_bs": None, "count": 1, "min(downlink_cqi)": 15.0},
+    ]
+    # counted per group by default
+    assert evaluate("group_by=slice_type")["groups"][0] == {
+        "slice_type": "eMBB",
+        "count": 3,
+    }
+
+
+@pytest.mark.parametrize(
+    "query_string",
+    [
+        "where=downlink_cqi~3",
+        "where=downlink_cqi<low",
+        "where=slice_type<eMBB",
+        "where=unknown=1",
+        "limit=-1",
+        "agg=avg",
+        "agg=median(downlink_cqi)",
+        "agg=avg(slice_type)",
+        "order=downlink_cqi",
+    ],
+)
+def test_invalid_queries_are_rejected(query_string):
+    with pytest.raises(KnowledgeQueryError):
+        evaluate(query_string)
+
+
+def test_list_routes_answer_collection_queries(make_engine):
+    simulation_engine = make_engine(seed=3)
+    run_steps(simulation_engine, 1)
+    router = KnowledgeRouter()
+    router.import_routes(simulation_engine)
+
+    response = router.query_knowledge_bulk(
+        ["/user_equipments?agg=count&group_by=current_bs", "/cells?where=nope=1"]
+    )
+    grouped, invalid = response["results"]
+    assert grouped["error"] is None
+    assert sum(group["count"] for group in grouped["data"]["groups"]) == len(
+        simulation_engine.ue_list
+    )
+    assert "not supported" in invalid["error"]
@@ -0,0 +1,77 @@
+"""Knowledge responses are cached per simulation state, docs responses until the routes change."""
+
+import pytest
+
+from conftest import run_steps
+from knowledge_layer import KnowledgeRouter
+
+
+@pytest.fixture
+def simulation_engine(make_engine):
+    simulation_engine = make_engine(seed=3)
+    run_steps(simulation_engine, 2)
+    return simulation_engine
+
+
+@pytest.fixture
+def router(simulation_engine):
+    router = KnowledgeRouter()
+    router.import_routes(simulation_engine)
+    return router
+
+
+def register_counting_route(router, pattern, cacheable=True):
+    calls = []
+
+    def handler(query_key, params):
+        calls.append(query_key)
+        return f"{query_key} at step {router._get_query_snapshot().sim_step}"
+
+    router.register_route(pattern, handler, cacheable=cacheable)
+    return calls
+
+
+def test_live_responses_are_cached_for_one_state(simulation_engine, router):
+    calls = register_counting_route(router, "/test/live")
+    first = router.query_knowledge("/test/live")
+    assert router.query_knowledge("/test/live") == first
+    assert calls == ["/test/live"]
+    metrics = router.get_response_cache_metrics()
+    assert (metrics["live_hits"], metrics["live_misses"]) == (1, 1)
+    assert metrics["chars_served_from_cache"] == len(first)
+
+    run_steps(simulation_engine, 1)
+    second = router.query_knowledge("/test/live")
+    assert second != first
+    assert second.endswith(f"step {simulation_engine.sim_step}")
+    assert len(calls) == 2
+
+
+def test_docs_responses_outlive_the_steps(simulation_engine, router):
+    calls = register_counting_route(router, "/docs/test")
+    first = router.query_knowledge("/docs/test")
+    run_steps(simulation_engine, 1)
+    assert router.query_knowledge("/docs/test") == first
+    assert calls == ["/docs/test"]
+    assert router.get_response_cache_metrics()["static_hits"] == 1
+
+    # registering a route may change the answers, the caches start over
+    router.register_route("/docs/other", lambda query_key, params: "other")
+    router.query_knowledge("/docs/test")
+    assert len(calls) == 2
+
+
+def test_uncacheable_responses_are_built_every_time(router):
+    calls = register_counting_route(router, "/test/uncached", cacheable=False)
+    router.query_knowledge("/test/uncached")
+    router.query_knowledge("/test/uncached")
+    assert len(calls) == 2
+    assert router.get_response_cache_metrics()["cached_live_responses"] == 0
+
+
+def test_real_routes_answer_the_same_from_the_cache(router):
+    for query_key in ["/base_stations", "/cells", "/docs/user_equipments/mobility"]:
+        assert router.query_knowledge(query_key) == router.query_knowledge(query_key)
+    metrics = router.get_response_cache_metrics()
+    assert metrics["static_hits"] + metrics["live_hits"] == 3
+    assert metrics["hit_rate"] == 0.5
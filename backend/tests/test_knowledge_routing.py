@@ -0,0 +1,81 @@
+"""Knowledge query keys are routed through a segment trie, matching like a scan of the route regexes."""
+
+import pytest
+
+from knowledge_layer import KnowledgeRouter
+from knowledge_layer.knowledge_route import KnowledgeRoute
+from knowledge_layer.knowledge_route_trie import KnowledgeRouteTrie
+
+
+def build_trie(patterns):
+    trie = KnowledgeRouteTrie()
+    for pattern in patterns:
+        trie.insert(KnowledgeRoute(pattern, handler=None))
+    return trie
+
+
+def scan_routes(routes, key):
+    for route in routes:
+        params = route.match(key)
+        if params is not None:
+            return route, params
+    return None
+
+
+def test_the_route_registered_first_wins():
+    trie = build_trie(["/cells/{cell_id}", "/cells/summary", "/cells/{cell_id}/attributes/{name}"])
+    route, params = trie.match("/cells/summary")
+    assert route.pattern == "/cells/{cell_id}"
+    assert params == {"cell_id": "summary"}
+
+    trie = build_trie(["/cells/summary", "/cells/{cell_id}"])
+    route, params = trie.match("/cells/summary")
+    assert route.pattern == "/cells/summary"
+    assert params == {}
+    assert trie.match("/cells/bs_1_cell_low_freq")[1] == {"cell_id": "bs_1_cell_low_freq"}
+
+
+def test_param_segments_match_non_empty_segments_only():
+    trie = build_trie(["/cells/{cell_id}/attributes/{name}"])
+    assert trie.match("/cells/c1/attributes/max_prb")[1] == {
+        "cell_id": "c1",
+        "name": "max_prb",
+    }
+    assert trie.match("/cells//attributes/max_prb") is None
+    assert trie.match("/cells/c1/attributes") is None
+    assert trie.match("/cells/c1/attributes/max_prb/more") is None
+
+
+def test_routes_mixing_text_and_params_in_a_segment_compete_on_registration_order():
+    trie = build_trie(["/files/report_{name}", "/files/{file}"])
+    route, params = trie.match("/files/report_today")
+    assert route.pattern == "/files/report_{name}"
+    assert params == {"name": "today"}
+
+    trie = build_trie(["/files/{file}", "/files/report_{name}"])
+    assert trie.match("/files/report_today")[0].pattern == "/files/{file}"
+
+
+def test_router_matches_like_a_scan_of_its_routes(make_engine):
+    router = KnowledgeRouter()
+    router.import_routes(make_engine(seed=1))
+    keys = ["/", "/unknown", "/docs", "/docs/unknown/route"]
+    for route in router.routes:
+        keys.append(route.pattern.replace("{", "").replace("}", ""))
+        keys.append(route.pattern.replace("{", "x_").replace("}", ""))
+        keys.append(route.pattern + "/more")
+    for key in keys:
+        expected = scan_routes(router.routes, key)
+        match = router._match_route(key)
+        if expected is None:
+            assert match is None, key
+        else:
+            assert match[0] is expected[0], key
+            assert match[1] == expected[1], key
+
+    with pytest.raises(KeyError):
+        router._find_route("/unknown")
+    # cached matches are handed out as copies
+    route, params = router._find_route("/cells/some_cell")
+    params["cell_id"] = "changed"
+    assert router._find_route("/cells/some_cell")[1] == {"cell_id": "some_cell"}
@@ -0,0 +1,82 @@
+"""The KPI recorder keeps a shorter history instead of outgrowing its memory budget."""
+
+import settings
+from conftest import run_steps
+
+
+def get_full_memory_mb(kpi_recorder):
+    engine = kpi_recorder.simulation_engine
+    return (
+        sum(
+            table.max_bytes_per_element * len(elements)
+            for table, elements in (
+                (kpi_recorder.tables["user_equipments"], engine.ue_list),
+                (kpi_recorder.tables["cells"], engine.cell_list),
+                (kpi_recorder.tables["base_stations"], engine.base_station_list),
+            )
+        )
+        / 1024
+        / 1024
+    )
+
+
+def test_history_shrinks_and_grows_back_with_the_budget(make_engine, monkeypatch):
+    simulation_engine = make_engine(seed=4)
+    kpi_recorder = simulation_engine.kpi_recorder
+    kpi_recorder.enabled = True
+    run_steps(simulation_engine, 5)
+    full_memory_mb = get_full_memory_mb(kpi_recorder)
+    ue_table = kpi_recorder.tables["user_equipments"]
+    finest_tier = ue_table.tiers[0]
+    recorded_times = finest_tier.sim_times[: finest_tier.size].tolist()
+
+    monkeypatch.setattr(settings, "SIM_KPI_RECORDER_MAX_MEMORY_MB", full_memory_mb / 4)
+    run_steps(simulation_engine, 1)
+    assert kpi_recorder.enabled and not kpi_recorder.paused
+    assert kpi_recorder.capacity_scale <= 0.25 * 0.8
+    assert finest_tier.capacity == int(ue_table.max_capacities[0] * kpi_recorder.capacity_scale)
+    memory_bytes = ue_table.bytes_per_element * len(simulation_engine.ue_list)
+    assert memory_bytes <= full_memory_mb / 4 * 1024 * 1024
+    # the samples recorded so far still fit, and the new one was recorded
+    assert finest_tier.sim_times[: finest_tier.size].tolist() == recorded_times + [
+        kpi_recorder.latest_time
+    ]
+    assert kpi_recorder.latest_time == simulation_engine.sim_time
+
+    # full, the shrunk buffer drops its oldest samples
+    run_steps(simulation_engine, finest_tier.capacity)
+    assert finest_tier.size == finest_tier.capacity
+    assert finest_tier.oldest_time > recorded_times[-1]
+
+    # UEs keep joining, the budget of the full history has some headroom for them
+    monkeypatch.setattr(settings, "SIM_KPI_RECORDER_MAX_MEMORY_MB", full_memory_mb * 10)
+    run_steps(simulation_engine, 1)
+    assert kpi_recorder.capacity_scale == 1.0
+    assert finest_tier.capacity == ue_table.max_capacities[0]
+    assert kpi_recorder.latest_time == simulation_engine.sim_time
+
+
+def test_recording_pauses_while_even_the_minimum_history_does_not_fit(
+    make_engine, monkeypatch
+):
+    simulation_engine = make_engine(seed=4)
+    kpi_recorder = simulation_engine.kpi_recorder
+    kpi_recorder.enabled = True
+    run_steps(simulation_engine, 3)
+    full_memory_mb = get_full_memory_mb(kpi_recorder)
+    latest_time = kpi_recorder.latest_time
+    ue_imsi = next(iter(simulation_engine.ue_list))
+
+    monkeypatch.setattr(settings, "SIM_KPI_RECORDER_MAX_MEMORY_MB", full_memory_mb / 1000)
+    run_steps(simulation_engine, 2)
+    assert kpi_recorder.enabled and kpi_recorder.paused
+    assert kpi_recorder.latest_time == latest_time
+    error, history = kpi_recorder.get_history("user_equipments", ue_imsi, "position_x")
+    assert error is None and len(history["values"]) == 3
+
+    monkeypatch.setattr(settings, "SIM_KPI_RECORDER_MAX_MEMORY_MB", full_memory_mb)
+    run_steps(simulation_engine, 1)
+    assert not kpi_recorder.paused
+    assert kpi_recorder.latest_time == simulation_engine.sim_time
+    error, history = kpi_recorder.get_history("user_equipments", ue_imsi, "position_x")
+    assert error is None and len(history["values"]) == 4
@@ -0,0 +1,82 @@
+"""The mobility models move all UEs at once, within their operation regions."""
+
+import math
+
+import numpy as np
+import pytest
+
+import settings
+from conftest import run_steps
+from network_layer.mobility import move_towards_targets
+
+
+def test_positions_move_towards_their_targets():
+    positions = np.array([[0.0, 0.0], [0.0, 0.0], [10.0, 10.0]])
+    targets = np.array([[30.0, 40.0], [3.0, 4.0], [10.0, 10.0]])
+
+    new_positions, arrived = move_towards_targets(
+        positions, targets, np.array([10.0, 10.0, 10.0])
+    )
+
+    # 10 m along the 50 m straight line, the other ones land on their targets
+    assert new_positions.tolist() == [[6.0, 8.0], [3.0, 4.0], [10.0, 10.0]]
+    assert arrived.tolist() == [False, True, True]
+
+
+def in_operation_region(ue):
+    region = ue.operation_region
+    return (
+        region["min_x"] <= ue.position_x <= region["max_x"]
+        and region["min_y"] <= ue.position_y <= region["max_y"]
+    )
+
+
+@pytest.mark.parametrize("model", ["random_waypoint", "gauss_markov", "fixed_route"])
+def test_models_move_the_ues_within_their_operation_regions(
+    make_engine, monkeypatch, model
+):
+    monkeypatch.setattr(settings, "UE_MOBILITY_MODEL", model)
+    simulation_engine = make_engine(seed=6)
+    assert simulation_engine.mobility.name == model
+    run_steps(simulation_engine, 2)
+
+    for _ in range(20):
+        positions = {
+            ue_imsi: (ue.position_x, ue.position_y, ue.speed_mps)
+            for ue_imsi, ue in simulation_engine.ue_list.items()
+        }
+        run_steps(simulation_engine, 1)
+        mobility = simulation_engine.mobility
+        assert len(mobility.ues) == len(simulation_engine.ue_list)
+        for ue_imsi, ue in simulation_engine.ue_list.items():
+            assert in_operation_region(ue)
+            # the UE objects show the positions of the model
+            assert mobility.positions[mobility.rows[ue_imsi]].tolist() == [
+                ue.position_x,
+                ue.position_y,
+            ]
+            if ue_imsi in positions and model != "gauss_markov":
+                position_x, position_y, speed_mps = positions[ue_imsi]
+                moved = math.hypot(ue.position_x - position_x, ue.position_y - position_y)
+                # at most one step at the UE speed, plus the rounding of the positions
+                assert moved <= speed_mps * settings.SIM_STEP_TIME_DEFAULT + 1
+
+
+def test_fixed_route_ues_loop_over_their_waypoints(make_engine, monkeypatch):
+    monkeypatch.setattr(settings, "UE_MOBILITY_MODEL", "fixed_route")
+    simulation_engine = make_engine(seed=6)
+    run_steps(simulation_engine, 1)
+
+    for ue in simulation_engine.ue_list.values():
+        route = ue.mobility_state["route"]
+        assert len(route) == settings.UE_FIXED_ROUTE_WAYPOINTS
+        assert [ue.target_x, ue.target_y] == route[ue.mobility_state["waypoint"]]
+
+    visited = {ue_imsi: set() for ue_imsi in simulation_engine.ue_list}
+    for _ in range(100):
+        run_steps(simulation_engine, 1)
+        for ue_imsi, ue in simulation_engine.ue_list.items():
+            if ue_imsi in visited:
+                visited[ue_imsi].add(ue.mobility_state["waypoint"])
+    # the UEs staying long enough move on to the next waypoints of their route
+    assert any(len(waypoints) > 1 for waypoints in visited.values())
@@ -0,0 +1,119 @@
+"""Mobility traces are streamed in chunks, the UEs enter, move and leave the network with their samples."""
+
+import pickle
+
+import pytest
+
+import settings
+from conftest import run_steps
+from network_layer.mobility_trace import MobilityTraceError, MobilityTraceReader
+from network_layer.simulation_engine import SimulationEngine
+
+# UE b leaves after t=2, UE c enters at t=6, the trace starts at t=100
+TRACE = """time,ue_id,x,y
+100,a,500,500
+100,b,1500,500
+102,a,520,500
+102,b,1500,520
+104,a,540,500
+106,c,600,600
+106,a,560,500
+"""
+
+
+def write_trace(tmp_path, content, name="trace.csv"):
+    path = tmp_path / name
+    path.write_text(content)
+    return str(path)
+
+
+def get_positions(reader, time):
+    ue_ids, positions, _, _ = reader.positions_at(time, step_time=1)
+    return dict(zip(ue_ids, positions.tolist()))
+
+
+def test_positions_are_interpolated_between_the_samples(tmp_path):
+    reader = MobilityTraceReader(write_trace(tmp_path, TRACE), max_gap_s=3)
+    ue_ids, positions, targets, speeds = reader.positions_at(1, step_time=1)
+    assert ue_ids == ["a", "b"]
+    assert positions.tolist() == [[510, 500], [1500, 510]]
+    assert targets.tolist() == [[520, 500], [1500, 520]]
+    assert speeds.tolist() == [10, 10]
+
+    assert get_positions(reader, 2) == {"a": [520, 500], "b": [1500, 520]}
+    # b has no sample within the maximum gap, it left
+    assert get_positions(reader, 3) == {"a": [530, 500]}
+    # c is not in the trace before its first sample
+    assert get_positions(reader, 5) == {"a": [550, 500]}
+    # after their last samples, the UEs stay for one step
+    assert get_positions(reader, 6) == {"a": [560, 500], "c": [600, 600]}
+    assert get_positions(reader, 7) == {}
+    assert reader.end_of_trace
+
+
+def test_chunked_and_resumed_readers_read_the_same_positions(tmp_path):
+    path = write_trace(tmp_path, TRACE)
+    reader = MobilityTraceReader(path, max_gap_s=3)
+    chunked_reader = MobilityTraceReader(path, chunk_rows=2, max_gap_s=3)
+    times = [0.5, 1, 2.5, 3, 4, 5.5, 6, 6.5]
+    for time in times[:3]:
+        assert get_positions(chunked_reader, time) == get_positions(reader, time)
+    # e.g., restored from a checkpoint, the file is reopened after the rows read
+    resumed_reader = pickle.loads(pickle.dumps(chunked_reader))
+    for time in times[3:]:
+        expected = get_positions(reader, time)
+        assert get_positions(chunked_reader, time) == expected
+        assert get_positions(resumed_reader, time) == expected
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "time,ue_id,x,y\n0,a,0,0\n2,a,1,1\n1,b,0,0\n",
+        "time,ue,x,y\n0,a,0,0\n",
+    ],
+)
+def test_invalid_traces_are_rejected(tmp_path, content):
+    reader = MobilityTraceReader(write_trace(tmp_path, content), chunk_rows=2)
+    with pytest.raises(MobilityTraceError):
+        reader.positions_at(5, step_time=1)
+
+
+def test_missing_trace_files_are_rejected(tmp_path, monkeypatch):
+    with pytest.raises(MobilityTraceError):
+        MobilityTraceReader(str(tmp_path / "missing.csv"))
+    monkeypatch.setattr(settings, "UE_MOBILITY_MODEL", "trace")
+    monkeypatch.setattr(settings, "UE_MOBILITY_TRACE_FILE", None)
+    with pytest.raises(MobilityTraceError):
+        SimulationEngine(seed=1)
+
+
+def test_ues_enter_move_and_leave_with_the_trace(tmp_path, monkeypatch, make_engine):
+    path = write_trace(
+        tmp_path,
+        "time,ue_id,x,y\n"
+        "0,1,500,500\n0,2,1500,1500\n"
+        "2,1,520,500\n2,2,1500,1480\n"
+        "4,1,540,500\n4,2,1500,1460\n"
+        "6,1,560,500\n",
+    )
+    monkeypatch.setattr(settings, "UE_MOBILITY_MODEL", "trace")
+    monkeypatch.setattr(settings, "UE_MOBILITY_TRACE_FILE", path)
+    simulation_engine = make_engine(seed=1)
+
+    def get_ue_positions():
+        return {
+            ue_imsi: (ue.position_x, ue.position_y)
+            for ue_imsi, ue in simulation_engine.ue_list.items()
+        }
+
+    run_steps(simulation_engine, 1)
+    assert get_ue_positions() == {"IMSI_1": (510, 500), "IMSI_2": (1500, 1490)}
+    assert simulation_engine.ue_list["IMSI_1"].speed_mps == 10
+    assert simulation_engine.ue_list["IMSI_1"].current_cell is not None
+    run_steps(simulation_engine, 3)
+    assert get_ue_positions() == {"IMSI_1": (540, 500), "IMSI_2": (1500, 1460)}
+    run_steps(simulation_engine, 1)
+    assert get_ue_positions() == {"IMSI_1": (550, 500)}
+    run_steps(simulation_engine, 2)
+    assert simulation_engine.ue_list == {}
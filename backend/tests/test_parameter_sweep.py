@@ -0,0 +1,140 @@
+"""Parameter sweeps run every combination of parameter values and seed as an isolated headless simulation."""
+
+import copy
+import csv
+from types import SimpleNamespace
+
+import pytest
+
+import settings
+from network_layer.parameter_sweep import (
+    SWEEP_KPIS,
+    HandoverTracker,
+    ParameterSweepError,
+    apply_parameter,
+    expand_grid,
+    run_simulation,
+    run_sweep,
+)
+from network_layer.ue import RRC_CONNECTED, RRC_IDLE
+
+
+@pytest.fixture
+def sweep_settings(monkeypatch):
+    """The parameters change the settings in place, the tests change copies of them."""
+    monkeypatch.setattr(settings, "NETWORK_TOPOLOGY_SCENARIO_FILE", None)
+    monkeypatch.setattr(
+        settings, "RAN_DEFAULT_BS_LIST", copy.deepcopy(settings.RAN_DEFAULT_BS_LIST)
+    )
+    monkeypatch.setattr(
+        settings, "NETWORK_SLICES", copy.deepcopy(settings.NETWORK_SLICES)
+    )
+    monkeypatch.setattr(settings, "UE_DEFAULT_MAX_COUNT", settings.UE_DEFAULT_MAX_COUNT)
+    return settings
+
+
+def test_parameters_change_the_default_topology_and_settings(sweep_settings):
+    apply_parameter("rrc.A3.power_threshold", 5)
+    apply_parameter("cell.n78.transmit_power_dBm", 30)
+    apply_parameter("cell.*.cell_individual_offset_dBm", 2)
+    apply_parameter("slice.eMBB.GBR_DL", 5e6)
+    apply_parameter("settings.UE_DEFAULT_MAX_COUNT", 7)
+
+    for bs_init_data in sweep_settings.RAN_DEFAULT_BS_LIST:
+        assert bs_init_data["rrc_measurement_events"][0]["power_threshold"] == 5
+        for cell_init_data in bs_init_data["cell_list"]:
+            assert cell_init_data["cell_individual_offset_dBm"] == 2
+            if cell_init_data["frequency_band"] == "n78":
+                assert cell_init_data["transmit_power_dBm"] == 30
+    assert sweep_settings.NETWORK_SLICES["eMBB"]["GBR_DL"] == 5e6
+    assert sweep_settings.UE_DEFAULT_MAX_COUNT == 7
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "settings.NO_SUCH_SETTING",
+        "rrc.A3",
+        "rrc.A5.power_threshold",
+        "cell.n999.transmit_power_dBm",
+        "cell.*.no_such_key",
+        "slice.bulk.GBR_DL",
+        "slice.eMBB.no_such_key",
+        "bs.bs_1.position_x",
+    ],
+)
+def test_invalid_parameters_are_rejected(sweep_settings, name):
+    with pytest.raises(ParameterSweepError):
+        apply_parameter(name, 1)
+
+
+def test_grid_is_expanded_per_combination_and_seed():
+    runs = expand_grid({"a": [1, 2], "b": ["x"]}, seeds=[7, 8])
+    assert runs == [
+        (0, {"a": 1, "b": "x"}, 7),
+        (1, {"a": 1, "b": "x"}, 8),
+        (2, {"a": 2, "b": "x"}, 7),
+        (3, {"a": 2, "b": "x"}, 8),
+    ]
+    with pytest.raises(ParameterSweepError):
+        expand_grid({"a": []}, seeds=[1])
+
+
+def test_handover_tracker_counts_ping_pongs_but_not_reselections():
+    ue = SimpleNamespace(ue_imsi="IMSI_1", current_cell=None, rrc_state=RRC_CONNECTED)
+    simulation_engine = SimpleNamespace(ue_list={"IMSI_1": ue}, sim_time=0)
+    tracker = HandoverTracker(ping_pong_window_seconds=5)
+
+    def serve(cell_id, sim_time, rrc_state=RRC_CONNECTED):
+        ue.current_cell = SimpleNamespace(cell_id=cell_id)
+        ue.rrc_state = rrc_state
+        simulation_engine.sim_time = sim_time
+        tracker.update(simulation_engine)
+
+    serve("c1", 0)
+    serve("c2", 1)
+    serve("c1", 3)  # back within the window
+    serve("c2", 20)  # back, but after the window
+    serve("c3", 21, rrc_state=RRC_IDLE)
+    assert (tracker.handovers, tracker.ping_pongs) == (3, 1)
+
+
+def test_runs_are_reproducible_per_seed():
+    results = [run_simulation({}, seed, 10, warmup_steps=5) for seed in [1, 1, 2]]
+    for result in results:
+        assert set(SWEEP_KPIS) <= set(result)
+        assert result["mean_ue_count"] > 0
+    first, again, other = [
+        {kpi: result[kpi] for kpi in SWEEP_KPIS} for result in results
+    ]
+    assert first == again
+    assert first != other
+
+
+def test_sweep_runs_in_worker_processes_and_writes_a_row_per_run(tmp_path):
+    output_path = tmp_path / "results" / "sweep.csv"
+    rows = run_sweep(
+        {"settings.UE_DEFAULT_MAX_COUNT": [5, 10], "cell.n999.transmit_power_dBm": [1]},
+        seeds=[1],
+        steps=5,
+        output_path=str(output_path),
+        max_workers=2,
+    )
+    # the invalid parameter fails the runs, not the sweep
+    assert [row["run_id"] for row in rows] == [0, 1]
+    assert all("does not match any cell" in row["error"] for row in rows)
+
+    rows = run_sweep(
+        {"settings.UE_DEFAULT_MAX_COUNT": [5, 10]},
+        seeds=[1],
+        steps=5,
+        warmup_steps=5,
+        output_path=str(output_path),
+        max_workers=2,
+    )
+    assert [row["error"] for row in rows] == [None, None]
+    assert rows[0]["mean_ue_count"] <= 5 < rows[1]["mean_ue_count"] <= 10
+    with open(output_path, newline="") as file:
+        written = list(csv.DictReader(file))
+    assert sorted(int(row["run_id"]) for row in written) == [0, 1]
+    assert written[0]["settings.UE_DEFAULT_MAX_COUNT"] in ("5", "10")
@@ -0,0 +1,150 @@
+"""RANEnv steps the simulated network with the actions of a RIC policy, VectorRANEnv steps a batch of them."""
+
+import numpy as np
+import pytest
+
+from conftest import run_steps
+from network_layer import checkpoint
+from network_layer.ran_env import (
+    CELL_FEATURES,
+    RSRP_NOT_DETECTED_dBm,
+    UE_FEATURES,
+    RANEnv,
+    VectorRANEnv,
+)
+
+
+def copy_observation(observation):
+    return {key: value.copy() for key, value in observation.items()}
+
+
+def assert_same_observation(observation, other):
+    assert observation.keys() == other.keys()
+    for key in observation:
+        np.testing.assert_array_equal(observation[key], other[key])
+
+
+def test_episodes_are_reproducible_per_seed():
+    observations = []
+    for seed in [1, 1, 2]:
+        env = RANEnv(episode_steps=3, warmup_steps=5)
+        env.reset(seed=seed)
+        for _ in range(2):
+            env.step({})
+        observations.append(copy_observation(env.observation))
+        env.close()
+    assert_same_observation(observations[0], observations[1])
+    assert not np.array_equal(observations[0]["ue"], observations[2]["ue"])
+
+
+def test_observations_follow_the_layout():
+    env = RANEnv(episode_steps=2, warmup_steps=5)
+    observation, info = env.reset(seed=1)
+    assert observation["cell"].shape == (len(env.cell_ids), len(CELL_FEATURES))
+    assert observation["ue"].shape == (env.max_ue_count, len(UE_FEATURES))
+    assert info["episode_step"] == 0 and info["ue_count"] > 0
+
+    connected = UE_FEATURES.index("connected")
+    serving_cell = UE_FEATURES.index("serving_cell")
+    for ue in env.simulation_engine.ue_list.values():
+        slot = int(ue.ue_imsi.split("_")[1])
+        assert observation["ue"][slot, connected] == 1.0
+        assert observation["ue"][slot, serving_cell] == env.cell_index[
+            ue.current_cell.cell_id
+        ]
+        assert (observation["ue_rsrp"][slot] > RSRP_NOT_DETECTED_dBm).sum() == len(
+            ue.downlink_received_power_dBm_dict
+        )
+    free_slots = [
+        slot
+        for slot in range(env.max_ue_count)
+        if f"IMSI_{slot}" not in env.simulation_engine.ue_list
+    ]
+    assert (observation["ue"][free_slots, connected] == 0).all()
+    assert (observation["ue"][free_slots, serving_cell] == -1).all()
+
+    _, _, terminated, truncated, _ = env.step({})
+    assert not terminated and not truncated
+    _, _, terminated, truncated, info = env.step({})
+    assert truncated and info["episode_step"] == 2
+
+
+def test_actions_set_offsets_prb_shares_and_handovers():
+    env = RANEnv(warmup_steps=5, disable_xapps=["xAppA3HandoverBlind"])
+    env.reset(seed=1)
+    simulation_engine = env.simulation_engine
+    assert "xAppA3HandoverBlind" not in simulation_engine.ric.xapp_list
+
+    cio = np.full(len(env.cell_ids), np.nan)
+    cio[0], cio[1] = 100, -3
+    prb_share = np.full((len(env.cell_ids), len(env.slice_types)), np.nan)
+    prb_share[0] = 1.0
+    ue = next(iter(simulation_engine.ue_list.values()))
+    slot = int(ue.ue_imsi.split("_")[1])
+    target_cell_id = next(
+        cell_id
+        for cell_id in ue.downlink_received_power_dBm_dict
+        if cell_id != ue.current_cell.cell_id
+    )
+    handover = np.full(env.max_ue_count, -1)
+    handover[slot] = env.cell_index[target_cell_id]
+    # a handover of a free slot is rejected
+    free_slot = next(
+        slot
+        for slot in range(env.max_ue_count)
+        if f"IMSI_{slot}" not in simulation_engine.ue_list
+    )
+    handover[free_slot] = 0
+    previous_offset = simulation_engine.cell_list[env.cell_ids[2]].cell_individual_offset_dBm
+
+    info = env.apply_action({"cio": cio, "prb_share": prb_share, "handover": handover})
+    assert info == {"handovers": 1, "rejected_handovers": 1}
+    assert ue.current_cell.cell_id == target_cell_id
+    cells = [simulation_engine.cell_list[cell_id] for cell_id in env.cell_ids]
+    assert cells[0].cell_individual_offset_dBm == 24
+    assert cells[1].cell_individual_offset_dBm == -3
+    assert cells[2].cell_individual_offset_dBm == previous_offset
+    shares = list(cells[0].slice_dl_prb_share.values())
+    assert sum(shares) == pytest.approx(1.0)
+    assert cells[1].slice_dl_prb_share is None
+    env.close()
+
+
+def test_episodes_start_from_a_checkpoint(make_engine):
+    simulation_engine = make_engine(seed=4)
+    run_steps(simulation_engine, 10)
+    env = RANEnv(
+        warmup_steps=0, checkpoint_data=checkpoint.dumps(simulation_engine, compress=False)
+    )
+    _, info = env.reset(seed=1)
+    assert info["sim_step"] == 10
+    assert info["ue_count"] == len(simulation_engine.ue_list)
+    env.close()
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_vector_envs_match_single_envs_and_reset_finished_episodes(workers):
+    env_kwargs = {"episode_steps": 2, "warmup_steps": 3}
+    single_observations = []
+    for seed in [5, 6, 7]:
+        env = RANEnv(**env_kwargs)
+        env.reset(seed=seed)
+        env.step({})
+        single_observations.append(copy_observation(env.observation))
+        env.close()
+
+    with VectorRANEnv(3, workers=workers, env_kwargs=env_kwargs) as vector_env:
+        observation, infos = vector_env.reset(seed=5)
+        assert observation["cell"].shape[0] == 3 and len(infos) == 3
+        observation, rewards, _, truncated, infos = vector_env.step([{}] * 3)
+        assert rewards.shape == (3,) and not truncated.any()
+        for i, single_observation in enumerate(single_observations):
+            assert_same_observation(
+                {key: value[i] for key, value in observation.items()}, single_observation
+            )
+
+        _, _, _, truncated, infos = vector_env.step([{}] * 3)
+        assert truncated.all()
+        for info in infos:
+            assert info["final_observation"]["ue"].shape == observation["ue"].shape[1:]
+            assert info["reset_info"]["episode_step"] == 0
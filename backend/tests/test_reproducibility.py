@@ -0,0 +1,31 @@
+"""Simulations with the same seed are identical."""
+
+from conftest import get_network_state, run_steps
+
+
+def test_same_seed_gives_the_same_run(make_engine):
+    first_engine = make_engine(seed=7)
+    second_engine = make_engine(seed=7)
+    run_steps(first_engine, 60)
+    run_steps(second_engine, 60)
+    assert get_network_state(first_engine) == get_network_state(second_engine)
+
+
+def test_different_seeds_give_different_runs(make_engine):
+    first_engine = make_engine(seed=7)
+    second_engine = make_engine(seed=8)
+    run_steps(first_engine, 60)
+    run_steps(second_engine, 60)
+    assert get_network_state(first_engine) != get_network_state(second_engine)
+
+
+def test_reset_restarts_the_run(make_engine):
+    simulation_engine = make_engine(seed=7)
+    run_steps(simulation_engine, 30)
+    first_run = get_network_state(simulation_engine)
+
+    simulation_engine.reset_network()
+    simulation_engine.network_setup()
+    run_steps(simulation_engine, 30)
+
+    assert get_network_state(simulation_engine) == first_run
@@ -0,0 +1,141 @@
+"""UEs with a traffic pattern release the connection between their bursts and resume it for the next one."""
+
+import pytest
+
+import settings
+from conftest import run_steps
+from network_layer.ue import RRC_CONNECTED, RRC_IDLE, RRC_INACTIVE
+
+
+@pytest.fixture
+def idle_mode(monkeypatch):
+    monkeypatch.setattr(settings, "UE_RRC_IDLE_MODE_ENABLED", True)
+    monkeypatch.setattr(
+        settings,
+        "UE_SLICE_TRAFFIC_PATTERNS",
+        {
+            slice_type: {"period_s": 20, "burst_s": 2, "mobile_terminated": False}
+            for slice_type in settings.NETWORK_SLICES
+        },
+    )
+    monkeypatch.setattr(settings, "UE_RRC_INACTIVITY_TIMER_S", 5)
+    monkeypatch.setattr(settings, "UE_RRC_INACTIVE_TO_IDLE_S", 10)
+
+
+def get_ue(simulation_engine, mobile_terminated=False):
+    """A UE of the network whose next burst starts in 20 s."""
+    ue = next(iter(simulation_engine.ue_list.values()))
+    ue.traffic_pattern = {"period_s": 20, "burst_s": 2, "mobile_terminated": mobile_terminated}
+    ue.traffic_countdown = 20
+    ue.traffic_burst_remaining = 0
+    ue.rrc_state_time = 0
+    return ue
+
+
+def step_rrc_state(ue, steps):
+    states = []
+    for _ in range(steps):
+        ue.step_rrc_state(1)
+        states.append(ue.rrc_state)
+    return states
+
+
+def test_ues_are_always_connected_by_default(make_engine):
+    simulation_engine = make_engine(seed=2)
+    run_steps(simulation_engine, 30)
+    for ue in simulation_engine.ue_list.values():
+        assert ue.traffic_pattern is None
+        assert ue.rrc_state == RRC_CONNECTED
+
+
+def test_ues_release_the_connection_after_their_bursts(idle_mode, make_engine):
+    simulation_engine = make_engine(seed=2)
+    run_steps(simulation_engine, 1)
+    ue = get_ue(simulation_engine)
+    cell = ue.current_cell
+
+    states = step_rrc_state(ue, 19)
+    assert states[:4] == [RRC_CONNECTED] * 4
+    assert states[4:14] == [RRC_INACTIVE] * 10
+    assert states[14:] == [RRC_IDLE] * 5
+    # released UEs are not scheduled and report no radio KPIs
+    assert ue.ue_imsi in cell.connected_ue_list
+    assert ue.ue_imsi not in cell.rrc_connected_ue_list
+    assert cell.prb_ue_allocation_dict[ue.ue_imsi] == {"downlink": 0, "uplink": 0}
+    assert (ue.downlink_sinr, ue.downlink_cqi, ue.downlink_bitrate) == (0, 0, 0)
+
+    # the uplink burst resumes the connection right away
+    assert step_rrc_state(ue, 1) == [RRC_CONNECTED]
+    assert ue.ue_imsi in cell.rrc_connected_ue_list
+    # and the UE stays connected for the burst and the inactivity timer
+    assert step_rrc_state(ue, 6) == [RRC_CONNECTED] * 5 + [RRC_INACTIVE]
+
+
+def test_mobile_terminated_bursts_page_the_ue(idle_mode, make_engine):
+    simulation_engine = make_engine(seed=2)
+    run_steps(simulation_engine, 1)
+    ue = get_ue(simulation_engine, mobile_terminated=True)
+
+    step_rrc_state(ue, 19)
+    assert ue.rrc_state == RRC_IDLE and not ue.paging_pending
+    ue.paging_countdown = 2.5
+    # paged with the burst, the UE resumes the connection at its next paging occasion
+    assert step_rrc_state(ue, 1) == [RRC_IDLE]
+    assert ue.paging_pending
+    assert step_rrc_state(ue, 2) == [RRC_IDLE, RRC_CONNECTED]
+    assert not ue.paging_pending
+
+
+def test_ai_service_subscriptions_keep_the_ue_connected(idle_mode, make_engine):
+    simulation_engine = make_engine(seed=2)
+    run_steps(simulation_engine, 1)
+    ue = get_ue(simulation_engine)
+    ue.ai_service_subscriptions = {"subscription": None}
+    assert set(step_rrc_state(ue, 15)) == {RRC_CONNECTED}
+
+
+def test_idle_ues_reselect_cells_with_hysteresis(idle_mode, make_engine):
+    simulation_engine = make_engine(seed=2)
+    run_steps(simulation_engine, 1)
+    ue = get_ue(simulation_engine)
+    step_rrc_state(ue, 5)
+    assert ue.rrc_state == RRC_INACTIVE
+    serving_cell = ue.current_cell
+    other_cell = next(
+        cell
+        for cell in simulation_engine.cell_list.values()
+        if cell is not serving_cell
+        and cell.frequency_priority == serving_cell.frequency_priority
+    )
+
+    def measure(other_cell_offset_dB):
+        ue.downlink_received_power_dBm_dict = {
+            cell.cell_id: {
+                "cell": cell,
+                "frequency_priority": cell.frequency_priority,
+                "received_power_with_cio_dBm": -80 + offset_dB,
+            }
+            for cell, offset_dB in [(serving_cell, 0), (other_cell, other_cell_offset_dB)]
+        }
+
+    measure(settings.UE_IDLE_RESELECTION_HYSTERESIS_dB)
+    assert not ue.reselect_cell()
+    assert ue.current_cell is serving_cell
+    measure(settings.UE_IDLE_RESELECTION_HYSTERESIS_dB + 1)
+    assert ue.reselect_cell()
+    assert ue.current_cell is other_cell
+    assert ue.rrc_state == RRC_INACTIVE
+    assert ue.ue_imsi in other_cell.connected_ue_list
+    assert ue.ue_imsi not in other_cell.rrc_connected_ue_list
+
+
+def test_idle_mode_networks_step_reproducibly(idle_mode, make_engine):
+    rrc_states = []
+    for _ in range(2):
+        simulation_engine = make_engine(seed=4)
+        run_steps(simulation_engine, 40)
+        rrc_states.append(
+            {ue.ue_imsi: ue.rrc_state for ue in simulation_engine.ue_list.values()}
+        )
+    assert rrc_states[0] == rrc_states[1]
+    assert set(rrc_states[0].values()) - {RRC_CONNECTED}
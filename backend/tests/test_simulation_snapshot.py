@@ -0,0 +1,72 @@
+"""Snapshots are read-only views of one step boundary, copied as they are read."""
+
+import json
+
+import pytest
+
+from conftest import run_steps
+from network_layer.simulation_snapshot import (
+    SnapshotExpiredError,
+    SnapshotMutationError,
+    SnapshotObject,
+)
+
+
+def is_copied(clone):
+    return "_snapshot_source" not in object.__getattribute__(clone, "__dict__")
+
+
+def test_snapshot_reads_like_the_live_engine(make_engine):
+    simulation_engine = make_engine(seed=5)
+    run_steps(simulation_engine, 10)
+    snapshot = simulation_engine.get_snapshot()
+
+    assert isinstance(snapshot, SnapshotObject)
+    assert snapshot.get_snapshot() is snapshot
+    assert simulation_engine.get_snapshot() is snapshot
+    assert json.dumps(snapshot.to_json(), default=str) == json.dumps(
+        simulation_engine.to_json(), default=str
+    )
+
+
+def test_snapshot_is_read_only(make_engine):
+    simulation_engine = make_engine(seed=5)
+    run_steps(simulation_engine, 3)
+    snapshot = simulation_engine.get_snapshot()
+    cell = next(iter(snapshot.cell_list.values()))
+
+    with pytest.raises(SnapshotMutationError):
+        cell.transmit_power_dBm = 0
+    with pytest.raises(SnapshotMutationError):
+        del snapshot.sim_step
+
+
+def test_only_the_objects_read_are_copied(make_engine):
+    simulation_engine = make_engine(seed=5)
+    run_steps(simulation_engine, 10)
+    snapshot = simulation_engine.get_snapshot()
+    ues = list(snapshot.ue_list.values())
+
+    position_x = ues[0].position_x
+
+    assert is_copied(ues[0])
+    assert not any(is_copied(ue) for ue in ues[1:])
+    assert position_x == simulation_engine.ue_list[ues[0].ue_imsi].position_x
+
+
+def test_expired_snapshot_never_mixes_steps(make_engine):
+    simulation_engine = make_engine(seed=5)
+    run_steps(simulation_engine, 10)
+    snapshot = simulation_engine.get_snapshot()
+    ues = list(snapshot.ue_list.values())
+    read_position = (ues[0].position_x, ues[0].position_y)
+
+    run_steps(simulation_engine, 1)
+
+    # what was read stays as it was, what was not read cannot be read from the next step
+    assert (ues[0].position_x, ues[0].position_y) == read_position
+    with pytest.raises(SnapshotExpiredError):
+        ues[1].position_x
+    new_snapshot = simulation_engine.get_snapshot()
+    assert new_snapshot is not snapshot
+    assert new_snapshot.sim_step == snapshot.sim_step + 1
@@ -0,0 +1,137 @@
+"""Networks are set up from generated topologies and scenario files as well as the default base station list."""
+
+import os
+
+import pytest
+
+import settings
+from conftest import run_steps
+from network_layer.simulation_engine import SimulationEngine
+from network_layer.topology import (
+    TopologyError,
+    generate_topology,
+    get_default_topology,
+    hexagonal_sites,
+    load_scenario,
+    save_scenario,
+)
+
+
+def get_cell_ids(topology):
+    return [
+        cell_init_data["cell_id"]
+        for bs_init_data in topology["bs_list"]
+        for cell_init_data in bs_init_data["cell_list"]
+    ]
+
+
+def test_hexagonal_sites_cover_the_area():
+    sites = hexagonal_sites(2000, 2000, 500)
+    assert sites[:4] == [(250, 250), (750, 250), (1250, 250), (1750, 250)]
+    # every other row is shifted by half the inter-site distance
+    assert sites[4] == (500, 683)
+    assert all(0 <= x <= 2000 and 0 <= y <= 2000 for x, y in sites)
+    # an area smaller than the distance still gets a site, in its middle
+    assert hexagonal_sites(100, 100, 500) == [(50, 50)]
+
+
+def test_generated_topologies_are_reproducible_per_seed():
+    kwargs = {
+        "coverage_width": 3000,
+        "coverage_height": 3000,
+        "inter_site_distance": 1000,
+        "sectors": {"n78": 3},
+        "band_mix": {"n78": 1.0, "n258": 0.5},
+    }
+    topology = generate_topology(seed=1, **kwargs)
+    assert topology == generate_topology(seed=1, **kwargs)
+    assert topology != generate_topology(seed=2, **kwargs)
+
+    cell_ids = get_cell_ids(topology)
+    assert len(cell_ids) == len(set(cell_ids))
+    for bs_init_data in topology["bs_list"]:
+        bands = [cell["frequency_band"] for cell in bs_init_data["cell_list"]]
+        assert bands.count("n78") == 3
+        assert bands.count("n258") <= 1
+        azimuths = [cell["azimuth_deg"] for cell in bs_init_data["cell_list"] if "azimuth_deg" in cell]
+        assert azimuths == [0, 120, 240]
+    n258_sites = sum(
+        any(cell["frequency_band"] == "n258" for cell in bs_init_data["cell_list"])
+        for bs_init_data in topology["bs_list"]
+    )
+    assert 0 < n258_sites < len(topology["bs_list"])
+
+
+def test_poisson_topologies_and_invalid_arguments():
+    topology = generate_topology(layout="poisson", site_count=7, seed=3)
+    assert len(topology["bs_list"]) == 7
+    assert topology["coverage_width"] == settings.NETWORK_COVERAGE_WIDTH
+
+    for kwargs in [
+        {"layout": "grid"},
+        {"layout": "poisson"},
+        {"band_mix": {"n999": 1.0}},
+        {"inter_site_distance": 0},
+    ]:
+        with pytest.raises(TopologyError):
+            generate_topology(**kwargs)
+
+
+def test_scenario_files(tmp_path):
+    topology = generate_topology(coverage_width=1000, coverage_height=1000, inter_site_distance=500)
+    listed_path = str(tmp_path / "scenarios" / "listed.json")
+    save_scenario(topology, listed_path)
+    assert load_scenario(listed_path) == topology
+    # cached until the file changes
+    assert load_scenario(listed_path) is load_scenario(listed_path)
+    save_scenario({"bs_list": topology["bs_list"][:1]}, listed_path)
+    modified_at = os.path.getmtime(listed_path) + 1
+    os.utime(listed_path, (modified_at, modified_at))
+    reloaded = load_scenario(listed_path)
+    assert len(reloaded["bs_list"]) == 1
+    assert reloaded["coverage_width"] == settings.NETWORK_COVERAGE_WIDTH
+
+    generated_path = tmp_path / "generated.json"
+    generated_path.write_text(
+        '{"generator": {"coverage_width": 1000, "coverage_height": 1000, "inter_site_distance": 500}}'
+    )
+    assert load_scenario(str(generated_path)) == topology
+
+    for name, content in [
+        ("empty.json", "{}"),
+        ("invalid_generator.json", '{"generator": {"towers": 3}}'),
+    ]:
+        (tmp_path / name).write_text(content)
+        with pytest.raises(TopologyError):
+            load_scenario(str(tmp_path / name))
+
+
+def test_networks_are_set_up_from_a_topology(tmp_path, monkeypatch):
+    topology = generate_topology(
+        coverage_width=1500,
+        coverage_height=1000,
+        inter_site_distance=500,
+        sectors=3,
+        band_mix={"n78": 1.0},
+    )
+    scenario_path = str(tmp_path / "scenario.json")
+    save_scenario(topology, scenario_path)
+    monkeypatch.setattr(settings, "NETWORK_TOPOLOGY_SCENARIO_FILE", scenario_path)
+    assert get_default_topology() == topology
+
+    simulation_engine = SimulationEngine(seed=2)
+    simulation_engine.reset_network()
+    simulation_engine.network_setup()
+    assert sorted(simulation_engine.cell_list) == sorted(get_cell_ids(topology))
+    assert len(simulation_engine.base_station_list) == len(topology["bs_list"])
+    run_steps(simulation_engine, 5)
+    assert simulation_engine.ue_list
+    for ue in simulation_engine.ue_list.values():
+        assert 0 <= ue.position_x <= 1500 and 0 <= ue.position_y <= 1000
+
+
+def test_default_topology_is_the_default_base_station_list(monkeypatch):
+    monkeypatch.setattr(settings, "NETWORK_TOPOLOGY_SCENARIO_FILE", None)
+    topology = get_default_topology()
+    assert topology["bs_list"] is settings.RAN_DEFAULT_BS_LIST
+    assert topology["coverage_width"] == settings.NETWORK_COVERAGE_WIDTH
@@ -0,0 +1,75 @@
+"""Trace replays are sent by a task of the engine, which ends with the replay."""
+
+import asyncio
+
+from conftest import run_steps
+from network_layer.simulation_registry import SimulationRegistry
+
+
+class FakeWebSocket:
+    def __init__(self, blocking=False):
+        self.blocking = blocking
+        self.messages = []
+
+    async def send(self, message):
+        if self.blocking:
+            # e.g., a client that stopped reading
+            await asyncio.Event().wait()
+        self.messages.append(message)
+
+
+def record_trace(simulation_engine, trace_dir, steps):
+    simulation_engine.start_trace_recording(str(trace_dir))
+    run_steps(simulation_engine, steps)
+    simulation_engine.stop_trace_recording()
+
+
+def test_replay_sends_every_recorded_step(make_engine, tmp_path):
+    simulation_engine = make_engine(seed=2)
+    record_trace(simulation_engine, tmp_path / "trace", 5)
+    websocket = FakeWebSocket()
+
+    async def replay():
+        simulation_engine.open_trace_replay(str(tmp_path / "trace"))
+        await simulation_engine.play_trace_replay(websocket, speed=0)
+
+    asyncio.run(replay())
+    assert len(websocket.messages) == 5
+
+
+def test_closing_the_replay_cancels_its_task(make_engine, tmp_path):
+    simulation_engine = make_engine(seed=2)
+    record_trace(simulation_engine, tmp_path / "trace", 3)
+
+    async def replay():
+        simulation_engine.open_trace_replay(str(tmp_path / "trace"))
+        task = simulation_engine.play_trace_replay(FakeWebSocket(blocking=True))
+        await asyncio.sleep(0)
+        simulation_engine.close_trace_replay()
+        await asyncio.gather(task, return_exceptions=True)
+        return task
+
+    task = asyncio.run(replay())
+    assert task.cancelled()
+    assert simulation_engine.trace_replay is None
+    assert simulation_engine.trace_replay_task is None
+
+
+def test_removing_the_session_cancels_its_replay(tmp_path):
+    registry = SimulationRegistry()
+    session = registry.create_session("replay")
+    simulation_engine = session.simulation_engine
+    simulation_engine.reset_network()
+    simulation_engine.network_setup()
+    record_trace(simulation_engine, tmp_path / "trace", 3)
+
+    async def replay():
+        simulation_engine.open_trace_replay(str(tmp_path / "trace"))
+        task = simulation_engine.play_trace_replay(FakeWebSocket(blocking=True), speed=0)
+        await asyncio.sleep(0)
+        registry.remove_session("replay")
+        await asyncio.gather(task, return_exceptions=True)
+        return task
+
+    assert asyncio.run(replay()).cancelled()
+    assert registry.sessions == {}
@@ -0,0 +1,61 @@
+"""What-if forks run a checkpoint of the live engine ahead, with and without a scenario."""
+
+import asyncio
+
+from conftest import run_steps
+from network_layer import checkpoint
+from network_layer.what_if import WhatIfRunner, WhatIfScenario, run_fork
+
+
+def test_forks_of_a_checkpoint_only_differ_by_the_scenario(make_engine):
+    simulation_engine = make_engine(seed=5)
+    run_steps(simulation_engine, 20)
+    checkpoint_data = checkpoint.dumps(simulation_engine, compress=False)
+    cell_id = next(iter(simulation_engine.cell_list))
+    scenario = WhatIfScenario(
+        steps=20, cell_overrides={cell_id: {"transmit_power_dBm": 0}}
+    )
+
+    baseline = run_fork(checkpoint_data, WhatIfScenario(20).to_json())
+    baseline_again = run_fork(checkpoint_data, WhatIfScenario(20).to_json())
+    variant = run_fork(checkpoint_data, scenario.to_json())
+
+    assert baseline["from_step"] == 20 and baseline["to_step"] == 40
+    assert baseline["kpis"] == baseline_again["kpis"]
+    assert baseline["cell_load"] == baseline_again["cell_load"]
+    assert variant["kpis"] != baseline["kpis"]
+    # the live engine is not changed by the forks
+    assert simulation_engine.sim_step == 20
+
+
+def test_invalid_scenarios_are_rejected_before_forking(make_engine):
+    runner = WhatIfRunner()
+    error, what_if_id = asyncio.run(
+        runner.fork(
+            make_engine(seed=5),
+            WhatIfScenario(steps=10, cell_overrides={"no_such_cell": {"transmit_power_dBm": 0}}),
+        )
+    )
+    assert error == "Cell no_such_cell not found."
+    assert what_if_id is None
+    assert runner.executor is None
+
+
+def test_runner_compares_the_forks_in_worker_processes(make_engine):
+    simulation_engine = make_engine(seed=5)
+    run_steps(simulation_engine, 10)
+    cell_id = next(iter(simulation_engine.cell_list))
+    scenario = WhatIfScenario(
+        steps=10, cell_overrides={cell_id: {"cell_individual_offset_dBm": 6}}
+    )
+    runner = WhatIfRunner()
+    try:
+        error, result = asyncio.run(runner.run(simulation_engine, scenario))
+    finally:
+        runner.shutdown()
+
+    assert error is None
+    assert result["status"] == "done"
+    assert result["from_step"] == 10
+    assert result["variant"]["to_step"] == 20
+    assert set(result["comparison"]) == set(result["baseline"]["kpis"])
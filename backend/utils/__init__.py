@@ -8,20 +8,26 @@ from .ue_utils import (
 )
 from .ric_utils import xAppControlAction
 from .logging_utils import setup_logging
-from .class_utils import SingletonMeta, generate_short_hash
+from .class_utils import generate_short_hash
+from .rng_utils import SIMULATION_RNG_STREAMS, SimulationRNG
 from .text_utils import (
     get_first_paragraph,
     bytes_pretty_printer,
     parse_memory_usage_string,
 )
 from .websocket_utils import (
-    WebSocketSingleton,
     WebSocketResponse,
     handle_start_simulation,
     handle_stop_simulation,
     handle_get_simulation_state,
+    handle_start_trace_replay,
+    handle_seek_trace_replay,
+    handle_stop_trace_replay,
+    handle_save_checkpoint,
+    handle_load_checkpoint,
     handle_get_routes,
     handle_query_knowledge,
+    handle_query_knowledge_bulk,
     stream_agent_chat,
     send_response_text_delta_event,
     send_agent_updated_event,
@@ -34,5 +40,17 @@ from .docker_utils import (
     get_available_port,
     start_ai_service_in_docker,
     remove_ai_service_in_docker,
+    inspect_ai_service_containers,
+    watch_ai_service_container_health,
+    get_ai_service_container_health,
+    is_ai_service_container_ready,
     send_post_request,
 )
+from .container_runtime import (
+    ContainerRuntimeError,
+    ContainerRuntimeBase,
+    DockerEngineRuntime,
+    InMemoryContainerRuntime,
+    get_container_runtime,
+    set_container_runtime,
+)
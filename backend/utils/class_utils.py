@@ -2,17 +2,6 @@ import secrets
 import base64
 
 
-class SingletonMeta(type):
-    """A metaclass for creating singleton classes."""
-
-    _instances = {}
-
-    def __call__(cls, *args, **kwargs):
-        if cls not in cls._instances:
-            cls._instances[cls] = super().__call__(*args, **kwargs)
-        return cls._instances[cls]
-
-
 def generate_short_hash(length=8):
     random_bytes = secrets.token_bytes(length)
     return base64.urlsafe_b64encode(random_bytes).decode("utf-8")[:length]
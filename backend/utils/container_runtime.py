@@ -0,0 +1,655 @@
+import http.client
+import json
+import logging
+import select
+import socket
+import threading
+import time
+import urllib.parse
+
+import requests
+
+import settings
+
+logger = logging.getLogger(__name__)
+
+# requests repeated when the connection fails after they were sent, the daemon may have acted on others
+_RETRIED_METHODS = ("GET", "HEAD")
+
+
+class ContainerRuntimeError(Exception):
+    """Raised when the container runtime rejects or fails a request."""
+
+
+def _normalize_container_name(name: str) -> str:
+    return name[1:] if name.startswith("/") else name
+
+
+def _parse_health_from_status(status: str):
+    # the list endpoint only exposes health inside the human readable status,
+    # e.g. "Up 3 minutes (healthy)" or "Up 2 seconds (health: starting)"
+    if not status:
+        return None
+    if "(healthy)" in status:
+        return "healthy"
+    if "(unhealthy)" in status:
+        return "unhealthy"
+    if "(health: starting)" in status:
+        return "starting"
+    return None
+
+
+class ContainerRuntimeBase:
+    """Interface of the container runtimes used to deploy AI services at the edge.
+
+    Container info dicts returned by the runtimes share the same shape:
+        {
+            "id": "3f2c...",
+            "name": "bs_11_edge_xxx_service",
+            "image": "docker.io/cranfield6g/cranfield-edge-...",
+            "state": "running",
+            "health": "healthy",  # or "starting", "unhealthy", None
+            "ports": {"8000/tcp": "49153"},
+        }
+    """
+
+    def inspect_containers(self, container_names: list[str]) -> dict:
+        """Inspect many containers in one call.
+
+        Returns:
+            dict: container name -> container info, or None if the container does not exist.
+        """
+        raise NotImplementedError
+
+    def inspect_container(self, container_name: str):
+        return self.inspect_containers([container_name]).get(container_name, None)
+
+    def list_containers(self, name_prefix: str = None) -> list[dict]:
+        raise NotImplementedError
+
+    def get_container_port(self, container_name: str, container_port: int = 8000):
+        container = self.inspect_container(container_name)
+        if container is None:
+            return None
+        return container["ports"].get(f"{container_port}/tcp", None)
+
+    def pull_image(self, image: str):
+        raise NotImplementedError
+
+    def has_image(self, image: str) -> bool:
+        raise NotImplementedError
+
+    def get_image_size(self, image: str) -> int:
+        raise NotImplementedError
+
+    def run_container(
+        self,
+        image: str,
+        container_name: str,
+        port_bindings: dict = None,
+        healthcheck_cmd: str = None,
+    ) -> str:
+        """Create and start a detached container.
+
+        Args:
+            image (str): The image to run.
+            container_name (str): The container name.
+            port_bindings (dict): container port -> host port, e.g., {8000: 49153}.
+            healthcheck_cmd (str): Shell command used as container health check.
+
+        Returns:
+            str: The container id.
+        """
+        raise NotImplementedError
+
+    def remove_container(self, container_name: str) -> bool:
+        """Force remove a container. Returns False if the container does not exist."""
+        raise NotImplementedError
+
+    def subscribe_events(self, callback, event_types=("health_status",)):
+        """Subscribe to container events.
+
+        The callback is called with dicts like
+        {"container_name": "...", "event": "health_status", "health": "healthy"}.
+
+        Returns:
+            An object with a close() method that stops the subscription.
+        """
+        raise NotImplementedError
+
+    def send_post_request(self, url: str, data: dict = None, files: dict = None):
+        """Send a POST request to a service running in a container, e.g., an AI service request.
+
+        Returns:
+            response (dict): The JSON response, or None if the request failed.
+            process_time (str): The X-Process-Time header of the service.
+            node_id (str): The X-NODE-ID header of the service.
+            k8s_pod_name (str): The X-K8S-POD-NAME header of the service.
+            request_time_ms (float): The time until the response was received.
+        """
+        started_at = time.perf_counter()
+        try:
+            response = requests.post(url, files=files, data=data)
+        except Exception as e:
+            print(f"Request failed: {e}")
+            return None, None, None, None, (time.perf_counter() - started_at) * 1000
+        request_time_ms = (time.perf_counter() - started_at) * 1000
+        if response.status_code != 200:
+            print(f"Error: {response.status_code}, {response.text}")
+            return None, None, None, None, request_time_ms
+        try:
+            response_json = response.json()
+        except ValueError as e:
+            print(f"Request failed: {e}")
+            return None, None, None, None, request_time_ms
+        # get the process time, node id and k8s pod name from the response headers
+        return (
+            response_json,
+            response.headers.get("X-Process-Time"),
+            response.headers.get("X-NODE-ID"),
+            response.headers.get("X-K8S-POD-NAME"),
+            request_time_ms,
+        )
+
+    def close(self):
+        pass
+
+
+def _is_connection_dropped(connection):
+    """Whether the peer closed an idle keep-alive connection: its socket reads as ready (EOF) without a request."""
+    if connection.sock is None:
+        return False
+    try:
+        readable, _, _ = select.select([connection.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+class _UnixSocketHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+class _DockerEventSubscription:
+    def __init__(self, runtime, callback, event_types):
+        self.runtime = runtime
+        self.callback = callback
+        self.event_types = event_types
+        self.connection = None
+        self.closed = False
+        self.thread = threading.Thread(
+            target=self._run, name="docker-event-stream", daemon=True
+        )
+        self.thread.start()
+
+    def _run(self):
+        filters = {"type": ["container"]}
+        if self.event_types:
+            # health events are reported as "health_status: healthy"
+            filters["event"] = list(self.event_types)
+        path = self.runtime._api_path(
+            "/events", {"filters": json.dumps(filters)}
+        )
+        try:
+            self.connection = _UnixSocketHTTPConnection(
+                self.runtime.socket_path, timeout=None
+            )
+            self.connection.request("GET", path)
+            response = self.connection.getresponse()
+            if response.status != 200:
+                logger.error(
+                    f"Docker event stream rejected: {response.status} {response.read()}"
+                )
+                return
+            while not self.closed:
+                line = response.readline()
+                if not line:
+                    break
+                line = line.strip()
+                if not line:
+                    continue
+                self._dispatch(json.loads(line))
+        except Exception as e:
+            # closing the connection from another thread interrupts the read
+            if not self.closed:
+                logger.error(f"Docker event stream stopped: {e}")
+
+    def _dispatch(self, raw_event):
+        action = raw_event.get("Action", raw_event.get("status", ""))
+        event, _, detail = action.partition(":")
+        attributes = raw_event.get("Actor", {}).get("Attributes", {})
+        event_data = {
+            "container_id": raw_event.get("id", raw_event.get("Actor", {}).get("ID")),
+            "container_name": _normalize_container_name(attributes.get("name", "")),
+            "event": event.strip(),
+            "health": detail.strip() or None,
+        }
+        try:
+            self.callback(event_data)
+        except Exception as e:
+            logger.error(f"Container event callback failed: {e}")
+
+    def close(self):
+        self.closed = True
+        if self.connection is not None:
+            self.connection.close()
+
+
+class DockerEngineRuntime(ContainerRuntimeBase):
+    """Talks to the Docker Engine REST API over its unix socket.
+
+    A single keep-alive connection is reused for all short requests, so checking,
+    inspecting and removing containers no longer forks a `docker` CLI process per call.
+    Image pulls and the event stream use their own connections because they are long-lived.
+    """
+
+    def __init__(
+        self,
+        socket_path=settings.DOCKER_ENGINE_SOCKET_PATH,
+        api_version=settings.DOCKER_ENGINE_API_VERSION,
+        timeout=settings.DOCKER_ENGINE_REQUEST_TIMEOUT_SECONDS,
+    ):
+        self.socket_path = socket_path
+        self.api_version = api_version
+        self.timeout = timeout
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def _api_path(self, path, query=None):
+        query_string = f"?{urllib.parse.urlencode(query)}" if query else ""
+        return f"/{self.api_version}{path}{query_string}"
+
+    def _get_connection(self):
+        if self._connection is not None and _is_connection_dropped(self._connection):
+            # closed by the daemon while idle, reconnect before sending anything
+            self._connection.close()
+            self._connection = None
+        if self._connection is None:
+            self._connection = _UnixSocketHTTPConnection(
+                self.socket_path, timeout=self.timeout
+            )
+        return self._connection
+
+    def _request(self, method, path, query=None, body=None):
+        headers = {}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+
+        with self._lock:
+            for attempt in range(2):
+                reused = self._connection is not None
+                connection = self._get_connection()
+                sent = False
+                try:
+                    connection.request(
+                        method, self._api_path(path, query), body=payload, headers=headers
+                    )
+                    sent = True
+                    response = connection.getresponse()
+                    data = response.read()
+                    break
+                except (ConnectionError, http.client.HTTPException, OSError) as e:
+                    connection.close()
+                    self._connection = None
+                    # retry once on a stale keep-alive connection, unless the daemon may already have
+                    # acted on the request (e.g., a repeated create conflicts, a repeated start fails)
+                    if attempt == 1 or not (
+                        method in _RETRIED_METHODS or (reused and not sent)
+                    ):
+                        raise ContainerRuntimeError(
+                            f"Docker engine request {method} {path} failed: {e}"
+                        ) from e
+
+        if data and response.getheader("Content-Type", "").startswith(
+            "application/json"
+        ):
+            data = json.loads(data)
+        return response.status, data
+
+    @staticmethod
+    def _raise_for_status(status, data, action):
+        if status >= 400:
+            message = data.get("message", data) if isinstance(data, dict) else data
+            raise ContainerRuntimeError(f"{action} failed ({status}): {message}")
+
+    def inspect_containers(self, container_names):
+        result = {name: None for name in container_names}
+        if not container_names:
+            return result
+        filters = {"name": [f"^/{name}$" for name in container_names]}
+        status, data = self._request(
+            "GET",
+            "/containers/json",
+            query={"all": "1", "filters": json.dumps(filters)},
+        )
+        self._raise_for_status(status, data, "Listing containers")
+        for container in data:
+            info = self._container_info_from_list_item(container)
+            if info["name"] in result:
+                result[info["name"]] = info
+        return result
+
+    def list_containers(self, name_prefix=None):
+        query = {"all": "1"}
+        if name_prefix:
+            query["filters"] = json.dumps({"name": [f"^/{name_prefix}"]})
+        status, data = self._request("GET", "/containers/json", query=query)
+        self._raise_for_status(status, data, "Listing containers")
+        return [self._container_info_from_list_item(container) for container in data]
+
+    @staticmethod
+    def _container_info_from_list_item(container):
+        names = container.get("Names") or [""]
+        ports = {}
+        for port in container.get("Ports") or []:
+            if port.get("PublicPort"):
+                ports[f"{port['PrivatePort']}/{port.get('Type', 'tcp')}"] = str(
+                    port["PublicPort"]
+                )
+        return {
+            "id": container.get("Id"),
+            "name": _normalize_container_name(names[0]),
+            "image": container.get("Image"),
+            "state": container.get("State"),
+            "health": _parse_health_from_status(container.get("Status", "")),
+            "ports": ports,
+        }
+
+    def pull_image(self, image):
+        repository, _, tag = image.rpartition(":")
+        if not repository or "/" in tag:
+            repository, tag = image, "latest"
+        connection = _UnixSocketHTTPConnection(
+            self.socket_path, timeout=settings.DOCKER_ENGINE_PULL_TIMEOUT_SECONDS
+        )
+        try:
+            connection.request(
+                "POST",
+                self._api_path("/images/create", {"fromImage": repository, "tag": tag}),
+            )
+            response = connection.getresponse()
+            # the pull progress is streamed as json lines, errors included
+            error = None
+            while True:
+                line = response.readline()
+                if not line:
+                    break
+                line = line.strip()
+                if not line:
+                    continue
+                progress = json.loads(line)
+                if "error" in progress:
+                    error = progress["error"]
+            if response.status >= 400 or error:
+                raise ContainerRuntimeError(
+                    f"Pulling image {image} failed ({response.status}): {error}"
+                )
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            raise ContainerRuntimeError(f"Pulling image {image} failed: {e}") from e
+        finally:
+            connection.close()
+
+    def _inspect_image(self, image):
+        status, data = self._request(
+            "GET", f"/images/{urllib.parse.quote(image, safe='')}/json"
+        )
+        if status == 404:
+            return None
+        self._raise_for_status(status, data, f"Inspecting image {image}")
+        return data
+
+    def has_image(self, image):
+        return self._inspect_image(image) is not None
+
+    def get_image_size(self, image):
+        data = self._inspect_image(image)
+        if data is None:
+            raise ContainerRuntimeError(f"Image {image} not found.")
+        return data.get("Size", 0)
+
+    def run_container(
+        self, image, container_name, port_bindings=None, healthcheck_cmd=None
+    ):
+        port_bindings = port_bindings or {}
+        body = {
+            "Image": image,
+            "ExposedPorts": {f"{port}/tcp": {} for port in port_bindings},
+            "HostConfig": {
+                "PortBindings": {
+                    f"{port}/tcp": [{"HostPort": str(host_port)}]
+                    for port, host_port in port_bindings.items()
+                }
+            },
+        }
+        if healthcheck_cmd:
+            # same as --health-interval=5s --health-timeout=2s --health-retries=3
+            body["Healthcheck"] = {
+                "Test": ["CMD-SHELL", healthcheck_cmd],
+                "Interval": 5 * 10**9,
+                "Timeout": 2 * 10**9,
+                "Retries": 3,
+            }
+        status, data = self._request(
+            "POST", "/containers/create", query={"name": container_name}, body=body
+        )
+        self._raise_for_status(status, data, f"Creating container {container_name}")
+        container_id = data["Id"]
+        status, data = self._request("POST", f"/containers/{container_id}/start")
+        self._raise_for_status(status, data, f"Starting container {container_name}")
+        return container_id
+
+    def remove_container(self, container_name):
+        status, data = self._request(
+            "DELETE", f"/containers/{container_name}", query={"force": "true"}
+        )
+        if status == 404:
+            return False
+        self._raise_for_status(status, data, f"Removing container {container_name}")
+        return True
+
+    def subscribe_events(self, callback, event_types=("health_status",)):
+        return _DockerEventSubscription(self, callback, event_types)
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class _InMemoryEventSubscription:
+    def __init__(self, runtime, callback, event_types):
+        self.runtime = runtime
+        self.callback = callback
+        self.event_types = event_types
+
+    def close(self):
+        if self in self.runtime.subscriptions:
+            self.runtime.subscriptions.remove(self)
+
+
+class InMemoryContainerRuntime(ContainerRuntimeBase):
+    """Fake container runtime that keeps images and containers in memory.
+
+    Containers become healthy as soon as they are started unless `initial_health` says otherwise,
+    and every call is recorded in `calls` so tests can assert on the runtime interactions.
+    Requests to the containers are answered without a service behind them, after a modeled
+    processing time of `request_latency_ms` plus `request_latency_ms_per_MB` per MB of request files,
+    so headless simulations still report AI service latencies.
+    """
+
+    def __init__(
+        self,
+        default_image_size=500 * 1024 * 1024,
+        initial_health="healthy",
+        request_latency_ms=30.0,
+        request_latency_ms_per_MB=20.0,
+    ):
+        self.default_image_size = default_image_size
+        self.initial_health = initial_health
+        self.request_latency_ms = request_latency_ms
+        self.request_latency_ms_per_MB = request_latency_ms_per_MB
+        self.images = {}
+        self.containers = {}
+        self.subscriptions = []
+        self.calls = []
+        self._next_host_port = 49000
+        self._next_container_id = 0
+        self._lock = threading.Lock()
+
+    def inspect_containers(self, container_names):
+        self.calls.append(("inspect_containers", tuple(container_names)))
+        with self._lock:
+            return {
+                name: (
+                    self._copy_info(self.containers[name])
+                    if name in self.containers
+                    else None
+                )
+                for name in container_names
+            }
+
+    def list_containers(self, name_prefix=None):
+        self.calls.append(("list_containers", name_prefix))
+        with self._lock:
+            return [
+                self._copy_info(info)
+                for name, info in self.containers.items()
+                if not name_prefix or name.startswith(name_prefix)
+            ]
+
+    @staticmethod
+    def _copy_info(info):
+        return {**info, "ports": dict(info["ports"])}
+
+    def pull_image(self, image):
+        self.calls.append(("pull_image", image))
+        with self._lock:
+            self.images.setdefault(image, self.default_image_size)
+
+    def has_image(self, image):
+        return image in self.images
+
+    def get_image_size(self, image):
+        self.calls.append(("get_image_size", image))
+        if image not in self.images:
+            raise ContainerRuntimeError(f"Image {image} not found.")
+        return self.images[image]
+
+    def run_container(
+        self, image, container_name, port_bindings=None, healthcheck_cmd=None
+    ):
+        self.calls.append(("run_container", image, container_name))
+        with self._lock:
+            if image not in self.images:
+                raise ContainerRuntimeError(f"Image {image} not found locally.")
+            if container_name in self.containers:
+                raise ContainerRuntimeError(
+                    f"Container name {container_name} is already in use."
+                )
+            ports = {}
+            for port, host_port in (port_bindings or {}).items():
+                if host_port is None:
+                    host_port = self._next_host_port
+                    self._next_host_port += 1
+                ports[f"{port}/tcp"] = str(host_port)
+            self._next_container_id += 1
+            container_id = f"fake{self._next_container_id:012d}"
+            self.containers[container_name] = {
+                "id": container_id,
+                "name": container_name,
+                "image": image,
+                "state": "running",
+                "health": self.initial_health if healthcheck_cmd else None,
+                "ports": ports,
+            }
+        if healthcheck_cmd and self.initial_health:
+            self._emit(container_name, "health_status", self.initial_health)
+        return container_id
+
+    def remove_container(self, container_name):
+        self.calls.append(("remove_container", container_name))
+        with self._lock:
+            removed = self.containers.pop(container_name, None)
+        if removed is None:
+            return False
+        self._emit(container_name, "destroy", None)
+        return True
+
+    def send_post_request(self, url, data=None, files=None):
+        self.calls.append(("send_post_request", url))
+        request_size = sum(
+            len(value) for value in (files or {}).values() if isinstance(value, bytes)
+        )
+        request_time_ms = (
+            self.request_latency_ms
+            + self.request_latency_ms_per_MB * request_size / (1024 * 1024)
+        )
+        return (
+            {"simulated": True},
+            f"{request_time_ms / 1000:.6f}",
+            "in_memory",
+            None,
+            request_time_ms,
+        )
+
+    def set_container_health(self, container_name, health):
+        """Simulate a health status change of a container."""
+        with self._lock:
+            self.containers[container_name]["health"] = health
+        self._emit(container_name, "health_status", health)
+
+    def _emit(self, container_name, event, health):
+        container = self.containers.get(container_name)
+        event_data = {
+            "container_id": container["id"] if container else None,
+            "container_name": container_name,
+            "event": event,
+            "health": health,
+        }
+        for subscription in list(self.subscriptions):
+            if subscription.event_types and event not in subscription.event_types:
+                continue
+            subscription.callback(event_data)
+
+    def subscribe_events(self, callback, event_types=("health_status",)):
+        subscription = _InMemoryEventSubscription(self, callback, event_types)
+        self.subscriptions.append(subscription)
+        return subscription
+
+
+CONTAINER_RUNTIME_BACKENDS = {
+    "docker": DockerEngineRuntime,
+    "in_memory": InMemoryContainerRuntime,
+}
+
+_container_runtime = None
+
+
+def get_container_runtime() -> ContainerRuntimeBase:
+    """Get the process-wide container runtime, created from settings on first use."""
+    global _container_runtime
+    if _container_runtime is None:
+        backend = settings.CONTAINER_RUNTIME_BACKEND
+        if backend not in CONTAINER_RUNTIME_BACKENDS:
+            raise ValueError(f"Unsupported container runtime backend: {backend}")
+        _container_runtime = CONTAINER_RUNTIME_BACKENDS[backend]()
+    return _container_runtime
+
+
+def set_container_runtime(runtime: ContainerRuntimeBase):
+    """Replace the container runtime, e.g., with an InMemoryContainerRuntime in tests."""
+    global _container_runtime
+    if _container_runtime is not None and _container_runtime is not runtime:
+        _container_runtime.close()
+    _container_runtime = runtime
@@ -1,10 +1,18 @@
-import subprocess
 import logging
 import socket
-import requests
+import threading
+import time
+
+import settings
+from .container_runtime import ContainerRuntimeError, get_container_runtime
 
 logger = logging.getLogger(__name__)
 
+AI_SERVICE_CONTAINER_PORT = 8000
+AI_SERVICE_HEALTHCHECK_CMD = "python healthcheck.py"
+# health of a container that does not exist (yet)
+CONTAINER_MISSING = "missing"
+
 
 def get_available_port() -> int:
     """Get an available port."""
@@ -15,100 +23,68 @@ def get_available_port() -> int:
     return port
 
 
-def start_ai_service_in_docker(ai_service_image_url: str, container_name: str):
+def start_ai_service_in_docker(
+    ai_service_image_url: str, container_name: str, pull: bool = True
+):
     """Start an AI service using Docker.
     Args:
         ai_service_image_url (str): The URL of the AI service Docker image, e.g., "docker.io/cranfield6g/cranfield-edge-trpakov-vit-face-expression"
         container_name (str): The name of the Docker container to be created, e.g., "cranfield-edge-trpakov-vit-face-expression"
+        pull (bool): Whether to pull the image first. Skip it when the image is known to be pre-pulled.
 
     Returns:
         error (str): Error message if any, otherwise None.
         ai_service_endpoint (str): The URL where the AI service is accessible, e.g., "localhost:8000"
     """
-    # ---------------------------------
-    # Check if any container of the same name is already running
-    # ---------------------------------
+    runtime = get_container_runtime()
     try:
-        subprocess.run(
-            ["docker", "inspect", container_name],
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
-        logger.info(f"Docker container {container_name} already exists.")
-
-        # get the port that's mapped to the 8000 of the existing container
-        service_port = (
-            subprocess.run(
-                ["docker", "port", container_name, "8000"],
-                capture_output=True,
-                text=True,
-                check=True,
+        # ---------------------------------
+        # Check if any container of the same name is already running
+        # ---------------------------------
+        existing_container = runtime.inspect_container(container_name)
+        if existing_container is not None:
+            logger.info(f"Docker container {container_name} already exists.")
+            # get the port that's mapped to the 8000 of the existing container
+            service_port = existing_container["ports"].get(
+                f"{AI_SERVICE_CONTAINER_PORT}/tcp", None
             )
-            .stdout.strip()
-            .split(":")[-1]
-        )
-        logger.info(
-            f"Docker container {container_name} is already running on port {service_port}:8000."
-        )
-        return None, f"localhost:{service_port}"
-    except subprocess.CalledProcessError:
+            logger.info(
+                f"Docker container {container_name} is already running on port {service_port}:{AI_SERVICE_CONTAINER_PORT}."
+            )
+            return None, f"localhost:{service_port}"
         logger.info(
             f"Docker container {container_name} does not exist. It will be created."
         )
 
-    try:
         # --------------------------------
         # Pull the docker image
         # ---------------------------------
-        logger.info(f"Pulling Docker image {ai_service_image_url} ...")
-        subprocess.run(
-            ["docker", "pull", ai_service_image_url],
-            check=True,
-        )
-        logger.info(f"Docker image {ai_service_image_url} pulled successfully.")
+        if pull:
+            logger.info(f"Pulling Docker image {ai_service_image_url} ...")
+            runtime.pull_image(ai_service_image_url)
+            logger.info(f"Docker image {ai_service_image_url} pulled successfully.")
 
         # ----------------------------------
         # Save the disk size of the pulled docker image
         # ----------------------------------
-        docker_image_size_bytes = subprocess.run(
-            ["docker", "image", "inspect", ai_service_image_url, "--format={{.Size}}"],
-            capture_output=True,
-            text=True,
-            check=True,
-        ).stdout.strip()
+        docker_image_size_bytes = runtime.get_image_size(ai_service_image_url)
         logger.info(f"Docker image size: {docker_image_size_bytes} bytes.")
 
         # --------------------------------
         # Run the docker container
         # ---------------------------------
         available_port = get_available_port()
-        cmd = [
-            "docker",
-            "run",
-            "-d",
-            "--name",
-            container_name,
-            "-p",
-            f"{available_port}:8000",
-            "--health-cmd",
-            "python healthcheck.py",
-            "--health-interval=5s",
-            "--health-timeout=2s",
-            "--health-retries=3",
-            ai_service_image_url,
-        ]
-        print(f"Running command: {' '.join(cmd)}")
-        subprocess.run(
-            cmd,
-            check=True,
+        runtime.run_container(
+            image=ai_service_image_url,
+            container_name=container_name,
+            port_bindings={AI_SERVICE_CONTAINER_PORT: available_port},
+            healthcheck_cmd=AI_SERVICE_HEALTHCHECK_CMD,
         )
-        print(f"Docker container {container_name} started successfully.")
-        print(f"Access the server at http://localhost:{available_port}/run")
+        logger.info(f"Docker container {container_name} started successfully.")
+        logger.info(f"Access the server at http://localhost:{available_port}/run")
 
-        # return f"localhost:{available_port}"
         return None, f"localhost:{available_port}"
-    except subprocess.CalledProcessError as e:
+    except ContainerRuntimeError as e:
         logger.error(f"Failed to start Docker container {container_name}: {e}")
         return (
             f"Failed to start Docker container {container_name}: {e}",
@@ -123,29 +99,134 @@ def remove_ai_service_in_docker(container_name: str):
         container_name (str): The name of the Docker container to be removed.
     """
     logger.info(f"Removing Docker container {container_name} ...")
+    _ai_service_container_health.forget(container_name)
     try:
-        subprocess.run(
-            ["docker", "rm", "-f", container_name],
-            check=True,
-        )
-        logger.info(f"Docker container {container_name} removed successfully.")
-    except subprocess.CalledProcessError as e:
+        if get_container_runtime().remove_container(container_name):
+            logger.info(f"Docker container {container_name} removed successfully.")
+        else:
+            logger.error(
+                f"Failed to remove Docker container {container_name}: no such container."
+            )
+    except ContainerRuntimeError as e:
         logger.error(f"Failed to remove Docker container {container_name}: {e}")
 
 
-def send_post_request(url, data, files):
-    """Send request to run AI service and display AI service responses."""
+def inspect_ai_service_containers(container_names: list[str]) -> dict:
+    """Inspect the Docker containers of many AI services with a single engine call.
+
+    Args:
+        container_names (list[str]): The names of the Docker containers.
+
+    Returns:
+        dict: container name -> container info (see ContainerRuntimeBase), or None if it does not exist.
+    """
     try:
-        response = requests.post(url, files=files, data=data)
-        # get the process time, node id and k8s pod name from the response headers
-        process_time = response.headers.get("X-Process-Time")
-        node_id = response.headers.get("X-NODE-ID")
-        k8s_pod_name = response.headers.get("X-K8S-POD-NAME")
-        if response.status_code == 200:
-            return response.json(), process_time, node_id, k8s_pod_name
-        else:
-            print(f"Error: {response.status_code}, {response.text}")
-            return None, None, None, None
-    except Exception as e:
-        print(f"Request failed: {e}")
-        return None, None, None, None
+        return get_container_runtime().inspect_containers(container_names)
+    except ContainerRuntimeError as e:
+        logger.error(f"Failed to inspect Docker containers {container_names}: {e}")
+        return {name: None for name in container_names}
+
+
+def watch_ai_service_container_health(callback):
+    """Subscribe to the health status events of the AI service containers.
+
+    Args:
+        callback (Callable): Called with {"container_name", "event", "health", ...} for each event.
+
+    Returns:
+        The event subscription, call close() on it to stop watching.
+    """
+    return get_container_runtime().subscribe_events(
+        callback, event_types=("health_status",)
+    )
+
+
+class _AIServiceContainerHealth:
+    """Health of the AI service containers, kept up to date from the health events of the container runtime.
+
+    Containers are inspected (in one call for all of them) when their health is first asked for, and
+    again if they are still starting after settings.DOCKER_CONTAINER_HEALTH_RECHECK_SECONDS in case an
+    event was missed. Otherwise asking for the health costs no runtime call.
+    """
+
+    def __init__(self):
+        self.runtime = None
+        self.subscription = None
+        # container name -> (health, time.monotonic() of the last inspection)
+        self.health = {}
+        self.lock = threading.Lock()
+
+    def _on_health_event(self, event):
+        with self.lock:
+            self.health[event["container_name"]] = (event["health"], time.monotonic())
+
+    def _watch(self):
+        runtime = get_container_runtime()
+        if runtime is self.runtime:
+            return
+        if self.subscription is not None:
+            self.subscription.close()
+        self.runtime = runtime
+        with self.lock:
+            self.health = {}
+        self.subscription = watch_ai_service_container_health(self._on_health_event)
+
+    def get(self, container_names):
+        self._watch()
+        now = time.monotonic()
+        with self.lock:
+            stale_names = [
+                name
+                for name in container_names
+                if name not in self.health
+                or (
+                    self.health[name][0] == "starting"
+                    and now - self.health[name][1]
+                    >= settings.DOCKER_CONTAINER_HEALTH_RECHECK_SECONDS
+                )
+            ]
+        if stale_names:
+            inspected = inspect_ai_service_containers(stale_names)
+            with self.lock:
+                for name, info in inspected.items():
+                    if info is None:
+                        continue
+                    previous = self.health.get(name, None)
+                    # an event received during the inspection is more recent
+                    if previous is None or previous[1] <= now:
+                        self.health[name] = (info["health"], time.monotonic())
+        with self.lock:
+            return {
+                name: self.health[name][0] if name in self.health else CONTAINER_MISSING
+                for name in container_names
+            }
+
+    def forget(self, container_name):
+        with self.lock:
+            self.health.pop(container_name, None)
+
+
+_ai_service_container_health = _AIServiceContainerHealth()
+
+
+def get_ai_service_container_health(container_names: list[str]) -> dict:
+    """The health of AI service containers.
+
+    Returns:
+        dict: container name -> "healthy", "starting", "unhealthy", None (no health check) or CONTAINER_MISSING.
+    """
+    return _ai_service_container_health.get(container_names)
+
+
+def is_ai_service_container_ready(health) -> bool:
+    """Whether a container of this health (see get_ai_service_container_health()) can serve requests."""
+    return health == "healthy" or health is None
+
+
+def send_post_request(url, data, files):
+    """Send request to run AI service and display AI service responses.
+
+    Returns:
+        response, process_time, node_id, k8s_pod_name, request_time_ms, see ContainerRuntimeBase.send_post_request()
+    """
+    return get_container_runtime().send_post_request(url, data=data, files=files)
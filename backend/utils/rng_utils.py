@@ -0,0 +1,61 @@
+import numpy as np
+
+# independent random number streams of the simulation, new streams must be appended
+# so that the draws of the existing ones stay the same for a given seed
+SIMULATION_RNG_STREAMS = [
+    "mobility",  # UE movement targets
+    "spawning",  # how many UEs spawn, where and how fast they move
+    "slicing",  # slice selection at the UE registration
+    "traffic",  # UE application traffic, e.g., the sample AI service requests
+]
+
+
+class SimulationRNG:
+    """Seeded random number generators of the simulation subsystems.
+
+    Each subsystem draws from its own NumPy Generator, so a change in how one subsystem draws
+    (e.g., an extra UE spawned) does not shift the random numbers of the others, and a seed
+    reproduces the whole run. The Generators can be used directly for batched draws,
+    e.g. ``rng.mobility.integers(0, 100, size=(n, 2))``.
+
+    Args:
+        seed (int, optional): The seed, None draws a fresh one from the OS (see the seed attribute).
+    """
+
+    def __init__(self, seed=None):
+        seed_sequence = np.random.SeedSequence(seed)
+        # the seed actually used, an unseeded run can be reproduced with it
+        self.seed = seed_sequence.entropy
+        self.streams = {
+            name: np.random.Generator(np.random.PCG64(child_seed_sequence))
+            for name, child_seed_sequence in zip(
+                SIMULATION_RNG_STREAMS, seed_sequence.spawn(len(SIMULATION_RNG_STREAMS))
+            )
+        }
+
+    def __getattr__(self, name):
+        streams = self.__dict__.get("streams", {})
+        if name in streams:
+            return streams[name]
+        raise AttributeError(name)
+
+    def randint(self, stream, low, high):
+        """A random integer in [low, high] (both included, like random.randint) from a stream."""
+        return int(self.streams[stream].integers(low, high, endpoint=True))
+
+    def choice(self, stream, options):
+        """A random element of a sequence from a stream."""
+        return options[int(self.streams[stream].integers(len(options)))]
+
+    def get_state(self):
+        return {
+            name: generator.bit_generator.state
+            for name, generator in self.streams.items()
+        }
+
+    def set_state(self, state):
+        for name, generator_state in state.items():
+            self.streams[name].bit_generator.state = generator_state
+
+    def to_json(self):
+        return {"seed": self.seed, "streams": list(self.streams.keys())}
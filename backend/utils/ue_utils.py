@@ -1,7 +1,3 @@
-import random
-import settings
-
-
 class RRCMeasurementEventMonitorBase:
     def __init__(self, event_id, time_to_trigger_in_sim_steps):
         self.event_id = event_id
@@ -129,19 +125,19 @@ def sinr_to_cqi(sinr_db):
     return 15
 
 
-def get_random_ue_operational_region(step=100):
+def get_random_ue_operational_region(rng, coverage_width, coverage_height, step=100):
+    # rng: the SimulationRNG of the simulation, the region is drawn from its spawning stream
+    # coverage_width, coverage_height: the coverage area of the network (m)
     # Choose min/max x/y as multiples of 100
-    min_x = random.randint(0, (settings.NETWORK_COVERAGE_WIDTH - step) // step) * step
-    min_y = random.randint(0, (settings.NETWORK_COVERAGE_HEIGHT - step) // step) * step
+    min_x = rng.randint("spawning", 0, (coverage_width - step) // step) * step
+    min_y = rng.randint("spawning", 0, (coverage_height - step) // step) * step
 
     # max_x/min_x at least 100m apart, at most map_size
     max_x = (
-        random.randint((min_x + step) // step, settings.NETWORK_COVERAGE_WIDTH // step)
-        * step
+        rng.randint("spawning", (min_x + step) // step, coverage_width // step) * step
     )
     max_y = (
-        random.randint((min_y + step) // step, settings.NETWORK_COVERAGE_HEIGHT // step)
-        * step
+        rng.randint("spawning", (min_y + step) // step, coverage_height // step) * step
     )
 
     return {
@@ -1,26 +1,11 @@
 import json
+import os
 import asyncio
 from agents import ItemHelpers
 from openai.types.responses import ResponseTextDeltaEvent, ResponseFunctionToolCall
 from agents import Runner
 
 
-class WebSocketSingleton:
-    _instance = None
-    _websocket = None
-
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(WebSocketSingleton, cls).__new__(cls)
-        return cls._instance
-
-    def set_websocket(self, websocket):
-        self._websocket = websocket
-
-    def get_websocket(self):
-        return self._websocket
-
-
 class WebSocketResponse:
     def __init__(self, layer=None, command=None, response=None, error=None):
         self.layer = layer
@@ -67,7 +52,98 @@ async def handle_get_simulation_state(
     response = WebSocketResponse(
         layer="network_layer",
         command="get_simulation_state",
-        response=simulation_engine.to_json(),
+        response=simulation_engine.get_snapshot().to_json(),
+        error=None,
+    )
+    await websocket.send(response.to_json())
+
+
+async def handle_start_trace_replay(
+    websocket, simulation_engine, knowledge_router, data
+):
+    """data: {"trace_dir": str, "speed": float (default 1, 0 for as fast as possible), "start_step": int}"""
+    replay = simulation_engine.open_trace_replay(data.get("trace_dir"))
+    if "start_step" in data:
+        replay.seek(data["start_step"])
+    response = WebSocketResponse(
+        layer="network_layer",
+        command="start_trace_replay",
+        response=replay.to_json(),
+        error=None,
+    )
+    await websocket.send(response.to_json())
+    # kept on the engine, cancelled by close_trace_replay() (also when the session is closed)
+    simulation_engine.play_trace_replay(websocket, speed=data.get("speed", 1.0))
+
+
+async def handle_seek_trace_replay(
+    websocket, simulation_engine, knowledge_router, data
+):
+    """data: {"step": int} or {"sim_time": float}"""
+    replay = simulation_engine.trace_replay
+    if replay is None:
+        response = WebSocketResponse(
+            layer="network_layer",
+            command="seek_trace_replay",
+            response=None,
+            error="No trace is being replayed.",
+        )
+        await websocket.send(response.to_json())
+        return
+    if "sim_time" in data:
+        replay.seek_time(data["sim_time"])
+    else:
+        replay.seek(data.get("step", 0))
+    if not replay.playing:
+        # paused replays still show the step they were moved to
+        await websocket.send(replay.get_frame_message(replay.position))
+    response = WebSocketResponse(
+        layer="network_layer",
+        command="seek_trace_replay",
+        response=replay.to_json(),
+        error=None,
+    )
+    await websocket.send(response.to_json())
+
+
+async def handle_stop_trace_replay(
+    websocket, simulation_engine, knowledge_router, data
+):
+    simulation_engine.close_trace_replay()
+    response = WebSocketResponse(
+        layer="network_layer",
+        command="stop_trace_replay",
+        response="Trace replay stopped",
+        error=None,
+    )
+    await websocket.send(response.to_json())
+
+
+async def handle_save_checkpoint(websocket, simulation_engine, knowledge_router, data):
+    """data: {"name": str} (optional), a file name in settings.SIM_CHECKPOINT_DIRECTORY"""
+    name = data.get("name", None) if isinstance(data, dict) else None
+    # the engine is not stepped until the checkpoint is taken
+    sim_step = simulation_engine.sim_step
+    path = await simulation_engine.save_checkpoint_in_background(
+        simulation_engine.get_checkpoint_path(name) if name is not None else None
+    )
+    response = WebSocketResponse(
+        layer="network_layer",
+        command="save_checkpoint",
+        response={"name": os.path.basename(path), "sim_step": sim_step},
+        error=None,
+    )
+    await websocket.send(response.to_json())
+
+
+async def handle_load_checkpoint(websocket, simulation_engine, knowledge_router, data):
+    """data: {"name": str}, a file name in settings.SIM_CHECKPOINT_DIRECTORY"""
+    name = data.get("name", None) if isinstance(data, dict) else None
+    header = simulation_engine.load_checkpoint(simulation_engine.get_checkpoint_path(name))
+    response = WebSocketResponse(
+        layer="network_layer",
+        command="load_checkpoint",
+        response=header,
         error=None,
     )
     await websocket.send(response.to_json())
@@ -84,10 +160,33 @@ async def handle_get_routes(websocket, simulation_engine, knowledge_router, data
 
 
 async def handle_query_knowledge(websocket, simulation_engine, knowledge_router, data):
+    if isinstance(data, list):
+        # a list of keys is answered in one round trip
+        response = knowledge_router.render_bulk_knowledge(
+            knowledge_router.query_knowledge_bulk(data)
+        )
+    else:
+        response = knowledge_router.query_knowledge(data)
     response = WebSocketResponse(
         layer="knowledge_layer",
         command="query_knowledge",
-        response=knowledge_router.query_knowledge(data),
+        response=response,
+        error=None,
+    )
+    await websocket.send(response.to_json())
+
+
+async def handle_query_knowledge_bulk(
+    websocket, simulation_engine, knowledge_router, data
+):
+    """data: {"query_keys": [...], "max_chars_per_query": int or None}"""
+    response = WebSocketResponse(
+        layer="knowledge_layer",
+        command="query_knowledge_bulk",
+        response=knowledge_router.query_knowledge_bulk(
+            data.get("query_keys", []),
+            max_chars_per_query=data.get("max_chars_per_query", None),
+        ),
         error=None,
     )
     await websocket.send(response.to_json())